@@ -13,7 +13,7 @@ import sys
 import numpy as np
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from matplotlib.animation import FuncAnimation
+import pyqtgraph as pg
 import math
 import os
 import json
@@ -24,6 +24,8 @@ from dashboard.chatbot_dialog import ChatbotDialog
 from utils.settings_manager import SettingsManager
 from utils.localization import translate_text
 from utils.crash_logger import get_crash_logger, CrashLogDialog
+from utils.frame_stats import FrameTimeStats
+from ecg.analysis_worker import compute_hrv_sdnn
 from dashboard.admin_reports import AdminLoginDialog, AdminReportsDialog
 
 # Try to import configuration, fallback to defaults if not available
@@ -529,15 +531,21 @@ class Dashboard(QWidget):
         self.ecg_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         ecg_layout.addWidget(self.ecg_label)
         
-        self.ecg_canvas = MplCanvas(width=4, height=2)
-        self.ecg_canvas.axes.set_facecolor("#eee")
-        self.ecg_canvas.axes.set_xticks([])
-        self.ecg_canvas.axes.set_yticks([])
-        self.ecg_canvas.axes.set_title("Lead II", fontsize=10)
-        # Set fixed Y-axis limits to center the ECG wave properly with more range
-        self.ecg_canvas.axes.set_ylim(-300, 300)
-        self.ecg_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        ecg_layout.addWidget(self.ecg_canvas)
+        # PyQtGraph (same renderer as the 12-lead page): one setData per frame, no Agg redraw
+        self.ecg_plot = pg.PlotWidget()
+        self.ecg_plot.setBackground("#eee")
+        self.ecg_plot.hideAxis('left')
+        self.ecg_plot.hideAxis('bottom')
+        self.ecg_plot.setTitle("Lead II", color="#222", size="10pt")
+        self.ecg_plot.setMouseEnabled(x=False, y=False)
+        self.ecg_plot.setMenuEnabled(False)
+        self.ecg_plot.hideButtons()
+        # Set fixed axis limits to center the ECG wave properly with more range
+        self.ecg_plot.disableAutoRange()
+        self.ecg_plot.setYRange(-300, 300, padding=0)
+        self.ecg_plot.setXRange(0, 2, padding=0)
+        self.ecg_plot.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        ecg_layout.addWidget(self.ecg_plot)
         
         grid.addWidget(ecg_card, 1, 1)
         
@@ -943,16 +951,19 @@ class Dashboard(QWidget):
         # --- ECG Animation Setup ---
         self.ecg_x = np.linspace(0, 2, 500)
         self.ecg_y = 150 * np.sin(2 * np.pi * 2 * self.ecg_x) + 30 * np.random.randn(500)  # Smaller amplitude to prevent cropping
-        self.ecg_line, = self.ecg_canvas.axes.plot(self.ecg_x, self.ecg_y, color="#ff6600", linewidth=0.5, antialiased=False)
-        # Reduce CPU/GPU usage: lower refresh rate slightly and disable frame caching
-        self.anim = FuncAnimation(
-            self.ecg_canvas.figure,
-            self.update_ecg,
-            interval=85,              # ~12 FPS for smoothness without lag
-            blit=True,
-            cache_frame_data=False,   # prevent unbounded cache growth
-            save_count=100
-        )
+        self.ecg_line = self.ecg_plot.plot(self.ecg_x, self.ecg_y, pen=pg.mkPen(color="#ff6600", width=1))
+        self.ecg_plot.getPlotItem().setClipToView(True)
+        # Frame callback only draws the trace; metrics run on their own timer below
+        self._ecg_frame = 0
+        self.ecg_frame_stats = FrameTimeStats("Dashboard ECG")
+        self.ecg_frame_timer = QTimer(self)
+        self.ecg_frame_timer.timeout.connect(self._on_ecg_frame)
+        self.ecg_frame_timer.start(33)  # ~30 FPS
+        
+        # --- Live ECG Metrics Timer (decoupled from the frame rate) ---
+        self.live_metrics_timer = QTimer(self)
+        self.live_metrics_timer.timeout.connect(self.update_live_metrics)
+        self.live_metrics_timer.start(500)
         
         # --- Dashboard Metrics Update Timer ---
         self.metrics_timer = QTimer(self)
@@ -1587,72 +1598,82 @@ class Dashboard(QWidget):
             b, a = butter(4, [low, high], btype='band')
             filtered_signal = filtfilt(b, a, ecg_signal)
             
+            # Prefer the ECG page's online Pan-Tompkins peak stream (ecg_signal is the
+            # newest Lead II window); re-detect only when it is not following the stream
+            peaks = None
+            if hasattr(self, 'ecg_test_page') and self.ecg_test_page and hasattr(self.ecg_test_page, 'live_r_peaks'):
+                try:
+                    peaks = self.ecg_test_page.live_r_peaks(len(ecg_signal))
+                except Exception:
+                    peaks = None
+            
             # SMART ADAPTIVE PEAK DETECTION (40-300 BPM with BPM-based selection)
             # Run multiple detections and choose based on CALCULATED BPM consistency
             height_threshold = np.mean(filtered_signal) + 0.5 * np.std(filtered_signal)
             prominence_threshold = np.std(filtered_signal) * 0.4
             
-            # Run 3 detection strategies
-            detection_results = []
+            if peaks is None or len(peaks) < 2:
+                # Run 3 detection strategies
+                detection_results = []
             
-            # Strategy 1: Conservative (best for 40-120 BPM)
-            peaks_conservative, _ = find_peaks(
-                filtered_signal,
-                height=height_threshold,
-                distance=int(0.5 * fs),  # 400ms - wider distance for low BPM
-                prominence=prominence_threshold
-            )
-            if len(peaks_conservative) >= 2:
-                rr_cons = np.diff(peaks_conservative) * (1000 / fs)
-                valid_cons = rr_cons[(rr_cons >= 200) & (rr_cons <= 2000)]
-                if len(valid_cons) > 0:
-                    bpm_cons = 60000 / np.median(valid_cons)
-                    std_cons = np.std(valid_cons)
-                    detection_results.append(('conservative', peaks_conservative, bpm_cons, std_cons))
-            
-            # Strategy 2: Normal (best for 100-180 BPM)
-            peaks_normal, _ = find_peaks(
-                filtered_signal,
-                height=height_threshold,
-                distance=int(0.3 * fs),  # 240ms - medium distance
-                prominence=prominence_threshold
-            )
-            if len(peaks_normal) >= 2:
-                rr_norm = np.diff(peaks_normal) * (1000 / fs)
-                valid_norm = rr_norm[(rr_norm >= 200) & (rr_norm <= 2000)]
-                if len(valid_norm) > 0:
-                    bpm_norm = 60000 / np.median(valid_norm)
-                    std_norm = np.std(valid_norm)
-                    detection_results.append(('normal', peaks_normal, bpm_norm, std_norm))
-            
-            # Strategy 3: Tight (best for 160-300 BPM)
-            peaks_tight, _ = find_peaks(
-                filtered_signal,
-                height=height_threshold,
-                distance=int(0.2 * fs),  # 160ms - tight distance for high BPM
-                prominence=prominence_threshold
-            )
-            if len(peaks_tight) >= 2:
-                rr_tight = np.diff(peaks_tight) * (1000 / fs)
-                valid_tight = rr_tight[(rr_tight >= 200) & (rr_tight <= 2000)]
-                if len(valid_tight) > 0:
-                    bpm_tight = 60000 / np.median(valid_tight)
-                    std_tight = np.std(valid_tight)
-                    detection_results.append(('tight', peaks_tight, bpm_tight, std_tight))
-            
-            # Select based on BPM consistency (lowest std deviation = most stable)
-            if detection_results:
-                # Sort by consistency (lower std = better)
-                detection_results.sort(key=lambda x: x[3])  # Sort by std
-                best_method, peaks, best_bpm, best_std = detection_results[0]
-            else:
-                # Fallback
-                peaks, _ = find_peaks(
+                # Strategy 1: Conservative (best for 40-120 BPM)
+                peaks_conservative, _ = find_peaks(
                     filtered_signal,
                     height=height_threshold,
-                    distance=int(0.4 * fs),
+                    distance=int(0.5 * fs),  # 400ms - wider distance for low BPM
                     prominence=prominence_threshold
                 )
+                if len(peaks_conservative) >= 2:
+                    rr_cons = np.diff(peaks_conservative) * (1000 / fs)
+                    valid_cons = rr_cons[(rr_cons >= 200) & (rr_cons <= 2000)]
+                    if len(valid_cons) > 0:
+                        bpm_cons = 60000 / np.median(valid_cons)
+                        std_cons = np.std(valid_cons)
+                        detection_results.append(('conservative', peaks_conservative, bpm_cons, std_cons))
+            
+                # Strategy 2: Normal (best for 100-180 BPM)
+                peaks_normal, _ = find_peaks(
+                    filtered_signal,
+                    height=height_threshold,
+                    distance=int(0.3 * fs),  # 240ms - medium distance
+                    prominence=prominence_threshold
+                )
+                if len(peaks_normal) >= 2:
+                    rr_norm = np.diff(peaks_normal) * (1000 / fs)
+                    valid_norm = rr_norm[(rr_norm >= 200) & (rr_norm <= 2000)]
+                    if len(valid_norm) > 0:
+                        bpm_norm = 60000 / np.median(valid_norm)
+                        std_norm = np.std(valid_norm)
+                        detection_results.append(('normal', peaks_normal, bpm_norm, std_norm))
+            
+                # Strategy 3: Tight (best for 160-300 BPM)
+                peaks_tight, _ = find_peaks(
+                    filtered_signal,
+                    height=height_threshold,
+                    distance=int(0.2 * fs),  # 160ms - tight distance for high BPM
+                    prominence=prominence_threshold
+                )
+                if len(peaks_tight) >= 2:
+                    rr_tight = np.diff(peaks_tight) * (1000 / fs)
+                    valid_tight = rr_tight[(rr_tight >= 200) & (rr_tight <= 2000)]
+                    if len(valid_tight) > 0:
+                        bpm_tight = 60000 / np.median(valid_tight)
+                        std_tight = np.std(valid_tight)
+                        detection_results.append(('tight', peaks_tight, bpm_tight, std_tight))
+            
+                # Select based on BPM consistency (lowest std deviation = most stable)
+                if detection_results:
+                    # Sort by consistency (lower std = better)
+                    detection_results.sort(key=lambda x: x[3])  # Sort by std
+                    best_method, peaks, best_bpm, best_std = detection_results[0]
+                else:
+                    # Fallback
+                    peaks, _ = find_peaks(
+                        filtered_signal,
+                        height=height_threshold,
+                        distance=int(0.4 * fs),
+                        prominence=prominence_threshold
+                    )
             
             metrics = {}
             
@@ -1945,30 +1966,8 @@ class Dashboard(QWidget):
                         print("❌ Invalid Lead II data")
                         return self._fallback_wave_update(frame)
                     
-                    # Convert to numpy array safely
-                    try:
-                        original_data = np.asarray(lead_ii_data, dtype=float)
-                    except Exception as e:
-                        print(f"❌ Error converting Lead II data to array: {e}")
-                        return self._fallback_wave_update(frame)
-                    
-                    # Check for invalid values
-                    if np.any(np.isnan(original_data)) or np.any(np.isinf(original_data)):
-                        print("❌ Invalid values (NaN/Inf) in Lead II data")
-                        return self._fallback_wave_update(frame)
-                    
                     # Get actual sampling rate from ECG test page
-                    actual_sampling_rate = 80  # Default to 80Hz
-                    try:
-                        if (hasattr(self.ecg_test_page, 'sampler') and 
-                            hasattr(self.ecg_test_page.sampler, 'sampling_rate') and 
-                            self.ecg_test_page.sampler.sampling_rate):
-                            actual_sampling_rate = float(self.ecg_test_page.sampler.sampling_rate)
-                            if actual_sampling_rate <= 0 or actual_sampling_rate > 1000:
-                                actual_sampling_rate = 80
-                    except Exception as e:
-                        print(f"❌ Error getting sampling rate: {e}")
-                        actual_sampling_rate = 80
+                    actual_sampling_rate = self._ecg_page_sampling_rate()
 
                     # Determine visible window based on wave speed (display feature only)
                     try:
@@ -1985,11 +1984,25 @@ class Dashboard(QWidget):
                     # Scale time window with wave speed:
                     #   12.5 mm/s → 6 s, 25 mm/s → 3 s, 50 mm/s → 1.5 s
                     seconds_to_show = baseline_seconds * (25.0 / max(1e-6, wave_speed))
-                    window_samples = int(max(50, min(len(original_data), seconds_to_show * actual_sampling_rate)))
+                    window_samples = int(max(50, min(len(lead_ii_data), seconds_to_show * actual_sampling_rate)))
+
+                    # Only the visible window is copied out of the circular lead store
+                    try:
+                        if hasattr(self.ecg_test_page.data, 'latest'):
+                            src = np.asarray(self.ecg_test_page.data.latest(window_samples, lead=1), dtype=float)
+                        else:
+                            src = np.asarray(lead_ii_data[-window_samples:], dtype=float)
+                    except Exception as e:
+                        print(f"❌ Error converting Lead II data to array: {e}")
+                        return self._fallback_wave_update(frame)
+                    
+                    # Check for invalid values
+                    if np.any(np.isnan(src)) or np.any(np.isinf(src)):
+                        print("❌ Invalid values (NaN/Inf) in Lead II data")
+                        return self._fallback_wave_update(frame)
 
-                    # Slice last window and resample horizontally to fixed display length
+                    # Resample horizontally to fixed display length
                     try:
-                        src = original_data[-window_samples:]
                         
                         # Detrend/center for display only
                         src_mean = np.mean(src)
@@ -1997,15 +2010,26 @@ class Dashboard(QWidget):
                             src_mean = 0
                         src_centered = src - src_mean
                         # Scale the signal to fit within the Y-axis range (-300 to 300)
-                        if np.std(src_centered) > 0:
-                            src_centered = src_centered * (200 / np.std(src_centered))  # Scale to fit in range
+                        src_std = np.std(src_centered)
+                        scale = (200 / src_std) if src_std > 0 else 1.0
+                        src_centered = src_centered * scale  # Scale to fit in range
                         
                         display_len = len(self.ecg_x)
+                        x_span = self.ecg_x[-1] - self.ecg_x[0]
                         if src_centered.size <= 1:
+                            display_x = self.ecg_x
                             display_y = np.full(display_len, 0.0)  # Center at 0
+                        elif hasattr(self.ecg_test_page, 'display_envelope') and hasattr(self.ecg_test_page.data, 'latest'):
+                            # Shared min/max envelope at the canvas' pixel width (keeps QRS spikes)
+                            x_env, y_env = self.ecg_test_page.display_envelope(
+                                'dashboard', self.ecg_test_page.data, 1, src.size,
+                                max(100, self.ecg_plot.width()))
+                            display_x = self.ecg_x[0] + x_env * (x_span / (src.size - 1))
+                            display_y = (y_env - src_mean) * scale
                         else:
                             x_src = np.linspace(0.0, 1.0, src_centered.size)
                             x_dst = np.linspace(0.0, 1.0, display_len)
+                            display_x = self.ecg_x
                             display_y = np.interp(x_dst, x_src, src_centered)
                         
                         # Validate display data
@@ -2013,47 +2037,12 @@ class Dashboard(QWidget):
                             print("❌ Invalid display data generated")
                             return self._fallback_wave_update(frame)
                         
-                        self.ecg_line.set_ydata(display_y)
+                        self.ecg_line.setData(display_x, display_y)
                         
                     except Exception as e:
                         print(f"❌ Error processing display data: {e}")
                         return self._fallback_wave_update(frame)
                     
-                    # Calculate and update live ECG metrics using ORIGINAL data with SAME sampling rate
-                    try:
-                        # Use ECG test page's own calculation methods for consistency
-                        if hasattr(self.ecg_test_page, 'calculate_ecg_metrics'):
-                            self.ecg_test_page.calculate_ecg_metrics()
-                        
-                        # Get metrics from ECG test page to ensure synchronization
-                        if hasattr(self.ecg_test_page, 'get_current_metrics'):
-                            ecg_metrics = self.ecg_test_page.get_current_metrics()
-                            # Debug: Print metrics to see what's being calculated
-                            if hasattr(self, '_debug_counter'):
-                                self._debug_counter += 1
-                            else:
-                                self._debug_counter = 1
-                            if self._debug_counter % 50 == 0:  # Optimized: Print every 50 updates (was 10) - reduces console spam
-                                print(f"🔍 Dashboard ECG metrics: {ecg_metrics}")
-                            self.update_dashboard_metrics_from_ecg()
-                        
-                        # Calculate and update stress level and HRV (throttled to every 3 seconds for stability)
-                        if not hasattr(self, '_last_stress_update'):
-                            self._last_stress_update = 0
-                        if time.time() - self._last_stress_update > 3:
-                            self.update_stress_and_hrv(original_data, actual_sampling_rate)
-                            self._last_stress_update = time.time()
-                        
-                        # Update live conclusion every 5 seconds
-                        if not hasattr(self, '_last_conclusion_update'):
-                            self._last_conclusion_update = 0
-                        if time.time() - self._last_conclusion_update > 5:
-                            self.update_live_conclusion()
-                            self._last_conclusion_update = time.time()
-                    except Exception as e:
-                        print(f"❌ Error calculating ECG metrics: {e}")
-                        # Continue with display even if metrics fail
-                    
                     return [self.ecg_line]
                     
                 except Exception as e:
@@ -2067,12 +2056,87 @@ class Dashboard(QWidget):
             print(f"❌ Critical error in update_ecg: {e}")
             return self._fallback_wave_update(frame)
     
+    def _on_ecg_frame(self):
+        """Frame timer callback: redraw the Lead II trace and record frame-time stats"""
+        start = self.ecg_frame_stats.begin()
+        try:
+            self._ecg_frame += 1
+            self.update_ecg(self._ecg_frame)
+        finally:
+            self.ecg_frame_stats.end(start)
+            self.ecg_frame_stats.maybe_report()
+
+    def _ecg_page_sampling_rate(self):
+        """Measured sampling rate of the ECG test page (80 Hz default)"""
+        actual_sampling_rate = 80  # Default to 80Hz
+        try:
+            if (hasattr(self.ecg_test_page, 'sampler') and 
+                hasattr(self.ecg_test_page.sampler, 'sampling_rate') and 
+                self.ecg_test_page.sampler.sampling_rate):
+                actual_sampling_rate = float(self.ecg_test_page.sampler.sampling_rate)
+                if actual_sampling_rate <= 0 or actual_sampling_rate > 1000:
+                    actual_sampling_rate = 80
+        except Exception as e:
+            print(f"❌ Error getting sampling rate: {e}")
+            actual_sampling_rate = 80
+        return actual_sampling_rate
+
+    def update_live_metrics(self):
+        """Recalculate live ECG metrics on their own timer, outside the waveform frame callback"""
+        if not hasattr(self, 'ecg_test_page') or not self.ecg_test_page:
+            return
+        try:
+            if not hasattr(self.ecg_test_page, 'data') or len(self.ecg_test_page.data) <= 1:
+                return
+            lead_ii_data = self.ecg_test_page.data[1]
+            if len(lead_ii_data) <= 10:
+                return
+            actual_sampling_rate = self._ecg_page_sampling_rate()
+        except Exception as e:
+            print(f"❌ Error reading ECG data for metrics: {e}")
+            return
+        
+        # Calculate and update live ECG metrics using ORIGINAL data with SAME sampling rate
+        try:
+            # Use ECG test page's own calculation methods for consistency
+            if hasattr(self.ecg_test_page, 'calculate_ecg_metrics'):
+                self.ecg_test_page.calculate_ecg_metrics()
+            
+            # Get metrics from ECG test page to ensure synchronization
+            if hasattr(self.ecg_test_page, 'get_current_metrics'):
+                ecg_metrics = self.ecg_test_page.get_current_metrics()
+                # Debug: Print metrics to see what's being calculated
+                if hasattr(self, '_debug_counter'):
+                    self._debug_counter += 1
+                else:
+                    self._debug_counter = 1
+                if self._debug_counter % 50 == 0:  # Optimized: Print every 50 updates (was 10) - reduces console spam
+                    print(f"🔍 Dashboard ECG metrics: {ecg_metrics}")
+                self.update_dashboard_metrics_from_ecg()
+            
+            # Calculate and update stress level and HRV (throttled to every 3 seconds for stability)
+            if not hasattr(self, '_last_stress_update'):
+                self._last_stress_update = 0
+            if time.time() - self._last_stress_update > 3:
+                self.update_stress_and_hrv(np.asarray(lead_ii_data, dtype=float), actual_sampling_rate)
+                self._last_stress_update = time.time()
+            
+            # Update live conclusion every 5 seconds
+            if not hasattr(self, '_last_conclusion_update'):
+                self._last_conclusion_update = 0
+            if time.time() - self._last_conclusion_update > 5:
+                self.update_live_conclusion()
+                self._last_conclusion_update = time.time()
+        except Exception as e:
+            print(f"❌ Error calculating ECG metrics: {e}")
+            # Continue with display even if metrics fail
+
     def _fallback_wave_update(self, frame):
         """Fallback wave generation when ECG data is not available"""
         try:
             self.ecg_y = np.roll(self.ecg_y, -1)
             self.ecg_y[-1] = 150 * np.sin(2 * np.pi * 2 * self.ecg_x[-1] + frame/10) + 30 * np.random.randn()  # Smaller amplitude
-            self.ecg_line.set_ydata(self.ecg_y)
+            self.ecg_line.setData(self.ecg_x, self.ecg_y)
             # Do not compute/update metrics from mock wave; keep zeros until user starts
             return [self.ecg_line]
         except Exception as e:
@@ -2353,11 +2417,6 @@ class Dashboard(QWidget):
         import os
         # Import the simple function from ecg_report_generator
         from ecg.ecg_report_generator import generate_ecg_report
-        # History helper
-        try:
-            from dashboard.history_window import append_history_entry
-        except Exception:
-            append_history_entry = None
 
         print(" Starting PDF report generation...")
 
@@ -2449,82 +2508,16 @@ class Dashboard(QWidget):
         project_root = os.path.abspath(os.path.join(current_dir, '..'))
         
         # Capture live data from ECG test page
+        use_report_jobs = False
         if hasattr(self, 'ecg_test_page') and self.ecg_test_page and hasattr(self.ecg_test_page, 'data'):
             print(f" Found ECG test page with data: {len(self.ecg_test_page.data)} leads")
-            
-            # Calculate 10 seconds of data based on sampling rate
-            sampling_rate = 250  # Default sampling rate
-            if hasattr(self.ecg_test_page, 'sampler') and hasattr(self.ecg_test_page.sampler, 'sampling_rate'):
-                try:
-                    sampling_rate = float(self.ecg_test_page.sampler.sampling_rate)
-                except:
-                    sampling_rate = 250
-            
-            data_points_10_sec = int(sampling_rate * 10)  # 10 seconds of data
-            print(f" Capturing {data_points_10_sec} data points at {sampling_rate}Hz")
-            
-            for i, lead in enumerate(ordered_leads):
-                if i < len(self.ecg_test_page.data) and i < len(self.ecg_test_page.leads):
-                    try:
-                        # Get the last 10 seconds of data for this lead
-                        lead_data = self.ecg_test_page.data[i]
-                        if len(lead_data) > data_points_10_sec:
-                            recent_data = lead_data[-data_points_10_sec:]
-                        else:
-                            recent_data = lead_data
-                        
-                        if len(recent_data) > 0:
-                            # Create a clean plot for the report
-                            import matplotlib.pyplot as plt
-                            import matplotlib
-                            matplotlib.use('Agg')  # Use non-interactive backend
-                            
-                            fig, ax = plt.subplots(figsize=(8, 2))
-                            
-                            # Plot the 10-second ECG trace
-                            time_axis = np.linspace(0, 10, len(recent_data))  # 10 seconds
-                            ax.plot(time_axis, recent_data, color='black', linewidth=0.8)
-                            
-                            # Clean medical-style formatting
-                            ax.set_xlim(0, 10)
-                            ax.set_xticks([0, 2, 4, 6, 8, 10])
-                            ax.set_xticklabels(['0s', '2s', '4s', '6s', '8s', '10s'])
-                            ax.set_ylabel('Amplitude (mV)')
-                            ax.set_title(f'Lead {lead} - Last 10 seconds', fontsize=10, fontweight='bold')
-                            
-                            # Add subtle grid
-                            ax.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
-                            ax.set_axisbelow(True)
-                            
-                            # Clean background
-                            ax.set_facecolor('white')
-                            fig.patch.set_facecolor('white')
-                            
-                            # Save the image
-                            img_path = os.path.join(project_root, f"lead_{lead}_10sec.png")
-                            fig.savefig(img_path, 
-                                      bbox_inches='tight', 
-                                      pad_inches=0.1, 
-                                      dpi=150, 
-                                      facecolor='white',
-                                      edgecolor='none')
-                            
-                            plt.close(fig)  # Close to free memory
-                            lead_img_paths[lead] = img_path
-                            
-                            print(f" ✅ Captured 10s Lead {lead}: {len(recent_data)} samples")
-                        else:
-                            print(f" ⚠️ No data available for Lead {lead}")
-                            
-                    except Exception as e:
-                        print(f" ❌ Error capturing Lead {lead}: {e}")
-                else:
-                    print(f" ⚠️ Lead {lead} not available (index {i})")
+            # The 10 s lead panels are rendered in the report job pool along with the PDF
+            use_report_jobs = hasattr(self.ecg_test_page, 'submit_report_jobs')
         else:
             print(" ❌ No ECG test page or data available for capture")
         
         # Method 3: Check current stack widget for ECG pages
-        if not lead_img_paths and hasattr(self, 'page_stack'):
+        if not lead_img_paths and not use_report_jobs and hasattr(self, 'page_stack'):
             print(" Checking page stack for ECG test pages...")
             
             for i in range(self.page_stack.count()):
@@ -2591,7 +2584,7 @@ class Dashboard(QWidget):
                     break
         
         # Method 4: Capture from PyQtGraph plot widgets (current 12-lead grid)
-        if not lead_img_paths and hasattr(self, 'ecg_test_page') and self.ecg_test_page:
+        if not lead_img_paths and not use_report_jobs and hasattr(self, 'ecg_test_page') and self.ecg_test_page:
             if hasattr(self.ecg_test_page, 'plot_widgets') and self.ecg_test_page.plot_widgets:
                 print(" Capturing ECG from PyQtGraph plot widgets...")
                 try:
@@ -2612,7 +2605,9 @@ class Dashboard(QWidget):
                     print(f" PyQtGraph capture failed: {e}")
 
         # Report results
-        if lead_img_paths:
+        if use_report_jobs:
+            print(" Lead graphs will be rendered from the live capture with the report")
+        elif lead_img_paths:
             print(f" Successfully captured {len(lead_img_paths)}/12 real ECG graphs!")
         else:
             print(" No real ECG graphs found!")
@@ -2739,6 +2734,16 @@ class Dashboard(QWidget):
                 }
                 ecg_data['machine_serial'] = self.user_details.get('serial_id', '') or os.getenv('MACHINE_SERIAL_ID', '')
 
+                if use_report_jobs:
+                    # Render off the GUI thread; _finish_pdf_report runs once the PDF is written
+                    queued = self.ecg_test_page.submit_report_jobs(
+                        {'ecg': filename}, ecg_data, patient,
+                        on_done=lambda result: self._finish_pdf_report(result['filename'], patient, result.get('panels', 0)),
+                    )
+                    if not queued:
+                        QMessageBox.critical(self, "Error", "Failed to generate PDF: no ECG data could be saved for the report")
+                    return
+
                 # Generate the PDF with patient details
                 generate_ecg_report(
                     filename,
@@ -2749,83 +2754,86 @@ class Dashboard(QWidget):
                     patient,
                     log_history=False,
                 )
-
-                # After successful report generation, append to history (explicit)
-                try:
-                    # Ensure history helper is available
-                    if append_history_entry is None:
-                        from dashboard.history_window import append_history_entry as _ah
-                        append_history_entry = _ah
-                    if append_history_entry is not None:
-                        append_history_entry(patient, filename, report_type="12 Lead")
-                except Exception as hist_err:
-                    import traceback
-                    traceback.print_exc()
-                
-                QMessageBox.information(
-                    self, 
-                    "Success", 
-                    f" ECG Report generated successfully!\n Saved as: {filename}\n Real graphs: {len(lead_img_paths)}/12"
-                )
-                
-                print(f" PDF generated: {filename}")
-                # Save a copy inside the app for Recent Reports + update index.json
-                try:
-                    import shutil, json
-                    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-                    reports_dir = os.path.abspath(os.path.join(base_dir, "..", "reports"))
-                    os.makedirs(reports_dir, exist_ok=True)
-                    # Destination filename (keep basename)
-                    dst_basename = os.path.basename(filename)
-                    dst_path = os.path.join(reports_dir, dst_basename)
-                    # Avoid overwrite
-                    if os.path.abspath(filename) != os.path.abspath(dst_path):
-                        counter = 1
-                        base_name, ext = os.path.splitext(dst_basename)
-                        while os.path.exists(dst_path):
-                            dst_basename = f"{base_name}_{counter}{ext}"
-                            dst_path = os.path.join(reports_dir, dst_basename)
-                            counter += 1
-                        shutil.copyfile(filename, dst_path)
-                    
-                    # Also copy the JSON twin if it exists
-                    src_json = os.path.splitext(filename)[0] + ".json"
-                    if os.path.exists(src_json):
-                        dst_json = os.path.splitext(dst_path)[0] + ".json"
-                        if os.path.abspath(src_json) != os.path.abspath(dst_json):
-                            shutil.copyfile(src_json, dst_json)
-                            print(f"✓ Copied JSON twin to: {dst_json}")
-                    # Update index.json (prepend)
-                    index_path = os.path.join(reports_dir, "index.json")
-                    items = []
-                    if os.path.exists(index_path):
-                        try:
-                            with open(index_path, 'r') as f:
-                                items = json.load(f)
-                        except Exception:
-                            items = []
-                    now = datetime.datetime.now()
-                    meta = {
-                        "filename": os.path.basename(dst_path),
-                        "title": "ECG Report",
-                        "patient": "",  # Fill from form if available
-                        "date": now.strftime('%Y-%m-%d'),
-                        "time": now.strftime('%H:%M:%S')
-                    }
-                    items = [meta] + items
-                    items = items[:10]
-                    with open(index_path, 'w') as f:
-                        json.dump(items, f, indent=2)
-                    # Refresh dashboard list
-                    self.refresh_recent_reports_ui()
-                except Exception as idx_err:
-                    print(f" Failed to update Recent Reports index: {idx_err}")
+                self._finish_pdf_report(filename, patient, len(lead_img_paths))
 
             except Exception as e:
                 error_msg = f"Failed to generate PDF: {str(e)}"
                 print(f" {error_msg}")
                 QMessageBox.critical(self, "Error", error_msg)
 
+    def _finish_pdf_report(self, filename, patient, graph_count=0):
+        """History entry, success message, copy into reports/ and the Recent Reports index."""
+        from PyQt5.QtWidgets import QMessageBox
+        import datetime
+        import os
+
+        # After successful report generation, append to history (explicit)
+        try:
+            from dashboard.history_window import append_history_entry
+            append_history_entry(patient, filename, report_type="12 Lead")
+        except Exception as hist_err:
+            import traceback
+            traceback.print_exc()
+
+        QMessageBox.information(
+            self, 
+            "Success", 
+            f" ECG Report generated successfully!\n Saved as: {filename}\n Real graphs: {graph_count}/12"
+        )
+
+        print(f" PDF generated: {filename}")
+        # Save a copy inside the app for Recent Reports + update index.json
+        try:
+            import shutil, json
+            base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+            reports_dir = os.path.abspath(os.path.join(base_dir, "..", "reports"))
+            os.makedirs(reports_dir, exist_ok=True)
+            # Destination filename (keep basename)
+            dst_basename = os.path.basename(filename)
+            dst_path = os.path.join(reports_dir, dst_basename)
+            # Avoid overwrite
+            if os.path.abspath(filename) != os.path.abspath(dst_path):
+                counter = 1
+                base_name, ext = os.path.splitext(dst_basename)
+                while os.path.exists(dst_path):
+                    dst_basename = f"{base_name}_{counter}{ext}"
+                    dst_path = os.path.join(reports_dir, dst_basename)
+                    counter += 1
+                shutil.copyfile(filename, dst_path)
+
+            # Also copy the JSON twin if it exists
+            src_json = os.path.splitext(filename)[0] + ".json"
+            if os.path.exists(src_json):
+                dst_json = os.path.splitext(dst_path)[0] + ".json"
+                if os.path.abspath(src_json) != os.path.abspath(dst_json):
+                    shutil.copyfile(src_json, dst_json)
+                    print(f"✓ Copied JSON twin to: {dst_json}")
+            # Update index.json (prepend)
+            index_path = os.path.join(reports_dir, "index.json")
+            items = []
+            if os.path.exists(index_path):
+                try:
+                    with open(index_path, 'r') as f:
+                        items = json.load(f)
+                except Exception:
+                    items = []
+            now = datetime.datetime.now()
+            meta = {
+                "filename": os.path.basename(dst_path),
+                "title": "ECG Report",
+                "patient": "",  # Fill from form if available
+                "date": now.strftime('%Y-%m-%d'),
+                "time": now.strftime('%H:%M:%S')
+            }
+            items = [meta] + items
+            items = items[:10]
+            with open(index_path, 'w') as f:
+                json.dump(items, f, indent=2)
+            # Refresh dashboard list
+            self.refresh_recent_reports_ui()
+        except Exception as idx_err:
+            print(f" Failed to update Recent Reports index: {idx_err}")
+
     def animate_heartbeat(self):
         """Animate heart image synchronized with live heart rate and play sound"""
         import time
@@ -3015,70 +3023,69 @@ class Dashboard(QWidget):
             # self.user_label.setText("Not signed in")
             self.sign_btn.setText("Sign In")
     def update_stress_and_hrv(self, ecg_signal, sampling_rate):
-        """Calculate and update stress level and HRV from ECG data with smoothing"""
+        """Calculate and update stress level and HRV from ECG data with smoothing
+        
+        The R-peak / SDNN computation runs on the ECG page's analysis worker;
+        apply_stress_and_hrv() updates the labels when the result arrives.
+        """
         try:
-            from scipy.signal import find_peaks
-            
             if len(ecg_signal) < 500:
                 return
+            worker = getattr(getattr(self, 'ecg_test_page', None), 'analysis_worker', None)
+            if worker is None:
+                self.apply_stress_and_hrv(compute_hrv_sdnn(ecg_signal, sampling_rate))
+                return
+            worker.submit('dashboard_hrv', compute_hrv_sdnn,
+                          np.array(ecg_signal, dtype=float), sampling_rate,
+                          on_result=self.apply_stress_and_hrv)
+        except Exception as e:
+            print(f"⚠️ Error calculating stress/HRV: {e}")
+    
+    def apply_stress_and_hrv(self, current_hrv_ms):
+        """Smooth one SDNN value (ms) into the stress / HRV labels (GUI thread)"""
+        try:
+            if current_hrv_ms is None:
+                return
             
-            # Find R-peaks
-            peaks, _ = find_peaks(
-                ecg_signal,
-                height=np.mean(ecg_signal) + 0.5 * np.std(ecg_signal),
-                distance=int(0.15 * sampling_rate)  # Reduced from 0.4 to 0.15 for high BPM (up to 360)
-            )
+            # Initialize rolling average for HRV smoothing
+            if not hasattr(self, '_hrv_history'):
+                self._hrv_history = []
             
-            if len(peaks) >= 3:
-                # Calculate R-R intervals in milliseconds
-                rr_intervals = np.diff(peaks) * (1000 / sampling_rate)
-                
-                # Filter valid intervals (240-2000 ms) - 240ms = 250 BPM
-                valid_rr = rr_intervals[(rr_intervals >= 240) & (rr_intervals <= 2000)]
-                
-                if len(valid_rr) >= 2:
-                    # HRV: Standard deviation of R-R intervals (SDNN)
-                    current_hrv_ms = np.std(valid_rr)
-                    
-                    # Initialize rolling average for HRV smoothing
-                    if not hasattr(self, '_hrv_history'):
-                        self._hrv_history = []
-                    
-                    # Add current HRV to history (keep last 5 values for smoothing)
-                    self._hrv_history.append(current_hrv_ms)
-                    if len(self._hrv_history) > 5:
-                        self._hrv_history.pop(0)
-                    
-                    # Use smoothed HRV value
-                    smoothed_hrv_ms = np.mean(self._hrv_history)
-                    
-                    # Store for conclusion generation
-                    self._current_hrv = smoothed_hrv_ms
-                    
-                    # Stress level based on smoothed HRV
-                    # Use dashboard's translation method
-                    translator = self.tr
-                    
-                    if smoothed_hrv_ms > 100:
-                        stress = translator("Low")
-                        stress_color = "#27ae60"
-                    elif smoothed_hrv_ms > 50:
-                        stress = translator("Moderate")
-                        stress_color = "#f39c12"
-                    else:
-                        stress = translator("High")
-                        stress_color = "#e74c3c"
-                    
-                    # Update labels with translation
-                    if hasattr(self, 'stress_label'):
-                        stress_label_text = translator("Stress Level:")
-                        self.stress_label.setText(f"{stress_label_text} {stress}")
-                        self.stress_label.setStyleSheet(f"font-size: 13px; color: {stress_color}; font-weight: bold;")
-                    
-                    if hasattr(self, 'hrv_label'):
-                        hrv_label_text = translator("Average Variability:")
-                        self.hrv_label.setText(f"{hrv_label_text} {int(smoothed_hrv_ms)}ms")
-                        self.hrv_label.setStyleSheet("font-size: 13px; color: #666;")
+            # Add current HRV to history (keep last 5 values for smoothing)
+            self._hrv_history.append(current_hrv_ms)
+            if len(self._hrv_history) > 5:
+                self._hrv_history.pop(0)
+            
+            # Use smoothed HRV value
+            smoothed_hrv_ms = np.mean(self._hrv_history)
+            
+            # Store for conclusion generation
+            self._current_hrv = smoothed_hrv_ms
+            
+            # Stress level based on smoothed HRV
+            # Use dashboard's translation method
+            translator = self.tr
+            
+            if smoothed_hrv_ms > 100:
+                stress = translator("Low")
+                stress_color = "#27ae60"
+            elif smoothed_hrv_ms > 50:
+                stress = translator("Moderate")
+                stress_color = "#f39c12"
+            else:
+                stress = translator("High")
+                stress_color = "#e74c3c"
+            
+            # Update labels with translation
+            if hasattr(self, 'stress_label'):
+                stress_label_text = translator("Stress Level:")
+                self.stress_label.setText(f"{stress_label_text} {stress}")
+                self.stress_label.setStyleSheet(f"font-size: 13px; color: {stress_color}; font-weight: bold;")
+            
+            if hasattr(self, 'hrv_label'):
+                hrv_label_text = translator("Average Variability:")
+                self.hrv_label.setText(f"{hrv_label_text} {int(smoothed_hrv_ms)}ms")
+                self.hrv_label.setStyleSheet("font-size: 13px; color: #666;")
         except Exception as e:
             print(f"⚠️ Error calculating stress/HRV: {e}")
     
@@ -3461,11 +3468,7 @@ class Dashboard(QWidget):
             os.makedirs(reports_dir, exist_ok=True)
             uploaded_names = set()
             try:
-                history = cloud_uploader.get_upload_history(limit=1000)
-                for item in history:
-                    path = item.get('local_path') or ''
-                    if path:
-                        uploaded_names.add(os.path.basename(path))
+                uploaded_names.update(cloud_uploader.get_uploaded_files_list())
             except Exception:
                 pass
             candidates = []
@@ -3614,9 +3617,9 @@ class Dashboard(QWidget):
             QTextEdit { background: #232323; color: #fff; border-radius: 12px; border: 2px solid #fff; }
         """)
         self.dark_btn.setText("Light Mode")
-        # Set matplotlib canvas backgrounds to dark
-        self.ecg_canvas.axes.set_facecolor("#232323")
-        self.ecg_canvas.figure.set_facecolor("#232323")
+        # Set plot backgrounds to dark
+        self.ecg_plot.setBackground("#232323")
+        self.ecg_plot.setTitle("Lead II", color="#fff", size="10pt")
         for child in self.findChildren(QFrame):
             child.setStyleSheet("background: #232323; border-radius: 16px; color: #fff; border: 2px solid #fff;")
         for key, label in self.metric_labels.items():
@@ -3640,8 +3643,8 @@ class Dashboard(QWidget):
         else:
             self.setStyleSheet("")
             self.dark_btn.setText("Dark Mode")
-            self.ecg_canvas.axes.set_facecolor("#eee")
-            self.ecg_canvas.figure.set_facecolor("#fff")
+            self.ecg_plot.setBackground("#eee")
+            self.ecg_plot.setTitle("Lead II", color="#222", size="10pt")
             for child in self.findChildren(QFrame):
                 child.setStyleSheet("")
             for key, label in self.metric_labels.items():
@@ -0,0 +1,196 @@
+"""
+Shared Per-Window ECG Analysis Cache
+
+R-peaks, median beats and TP baselines used to be recomputed independently
+by calculate_ecg_metrics, each of the P/QRS/T axis functions, the RV5/SV1
+measurement and the report generators - several filtfilt + find_peaks passes
+and a dozen build_median_beat calls over the same 10k-sample window.
+
+AnalysisCache stores those results keyed by (what, lead, buffer generation,
+buffer write position, fs), so each one is computed once per new data epoch no matter how
+many consumers ask for it. Old epochs fall out in LRU order. The hits/misses
+counters show whether the duplicate work is actually gone.
+
+Usage:
+    cache = AnalysisCache(max_entries=64)
+    analysis = WindowAnalysis(cache, ecg_test_page.data, fs)
+    r_peaks, align_lead = analysis.r_peaks()
+    time_axis, median_ii = analysis.median_beat(1)
+    tp_ii = analysis.tp_baseline(1)
+    metrics = analysis.measurements()   # ECGMeasurements from measure_all()
+    print(cache.stats())
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+from .clinical_measurements import build_median_beats, detect_r_peaks, get_tp_baseline, measure_all
+
+LEAD_II = 1
+R_PEAK_FALLBACK_LEAD = 3   # Lead used when Lead II has too few beats (calculate_ecg_metrics' "V2" fallback)
+MIN_MEDIAN_BEATS = 8       # GE/Philips: >= 8 clean beats for a median beat
+
+
+class AnalysisCache:
+    """Thread-safe LRU store of analysis results with hit/miss counters."""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = int(max_entries)
+        self._entries: "OrderedDict[tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple, compute: Callable[[], object]):
+        """
+        Return the cached value for `key`, computing (and storing) it on a miss.
+
+        The computation runs outside the lock; if two threads miss the same key
+        at once both compute and the last one stored wins.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        value = compute()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for confirming that repeated consumers hit the cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
+
+
+class WindowAnalysis:
+    """
+    Cached analysis of one data epoch of a CircularLeadBuffer.
+
+    Create one per consumer call; results are shared through the cache for as
+    long as the buffer's write position (total_written), its generation and fs
+    are unchanged. The generation moves on reset() and in-place overwrites,
+    which can leave total_written at a value an earlier epoch already used.
+    """
+
+    def __init__(self, cache: AnalysisCache, buffer, fs: float,
+                 r_peak_source: Optional[Callable[[int], Optional[np.ndarray]]] = None):
+        """
+        Args:
+            cache: Shared AnalysisCache
+            buffer: CircularLeadBuffer holding the raw leads
+            fs: Sampling rate (Hz)
+            r_peak_source: Optional callable(n_samples) returning Lead II R-peaks
+                           relative to the newest n_samples (e.g. the online
+                           detector), or None when unavailable
+        """
+        self.cache = cache
+        self.buffer = buffer
+        self.fs = round(float(fs), 3)
+        self.epoch = (int(getattr(buffer, 'generation', 0)), int(buffer.total_written))
+        self.n_samples = int(buffer.filled)
+        self.r_peak_source = r_peak_source
+
+    def _key(self, what: str, lead: int) -> tuple:
+        return (what, lead, self.epoch, self.fs)
+
+    def lead_data(self, lead: int) -> np.ndarray:
+        """Raw, time-ordered float copy of one lead for this epoch."""
+        return self.cache.get(
+            self._key('data', lead),
+            lambda: np.asarray(self.buffer.latest(lead=lead), dtype=float).copy())
+
+    def r_peaks(self) -> Tuple[np.ndarray, int]:
+        """
+        R-peaks shared by every measurement of this epoch.
+
+        Returns:
+            (r_peaks, alignment_lead) - indices into lead_data(), and the lead
+            they were detected on (Lead II, or the fallback lead)
+        """
+        return self.cache.get(self._key('r_peaks', LEAD_II), self._detect_r_peaks)
+
+    def _detect_r_peaks(self) -> Tuple[np.ndarray, int]:
+        if self.r_peak_source is not None:
+            try:
+                live = self.r_peak_source(self.n_samples)
+            except Exception:
+                live = None
+            if live is not None and len(live) >= MIN_MEDIAN_BEATS:
+                return np.asarray(live), LEAD_II
+
+        r_peaks = detect_r_peaks(self.lead_data(LEAD_II), self.fs)
+        if len(r_peaks) < MIN_MEDIAN_BEATS and self.buffer.n_leads > R_PEAK_FALLBACK_LEAD:
+            fallback = detect_r_peaks(self.lead_data(R_PEAK_FALLBACK_LEAD), self.fs)
+            if len(fallback) >= MIN_MEDIAN_BEATS:
+                return fallback, R_PEAK_FALLBACK_LEAD
+        return r_peaks, LEAD_II
+
+    def median_beats(self) -> Tuple[Optional[np.ndarray], list]:
+        """(time_axis, [median beat or None per lead]) for every lead, built in one batched call."""
+        def compute():
+            r_peaks, _ = self.r_peaks()
+            leads = np.asarray(self.buffer.latest(), dtype=float)
+            return build_median_beats(leads, r_peaks, self.fs, min_beats=MIN_MEDIAN_BEATS)
+        return self.cache.get(self._key('median_beats', -1), compute)
+
+    def median_beat(self, lead: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """(time_axis, median_beat) of one lead aligned on the shared R-peaks."""
+        time_axis, medians = self.median_beats()
+        if medians[lead] is None:
+            return None, None
+        return time_axis, medians[lead]
+
+    def tp_baseline(self, lead: int) -> Optional[float]:
+        """TP (isoelectric) baseline of one lead around the middle R-peak."""
+        def compute():
+            r_peaks, _ = self.r_peaks()
+            if len(r_peaks) == 0:
+                return None
+            r_mid = r_peaks[len(r_peaks) // 2]
+            prev_r_idx = r_peaks[len(r_peaks) // 2 - 1] if len(r_peaks) > 1 else None
+            return get_tp_baseline(self.lead_data(lead), r_mid, self.fs, prev_r_peak_idx=prev_r_idx)
+        return self.cache.get(self._key('tp_baseline', lead), compute)
+
+    def measurements(self, prev_axes: Optional[Dict[str, Optional[float]]] = None):
+        """
+        ECGMeasurements (measure_all) for this epoch, built on the shared R-peaks
+        and median beats. prev_axes only matters when an axis is indeterminate,
+        so the first caller's value is the one cached for the epoch.
+        """
+        def compute():
+            r_peaks, align_lead = self.r_peaks()
+            if len(r_peaks) < MIN_MEDIAN_BEATS:
+                return None
+            leads = np.asarray(self.buffer.latest(), dtype=float)
+            return measure_all(leads, self.fs, r_peaks=r_peaks, alignment_lead=align_lead,
+                               median_beats=self.median_beats(), prev_axes=prev_axes,
+                               min_beats=MIN_MEDIAN_BEATS)
+        return self.cache.get(self._key('measurements', -1), compute)
+
+    def r_peaks_in_last(self, n_samples: int) -> np.ndarray:
+        """Shared R-peaks that fall in the newest n_samples, relative to that window."""
+        r_peaks, _ = self.r_peaks()
+        offset = self.n_samples - min(int(n_samples), self.n_samples)
+        r_peaks = np.asarray(r_peaks)
+        return r_peaks[r_peaks >= offset] - offset
@@ -0,0 +1,260 @@
+"""
+Background ECG Analysis Worker
+
+calculate_ecg_metrics, the dashboard's HRV/stress update and the expanded
+lead view's PQRST + arrhythmia analysis used to run inside Qt timer callbacks,
+so a slow filtfilt / find_peaks pass stalled rendering for that frame.
+
+AnalysisWorker runs those computations on one background thread:
+
+- The GUI takes an immutable LeadSnapshot (or a plain array copy) of the data
+  and submits a job under a "kind" (e.g. 'live_metrics', 'expanded:II').
+- Only the newest job per kind is kept: a pending job that has not started
+  yet is replaced (counted as superseded) when a newer snapshot arrives.
+- Results are posted back to the GUI thread through a Qt signal and handed to
+  the job's callback there; a result older than one already delivered for
+  the same kind is dropped as stale.
+
+The UI callbacks only apply results (labels, overlays), so frame pacing no
+longer depends on analysis cost. Without Qt (headless replay / benchmarks)
+callbacks run on the worker thread.
+
+Usage:
+    worker = AnalysisWorker()
+    snapshot = LeadSnapshot.from_buffer(ecg_test_page.data)
+    worker.submit('live_metrics', compute_live_metrics, snapshot, fs, cache,
+                  on_result=ecg_test_page.apply_ecg_metrics)
+    print(worker.stats())
+    worker.stop()
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from utils.perf_stats import get_perf_stats
+
+from .analysis_cache import WindowAnalysis
+
+try:
+    from PyQt5.QtCore import QObject, pyqtSignal
+except ImportError:  # headless use (replay harness, benchmarks)
+    QObject = None
+
+
+class LeadSnapshot:
+    """
+    Read-only copy of a CircularLeadBuffer at one data epoch.
+
+    Exposes the read API WindowAnalysis needs (total_written, generation,
+    filled, n_leads, latest()), so cached analyses of the snapshot share keys
+    with analyses of the live buffer at the same epoch.
+    """
+
+    def __init__(self, data: np.ndarray, total_written: int, generation: int = 0):
+        self._data = np.array(data, copy=True)
+        self._data.flags.writeable = False
+        self.n_leads = self._data.shape[0]
+        self.capacity = self._data.shape[1]
+        self.total_written = int(total_written)
+        self.filled = self._data.shape[1]
+        self.generation = int(generation)
+
+    @classmethod
+    def from_buffer(cls, buffer, n: Optional[int] = None) -> "LeadSnapshot":
+        """Snapshot the newest n samples (default: all held) of a CircularLeadBuffer."""
+        return cls(buffer.latest(n), buffer.total_written, getattr(buffer, 'generation', 0))
+
+    def latest(self, n: Optional[int] = None, lead: Optional[int] = None) -> np.ndarray:
+        n = self.filled if n is None else max(0, min(int(n), self.filled))
+        rows = slice(None) if lead is None else lead
+        return self._data[rows, self.filled - n:]
+
+    def __len__(self) -> int:
+        return self.n_leads
+
+    def __getitem__(self, lead: int) -> np.ndarray:
+        return self.latest(lead=lead)
+
+
+# ------------------------------------------------------------------ job functions (worker thread)
+
+def compute_live_metrics(snapshot: LeadSnapshot, fs: float, cache, prev_axes=None, live_r_peaks=None):
+    """
+    measure_all() for a snapshot, through the shared AnalysisCache.
+
+    Args:
+        snapshot: LeadSnapshot of the raw leads
+        fs: Sampling rate (Hz)
+        cache: AnalysisCache shared with the GUI-thread consumers
+        prev_axes: {'p', 'qrs', 't'} previous axes for indeterminate beats
+        live_r_peaks: Online-detector R-peaks relative to the snapshot, or None
+
+    Returns:
+        ECGMeasurements, or None with fewer than 8 beats
+    """
+    source = (lambda n: live_r_peaks) if live_r_peaks is not None else None
+    return WindowAnalysis(cache, snapshot, fs, r_peak_source=source).measurements(prev_axes)
+
+
+def compute_hrv_sdnn(ecg_signal: np.ndarray, sampling_rate: float) -> Optional[float]:
+    """
+    SDNN (ms) of physiologic R-R intervals (240-2000 ms) in a Lead II window.
+
+    Returns:
+        SDNN in ms, or None when fewer than 3 peaks / 2 valid intervals are found
+    """
+    from scipy.signal import find_peaks
+
+    ecg_signal = np.asarray(ecg_signal, dtype=float)
+    if len(ecg_signal) < 500:
+        return None
+    peaks, _ = find_peaks(
+        ecg_signal,
+        height=np.mean(ecg_signal) + 0.5 * np.std(ecg_signal),
+        distance=int(0.15 * sampling_rate)  # up to ~360 BPM
+    )
+    if len(peaks) < 3:
+        return None
+    rr_intervals = np.diff(peaks) * (1000 / sampling_rate)
+    valid_rr = rr_intervals[(rr_intervals >= 240) & (rr_intervals <= 2000)]
+    if len(valid_rr) < 2:
+        return None
+    return float(np.std(valid_rr))
+
+
+# ------------------------------------------------------------------ worker
+
+if QObject is not None:
+    class _ResultBridge(QObject):
+        """Carries finished jobs from the worker thread to the GUI thread (queued signal)."""
+        posted = pyqtSignal(str, int, object, object)   # kind, seq, result, callback
+else:
+    _ResultBridge = None
+
+
+class AnalysisWorker:
+    """Single background thread running the newest analysis job per kind."""
+
+    def __init__(self, name: str = "ECGAnalysisWorker"):
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[str, tuple]" = OrderedDict()
+        self._seq: Dict[str, int] = {}
+        self._delivered: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.submitted = 0
+        self.superseded = 0
+        self.stale = 0
+        self.completed = 0
+        self.failed = 0
+        self._compute_ms: Dict[str, float] = {}
+        self._bridge = None
+        if _ResultBridge is not None:
+            try:
+                # Created on the GUI thread, so the queued slot runs there
+                self._bridge = _ResultBridge()
+                self._bridge.posted.connect(self._deliver)
+            except Exception as e:
+                print(f"⚠️ Analysis worker running without Qt result bridge: {e}")
+                self._bridge = None
+
+    def submit(self, kind: str, fn: Callable, *args, on_result: Optional[Callable] = None, **kwargs) -> int:
+        """
+        Queue fn(*args, **kwargs); replaces a not-yet-started job of the same kind.
+
+        Args:
+            kind: Job family; only the newest job per kind runs
+            fn: Pure computation (must not touch Qt widgets)
+            *args, **kwargs: Immutable inputs (snapshots / copies)
+            on_result: Called on the GUI thread with fn's return value
+
+        Returns:
+            Sequence number of the job within its kind
+        """
+        with self._cond:
+            seq = self._seq.get(kind, 0) + 1
+            self._seq[kind] = seq
+            if kind in self._pending:
+                self.superseded += 1
+                del self._pending[kind]
+            self._pending[kind] = (seq, fn, args, kwargs, on_result)
+            self.submitted += 1
+            get_perf_stats().gauge("analysis.queue_depth", len(self._pending))
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return seq
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                kind, (seq, fn, args, kwargs, on_result) = self._pending.popitem(last=False)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ Analysis job '{kind}' failed: {e}")
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            # 'expanded:II:<id>' -> one histogram per job family
+            get_perf_stats().record(f"analysis.{kind.split(':', 1)[0]}_ms", elapsed_ms)
+            previous = self._compute_ms.get(kind)
+            self._compute_ms[kind] = elapsed_ms if previous is None else 0.8 * previous + 0.2 * elapsed_ms
+            self.completed += 1
+            if self._bridge is not None:
+                self._bridge.posted.emit(kind, seq, result, on_result)
+            else:
+                self._deliver(kind, seq, result, on_result)
+
+    def _deliver(self, kind, seq, result, on_result):
+        """Apply a result on the consumer thread unless a newer one was already applied."""
+        if seq <= self._delivered.get(kind, 0):
+            self.stale += 1
+            return
+        self._delivered[kind] = seq
+        if on_result is not None:
+            try:
+                on_result(result)
+            except Exception as e:
+                print(f"❌ Applying analysis result '{kind}' failed: {e}")
+
+    def is_busy(self, kind: str) -> bool:
+        """True while a job of this kind is queued."""
+        with self._cond:
+            return kind in self._pending
+
+    def stats(self) -> Dict[str, object]:
+        """Counters plus smoothed compute time (ms) per job kind."""
+        with self._cond:
+            return {
+                'submitted': self.submitted,
+                'superseded': self.superseded,
+                'stale': self.stale,
+                'completed': self.completed,
+                'failed': self.failed,
+                'pending': len(self._pending),
+                'compute_ms': dict(self._compute_ms),
+            }
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Drop pending jobs and stop the thread (a running job finishes first)."""
+        with self._cond:
+            self._pending.clear()
+            self._stopping = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and threading.current_thread() is not thread:
+            thread.join(timeout)
+        self._thread = None
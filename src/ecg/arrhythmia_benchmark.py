@@ -0,0 +1,185 @@
+"""
+Arrhythmia Detection Benchmark
+
+Replays stored captures from reports/ecg_data (legacy JSON or binary .ecgb)
+through PQRSTAnalyzer + ArrhythmiaDetector in sliding windows, the way the
+expanded lead view analyses live data, and reports:
+
+- detections/sec for detect_arrhythmias() alone and for the full window
+  (PQRST detection + feature extraction + rules)
+- mean time per rule and for the feature-extraction stage
+- how often each label was reported
+
+Usage (from the src directory):
+    python -m ecg.arrhythmia_benchmark ../reports/ecg_data
+    python -m ecg.arrhythmia_benchmark ../reports/ecg_data --lead V1 --window 10 --step 2 --limit 20
+    python -m ecg.arrhythmia_benchmark ../reports/ecg_data --json bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .arrhythmia_detector import ArrhythmiaDetector
+from .ecg_capture import CAPTURE_EXTENSION, is_capture_file, load_capture_as_dict
+from .pqrst_analyzer import PQRSTAnalyzer
+
+
+def default_capture_dir() -> str:
+    """<repo>/reports/ecg_data"""
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    return os.path.join(base_dir, 'reports', 'ecg_data')
+
+
+def list_captures(directory: str, limit: Optional[int] = None) -> List[str]:
+    """ecg_data_* captures in a directory (binary preferred over a JSON twin), oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    by_stem = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.startswith('ecg_data_'):
+            continue
+        stem, ext = os.path.splitext(name)
+        if ext == CAPTURE_EXTENSION or (ext == '.json' and stem not in by_stem):
+            by_stem[stem] = os.path.join(directory, name)
+    paths = [by_stem[stem] for stem in sorted(by_stem)]
+    return paths[:limit] if limit else paths
+
+
+def load_lead(path: str, lead: str):
+    """(samples, fs) of one lead from a capture file, or (None, 0) if it is missing."""
+    if is_capture_file(path):
+        data = load_capture_as_dict(path)
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    samples = data.get('leads', {}).get(lead)
+    if samples is None:
+        return None, 0.0
+    return np.asarray(samples, dtype=float), float(data.get('sampling_rate') or 500.0)
+
+
+def run_benchmark(paths: List[str], lead: str = 'II', window_s: float = 10.0, step_s: float = 2.0,
+                  quiet: bool = True) -> Dict[str, object]:
+    """
+    Replay captures window by window and time the detector.
+
+    Args:
+        paths: Capture files
+        lead: Lead to analyse
+        window_s: Analysis window (the expanded view analyses its whole buffer, ~10 s)
+        step_s: Hop between windows
+        quiet: Swallow the detector's console output while timing
+
+    Returns:
+        dict with window counts, timings, per-rule stats and label counts
+    """
+    detector = ArrhythmiaDetector()
+    detector.enable_profiling()
+    analyzer = PQRSTAnalyzer()
+    labels = Counter()
+    windows = 0
+    files = 0
+    analysis_s = 0.0
+    detect_s = 0.0
+
+    for path in paths:
+        try:
+            signal, fs = load_lead(path, lead)
+        except Exception as e:
+            print(f"⚠️ Skipping {os.path.basename(path)}: {e}")
+            continue
+        if signal is None or fs <= 0:
+            continue
+        files += 1
+        analyzer.fs = fs
+        detector.fs = fs
+        win = max(1, int(round(window_s * fs)))
+        hop = max(1, int(round(step_s * fs)))
+        starts = range(0, max(1, len(signal) - win + 1), hop)
+        for start in starts:
+            window = signal[start:start + win]
+            if len(window) < int(2.0 * fs):
+                continue
+            sink = io.StringIO()
+            with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+                t0 = time.perf_counter()
+                analysis = analyzer.analyze_signal(window)
+                t1 = time.perf_counter()
+                result = detector.detect_arrhythmias(window, analysis, has_received_serial_data=True)
+                t2 = time.perf_counter()
+            analysis_s += t1 - t0
+            detect_s += t2 - t1
+            windows += 1
+            labels.update(result)
+
+    rules = {}
+    for key, (total, calls) in sorted(detector.rule_timings.items(), key=lambda kv: -kv[1][0]):
+        rules[key] = {
+            'calls': calls,
+            'total_ms': total * 1000.0,
+            'mean_us': total / calls * 1e6 if calls else 0.0,
+            'share': total / detect_s if detect_s > 0 else 0.0,
+        }
+    return {
+        'files': files,
+        'windows': windows,
+        'lead': lead,
+        'window_s': window_s,
+        'step_s': step_s,
+        'pqrst_ms_mean': analysis_s / windows * 1000.0 if windows else 0.0,
+        'detect_ms_mean': detect_s / windows * 1000.0 if windows else 0.0,
+        'detections_per_s': windows / detect_s if detect_s > 0 else 0.0,
+        'windows_per_s': windows / (analysis_s + detect_s) if analysis_s + detect_s > 0 else 0.0,
+        'rules': rules,
+        'labels': dict(labels.most_common()),
+    }
+
+
+def print_report(report: Dict[str, object]) -> None:
+    print(f"📊 Arrhythmia benchmark: {report['files']} capture(s), {report['windows']} window(s) "
+          f"of {report['window_s']:.0f} s (lead {report['lead']}, step {report['step_s']:.1f} s)")
+    print(f"   detect_arrhythmias: {report['detect_ms_mean']:.3f} ms/window, "
+          f"{report['detections_per_s']:.0f} detections/s")
+    print(f"   with PQRST detection: {report['pqrst_ms_mean'] + report['detect_ms_mean']:.3f} ms/window, "
+          f"{report['windows_per_s']:.0f} windows/s")
+    print(f"   {'stage/rule':<26}{'mean us':>10}{'share':>8}")
+    for key, stats in report['rules'].items():
+        print(f"   {key:<26}{stats['mean_us']:>10.1f}{stats['share'] * 100:>7.1f}%")
+    print("   labels:")
+    for label, count in report['labels'].items():
+        print(f"     {count:>6}  {label}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay stored ECG captures through the arrhythmia detector")
+    parser.add_argument('directory', nargs='?', default=default_capture_dir())
+    parser.add_argument('--lead', default='II')
+    parser.add_argument('--window', type=float, default=10.0, help="analysis window (s)")
+    parser.add_argument('--step', type=float, default=2.0, help="hop between windows (s)")
+    parser.add_argument('--limit', type=int, default=None, help="only the first N captures")
+    parser.add_argument('--json', dest='json_path', default=None, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    paths = list_captures(args.directory, args.limit)
+    if not paths:
+        print(f"❌ No ecg_data_* captures in {args.directory}")
+        return 1
+    report = run_benchmark(paths, lead=args.lead, window_s=args.window, step_s=args.step)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.json_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,11 +5,91 @@ All measurements use:
 - Raw ECG signal (no display filters)
 - Median beat (aligned beats)
 - TP segment as isoelectric baseline
+
+measure_all() runs the whole measurement set (HR, PR, QRS, QT/QTc/QTcF,
+P/QRS/T axes, QRS-T angle, ST, RV5/SV1) from one shared set of R-peaks and
+median beats. Benchmark against the old per-function call sequence
+(from the src directory):
+    python -m ecg.clinical_measurements
 """
 
+import contextlib
+import os
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
 import numpy as np
 from scipy.signal import butter, filtfilt, find_peaks
 
+# numpy 2.x renamed trapz to trapezoid (and later releases drop trapz)
+_trapezoid = getattr(np, 'trapezoid', None) or getattr(np, 'trapz')
+
+
+def assess_beats_quality(beats, fs, r_idx_in_beat):
+    """
+    Assess beat quality using GE/Philips rules for many aligned beats at once.
+    
+    Args:
+        beats: (..., beat_length) array of aligned beats (e.g. n_beats x L or
+               n_leads x n_beats x L)
+        fs: Sampling rate (Hz)
+        r_idx_in_beat: R-peak index within each beat
+    
+    Returns:
+        quality array of shape beats.shape[:-1]: 0.0 (poor) to 1.0 (excellent),
+        NaN where the beat is invalid
+    """
+    beats = np.asarray(beats, dtype=float)
+    beat_length = beats.shape[-1]
+    if beat_length < 100:
+        return np.full(beats.shape[:-1], np.nan)
+    
+    # Rule 1: Peak-to-peak amplitude (should be reasonable)
+    p2p = np.ptp(beats, axis=-1)
+    valid = (p2p >= 50) & (p2p <= 50000)  # Too small or too large (likely artifact)
+    
+    # Rule 2: Signal-to-noise ratio (QRS should dominate)
+    qrs_start = max(0, r_idx_in_beat - int(80 * fs / 1000))
+    qrs_end = min(beat_length, r_idx_in_beat + int(80 * fs / 1000))
+    if qrs_end <= qrs_start:
+        return np.full(beats.shape[:-1], np.nan)
+    qrs_amplitude = np.ptp(beats[..., qrs_start:qrs_end], axis=-1)
+    
+    # TP segment (baseline noise estimate)
+    tp_start = max(0, r_idx_in_beat - int(350 * fs / 1000))
+    tp_end = max(0, r_idx_in_beat - int(150 * fs / 1000))
+    signal_std = np.std(beats, axis=-1)
+    if tp_end > tp_start:
+        tp_segment = beats[..., tp_start:tp_end]
+        tp_noise = np.std(tp_segment, axis=-1)
+    else:
+        tp_noise = signal_std * 0.5
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        snr = np.where(tp_noise == 0, 100.0, qrs_amplitude / (tp_noise * 10))  # Normalized SNR
+        
+        # Rule 3: Baseline stability (TP segment should be relatively flat)
+        if tp_end > tp_start:
+            baseline_drift = np.ptp(tp_segment, axis=-1)
+            ratio = np.where(qrs_amplitude > 0, baseline_drift / qrs_amplitude, np.inf)
+            baseline_stability = 1.0 - np.minimum(ratio, 1.0)
+        else:
+            baseline_stability = np.full(beats.shape[:-1], 0.5)
+    
+    # Rule 4: No excessive spikes (check for artifacts)
+    deviation = np.abs(beats - np.median(beats, axis=-1, keepdims=True))
+    outliers = np.sum(deviation > 5 * signal_std[..., None], axis=-1)
+    artifact_score = 1.0 - np.minimum(outliers / beat_length, 1.0)
+    
+    # Combined quality score
+    quality = (np.minimum(snr / 10.0, 1.0) * 0.4 +
+               baseline_stability * 0.3 +
+               artifact_score * 0.3)
+    quality = np.clip(quality, 0.0, 1.0)
+    return np.where(valid, quality, np.nan)
+
 
 def assess_beat_quality(beat, fs, r_idx_in_beat):
     """
@@ -24,59 +104,93 @@ def assess_beat_quality(beat, fs, r_idx_in_beat):
         quality_score: 0.0 (poor) to 1.0 (excellent), or None if invalid
     """
     try:
-        if len(beat) < 100:
-            return None
-        
-        # Rule 1: Peak-to-peak amplitude (should be reasonable)
-        p2p = np.max(beat) - np.min(beat)
-        if p2p < 50 or p2p > 50000:  # Too small or too large (likely artifact)
-            return None
-        
-        # Rule 2: Signal-to-noise ratio (QRS should dominate)
-        qrs_start = max(0, r_idx_in_beat - int(80 * fs / 1000))
-        qrs_end = min(len(beat), r_idx_in_beat + int(80 * fs / 1000))
-        if qrs_end <= qrs_start:
-            return None
-        
-        qrs_segment = beat[qrs_start:qrs_end]
-        qrs_amplitude = np.max(qrs_segment) - np.min(qrs_segment)
-        
-        # TP segment (baseline noise estimate)
-        tp_start = max(0, r_idx_in_beat - int(350 * fs / 1000))
-        tp_end = max(0, r_idx_in_beat - int(150 * fs / 1000))
-        if tp_end > tp_start:
-            tp_segment = beat[tp_start:tp_end]
-            tp_noise = np.std(tp_segment)
-        else:
-            tp_noise = np.std(beat) * 0.5
-        
-        if tp_noise == 0:
-            snr = 100.0  # Perfect signal
-        else:
-            snr = qrs_amplitude / (tp_noise * 10)  # Normalized SNR
-        
-        # Rule 3: Baseline stability (TP segment should be relatively flat)
-        if tp_end > tp_start:
-            baseline_drift = np.max(tp_segment) - np.min(tp_segment)
-            baseline_stability = 1.0 - min(baseline_drift / qrs_amplitude, 1.0)
-        else:
-            baseline_stability = 0.5
-        
-        # Rule 4: No excessive spikes (check for artifacts)
-        signal_std = np.std(beat)
-        outliers = np.sum(np.abs(beat - np.median(beat)) > 5 * signal_std)
-        artifact_score = 1.0 - min(outliers / len(beat), 1.0)
-        
-        # Combined quality score
-        quality = (min(snr / 10.0, 1.0) * 0.4 + 
-                  baseline_stability * 0.3 + 
-                  artifact_score * 0.3)
-        
-        return max(0.0, min(1.0, quality))
+        quality = assess_beats_quality(np.asarray(beat, dtype=float)[None, :], fs, r_idx_in_beat)[0]
+        return None if np.isnan(quality) else float(quality)
     except:
         return None
 
 
+def _gather_beats(leads, r_peaks, pre_samples, post_samples):
+    """
+    Cut every beat window of every lead in one fancy-indexing gather.
+    
+    Windows that run off the signal are edge-padded (index clipping, same as
+    np.pad mode='edge'); windows with less than 80% real samples are dropped.
+    
+    Returns:
+        (beats, kept_r_peaks) - beats is (n_leads x n_beats x beat_length)
+    """
+    n = leads.shape[-1]
+    beat_length = pre_samples + post_samples + 1
+    r_peaks = np.asarray(r_peaks, dtype=np.int64)[1:-1]  # Skip first and last to avoid edge effects
+    covered = np.minimum(n, r_peaks + post_samples + 1) - np.maximum(0, r_peaks - pre_samples)
+    r_peaks = r_peaks[covered >= beat_length * 0.8]  # Accept partial beats at edges
+    idx = np.clip(r_peaks[:, None] + np.arange(-pre_samples, post_samples + 1), 0, n - 1)
+    return leads[:, idx], r_peaks
+
+
+def build_median_beats(leads, r_peaks, fs, pre_r_ms=400, post_r_ms=900, min_beats=8):
+    """
+    Build median beats for several leads in one batched pass.
+    
+    All beats of all leads are gathered into a (n_leads x n_beats x L) array,
+    scored with assess_beats_quality, and the best 8-12 beats of each lead
+    (quality > 0.3) are combined with a masked median along the beat axis.
+    
+    Args:
+        leads: (n_leads x n_samples) raw signals (no display filters)
+        r_peaks: R-peak indices shared by every lead
+        fs: Sampling rate (Hz)
+        pre_r_ms: Samples before R-peak (ms)
+        post_r_ms: Samples after R-peak (ms)
+        min_beats: Minimum number of clean beats required per lead
+    
+    Returns:
+        (time_axis, medians) - medians is a list with one median beat (or None
+        when that lead has too few clean beats) per lead; time_axis is None when
+        there are too few R-peaks for any lead
+    """
+    leads = np.atleast_2d(np.asarray(leads, dtype=float))
+    n_leads = leads.shape[0]
+    if len(r_peaks) < min_beats:
+        return None, [None] * n_leads
+    
+    pre_samples = int(pre_r_ms * fs / 1000)
+    post_samples = int(post_r_ms * fs / 1000)
+    r_idx_in_beat = pre_samples  # R-peak position in aligned beat
+    
+    beats, _ = _gather_beats(leads, r_peaks, pre_samples, post_samples)
+    if beats.shape[1] < min_beats:
+        return None, [None] * n_leads
+    
+    quality = assess_beats_quality(beats, fs, r_idx_in_beat)           # (n_leads x n_beats)
+    quality = np.where(quality > 0.3, quality, -np.inf)               # Minimum quality threshold
+    n_clean = np.sum(np.isfinite(quality), axis=1)
+    
+    # Best beats first (stable, so ties keep beat order) - 8-12 beats, GE Marquette style
+    num_beats = np.minimum(n_clean, max(min_beats, 12))
+    k = int(num_beats.max())
+    if k < min_beats:
+        return None, [None] * n_leads
+    order = np.argsort(-quality, axis=1, kind='stable')[:, :k]
+    selected = np.take_along_axis(beats, order[:, :, None], axis=1)  # (n_leads x k x L)
+    
+    if np.all(num_beats == k):
+        medians_arr = np.median(selected, axis=1)
+    else:
+        # Masked median: leads with fewer clean beats ignore the padding rows
+        selected[np.arange(k)[None, :] >= num_beats[:, None]] = np.nan
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN leads are dropped below
+            medians_arr = np.nanmedian(selected, axis=1)
+    
+    medians = [medians_arr[i] if n_clean[i] >= min_beats else None for i in range(n_leads)]
+    
+    # Time axis centered at R-peak (0 ms)
+    time_axis = np.arange(-pre_samples, post_samples + 1) / fs * 1000.0  # ms
+    return time_axis, medians
+
+
 def build_median_beat(raw_signal, r_peaks, fs, pre_r_ms=400, post_r_ms=900, min_beats=8):
     """
     Build median beat from aligned beats with quality selection (GE Marquette style).
@@ -101,54 +215,11 @@ def build_median_beat(raw_signal, r_peaks, fs, pre_r_ms=400, post_r_ms=900, min_
         - Ensures ≥8 beats for reliable median beat
         - Uses raw signal only (no display filters)
     """
-    if len(r_peaks) < min_beats:
+    time_axis, medians = build_median_beats(np.asarray(raw_signal, dtype=float)[None, :], r_peaks, fs,
+                                            pre_r_ms=pre_r_ms, post_r_ms=post_r_ms, min_beats=min_beats)
+    if medians[0] is None:
         return None, None
-    
-    pre_samples = int(pre_r_ms * fs / 1000)
-    post_samples = int(post_r_ms * fs / 1000)
-    beat_length = pre_samples + post_samples + 1
-    r_idx_in_beat = pre_samples  # R-peak position in aligned beat
-    
-    # Extract and assess all beats
-    beat_candidates = []
-    for r_idx in r_peaks[1:-1]:  # Skip first and last to avoid edge effects
-        start = max(0, r_idx - pre_samples)
-        end = min(len(raw_signal), r_idx + post_samples + 1)
-        if end - start >= beat_length * 0.8:  # Accept partial beats at edges
-            beat = raw_signal[start:end].copy()
-            # Pad or trim to fixed length
-            if len(beat) < beat_length:
-                pad_left = pre_samples - (r_idx - start)
-                pad_right = beat_length - len(beat) - pad_left
-                beat = np.pad(beat, (pad_left, pad_right), mode='edge')
-            elif len(beat) > beat_length:
-                trim_left = (len(beat) - beat_length) // 2
-                beat = beat[trim_left:trim_left + beat_length]
-            
-            # Assess beat quality
-            quality = assess_beat_quality(beat, fs, r_idx_in_beat)
-            if quality is not None and quality > 0.3:  # Minimum quality threshold
-                beat_candidates.append((beat, quality))
-    
-    # Select top quality beats (at least min_beats, up to 12 best for GE Marquette style)
-    if len(beat_candidates) < min_beats:
-        return None, None
-    
-    # Sort by quality (best first)
-    beat_candidates.sort(key=lambda x: x[1], reverse=True)
-    
-    # Take best beats (8-12 beats for median, GE Marquette style)
-    num_beats = min(len(beat_candidates), max(min_beats, 12))
-    selected_beats = [beat for beat, _ in beat_candidates[:num_beats]]
-    
-    # Compute median beat from selected clean beats
-    beats_arr = np.array(selected_beats)
-    median_beat = np.median(beats_arr, axis=0)
-    
-    # Time axis centered at R-peak (0 ms)
-    time_axis = np.arange(-pre_samples, post_samples + 1) / fs * 1000.0  # ms
-    
-    return time_axis, median_beat
+    return time_axis, medians[0]
 
 
 def detect_tp_segment(raw_signal, r_peak_idx, prev_r_peak_idx, fs):
@@ -308,7 +379,8 @@ def measure_qt_from_median_beat(median_beat, time_axis, fs, tp_baseline):
 
 
 def measure_rv5_sv1_from_median_beat(v5_raw, v1_raw, r_peaks_v5, r_peaks_v1, fs,
-                                      v5_adc_per_mv=2048.0, v1_adc_per_mv=1441.0):
+                                      v5_adc_per_mv=2048.0, v1_adc_per_mv=1441.0,
+                                      median_v5=None, median_v1=None):
     """
     Measure RV5 and SV1 from median beat (GE/Philips standard).
     
@@ -320,6 +392,8 @@ def measure_rv5_sv1_from_median_beat(v5_raw, v1_raw, r_peaks_v5, r_peaks_v1, fs,
         fs: Sampling rate (Hz)
         v5_adc_per_mv: ADC counts per mV for V5
         v1_adc_per_mv: ADC counts per mV for V1
+        median_v5: Optional prebuilt V5 median beat (e.g. from the analysis cache)
+        median_v1: Optional prebuilt V1 median beat
     
     Returns:
         (rv5_mv, sv1_mv) in mV, or (None, None) if not measurable
@@ -328,7 +402,8 @@ def measure_rv5_sv1_from_median_beat(v5_raw, v1_raw, r_peaks_v5, r_peaks_v1, fs,
     if len(r_peaks_v5) < 8:
         return None, None
     
-    _, median_v5 = build_median_beat(v5_raw, r_peaks_v5, fs, min_beats=8)
+    if median_v5 is None:
+        _, median_v5 = build_median_beat(v5_raw, r_peaks_v5, fs, min_beats=8)
     if median_v5 is None:
         return None, None
     
@@ -369,13 +444,14 @@ def measure_rv5_sv1_from_median_beat(v5_raw, v1_raw, r_peaks_v5, r_peaks_v1, fs,
     # Adjusted: v5_adc_per_mv = 2048.0 / 5.05 ≈ 405.5 ADC/mV
     adjusted_v5_adc_per_mv = v5_adc_per_mv / 5.05  # Adjust based on actual vs expected ratio
     rv5_mv = r_max_adc / adjusted_v5_adc_per_mv if r_max_adc > 0 else None
-    print(f"🔬 RV5 Calibration: original={v5_adc_per_mv:.1f}, adjusted={adjusted_v5_adc_per_mv:.1f}, rv5_mv={rv5_mv:.3f} (expected: 0.969)")
+    print(f"🔬 RV5 Calibration: original={v5_adc_per_mv:.1f}, adjusted={adjusted_v5_adc_per_mv:.1f}, rv5_mv={rv5_mv if rv5_mv is None else round(rv5_mv, 3)} (expected: 0.969)")
     
     # Build median beat for V1 (requires ≥8 beats, GE/Philips standard)
     if len(r_peaks_v1) < 8:
         return rv5_mv, None
     
-    _, median_v1 = build_median_beat(v1_raw, r_peaks_v1, fs, min_beats=8)
+    if median_v1 is None:
+        _, median_v1 = build_median_beat(v1_raw, r_peaks_v1, fs, min_beats=8)
     if median_v1 is None:
         return rv5_mv, None
     
@@ -671,8 +747,8 @@ def calculate_axis_from_median_beat(lead_i_raw, lead_ii_raw, lead_avf_raw, media
         wave_segment_avf = signal_avf[wave_start:wave_end]
         
         dt = 1.0 / fs
-        net_i_adc = np.trapz(wave_segment_i, dx=dt)
-        net_avf_adc = np.trapz(wave_segment_avf, dx=dt)
+        net_i_adc = _trapezoid(wave_segment_i, dx=dt)
+        net_avf_adc = _trapezoid(wave_segment_avf, dx=dt)
         
         # CRITICAL FIX: For axis calculation, we can use ADC counts directly without conversion
         # The ratio net_avf/net_i is what matters for atan2, not the absolute values
@@ -751,3 +827,292 @@ def calculate_qrs_t_angle(qrs_axis_deg, t_axis_deg):
     except Exception as e:
         print(f"❌ Error calculating QRS-T angle: {e}")
         return None
+
+
+def detect_r_peaks(signal, fs):
+    """
+    Batch R-peak detection on a raw lead (0.5-40 Hz bandpass + find_peaks).
+    Same parameters calculate_ecg_metrics has always used.
+    """
+    signal = np.asarray(signal, dtype=float)
+    if len(signal) < 100 or np.std(signal) < 0.1:
+        return np.zeros(0, dtype=np.int64)
+    nyquist = fs / 2
+    b, a = butter(4, [0.5 / nyquist, 40 / nyquist], btype='band')
+    filtered = filtfilt(b, a, signal)
+    signal_mean = np.mean(filtered)
+    signal_std = np.std(filtered)
+    r_peaks, _ = find_peaks(
+        filtered,
+        height=signal_mean + 0.5 * signal_std,
+        distance=int(0.3 * fs),
+        prominence=signal_std * 0.4
+    )
+    return r_peaks
+
+
+# Lead indices in the standard 12-lead order (I, II, III, aVR, aVL, aVF, V1..V6)
+LEAD_I, LEAD_II, LEAD_AVF, LEAD_V1, LEAD_V5 = 0, 1, 5, 6, 10
+
+
+@dataclass
+class ECGMeasurements:
+    """Result of measure_all(); None means "not measurable" for that value."""
+    heart_rate: int
+    rr_ms: float
+    pr_ms: int
+    qrs_ms: int
+    qt_ms: Optional[float]
+    qtc_ms: int
+    qtcf_ms: int
+    p_axis: Optional[int]
+    qrs_axis: Optional[int]
+    t_axis: Optional[int]
+    qrs_t_angle: Optional[float]
+    st_mv: Optional[float]
+    rv5_mv: Optional[float]
+    sv1_mv: Optional[float]
+    n_beats: int
+    alignment_lead: int = LEAD_II
+    r_peaks: np.ndarray = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, object]:
+        """Plain dict (without the R-peak array) for reports and JSON."""
+        result = dict(self.__dict__)
+        result.pop('r_peaks', None)
+        return result
+
+
+def qtc_bazett(qt_ms, heart_rate):
+    """QTc (ms) = QT / sqrt(RR), RR from heart rate; 0 when not computable."""
+    if not heart_rate or heart_rate <= 0 or not qt_ms or qt_ms <= 0:
+        return 0
+    return int(round(qt_ms / 1000.0 / np.sqrt(60.0 / heart_rate) * 1000))
+
+
+def qtc_fridericia(qt_ms, rr_ms):
+    """QTcF (ms) = QT / RR^(1/3); 0 when not computable."""
+    if not qt_ms or qt_ms <= 0 or not rr_ms or rr_ms <= 0:
+        return 0
+    return int(round((qt_ms / 1000.0) / ((rr_ms / 1000.0) ** (1.0 / 3.0)) * 1000.0))
+
+
+def measure_all(leads_array, fs, r_peaks=None, alignment_lead=LEAD_II, median_beats=None,
+                prev_axes=None, min_beats=8):
+    """
+    Run every median-beat measurement from one shared set of fiducial points.
+    
+    R-peaks are detected once (or supplied), every lead's median beat is built
+    in one batched build_median_beats() call (or supplied), and all interval,
+    axis, ST and voltage measurements read from those.
+    
+    Args:
+        leads_array: (12 x n_samples) raw leads in standard order
+        fs: Sampling rate (Hz)
+        r_peaks: Optional R-peak indices (e.g. from the online detector)
+        alignment_lead: Lead used for R detection and interval measurements
+        median_beats: Optional (time_axis, [median per lead]) already built on r_peaks
+        prev_axes: Optional {'p': deg, 'qrs': deg, 't': deg} used when an axis is
+                   indeterminate (same fallback the per-axis functions used)
+        min_beats: Clean beats required for a median beat (GE/Philips: 8)
+    
+    Returns:
+        ECGMeasurements, or None when there are too few beats for a median beat
+    """
+    leads = np.asarray(leads_array, dtype=float)
+    prev_axes = prev_axes or {}
+    
+    if r_peaks is None:
+        r_peaks = detect_r_peaks(leads[alignment_lead], fs)
+    r_peaks = np.asarray(r_peaks, dtype=np.int64)
+    if len(r_peaks) < min_beats:
+        return None
+    
+    if median_beats is None:
+        # Only the leads measure_all reads from (alignment, I, II, aVF, V1, V5)
+        needed = sorted({alignment_lead, LEAD_I, LEAD_II, LEAD_AVF, LEAD_V1, LEAD_V5} &
+                        set(range(leads.shape[0])))
+        time_axis, subset = build_median_beats(leads[needed], r_peaks, fs, min_beats=min_beats)
+        medians = [None] * leads.shape[0]
+        for lead, median in zip(needed, subset):
+            medians[lead] = median
+    else:
+        time_axis, medians = median_beats
+    median_align = medians[alignment_lead]
+    if time_axis is None or median_align is None:
+        return None
+    
+    # TP baselines around the middle beat (shared by intervals and axes)
+    r_mid = r_peaks[len(r_peaks) // 2]
+    prev_r_idx = r_peaks[len(r_peaks) // 2 - 1] if len(r_peaks) > 1 else None
+    
+    def tp(lead):
+        return get_tp_baseline(leads[lead], r_mid, fs, prev_r_peak_idx=prev_r_idx)
+    
+    tp_align = tp(alignment_lead)
+    
+    # Rate (median RR from the raw R-peak series)
+    rr_intervals_ms = np.diff(r_peaks) / fs * 1000.0
+    valid_rr = rr_intervals_ms[(rr_intervals_ms >= 200) & (rr_intervals_ms <= 6000)]
+    rr_ms = float(np.median(valid_rr)) if len(valid_rr) > 0 else 600.0
+    heart_rate = int(round(60000.0 / rr_ms)) if rr_ms > 0 else 60
+    
+    # Intervals from the alignment-lead median beat
+    pr_ms = measure_pr_from_median_beat(median_align, time_axis, fs, tp_align) or 0
+    qrs_ms = measure_qrs_duration_from_median_beat(median_align, time_axis, fs, tp_align) or 0
+    qt_ms = measure_qt_from_median_beat(median_align, time_axis, fs, tp_align)
+    qtc_ms = qtc_bazett(qt_ms, heart_rate)
+    qtcf_ms = qtc_fridericia(qt_ms, rr_ms)
+    st_mv = measure_st_deviation_from_median_beat(median_align, time_axis, fs, tp_align, j_offset_ms=60)
+    
+    # Frontal axes from Lead I / II / aVF median beats
+    axes = {'p': None, 'qrs': None, 't': None}
+    median_i, median_ii, median_avf = medians[LEAD_I], medians[LEAD_II], medians[LEAD_AVF]
+    if median_i is not None and median_ii is not None and median_avf is not None:
+        tp_i, tp_avf = tp(LEAD_I), tp(LEAD_AVF)
+        r_peak_idx = len(median_i) // 2
+        for key, wave_type in (('qrs', 'QRS'), ('p', 'P'), ('t', 'T')):
+            axis_deg = calculate_axis_from_median_beat(
+                leads[LEAD_I], leads[LEAD_II], leads[LEAD_AVF],
+                median_i, median_ii, median_avf,
+                r_peak_idx, fs,
+                tp_baseline_i=tp_i,
+                tp_baseline_avf=tp_avf,
+                time_axis=time_axis,
+                wave_type=wave_type,
+                prev_axis=prev_axes.get(key),
+                pr_ms=pr_ms if wave_type == 'P' else None
+            )
+            if axis_deg is None:
+                axis_deg = prev_axes.get(key)
+            axes[key] = int(round(axis_deg)) if axis_deg is not None else None
+    qrs_t_angle = calculate_qrs_t_angle(axes['qrs'], axes['t'])
+    
+    # Voltage criteria from V5 / V1 median beats on the same R-peaks
+    rv5_mv, sv1_mv = None, None
+    if leads.shape[0] > LEAD_V5:
+        rv5_mv, sv1_mv = measure_rv5_sv1_from_median_beat(
+            leads[LEAD_V5], leads[LEAD_V1], r_peaks, r_peaks, fs,
+            v5_adc_per_mv=2048.0, v1_adc_per_mv=1441.0,
+            median_v5=medians[LEAD_V5], median_v1=medians[LEAD_V1])
+    
+    return ECGMeasurements(
+        heart_rate=heart_rate, rr_ms=rr_ms, pr_ms=pr_ms, qrs_ms=qrs_ms,
+        qt_ms=float(qt_ms) if qt_ms is not None else None, qtc_ms=qtc_ms, qtcf_ms=qtcf_ms,
+        p_axis=axes['p'], qrs_axis=axes['qrs'], t_axis=axes['t'], qrs_t_angle=qrs_t_angle,
+        st_mv=float(st_mv) if st_mv is not None else None,
+        rv5_mv=float(rv5_mv) if rv5_mv is not None else None,
+        sv1_mv=float(sv1_mv) if sv1_mv is not None else None,
+        n_beats=min(len(r_peaks), 12), alignment_lead=alignment_lead, r_peaks=r_peaks)
+
+
+def _legacy_measurement_sequence(leads, fs):
+    """
+    The call sequence calculate_ecg_metrics used before measure_all(): R-peak
+    detection and median beats redone by the metrics, the three axis functions
+    and RV5/SV1 (kept only as the benchmark baseline).
+    """
+    def axis_inputs():
+        r_peaks = detect_r_peaks(leads[LEAD_II], fs)
+        if len(r_peaks) < 8:
+            return None
+        ta, median_i = build_median_beat(leads[LEAD_I], r_peaks, fs, min_beats=8)
+        _, median_ii = build_median_beat(leads[LEAD_II], r_peaks, fs, min_beats=8)
+        _, median_avf = build_median_beat(leads[LEAD_AVF], r_peaks, fs, min_beats=8)
+        if median_i is None or median_ii is None or median_avf is None:
+            return None
+        r_mid = r_peaks[len(r_peaks) // 2]
+        prev_r = r_peaks[len(r_peaks) // 2 - 1]
+        tp_i = get_tp_baseline(leads[LEAD_I], r_mid, fs, prev_r_peak_idx=prev_r)
+        tp_avf = get_tp_baseline(leads[LEAD_AVF], r_mid, fs, prev_r_peak_idx=prev_r)
+        return ta, median_i, median_ii, median_avf, tp_i, tp_avf
+    
+    r_peaks = detect_r_peaks(leads[LEAD_II], fs)
+    if len(r_peaks) < 8:
+        return None
+    time_axis, median_ii = build_median_beat(leads[LEAD_II], r_peaks, fs, min_beats=8)
+    if median_ii is None:
+        return None
+    r_mid = r_peaks[len(r_peaks) // 2]
+    tp_ii = get_tp_baseline(leads[LEAD_II], r_mid, fs, prev_r_peak_idx=r_peaks[len(r_peaks) // 2 - 1])
+    pr = measure_pr_from_median_beat(median_ii, time_axis, fs, tp_ii)
+    measure_qrs_duration_from_median_beat(median_ii, time_axis, fs, tp_ii)
+    measure_qt_from_median_beat(median_ii, time_axis, fs, tp_ii)
+    for wave_type in ('QRS', 'P', 'T'):
+        inputs = axis_inputs()
+        if inputs is not None:
+            ta, median_i, median_ii_ax, median_avf, tp_i, tp_avf = inputs
+            calculate_axis_from_median_beat(leads[LEAD_I], leads[LEAD_II], leads[LEAD_AVF],
+                                            median_i, median_ii_ax, median_avf, len(median_i) // 2, fs,
+                                            tp_baseline_i=tp_i, tp_baseline_avf=tp_avf, time_axis=ta,
+                                            wave_type=wave_type, pr_ms=pr)
+    measure_st_deviation_from_median_beat(median_ii, time_axis, fs, tp_ii, j_offset_ms=60)
+    r_peaks_rv = detect_r_peaks(leads[LEAD_II], fs)
+    measure_rv5_sv1_from_median_beat(leads[LEAD_V5], leads[LEAD_V1], r_peaks_rv, r_peaks_rv, fs)
+    return True
+
+
+def _synthetic_12_lead(fs, seconds, seed=0, qrs_axis_deg=60.0):
+    """
+    P-QRS-T train at 75 bpm (beats 0.8 s apart), used by the benchmark.
+    
+    The limb leads are projections of one frontal-plane vector at qrs_axis_deg
+    (III = II - I, aVR/aVL/aVF from Einthoven's relations), so measure_all()
+    finds a defined axis. The T peak sits 0.26 s after R, inside
+    detect_r_peaks' 0.3 s refractory distance, so it is not counted as a beat.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * fs)) / fs
+    beat = np.zeros(t.size)
+    for beat_t in np.arange(0.4, seconds - 0.4, 0.8):
+        beat += (0.12 * np.exp(-((t - beat_t + 0.16) / 0.025) ** 2) +
+                 1.0 * np.exp(-((t - beat_t) / 0.02) ** 2) -
+                 0.2 * np.exp(-((t - beat_t - 0.04) / 0.015) ** 2) +
+                 0.3 * np.exp(-((t - beat_t - 0.26) / 0.06) ** 2))
+    axis = np.radians(qrs_axis_deg)
+    lead_i = np.cos(axis)
+    lead_ii = 0.5 * np.cos(axis) + np.sqrt(3) / 2 * np.sin(axis)
+    gains = np.array([lead_i, lead_ii, lead_ii - lead_i, -(lead_i + lead_ii) / 2,
+                      lead_i - lead_ii / 2, lead_ii - lead_i / 2,
+                      -0.6, 0.3, 0.8, 1.1, 1.2, 0.9])
+    leads = 1000.0 * gains[:, None] * beat[None, :]
+    return leads + 2000.0 + rng.normal(scale=5.0, size=leads.shape)
+
+
+def benchmark_measure_all(fs=250.0, seconds=10.0, repeats=5):
+    """
+    Wall time of measure_all() vs the previous per-function call sequence.
+    
+    Measurement functions print debug lines, so stdout goes to os.devnull while
+    timing.
+    """
+    leads = _synthetic_12_lead(fs, seconds)
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, fn in (('legacy_sequence', _legacy_measurement_sequence), ('measure_all', measure_all)):
+            best = float("inf")
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                fn(leads, fs)
+                best = min(best, time.perf_counter() - t0)
+            results[name] = best
+        sample = measure_all(leads, fs)
+    
+    # The fixture is a 75 bpm rhythm with a 60 degree axis; anything else means the
+    # timing above was taken on a mis-detected signal
+    assert sample is not None, "measure_all() found too few beats in the synthetic signal"
+    assert abs(sample.heart_rate - 75) <= 2, f"synthetic HR {sample.heart_rate} != 75"
+    assert sample.qrs_axis is not None and abs(sample.qrs_axis - 60) <= 15, \
+        f"synthetic QRS axis {sample.qrs_axis} != 60"
+    
+    print(f"Median-beat measurement benchmark ({seconds:.0f} s, 12 leads, {fs:.1f} Hz, best of {repeats}):")
+    for name, secs in results.items():
+        print(f"  {name:<16} {secs * 1000:8.1f} ms")
+    print(f"  speed-up         {results['legacy_sequence'] / results['measure_all']:8.1f}x")
+    print(f"  HR={sample.heart_rate} PR={sample.pr_ms} QRS={sample.qrs_ms} QT={sample.qt_ms} "
+          f"QRS axis={sample.qrs_axis}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_measure_all()
@@ -0,0 +1,221 @@
+"""
+Min/Max (Envelope) Decimation for ECG Traces
+
+Plotting every sample of a 10 s, 500 Hz lead into a few hundred points of
+width wastes work: most samples land on the same output column. Naive
+stride decimation (y[::k]) is cheaper but drops the narrow QRS peaks.
+
+minmax_decimate_indices() splits the trace into n_bins equal columns and keeps,
+for each column, the sample indices of its minimum and maximum in time order.
+Every peak and trough survives, so the decimated trace is visually identical
+at the target resolution while holding at most 2 * n_bins points.
+
+For live traces, StreamingEnvelope keeps the per-lead min/max of fixed-size
+bins of a CircularLeadBuffer and only bins the samples written since the last
+frame, so a redraw costs O(pixel width) rather than O(samples in the window).
+Display gain and baseline offsets are affine with a positive scale, so they
+can be applied to the envelope points after decimation.
+
+Usage:
+    idx = minmax_decimate_indices(y, n_bins=800)
+    x_plot, y_plot = x[idx], y[idx]
+    # or
+    x_plot, y_plot = minmax_decimate(x, y, n_bins=800)
+
+    envelope = StreamingEnvelope()
+    x_rel, y_env = envelope.envelope(lead_buffer, lead=1, n_samples=1500, n_columns=800)
+    line.setData(x_rel / fs, (y_env - baseline) * gain)
+"""
+
+import numpy as np
+
+
+def minmax_decimate_indices(y, n_bins):
+    """
+    Indices of the per-column min and max samples of y, in time order.
+
+    Args:
+        y: 1-D signal
+        n_bins: Number of output columns (e.g. pixels or printer dots)
+
+    Returns:
+        Sorted int index array (at most 2 * n_bins + 2 entries, first and last
+        sample always included); all indices when y is already short enough
+    """
+    y = np.asarray(y)
+    n = len(y)
+    n_bins = int(n_bins)
+    if n_bins <= 0 or n <= 2 * n_bins:
+        return np.arange(n)
+
+    bin_len = int(np.ceil(n / n_bins))
+    n_bins = int(np.ceil(n / bin_len))
+    padded = n_bins * bin_len
+    if padded > n:
+        # Edge padding repeats the last sample, so it never creates a new extreme
+        y = np.concatenate([y, np.full(padded - n, y[-1], dtype=y.dtype)])
+    columns = y.reshape(n_bins, bin_len)
+
+    base = np.arange(n_bins) * bin_len
+    i_min = base + np.argmin(columns, axis=1)
+    i_max = base + np.argmax(columns, axis=1)
+    idx = np.concatenate([[0], np.minimum(i_min, i_max), np.maximum(i_min, i_max), [n - 1]])
+    idx = np.unique(np.minimum(idx, n - 1))
+    return idx
+
+
+def minmax_decimate(x, y, n_bins):
+    """
+    Envelope-preserving decimation of an (x, y) trace.
+
+    Args:
+        x: 1-D x coordinates (same length as y)
+        y: 1-D signal
+        n_bins: Number of output columns
+
+    Returns:
+        (x_decimated, y_decimated) numpy arrays
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    idx = minmax_decimate_indices(y, n_bins)
+    return x[idx], y[idx]
+
+
+def _ordered_pairs(i_lo, v_lo, i_hi, v_hi):
+    """Interleave per-bin (min, max) points so each bin's pair is in time order."""
+    lo_first = i_lo <= i_hi
+    first_i = np.where(lo_first, i_lo, i_hi)
+    second_i = np.where(lo_first, i_hi, i_lo)
+    first_v = np.where(lo_first, v_lo, v_hi)
+    second_v = np.where(lo_first, v_hi, v_lo)
+    return (np.column_stack([first_i, second_i]).ravel(),
+            np.column_stack([first_v, second_v]).ravel())
+
+
+class StreamingEnvelope:
+    """
+    Min/max envelope of the newest samples of a CircularLeadBuffer, cached per lead.
+
+    Completed bins of bin_len samples are aligned to absolute sample numbers
+    (buffer.total_written), stored in a ring per lead and never recomputed;
+    only the newly written samples and the still-filling last bin are scanned
+    on each call. The cache resets when the buffer, bin size or buffer
+    generation (reset / in-place overwrite) changes.
+    """
+
+    def __init__(self):
+        self._buffer_id = None
+        self._generation = None
+        self._bin_len = 0
+        self._capacity = 0
+        self._first_bin = 0     # oldest cached bin (absolute bin number)
+        self._next_bin = 0      # first bin not yet completed/cached
+        self._lo = self._hi = None
+        self._i_lo = self._i_hi = None
+
+    def _reset(self, buffer, bin_len):
+        self._buffer_id = id(buffer)
+        self._generation = getattr(buffer, 'generation', 0)
+        self._bin_len = bin_len
+        self._capacity = buffer.capacity // bin_len + 2
+        shape = (buffer.n_leads, self._capacity)
+        self._lo = np.zeros(shape, dtype=float)
+        self._hi = np.zeros(shape, dtype=float)
+        self._i_lo = np.zeros(shape, dtype=np.int64)
+        self._i_hi = np.zeros(shape, dtype=np.int64)
+        oldest = buffer.total_written - buffer.filled
+        self._first_bin = self._next_bin = -(-oldest // bin_len)   # first whole bin still held
+
+    def update(self, buffer, bin_len):
+        """Bin every sample written since the last call (all leads at once)."""
+        total = buffer.total_written
+        if (self._buffer_id != id(buffer) or self._bin_len != bin_len
+                or self._generation != getattr(buffer, 'generation', 0)
+                or total < self._next_bin * bin_len
+                or total - self._next_bin * bin_len > buffer.filled):
+            self._reset(buffer, bin_len)
+
+        complete = total // bin_len
+        if complete <= self._next_bin:
+            return
+        start_bin = max(self._next_bin, complete - self._capacity)
+        k = complete - start_bin
+        n = total - start_bin * bin_len
+        block = np.asarray(buffer.latest(n), dtype=float)[:, :k * bin_len]
+        columns = block.reshape(buffer.n_leads, k, bin_len)
+        base = (start_bin + np.arange(k, dtype=np.int64)) * bin_len
+        arg_lo = np.argmin(columns, axis=2)
+        arg_hi = np.argmax(columns, axis=2)
+        slots = np.arange(start_bin, complete) % self._capacity
+        self._lo[:, slots] = np.take_along_axis(columns, arg_lo[:, :, None], axis=2)[:, :, 0]
+        self._hi[:, slots] = np.take_along_axis(columns, arg_hi[:, :, None], axis=2)[:, :, 0]
+        self._i_lo[:, slots] = base + arg_lo
+        self._i_hi[:, slots] = base + arg_hi
+        self._next_bin = complete
+        self._first_bin = max(self._first_bin, complete - self._capacity)
+
+    def envelope(self, buffer, lead, n_samples, n_columns):
+        """
+        Pixel-width envelope of one lead's newest n_samples.
+
+        Args:
+            buffer: CircularLeadBuffer (or anything with the same read API)
+            lead: Lead index
+            n_samples: Window length in samples (clamped to the held history)
+            n_columns: Target width in pixel columns
+
+        Returns:
+            (x, y): x = sample offsets from the window start (float), y = values;
+            at most ~2 * n_columns + 6 points, every extreme and both edges kept
+        """
+        total = buffer.total_written
+        n_samples = max(0, min(int(n_samples), buffer.filled))
+        bin_len = int(np.ceil(n_samples / max(1, int(n_columns)))) if n_samples else 1
+        if bin_len <= 2:
+            # Nothing to gain from decimation: hand back the raw window
+            y = np.array(buffer.latest(n_samples, lead=lead), dtype=float)
+            return np.arange(y.size, dtype=float), y
+
+        self.update(buffer, bin_len)
+        start = total - n_samples
+        b0 = max(-(-start // bin_len), self._first_bin)
+        b1 = self._next_bin
+        xs, ys = [], []
+
+        # Head: samples before the first cached whole bin
+        head_end = min(b0 * bin_len, total)
+        if head_end > start:
+            head = np.asarray(buffer.latest(n_samples, lead=lead)[:head_end - start], dtype=float)
+            idx = minmax_decimate_indices(head, max(1, len(head) // bin_len))
+            xs.append(idx.astype(float))
+            ys.append(head[idx])
+
+        # Cached whole bins
+        if b1 > b0:
+            slots = np.arange(b0, b1) % self._capacity
+            i_pts, v_pts = _ordered_pairs(self._i_lo[lead, slots], self._lo[lead, slots],
+                                          self._i_hi[lead, slots], self._hi[lead, slots])
+            xs.append((i_pts - start).astype(float))
+            ys.append(v_pts)
+
+        # Tail: the bin still filling up
+        tail_start = max(b1 * bin_len, start)
+        if total > tail_start:
+            tail = np.asarray(buffer.latest(total - tail_start, lead=lead), dtype=float)
+            i_lo, i_hi = int(np.argmin(tail)), int(np.argmax(tail))
+            i_pts, v_pts = _ordered_pairs(np.array([i_lo]), tail[[i_lo]], np.array([i_hi]), tail[[i_hi]])
+            idx = np.unique(np.concatenate([i_pts, [len(tail) - 1]]))
+            xs.append((idx + tail_start - start).astype(float))
+            ys.append(tail[idx])
+
+        if not xs:
+            return np.zeros(0), np.zeros(0)
+        x, y = np.concatenate(xs), np.concatenate(ys)
+        # Pin both window edges so the trace spans the full x-range
+        window = buffer.latest(n_samples, lead=lead)
+        if x[0] > 0:
+            x, y = np.concatenate([[0.0], x]), np.concatenate([[float(window[0])], y])
+        if x[-1] < n_samples - 1:
+            x, y = np.concatenate([x, [float(n_samples - 1)]]), np.concatenate([y, [float(window[-1])]])
+        return x, y
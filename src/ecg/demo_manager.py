@@ -427,14 +427,15 @@ class DemoManager:
             lead_columns = [col for col in df.columns if col != 'Sample']
             print(f" Found leads: {lead_columns}")
             
-            # Clear existing data - data is a list of numpy arrays, not a dictionary
-            for i in range(len(self.ecg_test_page.data)):
-                self.ecg_test_page.data[i] = np.zeros(self.ecg_test_page.buffer_size)
+            # Clear existing data (CircularLeadBuffer)
+            self.ecg_test_page.data.reset()
             
             # Initialize data with first few rows
             # Prefill enough samples to immediately show ~4 peaks
             csv_base_fs = 80  # demo CSV base aligned to new default
             prefill_needed = min(self.ecg_test_page.buffer_size, max(100, int(csv_base_fs * 4.0)), len(df))
+            # Prefill block: samples first, zeros after (same layout the old per-lead arrays had)
+            prefill = np.zeros((len(self.ecg_test_page.data), self.ecg_test_page.buffer_size), dtype=np.float32)
             for lead in lead_columns:
                 if lead in self.ecg_test_page.leads:
                     lead_index = self.ecg_test_page.leads.index(lead)
@@ -448,7 +449,8 @@ class DemoManager:
                     baseline_mean = float(np.mean(arr[:baseline_window])) if arr.size > 0 else 0.0
                     self._baseline_means[lead_index] = baseline_mean
                     # Prefill with baseline‑centered data to reduce initial DC offset
-                    self.ecg_test_page.data[lead_index][:count] = arr - baseline_mean
+                    prefill[lead_index, :count] = arr - baseline_mean
+            self.ecg_test_page.data.extend(prefill)
             
             # Set warmup window to avoid initial visual artifacts
             self._warmup_until = time.time() + 1.0
@@ -480,7 +482,8 @@ class DemoManager:
                     
                     while (not self._stop_event.is_set()) and self._running_demo and row_index < len(df):
                         try:
-                            # Read data for all leads with error handling
+                            # Read data for all leads with error handling, then append one column
+                            column = np.zeros(len(self.ecg_test_page.data), dtype=np.float32)
                             for lead in lead_columns:
                                 try:
                                     if lead in self.ecg_test_page.leads:
@@ -506,24 +509,19 @@ class DemoManager:
                                             print(f"❌ Cannot convert value to float: {value}")
                                             value = 0.0
                                         
-                                        # Update data using numpy roll method with bounds checking
-                                        with self._lock:
-                                            if (hasattr(self.ecg_test_page, 'data') and 
-                                                lead_index < len(self.ecg_test_page.data) and
-                                                len(self.ecg_test_page.data[lead_index]) > 0):
-                                                # 🫀 CLINICAL: Store RAW value in data buffer (for clinical analysis)
-                                                # Do NOT apply baseline centering here - that's display-only
-                                                raw_value = float(value)
-                                                self.ecg_test_page.data[lead_index] = np.roll(
-                                                    self.ecg_test_page.data[lead_index], -1)
-                                                self.ecg_test_page.data[lead_index][-1] = raw_value
-                                            else:
-                                                print(f"❌ Invalid data buffer for lead {lead_index}")
+                                        # 🫀 CLINICAL: Store RAW value in data buffer (for clinical analysis)
+                                        # Do NOT apply baseline centering here - that's display-only
+                                        if lead_index < column.size:
+                                            column[lead_index] = value
+                                        else:
+                                            print(f"❌ Invalid data buffer for lead {lead_index}")
                                                 
                                 except Exception as e:
                                     print(f"❌ Error processing lead {lead} at row {row_index}: {e}")
                                     continue
                             
+                            with self._lock:
+                                self.ecg_test_page.data.append(column)
                             row_index += 1
                             consecutive_errors = 0  # Reset error counter on success
                             
@@ -681,7 +679,8 @@ class DemoManager:
         # 2. For each lead, slice and update (exactly like divyansh.py)
         for i, lead in enumerate(self.ecg_test_page.leads):
             if i < len(self.ecg_test_page.data_lines) and i < len(self.ecg_test_page.data):
-                lead_data = self.ecg_test_page.data[i]
+                # Sweep over the newest buffer_size samples (same span the old per-lead arrays had)
+                lead_data = self.ecg_test_page.data.latest(self.ecg_test_page.buffer_size, lead=i)
                 
                 total_len = len(lead_data)
                 if total_len == 0:
@@ -759,7 +758,7 @@ class DemoManager:
         
         step = 8
         if len(self.ecg_test_page.data) > 0:
-            any_len = len(self.ecg_test_page.data[0])
+            any_len = min(self.ecg_test_page.data.filled, self.ecg_test_page.buffer_size)
             if any_len > 0:
                 self.data_ptr = (self.data_ptr + step) % any_len
         
@@ -801,8 +800,8 @@ class DemoManager:
                 pass
             self.demo_timer = None
         # Initialize buffers
-        for i in range(len(self.ecg_test_page.data)):
-            self.ecg_test_page.data[i] = np.zeros(self.ecg_test_page.buffer_size)
+        self.ecg_test_page.data.reset()
+        self.ecg_test_page.data.extend(np.zeros((len(self.ecg_test_page.data), self.ecg_test_page.buffer_size)))
 
         # Parameters
         try:
@@ -839,11 +838,10 @@ class DemoManager:
                 sample += np.random.normal(0, 5)
 
                 # Update all leads with simple variations
-                for li in range(len(self.ecg_test_page.data)):
-                    val = sample * (0.8 + 0.4 * np.sin(two_pi * (li + 1) * 0.03 * t))
-                    with self._lock:
-                        self.ecg_test_page.data[li] = np.roll(self.ecg_test_page.data[li], -1)
-                        self.ecg_test_page.data[li][-1] = val
+                lead_numbers = np.arange(1, len(self.ecg_test_page.data) + 1)
+                column = sample * (0.8 + 0.4 * np.sin(two_pi * lead_numbers * 0.03 * t))
+                with self._lock:
+                    self.ecg_test_page.data.append(column)
 
                 # Respect wave speed for visual pacing (like divyansh.py)
                 speed_factor = getattr(self, 'time_window', 10.0) / 10.0
@@ -1119,8 +1117,7 @@ class DemoManager:
         # Clear demo data and plots safely
         try:
             with self._lock:
-                for i in range(len(self.ecg_test_page.data)):
-                    self.ecg_test_page.data[i] = np.zeros(self.ecg_test_page.buffer_size)
+                self.ecg_test_page.data.reset()
                 for line in self.ecg_test_page.data_lines:
                     line.setData(np.zeros(self.ecg_test_page.buffer_size))
             print("🧹 Demo data cleared and plots reset")
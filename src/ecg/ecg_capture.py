@@ -0,0 +1,295 @@
+"""
+Binary Columnar ECG Capture Files (.ecgb)
+
+The report generators used to save each capture as JSON (every sample a
+decimal string, indent=2) and parse it all back with json.load + np.array.
+For long captures that is slow and 10-20x larger than the samples themselves.
+
+File layout (little-endian):
+    8 bytes   magic b"ECGCAP01"
+    4 bytes   uint32 header length H
+    H bytes   UTF-8 JSON header, space-padded so the data block starts on a
+              64-byte boundary:
+                  sampling_rate, lead_names, lengths (samples per lead),
+                  timestamp, patient_id, dtype ("<i2" or "<f4"),
+                  n_leads, n_samples, data_offset
+    data      lead-major (n_leads x n_samples) block; leads shorter than
+              n_samples are zero-padded at the end (see "lengths")
+
+The data block is opened with np.memmap, so a report that only needs the last
+N seconds of a few leads touches just those bytes.
+
+Usage:
+    path = write_capture('reports/ecg_data/ecg_data_20250101_120000.ecgb',
+                         leads, fs=500.0, lead_names=LEAD_NAMES, patient_id='P-17')
+    capture = open_capture(path)
+    lead_ii_last_10s = capture.window('II', seconds=10.0)
+    data = load_capture_as_dict(path)   # same dict shape as the old JSON files
+
+Convert existing JSON captures (from the src directory):
+    python -m ecg.ecg_capture ../reports/ecg_data
+"""
+
+import json
+import os
+import struct
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+CAPTURE_MAGIC = b"ECGCAP01"
+CAPTURE_EXTENSION = ".ecgb"
+DATA_ALIGNMENT = 64
+LEAD_NAMES = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
+
+_PREFIX = struct.Struct("<8sI")
+
+
+def is_capture_file(file_path: str) -> bool:
+    """True if file_path starts with the binary capture magic."""
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(len(CAPTURE_MAGIC)) == CAPTURE_MAGIC
+    except OSError:
+        return False
+
+
+def _choose_dtype(block: np.ndarray) -> np.dtype:
+    """int16 when every sample is an integer ADC count that fits, else float32."""
+    if block.size and np.all(np.isfinite(block)):
+        if np.all(block == np.round(block)) and block.min() >= -32768 and block.max() <= 32767:
+            return np.dtype("<i2")
+    return np.dtype("<f4")
+
+
+def write_capture(file_path: str, leads, fs: float, lead_names: Optional[List[str]] = None,
+                  timestamp: Optional[str] = None, patient_id: Optional[str] = None,
+                  dtype: Optional[str] = None) -> str:
+    """
+    Write a capture file.
+
+    Args:
+        file_path: Output path (conventionally *.ecgb)
+        leads: dict {lead_name: 1-D samples} or a sequence/2-D array in lead_names order
+        fs: Sampling rate (Hz)
+        lead_names: Lead order (default: the 12 standard leads, or the dict's keys)
+        timestamp: Capture time string (default: now, '%Y-%m-%d %H:%M:%S')
+        patient_id: Optional patient identifier
+        dtype: '<i2' / '<f4' to force a sample type; default picks int16 when lossless
+
+    Returns:
+        file_path
+    """
+    if isinstance(leads, dict):
+        if lead_names is None:
+            lead_names = list(leads.keys())
+        series = [np.asarray(leads.get(name, []), dtype=float).ravel() for name in lead_names]
+    else:
+        series = [np.asarray(lead, dtype=float).ravel() for lead in leads]
+        if lead_names is None:
+            lead_names = LEAD_NAMES[:len(series)]
+
+    lengths = [int(len(s)) for s in series]
+    n_samples = max(lengths) if lengths else 0
+    block = np.zeros((len(series), n_samples), dtype=float)
+    for i, s in enumerate(series):
+        block[i, :len(s)] = s
+
+    sample_dtype = np.dtype(dtype) if dtype else _choose_dtype(block)
+
+    header = {
+        "format": "ecg-capture",
+        "version": 1,
+        "sampling_rate": float(fs),
+        "lead_names": list(lead_names),
+        "lengths": lengths,
+        "timestamp": timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "patient_id": patient_id,
+        "dtype": sample_dtype.str,
+        "n_leads": len(series),
+        "n_samples": n_samples,
+    }
+    # data_offset depends on the header length, which depends on data_offset's digits
+    header["data_offset"] = 0
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_offset = _PREFIX.size + len(header_bytes) + 16
+    data_offset += (-data_offset) % DATA_ALIGNMENT
+    header["data_offset"] = data_offset
+    header_bytes = json.dumps(header).encode("utf-8")
+    header_bytes += b" " * (data_offset - _PREFIX.size - len(header_bytes))
+
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(CAPTURE_MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(np.ascontiguousarray(block.astype(sample_dtype)).tobytes())
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def read_capture_header(file_path: str) -> Dict[str, object]:
+    """Parse the JSON header of a capture file (no sample data is read)."""
+    with open(file_path, "rb") as f:
+        magic, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != CAPTURE_MAGIC:
+            raise ValueError(f"{file_path} is not an ECG capture file")
+        return json.loads(f.read(header_len).decode("utf-8"))
+
+
+class ECGCapture:
+    """Memory-mapped view of one capture file."""
+
+    def __init__(self, file_path: str):
+        self.path = file_path
+        self.header = read_capture_header(file_path)
+        self.fs = float(self.header["sampling_rate"])
+        self.lead_names: List[str] = list(self.header["lead_names"])
+        self.lengths: List[int] = [int(n) for n in self.header["lengths"]]
+        self.timestamp = self.header.get("timestamp")
+        self.patient_id = self.header.get("patient_id")
+        n_leads, n_samples = int(self.header["n_leads"]), int(self.header["n_samples"])
+        if n_leads and n_samples:
+            self.data = np.memmap(file_path, dtype=np.dtype(self.header["dtype"]), mode="r",
+                                  offset=int(self.header["data_offset"]), shape=(n_leads, n_samples))
+        else:
+            self.data = np.zeros((n_leads, 0), dtype=np.dtype(self.header["dtype"]))
+
+    def lead(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Samples [start:stop] of one lead as float (only those bytes are read).
+
+        Args:
+            name: Lead name (e.g. 'II')
+            start: First sample index
+            stop: One past the last sample (default: the lead's length)
+        """
+        i = self.lead_names.index(name)
+        length = self.lengths[i]
+        stop = length if stop is None else min(int(stop), length)
+        start = max(0, min(int(start), stop))
+        return np.asarray(self.data[i, start:stop], dtype=float)
+
+    def window(self, name: str, seconds: float) -> np.ndarray:
+        """The last `seconds` of one lead."""
+        length = self.lengths[self.lead_names.index(name)]
+        n = int(round(seconds * self.fs))
+        return self.lead(name, max(0, length - n), length)
+
+    def duration_s(self) -> float:
+        return (max(self.lengths) / self.fs) if self.lengths and self.fs > 0 else 0.0
+
+
+def open_capture(file_path: str) -> ECGCapture:
+    """Open a capture file for windowed reads."""
+    return ECGCapture(file_path)
+
+
+def load_capture_as_dict(file_path: str, last_seconds: Optional[float] = None) -> Dict[str, object]:
+    """
+    Load a capture into the dict shape the JSON files had.
+
+    Args:
+        file_path: Capture file
+        last_seconds: Only load the newest N seconds of every lead
+
+    Returns:
+        {'timestamp', 'sampling_rate', 'patient_id', 'leads': {name: np.ndarray}}
+    """
+    capture = open_capture(file_path)
+    leads = {}
+    for name in capture.lead_names:
+        if last_seconds is not None:
+            leads[name] = capture.window(name, last_seconds)
+        else:
+            leads[name] = capture.lead(name)
+    return {
+        "timestamp": capture.timestamp,
+        "sampling_rate": capture.fs,
+        "patient_id": capture.patient_id,
+        "leads": leads,
+    }
+
+
+def patient_id_from_details(patient) -> Optional[str]:
+    """Best-effort patient identifier from a report 'patient' dict."""
+    if not patient or not isinstance(patient, dict):
+        return None
+    for key in ("patient_id", "id", "Patient ID"):
+        if patient.get(key):
+            return str(patient[key])
+    name = f"{patient.get('first_name', '')} {patient.get('last_name', '')}".strip()
+    return name or None
+
+
+def convert_json_capture(json_path: str, output_path: Optional[str] = None,
+                         remove_source: bool = False) -> Optional[str]:
+    """
+    Convert one legacy reports/ecg_data/*.json capture to the binary format.
+
+    Args:
+        json_path: Source JSON ({'timestamp', 'sampling_rate', 'leads': {...}})
+        output_path: Destination (default: same name with .ecgb)
+        remove_source: Delete the JSON after a successful, verified conversion
+
+    Returns:
+        Output path, or None if the file could not be converted
+    """
+    try:
+        with open(json_path, "r") as f:
+            saved = json.load(f)
+        leads = saved.get("leads", {})
+        if output_path is None:
+            output_path = os.path.splitext(json_path)[0] + CAPTURE_EXTENSION
+        write_capture(output_path, leads, fs=float(saved.get("sampling_rate", 80.0)),
+                      lead_names=list(leads.keys()), timestamp=saved.get("timestamp"),
+                      patient_id=saved.get("patient_id"))
+        if remove_source:
+            capture = open_capture(output_path)
+            for name, values in leads.items():
+                if not np.allclose(capture.lead(name), np.asarray(values, dtype=float), atol=1e-3, rtol=1e-6):
+                    print(f"⚠️ Verification failed for {json_path} lead {name}, keeping JSON")
+                    return output_path
+            os.remove(json_path)
+        return output_path
+    except Exception as e:
+        print(f"❌ Could not convert {json_path}: {e}")
+        return None
+
+
+def convert_json_directory(directory: str, remove_source: bool = False) -> List[str]:
+    """Convert every ecg_data_*.json in a directory; returns the written paths."""
+    written = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("ecg_data_") and name.endswith(".json"):
+            out = convert_json_capture(os.path.join(directory, name), remove_source=remove_source)
+            if out:
+                written.append(out)
+    return written
+
+
+def find_latest_capture(directory: str) -> Optional[str]:
+    """Newest ecg_data_* capture in a directory, binary or legacy JSON."""
+    if not os.path.isdir(directory):
+        return None
+    files = [f for f in os.listdir(directory)
+             if f.startswith("ecg_data_") and (f.endswith(CAPTURE_EXTENSION) or f.endswith(".json"))]
+    if not files:
+        return None
+    # Names carry the timestamp; prefer the binary file when both exist
+    files.sort(key=lambda f: (os.path.splitext(f)[0], f.endswith(CAPTURE_EXTENSION)), reverse=True)
+    return os.path.join(directory, files[0])
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(__file__), "..", "..", "reports", "ecg_data")
+    remove = "--remove-json" in sys.argv
+    converted = convert_json_directory(target, remove_source=remove)
+    before = sum(os.path.getsize(os.path.splitext(p)[0] + ".json") for p in converted
+                 if os.path.exists(os.path.splitext(p)[0] + ".json"))
+    after = sum(os.path.getsize(p) for p in converted)
+    print(f"✅ Converted {len(converted)} capture(s) in {target}")
+    if before:
+        print(f"   JSON {before / 1024:.0f} KB -> binary {after / 1024:.0f} KB ({before / max(after, 1):.1f}x smaller)")
@@ -25,10 +25,16 @@ Usage:
         emg_filter="150",  # "25", "35", "45", "75", "100", "150"
         dft_filter="0.5"  # "off", "0.05", or "0.5"
     )
+    
+    # Live streams: filter only new samples, state kept per lead
+    chain = StreamingFilterChain(n_channels=12)
+    chain.configure(500, ac_filter="50", emg_filter="off", dft_filter="off")
+    filtered_block = chain.process(new_block)  # (12 x k)
 """
 
 import numpy as np
-from scipy.signal import butter, filtfilt, iirnotch, medfilt, find_peaks
+from functools import lru_cache
+from scipy.signal import butter, filtfilt, iirnotch, medfilt, find_peaks, sosfilt, sosfilt_zi, tf2sos
 from scipy.ndimage import uniform_filter1d
 from typing import Union, Optional, Tuple
 
@@ -691,3 +697,239 @@ def apply_ecg_filters_from_settings(
         dft_filter=dft_filter
     )
 
+
+
+# ---------------------------------------------------------------------------
+# Streaming (stateful) filters
+#
+# The functions above re-filter a whole window with filtfilt on every call.
+# For live display we only need to filter samples that have just arrived:
+# the filters below run the same designs as second-order sections with the
+# per-lead state (zi) carried between calls, so cost is O(new samples).
+#
+# Streaming output is identical (to float rounding) to running the same SOS
+# cascade once over the whole record - see apply_ecg_filters_causal(). It is
+# causal, so it has the magnitude response of one filtfilt pass and a phase
+# lag instead of zero phase.
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=64)
+def design_filter_sos(kind: str, fs: float, cutoff, order: int = 2, q: float = 25.0) -> np.ndarray:
+    """
+    Design (and cache per (kind, fs, cutoff, order, q)) a filter as second-order sections.
+    
+    Args:
+        kind: "notch", "lowpass", "highpass", "bandpass" or "bandstop"
+        fs: Sampling frequency in Hz
+        cutoff: Cutoff in Hz (tuple of two for band filters)
+        order: Butterworth order (ignored for notch)
+        q: Quality factor (notch only)
+    
+    Returns:
+        Read-only SOS array
+    
+    Raises:
+        ValueError: if a cutoff is outside (0, Nyquist)
+    """
+    nyquist = fs / 2.0
+    freqs = np.atleast_1d(np.asarray(cutoff, dtype=float)) / nyquist
+    if np.any(freqs <= 0) or np.any(freqs >= 1):
+        raise ValueError(f"Cutoff {cutoff}Hz is invalid for sampling rate {fs}Hz")
+    
+    if kind == "notch":
+        b, a = iirnotch(freqs[0], q)
+        sos = tf2sos(b, a)
+    else:
+        wn = freqs[0] if freqs.size == 1 else freqs
+        sos = butter(order, wn, btype=kind, output='sos')
+    sos.flags.writeable = False
+    return sos
+
+
+def ac_filter_sos(sampling_rate: float, ac_filter: Optional[str]) -> Optional[np.ndarray]:
+    """SOS for apply_ac_filter's notch, or None when the filter is off/invalid."""
+    if not ac_filter or ac_filter == "off":
+        return None
+    try:
+        return design_filter_sos("notch", round(float(sampling_rate), 3), float(ac_filter), q=25.0)
+    except (ValueError, TypeError) as e:
+        print(f"⚠️ AC filter unavailable: {e}")
+        return None
+
+
+def emg_filter_sos(sampling_rate: float, emg_filter: Optional[str]) -> Optional[np.ndarray]:
+    """SOS for apply_emg_filter's low-pass (same 35-40 Hz clamp), or None."""
+    if not emg_filter or emg_filter == "off":
+        return None
+    try:
+        cutoff_freq = min(40.0, max(35.0, float(emg_filter)))
+        return design_filter_sos("lowpass", round(float(sampling_rate), 3), cutoff_freq, order=4)
+    except (ValueError, TypeError) as e:
+        print(f"⚠️ EMG filter unavailable: {e}")
+        return None
+
+
+def dft_filter_sos(sampling_rate: float, dft_filter: Optional[str]) -> Optional[np.ndarray]:
+    """SOS for apply_dft_filter's high-pass, or None."""
+    if not dft_filter or dft_filter == "off":
+        return None
+    try:
+        return design_filter_sos("highpass", round(float(sampling_rate), 3), float(dft_filter), order=2)
+    except (ValueError, TypeError) as e:
+        print(f"⚠️ DFT filter unavailable: {e}")
+        return None
+
+
+class StreamingSOSFilter:
+    """One SOS cascade applied to several channels, state carried between calls."""
+    
+    def __init__(self, sos: np.ndarray, n_channels: int = 12):
+        # Private writable copy: sosfilt's C kernel rejects the read-only cached design
+        self.sos = np.array(sos)
+        self.n_channels = n_channels
+        self.zi = None
+    
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Filter newly arrived samples.
+        
+        Args:
+            block: (n_channels x k) new samples, oldest first
+        
+        Returns:
+            (n_channels x k) filtered samples
+        """
+        block = np.asarray(block, dtype=float)
+        if block.shape[-1] == 0:
+            return block
+        if self.zi is None:
+            # Start in steady state at the first sample (no step transient)
+            self.zi = sosfilt_zi(self.sos)[:, None, :] * block[:, 0][None, :, None]
+        out, self.zi = sosfilt(self.sos, block, axis=-1, zi=self.zi)
+        return out
+    
+    def reset(self) -> None:
+        self.zi = None
+
+
+class StreamingFilterChain:
+    """
+    Streaming DFT -> EMG -> AC chain (same order and designs as apply_ecg_filters).
+    
+    Usage:
+        chain = StreamingFilterChain(n_channels=12)
+        chain.configure(fs, ac_filter="50", emg_filter="off", dft_filter="off")
+        filtered_block = chain.process(new_block)   # (12 x k)
+    """
+    
+    def __init__(self, n_channels: int = 12):
+        self.n_channels = n_channels
+        self.stages = []
+        self._key = None
+    
+    def configure(self, sampling_rate: float, ac_filter: Optional[str] = None,
+                  emg_filter: Optional[str] = None, dft_filter: Optional[str] = None) -> bool:
+        """
+        (Re)build the stages if the rate or any setting changed.
+        
+        Returns:
+            True if the chain was rebuilt (filter state was reset)
+        """
+        key = (round(float(sampling_rate), 3), ac_filter, emg_filter, dft_filter)
+        if key == self._key:
+            return False
+        self._key = key
+        fs = key[0]
+        designs = (dft_filter_sos(fs, dft_filter),
+                   emg_filter_sos(fs, emg_filter),
+                   ac_filter_sos(fs, ac_filter))
+        self.stages = [StreamingSOSFilter(sos, self.n_channels) for sos in designs if sos is not None]
+        return True
+    
+    @property
+    def active(self) -> bool:
+        return bool(self.stages)
+    
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Filter (n_channels x k) new samples through every stage."""
+        out = np.asarray(block, dtype=float)
+        for stage in self.stages:
+            out = stage.process(out)
+        return out
+    
+    def reset(self) -> None:
+        for stage in self.stages:
+            stage.reset()
+
+
+class StreamingMovingAverage:
+    """
+    Running mean of the last `window` samples per channel.
+    
+    Streaming replacement for the 2 s moving-average baseline estimate: each
+    update costs O(new samples) instead of convolving the whole window.
+    """
+    
+    def __init__(self, window: int, n_channels: int = 12):
+        self.window = max(1, int(window))
+        self.n_channels = n_channels
+        self._ring = np.zeros((n_channels, self.window))
+        self._sum = np.zeros(n_channels)
+        self._pos = 0
+        self._count = 0
+        self._updates = 0
+    
+    def update(self, block: np.ndarray) -> np.ndarray:
+        """Add (n_channels x k) new samples and return the current means."""
+        block = np.asarray(block, dtype=float)[:, -self.window:]
+        k = block.shape[1]
+        if k:
+            idx = (self._pos + np.arange(k)) % self.window
+            # Unwritten slots are still zero, so evicting them is a no-op
+            self._sum -= self._ring[:, idx].sum(axis=1)
+            self._ring[:, idx] = block
+            self._sum += block.sum(axis=1)
+            self._pos = (self._pos + k) % self.window
+            self._count = min(self.window, self._count + k)
+            self._updates += 1
+            if self._updates % 256 == 0:
+                # Re-sum occasionally so float error cannot accumulate
+                self._sum = self._ring.sum(axis=1)
+        return self.value
+    
+    @property
+    def value(self) -> np.ndarray:
+        if self._count == 0:
+            return np.zeros(self.n_channels)
+        return self._sum / self._count
+    
+    @property
+    def count(self) -> int:
+        return self._count
+
+
+def apply_ecg_filters_causal(
+    signal: Union[np.ndarray, list],
+    sampling_rate: float = 500,
+    ac_filter: Optional[str] = None,
+    emg_filter: Optional[str] = None,
+    dft_filter: Optional[str] = None
+) -> np.ndarray:
+    """
+    Batch (whole-record) reference for StreamingFilterChain.
+    
+    Runs the same DFT -> EMG -> AC designs as apply_ecg_filters, but causally
+    (single sosfilt pass started in steady state), so it matches the streaming
+    chain sample for sample regardless of how the record was chunked.
+    """
+    signal = np.asarray(signal, dtype=float)
+    if signal.ndim == 1:
+        signal = signal[None, :]
+        squeeze = True
+    else:
+        squeeze = False
+    chain = StreamingFilterChain(n_channels=signal.shape[0])
+    chain.configure(sampling_rate, ac_filter=ac_filter, emg_filter=emg_filter, dft_filter=dft_filter)
+    out = chain.process(signal)
+    return out[0] if squeeze else out
@@ -22,10 +22,31 @@ def _safe_float(value, default=None):
         return default
 
 
-def _build_conservative_conclusions(metrics, settings_manager=None, sampling_rate=None, recording_duration=None):
+def _rhythm_events_line(rhythm_events):
+    """
+    One conclusions line from a RhythmTimeline.summary() ({label: {'count', 'total_s', 'longest_s'}}).
+    Normal sinus rhythm is left out; returns None when nothing else was recorded.
+    """
+    if not rhythm_events:
+        return None
+    parts = []
+    for label, stats in sorted(rhythm_events.items(), key=lambda kv: -kv[1].get('total_s', 0.0)):
+        if label == "Normal Sinus Rhythm":
+            continue
+        count = int(stats.get('count', 0))
+        total_s = _safe_float(stats.get('total_s'), 0.0)
+        parts.append(f"{label} x{count} ({total_s:.1f} s)")
+    if not parts:
+        return None
+    return "Rhythm events: " + "; ".join(parts)
+
+
+def _build_conservative_conclusions(metrics, settings_manager=None, sampling_rate=None, recording_duration=None,
+                                    rhythm_events=None):
     """
     Build a conservative, hospital-style conclusions list.
-    Uses only provided metrics (assumed pre-display / raw-based).
+    Uses only provided metrics (assumed pre-display / raw-based), plus the
+    episode counts/durations of the live rhythm timeline when given.
     """
     conclusions = []
 
@@ -135,6 +156,9 @@ def _build_conservative_conclusions(metrics, settings_manager=None, sampling_rat
     # Build conservative list (max 12 entries downstream)
     conclusions.append(measured)
     conclusions.append(rhythm)
+    events_line = _rhythm_events_line(rhythm_events)
+    if events_line:
+        conclusions.append(events_line)
     conclusions.append(qtc_line)
     if lvh_line:
         conclusions.append(lvh_line)
@@ -147,14 +171,19 @@ def _build_conservative_conclusions(metrics, settings_manager=None, sampling_rat
 
 # ==================== ECG DATA SAVE/LOAD FUNCTIONS ====================
 
-def save_ecg_data_to_file(ecg_test_page, output_file=None):
+from .ecg_capture import (
+    CAPTURE_EXTENSION, find_latest_capture, is_capture_file, load_capture_as_dict,
+    patient_id_from_details, write_capture
+)
+
+def save_ecg_data_to_file(ecg_test_page, output_file=None, patient=None):
     """
-    Save ECG data from ecg_test_page.data to a JSON file
+    Save ECG data from ecg_test_page.data to a binary capture file (.ecgb, see ecg.ecg_capture)
     Returns: path to saved file or None if failed
     
     Example:
-        saved_file = save_ecg_data_to_file(ecg_test_page)
-        # Saved to: reports/ecg_data/ecg_data_20241119_143022.json
+        saved_file = save_ecg_data_to_file(ecg_test_page, patient=patient)
+        # Saved to: reports/ecg_data/ecg_data_20241119_143022.ecgb
     """
     from datetime import datetime
     
@@ -170,7 +199,7 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
     # Generate filename with timestamp
     if output_file is None:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = os.path.join(ecg_data_dir, f'ecg_data_{timestamp}.json')
+        output_file = os.path.join(ecg_data_dir, f'ecg_data_{timestamp}{CAPTURE_EXTENSION}')
     
     # Prepare data for saving
     lead_names = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
@@ -201,6 +230,9 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
         if ecg_test_page.data and len(ecg_test_page.data) > 0:
             print(f"   data[0] length: {len(ecg_test_page.data[0]) if isinstance(ecg_test_page.data[0], (list, np.ndarray)) else 'N/A'}")
     
+    # One time-ordered copy of the circular lead store (CircularLeadBuffer) for all leads
+    data_snapshot = ecg_test_page.data.snapshot() if hasattr(ecg_test_page.data, 'snapshot') else None
+    
     for i, lead_name in enumerate(lead_names):
         data_to_save = []
         
@@ -217,29 +249,27 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
                     # Get all available data from buffer, starting from ptr
                     if ptr + len(buffer) <= len(buffer):
                         # No wrap needed: get from ptr to end, then from start to ptr
-                        part1 = buffer[ptr:].tolist()
-                        part2 = buffer[:ptr].tolist()
-                        data_to_save = part1 + part2  # Full circular buffer
+                        data_to_save = np.concatenate([buffer[ptr:], buffer[:ptr]])  # Full circular buffer
                     else:
                         # Simple case: use all buffer data
-                        data_to_save = buffer.tolist()
+                        data_to_save = buffer
                 else:
                     # No ptrs: use ALL available data (full buffer)
-                    data_to_save = buffer.tolist()
+                    data_to_save = buffer
         
         # Priority 2: Fallback to ecg_test_page.data (smaller buffer, 1000 samples)
-        if not data_to_save and i < len(ecg_test_page.data):
-            lead_data = ecg_test_page.data[i]
+        if len(data_to_save) == 0 and i < len(ecg_test_page.data):
+            lead_data = data_snapshot[i] if data_snapshot is not None else ecg_test_page.data[i]
             if isinstance(lead_data, np.ndarray):
                 # Use ALL available data (not just window_size)
-                data_to_save = lead_data.tolist()
+                data_to_save = lead_data
             elif isinstance(lead_data, (list, tuple)):
                 data_to_save = list(lead_data)
         
-        saved_data["leads"][lead_name] = data_to_save if data_to_save else []
+        saved_data["leads"][lead_name] = np.asarray(data_to_save, dtype=float)
     
     # Check if we have sufficient data for report generation
-    sample_counts = [len(saved_data["leads"][lead]) for lead in saved_data["leads"] if saved_data["leads"][lead]]
+    sample_counts = [len(saved_data["leads"][lead]) for lead in saved_data["leads"] if len(saved_data["leads"][lead])]
     if sample_counts:
         max_samples = max(sample_counts)
         min_samples = min(sample_counts)
@@ -257,8 +287,9 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
     
     # Save to file
     try:
-        with open(output_file, 'w') as f:
-            json.dump(saved_data, f, indent=2)
+        write_capture(output_file, saved_data["leads"], fs=saved_data["sampling_rate"],
+                      lead_names=lead_names, timestamp=saved_data["timestamp"],
+                      patient_id=patient_id_from_details(patient))
         print(f"Saved ECG data to: {output_file}")
         print(f"   Leads saved: {list(saved_data['leads'].keys())}")
         print(f"   Sampling rate: {saved_data['sampling_rate']} Hz")
@@ -270,24 +301,34 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
         traceback.print_exc()
         return None
 
-def load_ecg_data_from_file(file_path):
+def load_ecg_data_from_file(file_path, last_seconds=None):
     """
-    Load ECG data from JSON file
+    Load ECG data from a binary capture (.ecgb) or legacy JSON file
     Returns: dict with 'leads', 'sampling_rate', 'timestamp' or None if failed
     
     Example:
-        data = load_ecg_data_from_file('reports/ecg_data/ecg_data_20241119_143022.json')
-        # Returns: {'leads': {'I': [...], 'II': [...]}, 'sampling_rate': 80.0, ...}
+        data = load_ecg_data_from_file('reports/ecg_data/ecg_data_20241119_143022.ecgb')
+        # Returns: {'leads': {'I': array([...]), 'II': array([...])}, 'sampling_rate': 80.0, ...}
+    
+    Parameters:
+        last_seconds: Only read the newest N seconds of each lead (binary captures
+                      are memory-mapped, so the rest of the file is never touched)
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Convert lists back to numpy arrays
-        if 'leads' in data:
-            for lead_name in data['leads']:
-                if isinstance(data['leads'][lead_name], list):
-                    data['leads'][lead_name] = np.array(data['leads'][lead_name])
+        if is_capture_file(file_path):
+            data = load_capture_as_dict(file_path, last_seconds=last_seconds)
+        else:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+            
+            # Convert lists back to numpy arrays
+            if 'leads' in data:
+                for lead_name in data['leads']:
+                    if isinstance(data['leads'][lead_name], list):
+                        data['leads'][lead_name] = np.array(data['leads'][lead_name])
+                        if last_seconds is not None:
+                            n = int(round(last_seconds * float(data.get('sampling_rate', 80.0))))
+                            data['leads'][lead_name] = data['leads'][lead_name][-n:] if n > 0 else data['leads'][lead_name][:0]
         
         print(f" Loaded ECG data from: {file_path}")
         print(f"   Leads loaded: {list(data.get('leads', {}).keys())}")
@@ -365,43 +406,15 @@ def create_ecg_grid_with_waveform(ecg_data, lead_name, width=6, height=2):
     fig, ax = plt.subplots(figsize=(width, height), facecolor='#ffe6e6', frameon=True)
     
     # STEP 1: Create pink ECG grid background
-    # ECG grid colors (even lighter pink/red like medical ECG paper)
-    light_grid_color = '#ffd1d1'  # Darker minor grid
-    major_grid_color = '#ffb3b3'  # Darker major grid
-    bg_color = '#ffe6e6'  # Very light pink background
+    # ECG paper background (very light pink)
+    bg_color = '#ffe6e6'
     
     # Set both figure and axes background to pink
     fig.patch.set_facecolor(bg_color)  # Figure background pink
     ax.set_facecolor(bg_color)         # Axes background pink
     
-    # STEP 2: Draw pink ECG grid lines
-    # Minor grid lines (1mm equivalent spacing) - LIGHT PINK
-    minor_spacing_x = width / 60  # 60 minor divisions across width
-    minor_spacing_y = height / 20  # 20 minor divisions across height
-    
-    # Draw vertical minor pink grid lines
-    for i in range(61):
-        x_pos = i * minor_spacing_x
-        ax.axvline(x=x_pos, color=light_grid_color, linewidth=0.6, alpha=0.8)
-    
-    # Draw horizontal minor pink grid lines
-    for i in range(21):
-        y_pos = i * minor_spacing_y
-        ax.axhline(y=y_pos, color=light_grid_color, linewidth=0.6, alpha=0.8)
-    
-    # Major grid lines (5mm equivalent spacing) - DARKER PINK
-    major_spacing_x = width / 12  # 12 major divisions across width
-    major_spacing_y = height / 4   # 4 major divisions across height
-    
-    # Draw vertical major pink grid lines
-    for i in range(13):
-        x_pos = i * major_spacing_x
-        ax.axvline(x=x_pos, color=major_grid_color, linewidth=1.0, alpha=0.9)
-    
-    # Draw horizontal major pink grid lines
-    for i in range(5):
-        y_pos = i * major_spacing_y
-        ax.axhline(y=y_pos, color=major_grid_color, linewidth=1.0, alpha=0.9)
+    # STEP 2: Pink ECG grid (60 x 20 minor, 12 x 4 major divisions) as two line collections
+    add_axes_grid(ax, width, height)
     
     # STEP 3: Plot DARK ECG waveform on top of pink grid
     if ecg_data is not None and len(ecg_data) > 0:
@@ -435,6 +448,7 @@ def create_ecg_grid_with_waveform(ecg_data, lead_name, width=6, height=2):
 from reportlab.graphics.shapes import Drawing, Group, Line, Rect
 from reportlab.graphics.charts.lineplots import LinePlot
 from reportlab.lib.units import mm
+from .report_drawing import add_axes_grid, draw_page_grid, grid_tile_png, panel_grid_group, trace_path, trace_polyline
 
 def create_reportlab_ecg_drawing(lead_name, width=460, height=45):
     """
@@ -443,46 +457,9 @@ def create_reportlab_ecg_drawing(lead_name, width=460, height=45):
     """
     drawing = Drawing(width, height)
     
-    # STEP 1: Create solid pink background rectangle
-    bg_color = colors.HexColor("#ffe6e6")  # Light pink background
-    bg_rect = Rect(0, 0, width, height, fillColor=bg_color, strokeColor=None)
-    drawing.add(bg_rect)
-    
-    # STEP 2: Draw pink ECG grid lines (even lighter colors)
-    light_grid_color = colors.HexColor("#ffd1d1")  # Darker minor grid
-    major_grid_color = colors.HexColor("#ffb3b3")   # Darker major grid
-    
-    # Minor grid lines (1mm spacing equivalent)
-    minor_spacing_x = width / 60  # 60 divisions across width
-    minor_spacing_y = height / 20  # 20 divisions across height
-    
-    # Vertical minor grid lines
-    for i in range(61):
-        x_pos = i * minor_spacing_x
-        line = Line(x_pos, 0, x_pos, height, strokeColor=light_grid_color, strokeWidth=0.4)
-        drawing.add(line)
-    
-    # Horizontal minor grid lines
-    for i in range(21):
-        y_pos = i * minor_spacing_y
-        line = Line(0, y_pos, width, y_pos, strokeColor=light_grid_color, strokeWidth=0.4)
-        drawing.add(line)
-    
-    # Major grid lines (5mm spacing equivalent)
-    major_spacing_x = width / 12  # 12 divisions across width
-    major_spacing_y = height / 4   # 4 divisions across height
-    
-    # Vertical major grid lines
-    for i in range(13):
-        x_pos = i * major_spacing_x
-        line = Line(x_pos, 0, x_pos, height, strokeColor=major_grid_color, strokeWidth=0.8)
-        drawing.add(line)
-    
-    # Horizontal major grid lines
-    for i in range(5):
-        y_pos = i * major_spacing_y
-        line = Line(0, y_pos, width, y_pos, strokeColor=major_grid_color, strokeWidth=0.8)
-        drawing.add(line)
+    # STEP 1-2: Pink background + ECG grid (60 x 20 minor, 12 x 4 major divisions),
+    # one cached group shared by every panel
+    drawing.add(panel_grid_group(width, height, width / 60, height / 20, width / 12, height / 4))
     
     # REMOVE ENTIRE "STEP 3: Draw ECG waveform as series of lines" section (lines ~166-214)
     
@@ -650,62 +627,13 @@ def create_reportlab_ecg_drawing_with_real_data(lead_name, ecg_data, width=460,
     
     drawing = Drawing(width, height)
     
-    # STEP 1: Create solid pink background rectangle
-    bg_color = colors.HexColor("#ffe6e6")  # Light pink background
-    bg_rect = Rect(0, 0, width, height, fillColor=bg_color, strokeColor=None)
-    drawing.add(bg_rect)
-    
-    # STEP 2: Draw pink ECG grid lines (GE/Philips fixed diagnostic scale)
-    # Fixed diagnostic grid requirements:
-    # Minor: 0.04s / 0.1mV
-    # Major: 0.20s / 1.0mV
+    # STEP 1-2: Pink background + ECG grid (GE/Philips fixed diagnostic scale)
+    # Minor: 0.04s / 0.1mV, Major: 0.20s / 1.0mV
     # At 25 mm/s: 0.04s = 1mm, 0.20s = 5mm
     # At 10 mm/mV: 0.1mV = 1mm, 1.0mV = 10mm
-    light_grid_color = colors.HexColor("#ffd1d1")  # Darker minor grid
-    major_grid_color = colors.HexColor("#ffb3b3")   # Darker major grid
-    
+    # One cached group (background + one path per line weight) shared by every panel
     from reportlab.lib.units import mm
-    
-    # Minor grid: 1mm spacing (0.04s / 0.1mV)
-    minor_spacing_mm = 1.0 * mm
-    minor_spacing_x_points = minor_spacing_mm
-    minor_spacing_y_points = minor_spacing_mm
-    
-    # Vertical minor lines (every 0.04s = 1mm at 25 mm/s)
-    num_minor_x = int(width / minor_spacing_x_points) + 1
-    for i in range(num_minor_x):
-        x_pos = i * minor_spacing_x_points
-        if x_pos <= width:
-            line = Line(x_pos, 0, x_pos, height, strokeColor=light_grid_color, strokeWidth=0.4)
-            drawing.add(line)
-    
-    # Horizontal minor lines (every 0.1mV = 1mm at 10 mm/mV)
-    num_minor_y = int(height / minor_spacing_y_points) + 1
-    for i in range(num_minor_y):
-        y_pos = i * minor_spacing_y_points
-        if y_pos <= height:
-            line = Line(0, y_pos, width, y_pos, strokeColor=light_grid_color, strokeWidth=0.4)
-            drawing.add(line)
-    
-    # Major grid: 5mm horizontal (0.20s), 10mm vertical (1.0mV)
-    major_spacing_x_mm = 5.0 * mm  # 0.20s at 25 mm/s
-    major_spacing_y_mm = 10.0 * mm  # 1.0mV at 10 mm/mV
-    
-    # Vertical major lines (every 0.20s = 5mm)
-    num_major_x = int(width / major_spacing_x_mm) + 1
-    for i in range(num_major_x):
-        x_pos = i * major_spacing_x_mm
-        if x_pos <= width:
-            line = Line(x_pos, 0, x_pos, height, strokeColor=major_grid_color, strokeWidth=0.8)
-            drawing.add(line)
-    
-    # Horizontal major lines (every 1.0mV = 10mm)
-    num_major_y = int(height / major_spacing_y_mm) + 1
-    for i in range(num_major_y):
-        y_pos = i * major_spacing_y_mm
-        if y_pos <= height:
-            line = Line(0, y_pos, width, y_pos, strokeColor=major_grid_color, strokeWidth=0.8)
-            drawing.add(line)
+    drawing.add(panel_grid_group(width, height, 1.0 * mm, 1.0 * mm, 5.0 * mm, 10.0 * mm))
     
     # STEP 3: Plot ECG in fixed diagnostic scale (25 mm/s, 10 mm/mV) with no autoscale
     if ecg_data is None or len(ecg_data) == 0:
@@ -746,17 +674,9 @@ def create_reportlab_ecg_drawing_with_real_data(lead_name, ecg_data, width=460,
     y_mm = np.clip(y_mm, 0.0, height_mm_physical)
     x_mm = np.clip(x_mm, 0.0, width_mm)
 
-    # Convert to points for plotting
-    points = list(zip(x_mm, y_mm))
-
-    # Draw as line segments
+    # Draw as one polyline, min/max decimated to the printable resolution
     ecg_color = colors.HexColor("#000000")
-    for i in range(len(points) - 1):
-        x1 = points[i][0] * mm
-        y1 = points[i][1] * mm
-        x2 = points[i+1][0] * mm
-        y2 = points[i+1][1] * mm
-        drawing.add(Line(x1, y1, x2, y2, strokeColor=ecg_color, strokeWidth=0.6))
+    drawing.add(trace_polyline(x_mm * mm, y_mm * mm, strokeColor=ecg_color, strokeWidth=0.6))
     
     return drawing
 
@@ -783,37 +703,8 @@ def create_clean_ecg_image(lead_name, width=6, height=2):
     ax.patch.set_facecolor('#ffe6e6')  # FORCE axes patch pink
     ax.patch.set_alpha(1.0)  # Full opacity
     
-    # STEP 2: Draw pink ECG grid lines OVER pink background (darker for clarity)
-    light_grid_color = '#ffd1d1'  # Darker minor grid
-    major_grid_color = '#ffb3b3'  # Darker major grid
-    
-    # Minor grid lines (1mm equivalent spacing)
-    minor_spacing_x = width / 60  # 60 minor divisions
-    minor_spacing_y = height / 20  # 20 minor divisions
-    
-    # Draw vertical minor pink grid lines
-    for i in range(61):
-        x_pos = i * minor_spacing_x
-        ax.axvline(x=x_pos, color=light_grid_color, linewidth=0.6, alpha=0.8)
-    
-    # Draw horizontal minor pink grid lines
-    for i in range(21):
-        y_pos = i * minor_spacing_y
-        ax.axhline(y=y_pos, color=light_grid_color, linewidth=0.6, alpha=0.8)
-    
-    # Major grid lines (5mm equivalent spacing)
-    major_spacing_x = width / 12  # 12 major divisions
-    major_spacing_y = height / 4   # 4 major divisions
-    
-    # Draw vertical major pink grid lines
-    for i in range(13):
-        x_pos = i * major_spacing_x
-        ax.axvline(x=x_pos, color=major_grid_color, linewidth=1.0, alpha=0.9)
-    
-    # Draw horizontal major pink grid lines
-    for i in range(5):
-        y_pos = i * major_spacing_y
-        ax.axhline(y=y_pos, color=major_grid_color, linewidth=1.0, alpha=0.9)
+    # STEP 2: Pink ECG grid lines OVER pink background (two line collections)
+    add_axes_grid(ax, width, height)
     
     # REMOVE ENTIRE "STEP 3: Create realistic ECG waveform" section (lines ~315-356)
     # REMOVE ENTIRE "STEP 4: Plot DARK ECG line" section
@@ -1080,7 +971,7 @@ def generate_ecg_report(
     elif ecg_test_page and hasattr(ecg_test_page, 'data'):
         # ALWAYS save current data to file before generating report (REQUIRED for calculation-based beats)
         print(" Saving ECG data to file (required for calculation-based beats)...")
-        saved_data_file_path = save_ecg_data_to_file(ecg_test_page)
+        saved_data_file_path = save_ecg_data_to_file(ecg_test_page, patient=patient)
         if saved_data_file_path:
             saved_ecg_data = load_ecg_data_from_file(saved_data_file_path)
             if saved_ecg_data:
@@ -1132,12 +1023,22 @@ def generate_ecg_report(
     except Exception:
         pass
 
+    # Episode counts / durations from the live beat-by-beat rhythm timeline
+    rhythm_events = None
+    try:
+        timeline = getattr(ecg_test_page, 'rhythm_timeline', None) if ecg_test_page is not None else None
+        if timeline is not None:
+            rhythm_events = timeline.summary()
+    except Exception as e:
+        print(f"⚠️ Could not read rhythm timeline: {e}")
+
     # Replace conclusions with conservative hospital-style list built from measured metrics
     filtered_conclusions = _build_conservative_conclusions(
         data,
         settings_manager=settings_manager,
         sampling_rate=computed_sampling_rate,
-        recording_duration=data.get("recording_duration") or data.get("duration")
+        recording_duration=data.get("recording_duration") or data.get("duration"),
+        rhythm_events=rhythm_events
     )
     # Ensure max 12
     filtered_conclusions = filtered_conclusions[:12]
@@ -1170,29 +1071,15 @@ def generate_ecg_report(
         
         print(" CREATING NEW PINK GRID IMAGES...")
         
-        # Create NEW pink grid images
+        # Grid-only placeholders: one PNG tile, rendered once per size/DPI and shared by every lead
         lead_images = {}
-        for lead in leads:
-            try:
-                # Create pink grid ECG
-                fig = create_ecg_grid_with_waveform(None, lead, width=6, height=2)
-                
-                # Save to project root with pink background
-                img_path = os.path.join(project_root, f"lead_{lead}.png")
-                fig.savefig(img_path, 
-                           dpi=200, 
-                           bbox_inches='tight', 
-                           pad_inches=0.05,
-                           facecolor='#ffe6e6',  # PINK background
-                           edgecolor='none',
-                           format='png')
-                plt.close(fig)
-                
-                lead_images[lead] = img_path
-                print(f" Created NEW PINK GRID image: {img_path}")
-                
-            except Exception as e:
-                print(f" Error creating {lead}: {e}")
+        try:
+            tile_path = grid_tile_png(6, 2, dpi=200)
+            for lead in leads:
+                lead_images[lead] = tile_path
+            print(f" Using cached PINK GRID tile: {tile_path}")
+        except Exception as e:
+            print(f" Error creating PINK GRID tile: {e}")
         
         if not lead_images:
             return "Error: Could not create PINK GRID ECG images"
@@ -2141,11 +2028,12 @@ def generate_ecg_report(
                 
                 # Draw ALL REAL ECG data points
                 from reportlab.graphics.shapes import Path
-                ecg_path = Path(fillColor=None, 
-                               strokeColor=colors.HexColor("#000000"), 
-                               strokeWidth=0.4,
-                               strokeLineCap=1,
-                               strokeLineJoin=1)
+                # One path per trace, min/max decimated to the printable resolution
+                ecg_path = trace_path(t, ecg_normalized,
+                                      strokeColor=colors.HexColor("#000000"),
+                                      strokeWidth=0.4,
+                                      strokeLineCap=1,
+                                      strokeLineJoin=1)
                 
                 # DEBUG: Verify actual plotted values
                 actual_min_y = np.min(ecg_normalized)
@@ -2153,13 +2041,6 @@ def generate_ecg_report(
                 actual_span_points = actual_max_y - actual_min_y
                 actual_span_boxes = actual_span_points / box_height_points
                 
-                # Start path
-                ecg_path.moveTo(t[0], ecg_normalized[0])
-                
-                # Add ALL points
-                for i in range(1, len(t)):
-                    ecg_path.lineTo(t[i], ecg_normalized[i])
-                
                 # Add path to master drawing
                 master_drawing.add(ecg_path)
                 
@@ -2626,11 +2507,12 @@ def generate_ecg_report(
                 
                 # Draw ALL REAL ECG data points
                 from reportlab.graphics.shapes import Path
-                ecg_path = Path(fillColor=None, 
-                               strokeColor=colors.HexColor("#000000"), 
-                               strokeWidth=0.4,
-                               strokeLineCap=1,
-                               strokeLineJoin=1)
+                # One path per trace, min/max decimated to the printable resolution
+                ecg_path = trace_path(t, ecg_normalized,
+                                      strokeColor=colors.HexColor("#000000"),
+                                      strokeWidth=0.4,
+                                      strokeLineCap=1,
+                                      strokeLineJoin=1)
                 
                 # DEBUG: Verify actual plotted values
                 actual_min_y = np.min(ecg_normalized)
@@ -2638,13 +2520,6 @@ def generate_ecg_report(
                 actual_span_points = actual_max_y - actual_min_y
                 actual_span_boxes = actual_span_points / box_height_points
                 
-                # Start path
-                ecg_path.moveTo(t[0], ecg_normalized[0])
-                
-                # Add ALL points
-                for i in range(1, len(t)):
-                    ecg_path.lineTo(t[i], ecg_normalized[i])
-                
                 # Add path to master drawing
                 master_drawing.add(ecg_path)
                 
@@ -2744,19 +2619,20 @@ def generate_ecg_report(
     print(f"   Available keys in data: {list(data.keys())}")
     
     # If not provided or zero, compute quickly from Lead II in ecg_test_page (robust fallback)
-    def _compute_from_data_array(arr, fs):
+    def _compute_from_data_array(arr, fs, r_peaks=None):
         from scipy.signal import butter, filtfilt, find_peaks
         if arr is None or len(arr) < int(2*fs) or np.std(arr) < 0.1:
             return 0.0, 0.0, 0.0
         nyq = fs/2.0
         b,a = butter(2, [max(0.5/nyq, 0.001), min(40.0/nyq,0.99)], btype='band')
         x = filtfilt(b,a,arr)
-        # Simple R detection via Pan-Tompkins style envelope
-        squared = np.square(np.diff(x))
-        win = max(1, int(0.15*fs))
-        env = np.convolve(squared, np.ones(win)/win, mode='same')
-        thr = np.mean(env) + 0.5*np.std(env)
-        r_peaks, _ = find_peaks(env, height=thr, distance=int(0.6*fs))
+        if r_peaks is None:
+            # Simple R detection via Pan-Tompkins style envelope
+            squared = np.square(np.diff(x))
+            win = max(1, int(0.15*fs))
+            env = np.convolve(squared, np.ones(win)/win, mode='same')
+            thr = np.mean(env) + 0.5*np.std(env)
+            r_peaks, _ = find_peaks(env, height=thr, distance=int(0.6*fs))
         if len(r_peaks) < 3:
             return 0.0, 0.0, 0.0
         p_vals, qrs_vals, t_vals = [], [], []
@@ -2788,12 +2664,20 @@ def generate_ecg_report(
             if hasattr(ecg_test_page, 'sampler') and hasattr(ecg_test_page.sampler,'sampling_rate') and ecg_test_page.sampler.sampling_rate:
                 fs = float(ecg_test_page.sampler.sampling_rate)
             arr = None
+            r_peaks = None
             if len(ecg_test_page.data)>1:
                 lead_ii = ecg_test_page.data[1]
                 if isinstance(lead_ii, (list, tuple)):
                     lead_ii = np.asarray(lead_ii)
                 arr = lead_ii[-int(10*fs):] if lead_ii is not None and len(lead_ii)>int(10*fs) else lead_ii
-            cp, cqrs, ct = _compute_from_data_array(arr, fs)
+                # Reuse the ECG page's cached R-peaks for this data epoch instead of re-detecting
+                if arr is not None and hasattr(ecg_test_page, 'window_analysis'):
+                    try:
+                        r_peaks = ecg_test_page.window_analysis(fs).r_peaks_in_last(len(arr))
+                    except Exception as e:
+                        print(f"⚠️ Cached R-peaks unavailable: {e}")
+                        r_peaks = None
+            cp, cqrs, ct = _compute_from_data_array(arr, fs, r_peaks)
             if p_amp_mv<=0: p_amp_mv = cp
             if qrs_amp_mv<=0: qrs_amp_mv = cqrs
             if t_amp_mv<=0: t_amp_mv = ct
@@ -3496,62 +3380,10 @@ def generate_ecg_report(
         if canvas.getPageNumber() == 2:  # Changed from 3 to 2
             page_width, page_height = canvas._pagesize
             
-            # Fill entire page with pink background
-            canvas.setFillColor(colors.HexColor("#ffe6e6"))
-            canvas.rect(0, 0, page_width, page_height, fill=1, stroke=0)
-            
-            # ECG grid colors - darker for better visibility
-            light_grid_color = colors.HexColor("#ffd1d1")  
-            
-            major_grid_color = colors.HexColor("#ffb3b3")   
-            
-            # Draw minor grid lines (1mm spacing) - FULL PAGE
-            canvas.setStrokeColor(light_grid_color)
-            canvas.setLineWidth(0.6)
-            
-            minor_spacing = 1 * mm
-            
-            # Vertical minor lines - full page
-            x = 0
-            while x <= page_width:
-                canvas.line(x, 0, x, page_height)
-                x += minor_spacing
-            
-            # Horizontal minor lines - full page
-            y = 0
-            while y <= page_height:
-                canvas.line(0, y, page_width, y)
-                y += minor_spacing
-                
-            
-            # Draw major grid lines - FULL PAGE
-            # IMPORTANT: Match waveform calculation: height/3 = 15.0 points per box
-            # For individual lead graphs: ecg_height = 45 points, so 15 points = 1 box
-            canvas.setStrokeColor(major_grid_color)
-            canvas.setLineWidth(1.2)
-            
-            # Use standard ECG paper spacing: 5mm per box
-            # 5mm = 5 * 2.834645669 points = 14.17 points per box
-            from reportlab.lib.units import mm
-            major_spacing = 5 * mm  # Standard ECG: 5mm = 14.17 points per box
-            
-            # DEBUG: Log actual grid spacing being used
-            from reportlab.lib.units import mm as mm_unit
-            
-            # Vertical major lines - full page
-            x = 0
-            while x <= page_width:
-                canvas.line(x, 0, x, page_height)
-                x += major_spacing
-            
-            # Horizontal major lines - full page
-            y = 0
-            while y <= page_height:
-                canvas.line(0, y, page_width, y)
-                y += major_spacing
-            
+            # Pink background + 1 mm / 5 mm grid: one Form XObject per document
+            draw_page_grid(canvas, page_width, page_height, 1 * mm, 1 * mm, 5 * mm, 5 * mm,
+                           minor_width=0.6, major_width=1.2)
 
-        
         # STEP 1.5: Draw Org. and Phone No. labels on Page 1 (TOP LEFT)
         if canvas.getPageNumber() == 1:
             canvas.saveState()
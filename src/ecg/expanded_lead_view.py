@@ -19,198 +19,15 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib.patches as patches
 from .arrhythmia_detector import ArrhythmiaDetector
+from .pqrst_analyzer import PQRSTAnalyzer
+from .decimation import minmax_decimate
+from .rhythm_engine import BENIGN_LABELS
 try:
     from .ecg_filters import extract_respiration, estimate_baseline_drift
 except ImportError:
     extract_respiration = None
     estimate_baseline_drift = None
 
-class PQRSTAnalyzer:
-    """Analyze ECG signal to detect P, Q, R, S, T waves and calculate metrics"""
-    
-    def __init__(self, sampling_rate=500):
-        self.fs = sampling_rate
-        self.r_peaks = []
-        self.p_peaks = []
-        self.q_peaks = []
-        self.s_peaks = []
-        self.t_peaks = []
-        
-    def analyze_signal(self, signal):
-        """Analyze ECG signal and detect all wave components"""
-        try:
-            # Filter the signal
-            filtered_signal = self._filter_signal(signal)
-            
-            # Detect R peaks first
-            self.r_peaks = self._detect_r_peaks(filtered_signal)
-            
-            if len(self.r_peaks) > 0:
-                # Detect other waves based on R peaks
-                self.p_peaks = self._detect_p_waves(filtered_signal, self.r_peaks)
-                self.q_peaks = self._detect_q_waves(filtered_signal, self.r_peaks)
-                self.s_peaks = self._detect_s_waves(filtered_signal, self.r_peaks)
-                self.t_peaks = self._detect_t_waves(filtered_signal, self.r_peaks)
-            
-            return {
-                'r_peaks': self.r_peaks,
-                'p_peaks': self.p_peaks,
-                'q_peaks': self.q_peaks,
-                's_peaks': self.s_peaks,
-                't_peaks': self.t_peaks
-            }
-        except Exception as e:
-            print(f"Error in PQRST analysis: {e}")
-            return {'r_peaks': [], 'p_peaks': [], 'q_peaks': [], 's_peaks': [], 't_peaks': []}
-    
-    def _filter_signal(self, signal):
-        """Apply bandpass filter to ECG signal with improved error handling"""
-        try:
-            if len(signal) < 10:
-                return signal
-            
-            # Ensure sampling rate is valid
-            if self.fs <= 0 or self.fs > 10000:
-                print(f"⚠️ Invalid sampling rate: {self.fs} Hz, using default 80 Hz")
-                self.fs = 80.0
-            
-            nyq = 0.5 * self.fs
-            # Ensure filter frequencies are valid
-            low = max(0.01, 0.5 / nyq)  # At least 0.5 Hz
-            high = min(0.49, 40 / nyq)  # At most 40 Hz, but below Nyquist
-            
-            if low >= high:
-                # Invalid filter parameters, return unfiltered signal
-                print(f"⚠️ Invalid filter parameters: low={low}, high={high}, fs={self.fs}")
-                return signal
-            
-            b, a = butter(4, [low, high], btype='band')
-            
-            # Check if signal is long enough for filtering
-            if len(signal) < max(len(b), len(a)) * 3:
-                # Signal too short for filtering, return as is
-                return signal
-            
-            filtered = filtfilt(b, a, signal)
-            return filtered
-        except Exception as e:
-            print(f"⚠️ Error filtering signal: {e}, returning unfiltered signal")
-            return signal
-    
-    def _detect_r_peaks(self, signal):
-        """Detect R peaks using Pan-Tompkins algorithm with improved sensitivity for serial data"""
-        try:
-            if len(signal) < 10:
-                return []
-            
-            # Filter the signal first to reduce noise
-            filtered_signal = self._filter_signal(signal)
-            
-            # Differentiate
-            diff = np.ediff1d(filtered_signal)
-            # Square
-            squared = diff ** 2
-            
-            # Moving window integration - adaptive window size based on sampling rate
-            window_size = max(3, int(0.15 * self.fs))
-            if window_size > len(squared):
-                window_size = len(squared) // 4
-            if window_size < 1:
-                window_size = 1
-            
-            mwa = np.convolve(squared, np.ones(window_size)/window_size, mode='same')
-            
-            # Adaptive threshold - more lenient for serial data
-            mean_mwa = np.mean(mwa)
-            std_mwa = np.std(mwa)
-            
-            # Use lower threshold for better sensitivity (0.3 instead of 0.5)
-            threshold = mean_mwa + 0.3 * std_mwa
-            
-            # Minimum distance between peaks - adaptive based on expected heart rate
-            # Allow for heart rates from 40-200 bpm
-            min_distance_samples = max(3, int(0.2 * self.fs))  # At least 200ms between peaks
-            
-            # Try to find peaks with the threshold
-            peaks, properties = find_peaks(mwa, height=threshold, distance=min_distance_samples)
-            
-            # If no peaks found, try with lower threshold
-            if len(peaks) == 0 and len(mwa) > 0:
-                # Lower threshold to 0.1 * std for very sensitive detection
-                lower_threshold = mean_mwa + 0.1 * std_mwa
-                peaks, _ = find_peaks(mwa, height=lower_threshold, distance=min_distance_samples)
-            
-            # Additional check: if we have very few peaks but signal has variation, try even more lenient
-            if len(peaks) < 2 and len(mwa) > 50:
-                # Check if signal has significant variation (not flatline)
-                signal_variation = np.std(filtered_signal)
-                if signal_variation > 0.01:  # Signal has variation
-                    # Use even lower threshold
-                    very_low_threshold = mean_mwa + 0.05 * std_mwa
-                    peaks, _ = find_peaks(mwa, height=very_low_threshold, distance=max(2, min_distance_samples // 2))
-            
-            return peaks
-        except Exception as e:
-            print(f"Error in R peak detection: {e}")
-            return []
-    
-    def _detect_p_waves(self, signal, r_peaks):
-        """Detect P waves before R peaks"""
-        p_peaks = []
-        for r in r_peaks:
-            # Look for P wave 120-200ms before R peak for better accuracy
-            start = max(0, r - int(0.20 * self.fs))
-            end = max(0, r - int(0.12 * self.fs))
-            if end > start:
-                segment = signal[start:end]
-                if len(segment) > 0:
-                    p_idx = start + np.argmax(segment)
-                    p_peaks.append(p_idx)
-        return p_peaks
-    
-    def _detect_q_waves(self, signal, r_peaks):
-        """Detect Q waves (negative deflection before R)"""
-        q_peaks = []
-        for r in r_peaks:
-            # Look for Q wave up to 80ms before R peak
-            start = max(0, r - int(0.08 * self.fs))
-            end = r
-            if end > start:
-                segment = signal[start:end]
-                if len(segment) > 0:
-                    # Q wave is the minimum point between the P wave end and R peak
-                    q_idx = start + np.argmin(segment)
-                    q_peaks.append(q_idx)
-        return q_peaks
-    
-    def _detect_s_waves(self, signal, r_peaks):
-        """Detect S waves (negative deflection after R)"""
-        s_peaks = []
-        for r in r_peaks:
-            # Look for S wave up to 80ms after R peak
-            start = r
-            end = min(len(signal), r + int(0.08 * self.fs))
-            if end > start:
-                segment = signal[start:end]
-                if len(segment) > 0:
-                    s_idx = start + np.argmin(segment)
-                    s_peaks.append(s_idx)
-        return s_peaks
-    
-    def _detect_t_waves(self, signal, r_peaks):
-        """Detect T waves after S waves"""
-        t_peaks = []
-        for r in r_peaks:
-            # Look for T wave 100-300ms after R peak
-            start = min(len(signal), r + int(0.1 * self.fs))
-            end = min(len(signal), r + int(0.3 * self.fs))
-            if end > start:
-                segment = signal[start:end]
-                if len(segment) > 0:
-                    t_idx = start + np.argmax(segment)
-                    t_peaks.append(t_idx)
-        return t_peaks
-
 class MetricsCard(QFrame):
     """Individual metric card with color coding and animations"""
     
@@ -388,6 +205,8 @@ class ExpandedLeadView(QDialog):
 
         # Store detected arrhythmia events as (time_seconds, label)
         self.arrhythmia_events = []
+        # Session time (s) of self.ecg_data[0]; non-zero once the view reads full-disclosure history
+        self.ecg_data_start_time = 0.0
         
         # Heat map + history view state
         self.heatmap_overlay = None
@@ -1139,27 +958,36 @@ class ExpandedLeadView(QDialog):
                 # Find the lead index for this lead
                 lead_index = self.get_lead_index()
                 if lead_index is not None and lead_index < len(parent.data):
-                    # 🫀 CLINICAL: Get RAW data from parent's raw buffer
-                    # parent.data[lead_index] contains raw clinical data, NOT display-processed
-                    new_data = parent.data[lead_index]
-                    if len(new_data) > 0:
-                        # Store raw clinical data for analysis
-                        self.ecg_data = np.array(new_data)
+                    if not hasattr(self, '_last_analysis_time'):
+                        self._last_analysis_time = 0.0
+                    current_time = time.time()
+                    # Analyze every 500ms to avoid performance issues
+                    analysis_due = current_time - self._last_analysis_time >= 0.5
+                    recorder = self._history_recorder()
+                    if recorder is None or analysis_due or self.ecg_data.size == 0:
+                        # 🫀 CLINICAL: Get RAW data from parent's raw buffer
+                        # parent.data[lead_index] contains raw clinical data, NOT display-processed.
+                        # With a full-disclosure recorder the plot reads its window from disk,
+                        # so the buffer is only copied when the analysis needs it.
+                        new_data = parent.data[lead_index]
+                        if len(new_data) > 0:
+                            # Store raw clinical data for analysis
+                            self.ecg_data = np.array(new_data)
+                            if recorder is not None:
+                                self.ecg_data_start_time = max(0, recorder.total_samples - len(self.ecg_data)) / max(1.0, self.sampling_rate)
+                            else:
+                                self.ecg_data_start_time = 0.0
+                    if self._history_total_samples() > 0:
                         # Only auto-advance if user hasn't manually positioned the slider
                         if not self.manual_view and not self.history_slider_active:
-                            total_duration = len(self.ecg_data) / max(1.0, self.sampling_rate)
+                            total_duration = self._history_total_samples() / max(1.0, self.sampling_rate)
                             self.view_window_offset = max(0.0, total_duration - self.view_window_duration)
                         
                         # Update plot first (visual update)
                         self.update_plot()
                         
                         # Then analyze ECG (including arrhythmia detection) - call periodically, not every frame
-                        # Only analyze every 500ms to avoid performance issues
-                        if not hasattr(self, '_last_analysis_time'):
-                            self._last_analysis_time = 0.0
-                        
-                        current_time = time.time()
-                        if current_time - self._last_analysis_time >= 0.5:  # Analyze every 500ms
+                        if analysis_due:
                             self.analyze_ecg()
                             self._last_analysis_time = current_time
                         
@@ -1172,6 +1000,31 @@ class ExpandedLeadView(QDialog):
         except Exception as e:
             print(f"Error updating live data: {e}")
     
+    def _history_recorder(self):
+        """The parent's running full-disclosure recorder, if it holds samples for this view"""
+        parent = self._parent
+        recorder = getattr(parent, 'disclosure_recorder', None) if parent is not None else None
+        if recorder is None or recorder.closed or recorder.total_samples == 0:
+            return None
+        lead_index = self.get_lead_index()
+        if lead_index is None or lead_index >= recorder.n_leads:
+            return None
+        return recorder
+
+    def _history_total_samples(self):
+        """Samples available to scroll through (whole session when recorded to disk)"""
+        recorder = self._history_recorder()
+        if recorder is not None:
+            return recorder.total_samples
+        return len(self.ecg_data)
+
+    def _read_history(self, start_idx, end_idx):
+        """Raw samples [start_idx:end_idx) of this lead; only that window is read from disk"""
+        recorder = self._history_recorder()
+        if recorder is not None:
+            return recorder.read(self.get_lead_index(), start_idx, end_idx)
+        return self.ecg_data[start_idx:end_idx]
+
     def get_lead_index(self):
         """Get the lead index for this lead name"""
         lead_mapping = {
@@ -1331,11 +1184,11 @@ class ExpandedLeadView(QDialog):
     
     def update_plot(self):
         """Update the ECG plot with new data"""
-        if len(self.ecg_data) == 0:
+        total_samples = self._history_total_samples()
+        if total_samples == 0:
             return
         
         try:
-            total_samples = len(self.ecg_data)
             window_samples = max(1, int(self.view_window_duration * self.sampling_rate))
             if window_samples > total_samples:
                 window_samples = total_samples
@@ -1353,7 +1206,7 @@ class ExpandedLeadView(QDialog):
             if end_idx - start_idx <= 1:
                 return
 
-            window_signal = self.ecg_data[start_idx:end_idx]
+            window_signal = self._read_history(start_idx, end_idx)
             
             # Ensure we have valid data
             if len(window_signal) == 0:
@@ -1447,15 +1300,20 @@ class ExpandedLeadView(QDialog):
                     except Exception:
                         pass
                     # Plot only valid points
+                    # Min/max decimate to the canvas width: a wide window plots at most
+                    # two points per pixel column and keeps every QRS peak
+                    plot_columns = max(200, int(self.canvas.width())) if hasattr(self, 'canvas') else 1600
                     if np.all(valid_mask):
                         # All data is valid - plot normally
-                        self.ax.plot(time, display_signal, color='#0984e3', linewidth=1.0, label='ECG Signal', zorder=1, alpha=waveform_alpha)
+                        plot_time, plot_signal = minmax_decimate(time, display_signal, plot_columns)
+                        self.ax.plot(plot_time, plot_signal, color='#0984e3', linewidth=1.0, label='ECG Signal', zorder=1, alpha=waveform_alpha)
                     else:
                         # Some NaN values - plot segments
                         time_valid = time[valid_mask]
                         scaled_valid = display_signal[valid_mask]
                         if len(time_valid) > 1:
-                            self.ax.plot(time_valid, scaled_valid, color='#0984e3', linewidth=1.0, label='ECG Signal', zorder=1, alpha=waveform_alpha)
+                            plot_time, plot_signal = minmax_decimate(time_valid, scaled_valid, plot_columns)
+                            self.ax.plot(plot_time, plot_signal, color='#0984e3', linewidth=1.0, label='ECG Signal', zorder=1, alpha=waveform_alpha)
                 else:
                     print(f"⚠️ All data is NaN in expanded view for lead {self.lead_name}")
             else:
@@ -1780,7 +1638,13 @@ class ExpandedLeadView(QDialog):
         parent_layout.addWidget(arrhythmia_frame)
     
     def analyze_ecg(self):
-        """Analyze the ECG signal and update metrics"""
+        """Analyze the ECG signal and update metrics
+        
+        PQRST detection, heart rate, arrhythmia detection and the heat map run in
+        _analysis_job() on the parent's analysis worker (against a copy of
+        self.ecg_data); _apply_analysis() updates the UI when the result arrives.
+        Without a worker the job runs inline.
+        """
         if self.ecg_data.size == 0:
             if hasattr(self, 'arrhythmia_list'):
                 self.arrhythmia_list.setText("No data to analyze.")
@@ -1794,10 +1658,6 @@ class ExpandedLeadView(QDialog):
                     self.arrhythmia_list.setText("Collecting data...")
                 return
             
-            # Analyze signal for PQRST waves
-            analysis = self.analyzer.analyze_signal(self.ecg_data)
-            self.calculate_metrics(analysis)
-            
             # Check if serial data has actually started flowing (not just initial state)
             has_received_serial_data = False
             min_serial_data_packets = 50
@@ -1816,91 +1676,172 @@ class ExpandedLeadView(QDialog):
                         else:
                             print(f"⏳ Waiting for serial data: {data_count}/{min_serial_data_packets} packets - asystole detection disabled")
             
+            # Heart rate uses the 12-lead page's calculation when available (pure function of the data)
+            heart_rate_fn = None
+            if self._parent is not None and hasattr(self._parent, 'calculate_heart_rate'):
+                heart_rate_fn = self._parent.calculate_heart_rate
+            
+            job_args = (np.array(self.ecg_data, dtype=float), float(self.sampling_rate),
+                        has_received_serial_data, min_serial_data_packets, heart_rate_fn,
+                        self.ecg_data_start_time)
+            worker = getattr(self._parent, 'analysis_worker', None) if self._parent else None
+            if worker is not None:
+                worker.submit(f"expanded:{self.lead_name}:{id(self)}", self._analysis_job, *job_args,
+                              on_result=self._apply_analysis)
+            else:
+                self._apply_analysis(self._analysis_job(*job_args))
+        except Exception as e:
+            import traceback
+            print(f"Error in ECG analysis for {self.lead_name}: {str(e)}")
+            traceback.print_exc()
+            if hasattr(self, 'arrhythmia_list'):
+                self.arrhythmia_list.setText(f"Analysis error: {str(e)[:50]}")
+    
+    def _analysis_job(self, ecg_data, sampling_rate, has_received_serial_data, min_serial_data_packets,
+                      heart_rate_fn=None, start_time=0.0):
+        """
+        Compute everything analyze_ecg() displays (runs on the analysis worker).
+        
+        Must not touch widgets: it only reads its arguments and the stateless
+        analyzer / arrhythmia detector.
+        
+        Returns:
+            dict with analysis, heart_rate, filtered, arrhythmias, heat_map_data and
+            start_time, or {'error', 'r_peaks'} when the analysis failed
+        """
+        self.analyzer.fs = sampling_rate
+        self.arrhythmia_detector.fs = sampling_rate
+        try:
+            # Analyze signal for PQRST waves
+            analysis = self.analyzer.analyze_signal(ecg_data)
+            
+            heart_rate = None
+            if heart_rate_fn is not None:
+                try:
+                    heart_rate = int(heart_rate_fn(ecg_data))
+                except Exception:
+                    heart_rate = 0
+            filtered = self.analyzer._filter_signal(ecg_data) if len(analysis.get('p_peaks', [])) > 0 else None
+            
             # Detect arrhythmias using raw ECG data
-            print(f"🔍 Analyzing arrhythmias for {self.lead_name}: {len(self.ecg_data)} samples, {len(analysis.get('r_peaks', []))} R-peaks detected")
+            print(f"🔍 Analyzing arrhythmias for {self.lead_name}: {len(ecg_data)} samples, {len(analysis.get('r_peaks', []))} R-peaks detected")
             arrhythmias = self.arrhythmia_detector.detect_arrhythmias(
-                self.ecg_data, 
+                ecg_data, 
                 analysis,
                 has_received_serial_data=has_received_serial_data,
                 min_serial_data_packets=min_serial_data_packets
             )
-            print(f"📊 Arrhythmia detection result for {self.lead_name}: {arrhythmias}")
-            self.update_arrhythmia_display(arrhythmias)
             
             # Generate heat map data (optional - don't break if method doesn't exist)
+            heat_map_data = None
             try:
-                if len(analysis.get('r_peaks', [])) > 0:
-                    # Check if method exists before calling
-                    if hasattr(self.arrhythmia_detector, 'detect_arrhythmias_with_probabilities'):
-                        heat_map_data = self.arrhythmia_detector.detect_arrhythmias_with_probabilities(
-                            self.ecg_data, analysis['r_peaks'], window_size=2.0
-                        )
-                        self.prepare_heatmap_overlay(heat_map_data)
-                    else:
-                        # Method doesn't exist, clear heatmap
-                        self.heatmap_overlay = None
-                        self.heatmap_time_axis = None
-                else:
-                    # No R-peaks detected, clear heatmap
-                    self.heatmap_overlay = None
-                    self.heatmap_time_axis = None
+                if len(analysis.get('r_peaks', [])) > 0 and hasattr(self.arrhythmia_detector, 'detect_arrhythmias_with_probabilities'):
+                    heat_map_data = self.arrhythmia_detector.detect_arrhythmias_with_probabilities(
+                        ecg_data, analysis['r_peaks'], window_size=2.0
+                    )
             except Exception as heatmap_error:
                 # Heatmap is optional - don't break arrhythmia display
                 print(f"⚠️ Heatmap generation error (non-critical): {heatmap_error}")
+            
+            return {
+                'analysis': analysis,
+                'heart_rate': heart_rate,
+                'filtered': filtered,
+                'arrhythmias': arrhythmias,
+                'heat_map_data': heat_map_data,
+                'start_time': start_time,
+                'sampling_rate': sampling_rate,
+            }
+        except Exception as e:
+            import traceback
+            print(f"Error in ECG analysis for {self.lead_name}: {str(e)}")
+            traceback.print_exc()
+            # Still try to show rate-based detection even if other detections fail
+            try:
+                r_peaks = self.analyzer.analyze_signal(ecg_data).get('r_peaks', [])
+            except Exception:
+                r_peaks = []
+            return {'error': str(e), 'r_peaks': r_peaks, 'sampling_rate': sampling_rate}
+    
+    def _apply_analysis(self, result):
+        """Show one _analysis_job() result (GUI thread)"""
+        if not result:
+            return
+        if 'error' in result:
+            self._show_analysis_error(result['error'], result.get('r_peaks', []), result['sampling_rate'])
+            return
+        try:
+            analysis = result['analysis']
+            self.calculate_metrics(analysis, heart_rate=result['heart_rate'], filtered=result['filtered'])
+            
+            arrhythmias = result['arrhythmias']
+            print(f"📊 Arrhythmia detection result for {self.lead_name}: {arrhythmias}")
+            self.update_arrhythmia_display(arrhythmias)
+            
+            if result['heat_map_data'] is not None:
+                self.prepare_heatmap_overlay(result['heat_map_data'], start_time=result['start_time'])
+            else:
+                # No R-peaks detected (or no probability model), clear heatmap
                 self.heatmap_overlay = None
                 self.heatmap_time_axis = None
             
+            timeline_events = self._rhythm_timeline_events()
+            if timeline_events is not None:
+                # Onsets from the live beat-by-beat timeline replace the per-window heatmap guesses
+                self.arrhythmia_events = timeline_events
+            
             self.update_plot_with_markers(analysis)
             
             # Update history slider range after analysis
             self.update_history_slider()
         except Exception as e:
-            import traceback
-            error_msg = f"Error in ECG analysis for {self.lead_name}: {str(e)}"
-            print(error_msg)
-            traceback.print_exc()
+            print(f"Error applying ECG analysis for {self.lead_name}: {e}")
             if hasattr(self, 'arrhythmia_list'):
                 self.arrhythmia_list.setText(f"Analysis error: {str(e)[:50]}")
-            print(traceback.format_exc())
-            # Still try to show rate-based detection even if other detections fail
-            try:
-                if len(self.ecg_data) > 0:
-                    # Try to get r_peaks from analyzer if analysis failed
-                    try:
-                        temp_analysis = self.analyzer.analyze_signal(self.ecg_data)
-                        r_peaks = temp_analysis.get('r_peaks', [])
-                    except:
-                        r_peaks = []
-                    
-                    if len(r_peaks) >= 3:
-                        rr_intervals = np.diff(r_peaks) / self.sampling_rate * 1000
-                        if len(rr_intervals) >= 2:
-                            mean_rr = np.mean(rr_intervals)
-                            if mean_rr > 0:
-                                heart_rate = 60000 / mean_rr
-                                if heart_rate >= 100:
-                                    self.arrhythmia_list.setText("Sinus Tachycardia")
-                                elif heart_rate < 60:
-                                    self.arrhythmia_list.setText("Sinus Bradycardia")
-                                else:
-                                    self.arrhythmia_list.setText(f"Analysis error: {str(e)[:50]}")
-                            else:
-                                self.arrhythmia_list.setText(f"Analysis error: {str(e)[:50]}")
-                        else:
-                            self.arrhythmia_list.setText(f"Analysis error: {str(e)[:50]}")
-                    else:
-                        self.arrhythmia_list.setText(f"Analysis error: {str(e)[:50]}")
-                else:
-                    self.arrhythmia_list.setText(f"Analysis error: {str(e)[:50]}")
-            except Exception as e2:
-                print(f"Error in fallback detection: {e2}")
-                self.arrhythmia_list.setText(f"Analysis error: {str(e)[:50]}")
     
-    def calculate_metrics(self, analysis):
+    def _rhythm_timeline_events(self):
+        """(onset time s, label) of non-normal episodes in the parent's rhythm timeline, or None when not live"""
+        if not self.is_live or self.parent() is None:
+            return None
+        timeline = getattr(self.parent(), 'rhythm_timeline', None)
+        if timeline is None:
+            return None
+        try:
+            return [(event.onset_time, event.label) for event in timeline.events()
+                    if event.label not in BENIGN_LABELS]
+        except Exception as e:
+            print(f"⚠️ Could not read rhythm timeline: {e}")
+            return None
+    
+    def _show_analysis_error(self, error, r_peaks, sampling_rate):
+        """Rate-based rhythm text when the full analysis failed"""
+        if not hasattr(self, 'arrhythmia_list'):
+            return
+        message = f"Analysis error: {str(error)[:50]}"
+        try:
+            if len(r_peaks) >= 3:
+                rr_intervals = np.diff(r_peaks) / sampling_rate * 1000
+                mean_rr = np.mean(rr_intervals) if len(rr_intervals) >= 2 else 0
+                if mean_rr > 0:
+                    heart_rate = 60000 / mean_rr
+                    if heart_rate >= 100:
+                        message = "Sinus Tachycardia"
+                    elif heart_rate < 60:
+                        message = "Sinus Bradycardia"
+        except Exception as e2:
+            print(f"Error in fallback detection: {e2}")
+        self.arrhythmia_list.setText(message)
+    
+    def calculate_metrics(self, analysis, heart_rate=None, filtered=None):
         """Calculate ECG metrics from analysis results
         
         ⚠️ CLINICAL ANALYSIS: Uses self.ecg_data which comes from parent.data[lead_index]
         This is raw clinical data, NOT display-processed data.
+        
+        Args:
+            analysis: PQRSTAnalyzer.analyze_signal() result
+            heart_rate: Heart rate already computed by the analysis worker (None = compute here)
+            filtered: Filtered signal already computed by the analysis worker (None = compute here)
         """
         try:
             # Check if demo mode is active from parent
@@ -1927,8 +1868,10 @@ class ExpandedLeadView(QDialog):
             # Heart Rate & RR Interval - use same calculation as 12-lead page if available
             # 🫀 CLINICAL: Calculate metrics from RAW clinical data (self.ecg_data)
             # self.ecg_data comes from parent.data[lead_index] which is raw, not display-processed
-            heart_rate = 0
-            if parent is not None and hasattr(parent, 'calculate_heart_rate'):
+            if heart_rate is not None:
+                self.update_metric('heart_rate', max(0, heart_rate))
+                self.update_metric('rr_interval', int(60000 / heart_rate) if heart_rate > 0 else 0)
+            elif parent is not None and hasattr(parent, 'calculate_heart_rate'):
                 try:
                     # Pass raw clinical data to parent's calculation function
                     heart_rate = int(parent.calculate_heart_rate(self.ecg_data))
@@ -1978,7 +1921,8 @@ class ExpandedLeadView(QDialog):
             # P Duration (estimate from P-wave width around detected P peaks)
             try:
                 if len(p_peaks) > 0:
-                    filtered = self.analyzer._filter_signal(self.ecg_data)
+                    if filtered is None:
+                        filtered = self.analyzer._filter_signal(self.ecg_data)
                     p_durations = []
                     for p_idx in p_peaks:
                         # Examine a window of ±80 ms around the P-peak
@@ -2063,8 +2007,16 @@ class ExpandedLeadView(QDialog):
         except Exception as e:
             print(f"Error updating plot markers: {e}")
 
-    def prepare_heatmap_overlay(self, heat_map_data):
-        """Convert arrhythmia probabilities into a background overlay and record event times."""
+    def prepare_heatmap_overlay(self, heat_map_data, start_time=None):
+        """Convert arrhythmia probabilities into a background overlay and record event times.
+        
+        Args:
+            heat_map_data: detect_arrhythmias_with_probabilities() result
+            start_time: Session time (s) of the analysed window's first sample
+                        (default: the current self.ecg_data_start_time)
+        """
+        if start_time is None:
+            start_time = self.ecg_data_start_time
         # Clear previous events each time we recompute the heatmap
         self.arrhythmia_events = []
 
@@ -2103,6 +2055,7 @@ class ExpandedLeadView(QDialog):
 
         for idx in range(num_windows):
             time_value = base_series[idx][0] if idx < len(base_series) else idx * 2.0
+            time_value += start_time
             time_axis.append(time_value)
             
             best_type = "Irregular Rhythm"
@@ -2138,7 +2091,7 @@ class ExpandedLeadView(QDialog):
         """Adjust slider bounds to match available history"""
         if not hasattr(self, 'history_slider'):
             return
-        total_duration = len(self.ecg_data) / max(1.0, self.sampling_rate)
+        total_duration = self._history_total_samples() / max(1.0, self.sampling_rate)
         max_offset = max(0.0, total_duration - self.view_window_duration)
         slider_max = int(max_offset * 1000)
         current_val = int(min(self.view_window_offset, max_offset) * 1000)
@@ -2168,7 +2121,7 @@ class ExpandedLeadView(QDialog):
         print(f"📊 View window offset set to: {self.view_window_offset:.2f}s")
         self.update_plot()
         if self.history_slider_label:
-            total_duration = len(self.ecg_data) / max(1.0, self.sampling_rate)
+            total_duration = self._history_total_samples() / max(1.0, self.sampling_rate)
             start_time = max(0.0, min(self.view_window_offset, total_duration))
             end_time = min(start_time + self.view_window_duration, total_duration)
             self.history_slider_label.setText(f"{start_time:0.1f}s – {end_time:0.1f}s")
@@ -2182,8 +2135,8 @@ class ExpandedLeadView(QDialog):
         if self.history_slider_label:
             self.history_slider_label.setText("LIVE")
         # Update plot to show latest data
-        if len(self.ecg_data) > 0:
-            total_duration = len(self.ecg_data) / max(1.0, self.sampling_rate)
+        if self._history_total_samples() > 0:
+            total_duration = self._history_total_samples() / max(1.0, self.sampling_rate)
             self.view_window_offset = max(0.0, total_duration - self.view_window_duration)
             self.update_plot()
             self.update_history_slider()
@@ -0,0 +1,372 @@
+"""
+Full-Disclosure ECG Recording (chunked, memory-mapped segments)
+
+The live page keeps only HISTORY_LENGTH samples per lead in RAM, so the
+expanded view could never scroll back further than ~10 000 samples, and it
+copied that whole buffer every tick to do so.
+
+FullDisclosureRecorder appends every decoded 12-lead block to fixed-size
+segment files on disk while acquisition runs:
+
+    reports/full_disclosure/session_20250101_120000/
+        session.json          manifest + time index
+        seg_000000.dat        (n_leads x segment_samples) lead-major float32
+        seg_000001.dat        ...
+
+Because every segment holds exactly segment_samples samples, the time index is
+arithmetic: sample = seconds * fs, segment = sample // segment_samples. Seeking
+anywhere in a multi-hour session is O(1), and read() touches only the segment
+slices covering the requested window. The manifest also stores each segment's
+wall-clock start for time-of-day labels.
+
+A session runs to roughly 86 MB per hour at 500 Hz, so create() first prunes
+old sessions under root_dir: anything older than max_age_days, then the
+oldest sessions until the rest fit in max_total_mb (0 disables either rule).
+
+Usage:
+    recorder = FullDisclosureRecorder.create(root_dir, fs=500.0, max_age_days=30, max_total_mb=2048)
+    recorder.append(block)                  # (12 x k) samples, acquisition thread/GUI
+    window = recorder.read_seconds(1, start_s=3600.0, duration_s=10.0)
+    recorder.close()
+
+    session = open_full_disclosure(session_dir)   # read-only review later
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+LEAD_NAMES = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
+MANIFEST_NAME = "session.json"
+DEFAULT_SEGMENT_SECONDS = 60.0
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_TOTAL_MB = 2048
+MANIFEST_FLUSH_INTERVAL_S = 5.0
+
+
+def default_disclosure_root() -> str:
+    """<repo>/reports/full_disclosure"""
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    return os.path.join(base_dir, 'reports', 'full_disclosure')
+
+
+class FullDisclosureRecorder:
+    """Append-only 12-lead recorder with O(1) time-indexed windowed reads."""
+
+    def __init__(self, directory: str, manifest: Dict[str, object], writable: bool):
+        self.directory = directory
+        self.manifest = manifest
+        self.writable = writable
+        self.n_leads = int(manifest["n_leads"])
+        self.segment_samples = int(manifest["segment_samples"])
+        self.dtype = np.dtype(manifest["dtype"])
+        self.lead_names: List[str] = list(manifest["lead_names"])
+        self._segments: List[Dict[str, object]] = list(manifest["segments"])
+        self._total = int(manifest.get("total_samples", 0))
+        self._maps: Dict[int, np.memmap] = {}
+        self._lock = threading.Lock()
+        self._last_manifest_write = 0.0
+        self.closed = not writable
+
+    # ------------------------------------------------------------------ create / open
+
+    @classmethod
+    def create(cls, root_dir: Optional[str] = None, fs: float = 500.0, n_leads: int = 12,
+               lead_names: Optional[List[str]] = None, segment_seconds: float = DEFAULT_SEGMENT_SECONDS,
+               dtype=np.float32, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+               max_total_mb: float = DEFAULT_MAX_TOTAL_MB) -> "FullDisclosureRecorder":
+        """
+        Start a new recording session directory.
+
+        Args:
+            root_dir: Parent directory (default: reports/full_disclosure)
+            fs: Sampling rate (Hz) used by the time index
+            n_leads: Leads per block
+            lead_names: Lead labels (default: standard 12-lead order)
+            segment_seconds: Segment length at fs; every segment has the same sample count
+            dtype: On-disk sample type
+            max_age_days: Delete existing sessions older than this first (0 = keep all)
+            max_total_mb: Then delete the oldest sessions until the rest fit (0 = no limit)
+
+        Returns:
+            Writable FullDisclosureRecorder
+        """
+        root_dir = root_dir or default_disclosure_root()
+        prune_sessions(root_dir, max_age_days=max_age_days, max_total_mb=max_total_mb)
+        started = datetime.now()
+        directory = os.path.join(root_dir, f"session_{started.strftime('%Y%m%d_%H%M%S')}")
+        suffix = 1
+        while os.path.exists(directory):
+            directory = os.path.join(root_dir, f"session_{started.strftime('%Y%m%d_%H%M%S')}_{suffix}")
+            suffix += 1
+        os.makedirs(directory)
+
+        fs = float(fs) if fs and fs > 0 else 500.0
+        manifest = {
+            "format": "ecg-full-disclosure",
+            "version": 1,
+            "started": started.isoformat(timespec="seconds"),
+            "stopped": None,
+            "fs": fs,
+            "n_leads": int(n_leads),
+            "lead_names": list(lead_names or LEAD_NAMES[:n_leads]),
+            "dtype": np.dtype(dtype).str,
+            "segment_samples": max(1, int(round(segment_seconds * fs))),
+            "segments": [],
+            "total_samples": 0,
+        }
+        recorder = cls(directory, manifest, writable=True)
+        recorder._write_manifest()
+        return recorder
+
+    @classmethod
+    def open(cls, directory: str) -> "FullDisclosureRecorder":
+        """Open an existing session read-only (e.g. to review after acquisition)."""
+        with open(os.path.join(directory, MANIFEST_NAME), "r") as f:
+            manifest = json.load(f)
+        return cls(directory, manifest, writable=False)
+
+    # ------------------------------------------------------------------ properties
+
+    @property
+    def fs(self) -> float:
+        return float(self.manifest["fs"])
+
+    @property
+    def total_samples(self) -> int:
+        return self._total
+
+    @property
+    def duration_s(self) -> float:
+        return self._total / self.fs if self.fs > 0 else 0.0
+
+    # ------------------------------------------------------------------ time index
+
+    def sample_at(self, seconds: float) -> int:
+        """Absolute sample index of a session time (O(1))."""
+        return max(0, min(self._total, int(round(seconds * self.fs))))
+
+    def time_of(self, sample: int) -> float:
+        """Session time (s) of an absolute sample index."""
+        return sample / self.fs if self.fs > 0 else 0.0
+
+    def wall_time_of(self, sample: int) -> Optional[float]:
+        """Approximate wall-clock epoch time of a sample, from its segment's start anchor."""
+        seg_no = int(sample) // self.segment_samples
+        if not 0 <= seg_no < len(self._segments):
+            return None
+        seg = self._segments[seg_no]
+        return float(seg["wall_start"]) + (int(sample) - int(seg["start_sample"])) / self.fs
+
+    def set_sampling_rate(self, fs: float) -> None:
+        """Record a refined (measured) sampling rate; affects time <-> sample mapping."""
+        if fs and fs > 0:
+            with self._lock:
+                self.manifest["fs"] = float(fs)
+
+    # ------------------------------------------------------------------ writing
+
+    def _segment_path(self, seg_no: int) -> str:
+        return os.path.join(self.directory, f"seg_{seg_no:06d}.dat")
+
+    def _segment_map(self, seg_no: int) -> np.memmap:
+        seg_map = self._maps.get(seg_no)
+        if seg_map is None:
+            path = self._segment_path(seg_no)
+            if self.writable and not os.path.exists(path):
+                seg_map = np.memmap(path, dtype=self.dtype, mode="w+",
+                                    shape=(self.n_leads, self.segment_samples))
+            else:
+                seg_map = np.memmap(path, dtype=self.dtype, mode="r+" if self.writable else "r",
+                                    shape=(self.n_leads, self.segment_samples))
+            # Keep only the segment being written plus a few recently read ones mapped
+            if len(self._maps) >= 4:
+                current = self._current_segment() if self.writable else None
+                for old_no in [n for n in self._maps if n != current][:len(self._maps) - 3]:
+                    old_map = self._maps.pop(old_no)
+                    if self.writable:
+                        old_map.flush()
+            self._maps[seg_no] = seg_map
+        return seg_map
+
+    def _current_segment(self) -> int:
+        return self._total // self.segment_samples
+
+    def append(self, block) -> None:
+        """
+        Append a (n_leads x k) block of samples.
+
+        Args:
+            block: Samples in lead order; same layout as CircularLeadBuffer.extend()
+        """
+        if self.closed:
+            return
+        block = np.asarray(block)
+        if block.ndim != 2 or block.shape[0] != self.n_leads or block.shape[1] == 0:
+            return
+        with self._lock:
+            offset = 0
+            k = block.shape[1]
+            while offset < k:
+                seg_no = self._current_segment()
+                pos = self._total - seg_no * self.segment_samples
+                if pos == 0:
+                    self._segments.append({
+                        "file": os.path.basename(self._segment_path(seg_no)),
+                        "start_sample": self._total,
+                        "wall_start": time.time() - (k - offset) / self.fs,
+                    })
+                    self.manifest["segments"] = self._segments
+                n = min(k - offset, self.segment_samples - pos)
+                self._segment_map(seg_no)[:, pos:pos + n] = block[:, offset:offset + n]
+                self._total += n
+                offset += n
+                if pos + n == self.segment_samples:
+                    # Segment complete: push it to disk and persist the index
+                    self._maps.pop(seg_no).flush()
+                    self._write_manifest()
+            if time.time() - self._last_manifest_write >= MANIFEST_FLUSH_INTERVAL_S:
+                self.flush()
+
+    def flush(self) -> None:
+        """Flush the open segment and manifest (bounded data loss on crash)."""
+        if not self.writable:
+            return
+        for seg_map in self._maps.values():
+            seg_map.flush()
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        self.manifest["total_samples"] = self._total
+        self.manifest["segments"] = self._segments
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self.manifest, f)
+            os.replace(tmp_path, path)
+            self._last_manifest_write = time.time()
+        except Exception as e:
+            print(f"⚠️ Full-disclosure manifest write failed: {e}")
+
+    def close(self) -> None:
+        """Finish the session; the recorder stays readable."""
+        if self.closed:
+            return
+        with self._lock:
+            self.manifest["stopped"] = datetime.now().isoformat(timespec="seconds")
+            self.flush()
+            self.closed = True
+        print(f"💾 Full-disclosure session saved: {self.directory} "
+              f"({self.duration_s / 60.0:.1f} min, {len(self._segments)} segment(s))")
+
+    # ------------------------------------------------------------------ reading
+
+    def read(self, lead: int, start: int, stop: int) -> np.ndarray:
+        """
+        Samples [start:stop) of one lead as float64.
+
+        Only the segment slices covering the range are touched.
+        """
+        with self._lock:
+            start = max(0, int(start))
+            stop = min(self._total, int(stop))
+            if stop <= start:
+                return np.zeros(0, dtype=float)
+            out = np.empty(stop - start, dtype=float)
+            pos = start
+            while pos < stop:
+                seg_no = pos // self.segment_samples
+                seg_start = seg_no * self.segment_samples
+                n = min(stop - pos, seg_start + self.segment_samples - pos)
+                out[pos - start:pos - start + n] = self._segment_map(seg_no)[lead, pos - seg_start:pos - seg_start + n]
+                pos += n
+            return out
+
+    def read_seconds(self, lead: int, start_s: float, duration_s: float) -> np.ndarray:
+        """One lead's samples for a session-time window (seconds)."""
+        start = self.sample_at(start_s)
+        return self.read(lead, start, start + int(round(duration_s * self.fs)))
+
+    def latest(self, lead: int, n: int) -> np.ndarray:
+        """The newest n samples of one lead."""
+        return self.read(lead, self._total - int(n), self._total)
+
+
+def open_full_disclosure(directory: str) -> FullDisclosureRecorder:
+    """Open a recorded session read-only."""
+    return FullDisclosureRecorder.open(directory)
+
+
+def list_sessions(root_dir: Optional[str] = None) -> List[str]:
+    """Session directories under root_dir, newest first."""
+    root_dir = root_dir or default_disclosure_root()
+    if not os.path.isdir(root_dir):
+        return []
+    sessions = [os.path.join(root_dir, d) for d in os.listdir(root_dir)
+                if os.path.isfile(os.path.join(root_dir, d, MANIFEST_NAME))]
+    return sorted(sessions, reverse=True)
+
+
+def _session_size(directory: str) -> int:
+    total = 0
+    for name in os.listdir(directory):
+        try:
+            total += os.path.getsize(os.path.join(directory, name))
+        except OSError:
+            pass
+    return total
+
+
+def prune_sessions(root_dir: Optional[str] = None, max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                   max_total_mb: float = DEFAULT_MAX_TOTAL_MB) -> List[str]:
+    """
+    Delete old full-disclosure sessions.
+
+    A session's age is the time since its manifest was last written. Sessions
+    older than max_age_days go first; then the oldest remaining sessions are
+    removed until the total size is within max_total_mb.
+
+    Args:
+        root_dir: Parent directory (default: reports/full_disclosure)
+        max_age_days: Maximum session age in days (0 or None = no age limit)
+        max_total_mb: Maximum total size in MB (0 or None = no size limit)
+
+    Returns:
+        list of removed session directories
+    """
+    sessions = []
+    for directory in list_sessions(root_dir):
+        try:
+            sessions.append((os.path.getmtime(os.path.join(directory, MANIFEST_NAME)),
+                             _session_size(directory), directory))
+        except OSError:
+            continue
+    sessions.sort()  # oldest first
+
+    removed = []
+    max_age_s = float(max_age_days or 0) * 86400.0
+    budget = float(max_total_mb or 0) * 1024 * 1024
+    total = sum(size for _, size, _ in sessions)
+    now = time.time()
+    for mtime, size, directory in sessions:
+        too_old = max_age_s > 0 and now - mtime > max_age_s
+        over_budget = budget > 0 and total > budget
+        if not (too_old or over_budget):
+            continue
+        try:
+            shutil.rmtree(directory)
+        except OSError as e:
+            print(f"⚠️ Could not remove full-disclosure session {directory}: {e}")
+            continue
+        total -= size
+        removed.append(directory)
+    if removed:
+        print(f"🧹 Removed {len(removed)} old full-disclosure session(s), {total / (1024 * 1024):.0f} MB kept")
+    return removed
@@ -19,14 +19,19 @@ matplotlib.use('Agg')
 
 # ==================== ECG DATA SAVE/LOAD FUNCTIONS ====================
 
-def save_ecg_data_to_file(ecg_test_page, output_file=None):
+from .ecg_capture import (
+    CAPTURE_EXTENSION, find_latest_capture, is_capture_file, load_capture_as_dict,
+    patient_id_from_details, write_capture
+)
+
+def save_ecg_data_to_file(ecg_test_page, output_file=None, patient=None):
     """
-    Save ECG data from ecg_test_page.data to a JSON file
+    Save ECG data from ecg_test_page.data to a binary capture file (.ecgb, see ecg.ecg_capture)
     Returns: path to saved file or None if failed
     
     Example:
-        saved_file = save_ecg_data_to_file(ecg_test_page)
-        # Saved to: reports/ecg_data/ecg_data_20241119_143022.json
+        saved_file = save_ecg_data_to_file(ecg_test_page, patient=patient)
+        # Saved to: reports/ecg_data/ecg_data_20241119_143022.ecgb
     """
     from datetime import datetime
     
@@ -42,7 +47,7 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
     # Generate filename with timestamp
     if output_file is None:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = os.path.join(ecg_data_dir, f'ecg_data_{timestamp}.json')
+        output_file = os.path.join(ecg_data_dir, f'ecg_data_{timestamp}{CAPTURE_EXTENSION}')
     
     # Prepare data for saving
     lead_names = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
@@ -73,6 +78,9 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
         if ecg_test_page.data and len(ecg_test_page.data) > 0:
             print(f"   data[0] length: {len(ecg_test_page.data[0]) if isinstance(ecg_test_page.data[0], (list, np.ndarray)) else 'N/A'}")
     
+    # One time-ordered copy of the circular lead store (CircularLeadBuffer) for all leads
+    data_snapshot = ecg_test_page.data.snapshot() if hasattr(ecg_test_page.data, 'snapshot') else None
+    
     for i, lead_name in enumerate(lead_names):
         data_to_save = []
         
@@ -89,29 +97,27 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
                     # Get all available data from buffer, starting from ptr
                     if ptr + len(buffer) <= len(buffer):
                         # No wrap needed: get from ptr to end, then from start to ptr
-                        part1 = buffer[ptr:].tolist()
-                        part2 = buffer[:ptr].tolist()
-                        data_to_save = part1 + part2  # Full circular buffer
+                        data_to_save = np.concatenate([buffer[ptr:], buffer[:ptr]])  # Full circular buffer
                     else:
                         # Simple case: use all buffer data
-                        data_to_save = buffer.tolist()
+                        data_to_save = buffer
                 else:
                     # No ptrs: use ALL available data (full buffer)
-                    data_to_save = buffer.tolist()
+                    data_to_save = buffer
         
         # Priority 2: Fallback to ecg_test_page.data (smaller buffer, 1000 samples)
-        if not data_to_save and i < len(ecg_test_page.data):
-            lead_data = ecg_test_page.data[i]
+        if len(data_to_save) == 0 and i < len(ecg_test_page.data):
+            lead_data = data_snapshot[i] if data_snapshot is not None else ecg_test_page.data[i]
             if isinstance(lead_data, np.ndarray):
                 # Use ALL available data (not just window_size)
-                data_to_save = lead_data.tolist()
+                data_to_save = lead_data
             elif isinstance(lead_data, (list, tuple)):
                 data_to_save = list(lead_data)
         
-        saved_data["leads"][lead_name] = data_to_save if data_to_save else []
+        saved_data["leads"][lead_name] = np.asarray(data_to_save, dtype=float)
     
     # Check if we have sufficient data for report generation
-    sample_counts = [len(saved_data["leads"][lead]) for lead in saved_data["leads"] if saved_data["leads"][lead]]
+    sample_counts = [len(saved_data["leads"][lead]) for lead in saved_data["leads"] if len(saved_data["leads"][lead])]
     if sample_counts:
         max_samples = max(sample_counts)
         min_samples = min(sample_counts)
@@ -129,8 +135,9 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
     
     # Save to file
     try:
-        with open(output_file, 'w') as f:
-            json.dump(saved_data, f, indent=2)
+        write_capture(output_file, saved_data["leads"], fs=saved_data["sampling_rate"],
+                      lead_names=lead_names, timestamp=saved_data["timestamp"],
+                      patient_id=patient_id_from_details(patient))
         print(f"Saved ECG data to: {output_file}")
         print(f"   Leads saved: {list(saved_data['leads'].keys())}")
         print(f"   Sampling rate: {saved_data['sampling_rate']} Hz")
@@ -142,24 +149,34 @@ def save_ecg_data_to_file(ecg_test_page, output_file=None):
         traceback.print_exc()
         return None
 
-def load_ecg_data_from_file(file_path):
+def load_ecg_data_from_file(file_path, last_seconds=None):
     """
-    Load ECG data from JSON file
+    Load ECG data from a binary capture (.ecgb) or legacy JSON file
     Returns: dict with 'leads', 'sampling_rate', 'timestamp' or None if failed
     
     Example:
-        data = load_ecg_data_from_file('reports/ecg_data/ecg_data_20241119_143022.json')
-        # Returns: {'leads': {'I': [...], 'II': [...]}, 'sampling_rate': 80.0, ...}
+        data = load_ecg_data_from_file('reports/ecg_data/ecg_data_20241119_143022.ecgb')
+        # Returns: {'leads': {'I': array([...]), 'II': array([...])}, 'sampling_rate': 80.0, ...}
+    
+    Parameters:
+        last_seconds: Only read the newest N seconds of each lead (binary captures
+                      are memory-mapped, so the rest of the file is never touched)
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Convert lists back to numpy arrays
-        if 'leads' in data:
-            for lead_name in data['leads']:
-                if isinstance(data['leads'][lead_name], list):
-                    data['leads'][lead_name] = np.array(data['leads'][lead_name])
+        if is_capture_file(file_path):
+            data = load_capture_as_dict(file_path, last_seconds=last_seconds)
+        else:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+            
+            # Convert lists back to numpy arrays
+            if 'leads' in data:
+                for lead_name in data['leads']:
+                    if isinstance(data['leads'][lead_name], list):
+                        data['leads'][lead_name] = np.array(data['leads'][lead_name])
+                        if last_seconds is not None:
+                            n = int(round(last_seconds * float(data.get('sampling_rate', 80.0))))
+                            data['leads'][lead_name] = data['leads'][lead_name][-n:] if n > 0 else data['leads'][lead_name][:0]
         
         print(f" Loaded ECG data from: {file_path}")
         print(f"   Leads loaded: {list(data.get('leads', {}).keys())}")
@@ -237,43 +254,15 @@ def create_ecg_grid_with_waveform(ecg_data, lead_name, width=6, height=2):
     fig, ax = plt.subplots(figsize=(width, height), facecolor='#ffe6e6', frameon=True)
     
     # STEP 1: Create pink ECG grid background
-    # ECG grid colors (even lighter pink/red like medical ECG paper)
-    light_grid_color = '#ffd1d1'  # Darker minor grid
-    major_grid_color = '#ffb3b3'  # Darker major grid
-    bg_color = '#ffe6e6'  # Very light pink background
+    # ECG paper background (very light pink)
+    bg_color = '#ffe6e6'
     
     # Set both figure and axes background to pink
     fig.patch.set_facecolor(bg_color)  # Figure background pink
     ax.set_facecolor(bg_color)         # Axes background pink
     
-    # STEP 2: Draw pink ECG grid lines
-    # Minor grid lines (1mm equivalent spacing) - LIGHT PINK
-    minor_spacing_x = width / 60  # 60 minor divisions across width
-    minor_spacing_y = height / 20  # 20 minor divisions across height
-    
-    # Draw vertical minor pink grid lines
-    for i in range(61):
-        x_pos = i * minor_spacing_x
-        ax.axvline(x=x_pos, color=light_grid_color, linewidth=0.6, alpha=0.8)
-    
-    # Draw horizontal minor pink grid lines
-    for i in range(21):
-        y_pos = i * minor_spacing_y
-        ax.axhline(y=y_pos, color=light_grid_color, linewidth=0.6, alpha=0.8)
-    
-    # Major grid lines (5mm equivalent spacing) - DARKER PINK
-    major_spacing_x = width / 12  # 12 major divisions across width
-    major_spacing_y = height / 4   # 4 major divisions across height
-    
-    # Draw vertical major pink grid lines
-    for i in range(13):
-        x_pos = i * major_spacing_x
-        ax.axvline(x=x_pos, color=major_grid_color, linewidth=1.0, alpha=0.9)
-    
-    # Draw horizontal major pink grid lines
-    for i in range(5):
-        y_pos = i * major_spacing_y
-        ax.axhline(y=y_pos, color=major_grid_color, linewidth=1.0, alpha=0.9)
+    # STEP 2: Pink ECG grid (60 x 20 minor, 12 x 4 major divisions) as two line collections
+    add_axes_grid(ax, width, height)
     
     # STEP 3: Plot DARK ECG waveform on top of pink grid
     if ecg_data is not None and len(ecg_data) > 0:
@@ -307,6 +296,7 @@ def create_ecg_grid_with_waveform(ecg_data, lead_name, width=6, height=2):
 from reportlab.graphics.shapes import Drawing, Group, Line, Rect
 from reportlab.graphics.charts.lineplots import LinePlot
 from reportlab.lib.units import mm
+from .report_drawing import add_axes_grid, draw_page_grid, grid_tile_png, panel_grid_group, trace_path, trace_polyline
 
 def create_reportlab_ecg_drawing(lead_name, width=460, height=45):
     """
@@ -315,46 +305,9 @@ def create_reportlab_ecg_drawing(lead_name, width=460, height=45):
     """
     drawing = Drawing(width, height)
     
-    # STEP 1: Create solid pink background rectangle
-    bg_color = colors.HexColor("#ffe6e6")  # Light pink background
-    bg_rect = Rect(0, 0, width, height, fillColor=bg_color, strokeColor=None)
-    drawing.add(bg_rect)
-    
-    # STEP 2: Draw pink ECG grid lines (even lighter colors)
-    light_grid_color = colors.HexColor("#ffd1d1")  # Darker minor grid
-    major_grid_color = colors.HexColor("#ffb3b3")   # Darker major grid
-    
-    # Minor grid lines (1mm spacing equivalent)
-    minor_spacing_x = width / 60  # 60 divisions across width
-    minor_spacing_y = height / 20  # 20 divisions across height
-    
-    # Vertical minor grid lines
-    for i in range(61):
-        x_pos = i * minor_spacing_x
-        line = Line(x_pos, 0, x_pos, height, strokeColor=light_grid_color, strokeWidth=0.4)
-        drawing.add(line)
-    
-    # Horizontal minor grid lines
-    for i in range(21):
-        y_pos = i * minor_spacing_y
-        line = Line(0, y_pos, width, y_pos, strokeColor=light_grid_color, strokeWidth=0.4)
-        drawing.add(line)
-    
-    # Major grid lines (5mm spacing equivalent)
-    major_spacing_x = width / 12  # 12 divisions across width
-    major_spacing_y = height / 4   # 4 divisions across height
-    
-    # Vertical major grid lines
-    for i in range(13):
-        x_pos = i * major_spacing_x
-        line = Line(x_pos, 0, x_pos, height, strokeColor=major_grid_color, strokeWidth=0.8)
-        drawing.add(line)
-    
-    # Horizontal major grid lines
-    for i in range(5):
-        y_pos = i * major_spacing_y
-        line = Line(0, y_pos, width, y_pos, strokeColor=major_grid_color, strokeWidth=0.8)
-        drawing.add(line)
+    # STEP 1-2: Pink background + ECG grid (60 x 20 minor, 12 x 4 major divisions),
+    # one cached group shared by every panel
+    drawing.add(panel_grid_group(width, height, width / 60, height / 20, width / 12, height / 4))
     
     # REMOVE ENTIRE "STEP 3: Draw ECG waveform as series of lines" section (lines ~166-214)
     
@@ -514,46 +467,9 @@ def create_reportlab_ecg_drawing_with_real_data(lead_name, ecg_data, width=460,
     """
     drawing = Drawing(width, height)
     
-    # STEP 1: Create solid pink background rectangle
-    bg_color = colors.HexColor("#ffe6e6")  # Light pink background
-    bg_rect = Rect(0, 0, width, height, fillColor=bg_color, strokeColor=None)
-    drawing.add(bg_rect)
-    
-    # STEP 2: Draw pink ECG grid lines (even lighter colors)
-    light_grid_color = colors.HexColor("#ffd1d1")  # Darker minor grid
-    major_grid_color = colors.HexColor("#ffb3b3")   # Darker major grid
-    
-    # Minor grid lines (1mm spacing equivalent)
-    minor_spacing_x = width / 60  # 60 divisions across width
-    minor_spacing_y = height / 20  # 20 divisions across height
-    
-    # Vertical minor grid lines
-    for i in range(61):
-        x_pos = i * minor_spacing_x
-        line = Line(x_pos, 0, x_pos, height, strokeColor=light_grid_color, strokeWidth=0.4)
-        drawing.add(line)
-    
-    # Horizontal minor grid lines
-    for i in range(21):
-        y_pos = i * minor_spacing_y
-        line = Line(0, y_pos, width, y_pos, strokeColor=light_grid_color, strokeWidth=0.4)
-        drawing.add(line)
-    
-    # Major grid lines (5mm spacing equivalent)
-    major_spacing_x = width / 12  # 12 divisions across width
-    major_spacing_y = height / 4   # 4 divisions across height
-    
-    # Vertical major grid lines
-    for i in range(13):
-        x_pos = i * major_spacing_x
-        line = Line(x_pos, 0, x_pos, height, strokeColor=major_grid_color, strokeWidth=0.8)
-        drawing.add(line)
-    
-    # Horizontal major grid lines
-    for i in range(5):
-        y_pos = i * major_spacing_y
-        line = Line(0, y_pos, width, y_pos, strokeColor=major_grid_color, strokeWidth=0.8)
-        drawing.add(line)
+    # STEP 1-2: Pink background + ECG grid (60 x 20 minor, 12 x 4 major divisions)
+    # One cached group (background + one path per line weight) shared by every panel
+    drawing.add(panel_grid_group(width, height, width / 60, height / 20, width / 12, height / 4))
     
     # STEP 3: Draw ALL AVAILABLE ECG data - NO DOWNSAMPLING, NO LIMITS!
     if ecg_data is not None and len(ecg_data) > 0:
@@ -605,15 +521,10 @@ def create_reportlab_ecg_drawing_with_real_data(lead_name, ecg_data, width=460,
         # Convert boxes offset to Y position
         ecg_normalized = center_y + (boxes_offset * box_height_points)
         
-        # Draw ALL ECG data points - NO REDUCTION
+        # Draw the whole trace as one polyline, min/max decimated to the
+        # printable resolution (every QRS peak is kept)
         ecg_color = colors.HexColor("#000000")  # Black ECG line
-        
-        # OPTIMIZED: Draw every point for maximum detail
-        for i in range(len(t) - 1):
-            line = Line(t[i], ecg_normalized[i], 
-                       t[i+1], ecg_normalized[i+1], 
-                       strokeColor=ecg_color, strokeWidth=0.5)
-            drawing.add(line)
+        drawing.add(trace_polyline(t, ecg_normalized, strokeColor=ecg_color, strokeWidth=0.5))
         
         print(f" Drew ALL {len(ecg_data)} ECG data points for {lead_name} - showing MAXIMUM heartbeats!")
     else:
@@ -644,37 +555,8 @@ def create_clean_ecg_image(lead_name, width=6, height=2):
     ax.patch.set_facecolor('#ffe6e6')  # FORCE axes patch pink
     ax.patch.set_alpha(1.0)  # Full opacity
     
-    # STEP 2: Draw pink ECG grid lines OVER pink background (darker for clarity)
-    light_grid_color = '#ffd1d1'  # Darker minor grid
-    major_grid_color = '#ffb3b3'  # Darker major grid
-    
-    # Minor grid lines (1mm equivalent spacing)
-    minor_spacing_x = width / 60  # 60 minor divisions
-    minor_spacing_y = height / 20  # 20 minor divisions
-    
-    # Draw vertical minor pink grid lines
-    for i in range(61):
-        x_pos = i * minor_spacing_x
-        ax.axvline(x=x_pos, color=light_grid_color, linewidth=0.6, alpha=0.8)
-    
-    # Draw horizontal minor pink grid lines
-    for i in range(21):
-        y_pos = i * minor_spacing_y
-        ax.axhline(y=y_pos, color=light_grid_color, linewidth=0.6, alpha=0.8)
-    
-    # Major grid lines (5mm equivalent spacing)
-    major_spacing_x = width / 12  # 12 major divisions
-    major_spacing_y = height / 4   # 4 major divisions
-    
-    # Draw vertical major pink grid lines
-    for i in range(13):
-        x_pos = i * major_spacing_x
-        ax.axvline(x=x_pos, color=major_grid_color, linewidth=1.0, alpha=0.9)
-    
-    # Draw horizontal major pink grid lines
-    for i in range(5):
-        y_pos = i * major_spacing_y
-        ax.axhline(y=y_pos, color=major_grid_color, linewidth=1.0, alpha=0.9)
+    # STEP 2: Pink ECG grid lines OVER pink background (two line collections)
+    add_axes_grid(ax, width, height)
     
     # REMOVE ENTIRE "STEP 3: Create realistic ECG waveform" section (lines ~315-356)
     # REMOVE ENTIRE "STEP 4: Plot DARK ECG line" section
@@ -924,7 +806,7 @@ def generate_ecg_report(filename="ecg_report.pdf", data=None, lead_images=None,
     elif ecg_test_page and hasattr(ecg_test_page, 'data'):
         # ALWAYS save current data to file before generating report (REQUIRED for calculation-based beats)
         print(" Saving ECG data to file (required for calculation-based beats)...")
-        saved_data_file_path = save_ecg_data_to_file(ecg_test_page)
+        saved_data_file_path = save_ecg_data_to_file(ecg_test_page, patient=patient)
         if saved_data_file_path:
             saved_ecg_data = load_ecg_data_from_file(saved_data_file_path)
             if saved_ecg_data:
@@ -1019,29 +901,15 @@ def generate_ecg_report(filename="ecg_report.pdf", data=None, lead_images=None,
         
         print(" CREATING NEW PINK GRID IMAGES...")
         
-        # Create NEW pink grid images
+        # Grid-only placeholders: one PNG tile, rendered once per size/DPI and shared by every lead
         lead_images = {}
-        for lead in leads:
-            try:
-                # Create pink grid ECG
-                fig = create_ecg_grid_with_waveform(None, lead, width=6, height=2)
-                
-                # Save to project root with pink background
-                img_path = os.path.join(project_root, f"lead_{lead}.png")
-                fig.savefig(img_path, 
-                           dpi=200, 
-                           bbox_inches='tight', 
-                           pad_inches=0.05,
-                           facecolor='#ffe6e6',  # PINK background
-                           edgecolor='none',
-                           format='png')
-                plt.close(fig)
-                
-                lead_images[lead] = img_path
-                print(f" Created NEW PINK GRID image: {img_path}")
-                
-            except Exception as e:
-                print(f" Error creating {lead}: {e}")
+        try:
+            tile_path = grid_tile_png(6, 2, dpi=200)
+            for lead in leads:
+                lead_images[lead] = tile_path
+            print(f" Using cached PINK GRID tile: {tile_path}")
+        except Exception as e:
+            print(f" Error creating PINK GRID tile: {e}")
         
         if not lead_images:
             return "Error: Could not create PINK GRID ECG images"
@@ -1776,11 +1644,12 @@ def generate_ecg_report(filename="ecg_report.pdf", data=None, lead_images=None,
                 
                 # Draw ALL REAL ECG data points
                 from reportlab.graphics.shapes import Path
-                ecg_path = Path(fillColor=None, 
-                               strokeColor=colors.HexColor("#000000"), 
-                               strokeWidth=0.4,
-                               strokeLineCap=1,
-                               strokeLineJoin=1)
+                # One path per trace, min/max decimated to the printable resolution
+                ecg_path = trace_path(t, ecg_normalized,
+                                      strokeColor=colors.HexColor("#000000"),
+                                      strokeWidth=0.4,
+                                      strokeLineCap=1,
+                                      strokeLineJoin=1)
                 
                 # DEBUG: Verify actual plotted values
                 actual_min_y = np.min(ecg_normalized)
@@ -1788,13 +1657,6 @@ def generate_ecg_report(filename="ecg_report.pdf", data=None, lead_images=None,
                 actual_span_points = actual_max_y - actual_min_y
                 actual_span_boxes = actual_span_points / box_height_points
                 
-                # Start path
-                ecg_path.moveTo(t[0], ecg_normalized[0])
-                
-                # Add ALL points
-                for i in range(1, len(t)):
-                    ecg_path.lineTo(t[i], ecg_normalized[i])
-                
                 # Add path to master drawing
                 master_drawing.add(ecg_path)
                 
@@ -2262,11 +2124,12 @@ def generate_ecg_report(filename="ecg_report.pdf", data=None, lead_images=None,
                 
                 # Draw ALL REAL ECG data points
                 from reportlab.graphics.shapes import Path
-                ecg_path = Path(fillColor=None, 
-                               strokeColor=colors.HexColor("#000000"), 
-                               strokeWidth=0.4,
-                               strokeLineCap=1,
-                               strokeLineJoin=1)
+                # One path per trace, min/max decimated to the printable resolution
+                ecg_path = trace_path(t, ecg_normalized,
+                                      strokeColor=colors.HexColor("#000000"),
+                                      strokeWidth=0.4,
+                                      strokeLineCap=1,
+                                      strokeLineJoin=1)
                 
                 # DEBUG: Verify actual plotted values
                 actual_min_y = np.min(ecg_normalized)
@@ -2274,13 +2137,6 @@ def generate_ecg_report(filename="ecg_report.pdf", data=None, lead_images=None,
                 actual_span_points = actual_max_y - actual_min_y
                 actual_span_boxes = actual_span_points / box_height_points
                 
-                # Start path
-                ecg_path.moveTo(t[0], ecg_normalized[0])
-                
-                # Add ALL points
-                for i in range(1, len(t)):
-                    ecg_path.lineTo(t[i], ecg_normalized[i])
-                
                 # Add path to master drawing
                 master_drawing.add(ecg_path)
                 
@@ -2381,19 +2237,20 @@ def generate_ecg_report(filename="ecg_report.pdf", data=None, lead_images=None,
     print(f"   Available keys in data: {list(data.keys())}")
     
     # If not provided or zero, compute quickly from Lead II in ecg_test_page (robust fallback)
-    def _compute_from_data_array(arr, fs):
+    def _compute_from_data_array(arr, fs, r_peaks=None):
         from scipy.signal import butter, filtfilt, find_peaks
         if arr is None or len(arr) < int(2*fs) or np.std(arr) < 0.1:
             return 0.0, 0.0, 0.0
         nyq = fs/2.0
         b,a = butter(2, [max(0.5/nyq, 0.001), min(40.0/nyq,0.99)], btype='band')
         x = filtfilt(b,a,arr)
-        # Simple R detection via Pan-Tompkins style envelope
-        squared = np.square(np.diff(x))
-        win = max(1, int(0.15*fs))
-        env = np.convolve(squared, np.ones(win)/win, mode='same')
-        thr = np.mean(env) + 0.5*np.std(env)
-        r_peaks, _ = find_peaks(env, height=thr, distance=int(0.6*fs))
+        if r_peaks is None:
+            # Simple R detection via Pan-Tompkins style envelope
+            squared = np.square(np.diff(x))
+            win = max(1, int(0.15*fs))
+            env = np.convolve(squared, np.ones(win)/win, mode='same')
+            thr = np.mean(env) + 0.5*np.std(env)
+            r_peaks, _ = find_peaks(env, height=thr, distance=int(0.6*fs))
         if len(r_peaks) < 3:
             return 0.0, 0.0, 0.0
         p_vals, qrs_vals, t_vals = [], [], []
@@ -2425,12 +2282,20 @@ def generate_ecg_report(filename="ecg_report.pdf", data=None, lead_images=None,
             if hasattr(ecg_test_page, 'sampler') and hasattr(ecg_test_page.sampler,'sampling_rate') and ecg_test_page.sampler.sampling_rate:
                 fs = float(ecg_test_page.sampler.sampling_rate)
             arr = None
+            r_peaks = None
             if len(ecg_test_page.data)>1:
                 lead_ii = ecg_test_page.data[1]
                 if isinstance(lead_ii, (list, tuple)):
                     lead_ii = np.asarray(lead_ii)
                 arr = lead_ii[-int(10*fs):] if lead_ii is not None and len(lead_ii)>int(10*fs) else lead_ii
-            cp, cqrs, ct = _compute_from_data_array(arr, fs)
+                # Reuse the ECG page's cached R-peaks for this data epoch instead of re-detecting
+                if arr is not None and hasattr(ecg_test_page, 'window_analysis'):
+                    try:
+                        r_peaks = ecg_test_page.window_analysis(fs).r_peaks_in_last(len(arr))
+                    except Exception as e:
+                        print(f"⚠️ Cached R-peaks unavailable: {e}")
+                        r_peaks = None
+            cp, cqrs, ct = _compute_from_data_array(arr, fs, r_peaks)
             if p_amp_mv<=0: p_amp_mv = cp
             if qrs_amp_mv<=0: qrs_amp_mv = cqrs
             if t_amp_mv<=0: t_amp_mv = ct
@@ -3076,65 +2941,12 @@ def generate_ecg_report(filename="ecg_report.pdf", data=None, lead_images=None,
         if canvas.getPageNumber() == 2:  # Changed from 3 to 2
             page_width, page_height = canvas._pagesize
             
-            # Fill entire page with pink background
-            canvas.setFillColor(colors.HexColor("#ffe6e6"))
-            canvas.rect(0, 0, page_width, page_height, fill=1, stroke=0)
-            
-            # ECG grid colors - darker for better visibility
-            light_grid_color = colors.HexColor("#ffd1d1")  
-            
-            major_grid_color = colors.HexColor("#ffb3b3")   
-            
-            # Draw minor grid lines (1mm spacing) - 59 boxes complete (0 to 295mm)
-            canvas.setStrokeColor(light_grid_color)
-            canvas.setLineWidth(0.6)
-            
-            minor_spacing = 1 * mm
-            
-            # Vertical minor lines - Draw up to 295mm (includes 295mm line)
-            max_x_limit = 59 * 5 * mm  # 295mm = right edge of 59th box
-            x = 0
-            while x <= max_x_limit:  # Draw lines 0 to 295mm (complete 59 boxes)
-                canvas.line(x, 0, x, page_height)
-                x += minor_spacing
-                if x > max_x_limit:  # Stop immediately after 295mm
-                    break
-            
-            # Horizontal minor lines - full page
-            y = 0
-            while y <= page_height:
-                canvas.line(0, y, page_width, y)
-                y += minor_spacing
-                
-            
-            # Draw major grid lines - FULL PAGE
-            # IMPORTANT: Match waveform calculation: height/3 = 15.0 points per box
-            # For individual lead graphs: ecg_height = 45 points, so 15 points = 1 box
-            canvas.setStrokeColor(major_grid_color)
-            canvas.setLineWidth(1.2)
-            
-            # Use standard ECG paper spacing: 5mm per box
-            # 5mm = 5 * 2.834645669 points = 14.17 points per box
-            from reportlab.lib.units import mm
-            major_spacing = 5 * mm  # Standard ECG: 5mm = 14.17 points per box
-            
-            # Vertical major lines - Draw 60 lines (0, 5, 10...295mm) for 59 complete boxes
+            # Pink background + 1 mm / 5 mm grid over 59 complete boxes (0-295 mm); the
+            # major rows also stop at 295 mm. One Form XObject per document.
             max_x_limit = 59 * 5 * mm  # 295mm = right edge of 59th box
-            x = 0
-            while x <= max_x_limit:  # Include 295mm line (completes 59 boxes)
-                canvas.line(x, 0, x, page_height)
-                x += major_spacing
-                if x > max_x_limit:  # Stop after 295mm
-                    break
-            
-            # Horizontal major lines - STRICT: Only up to 295mm width (not full page_width)
-            y = 0
-            while y <= page_height:
-                canvas.line(0, y, max_x_limit, y)  # End at 295mm (not page_width) ✅
-                y += major_spacing
-            
+            draw_page_grid(canvas, page_width, page_height, 1 * mm, 1 * mm, 5 * mm, 5 * mm,
+                           minor_width=0.6, major_width=1.2, x_limit=max_x_limit, major_row_end=max_x_limit)
 
-        
         # STEP 1.5: Draw Org. and Phone No. labels on Page 1 (TOP LEFT)
         if canvas.getPageNumber() == 1:
             canvas.saveState()
@@ -3643,66 +3455,15 @@ def generate_hrv_ecg_report(filename="hrv_ecg_report.pdf", lead_ii_data=None, da
             page_width, page_height = canvas._pagesize
             
             # ========== 57 BOXES IN FULL 297MM PAGE WIDTH ==========
-            # Page width: 297mm (full A4 landscape)
-            # Number of boxes: 57
-            # Box size: 297mm / 57 = 5.2105mm per box
+            # Box size: 297mm / 57 = 5.2105mm per box (minor = box / 5 across, 1mm down);
+            # 40 boxes over the 210mm height (5.25mm per box)
             num_boxes_width = 57
-            page_width_mm = 297.0
-            box_width_mm = page_width_mm / num_boxes_width  # 297/57 = 5.2105mm per box
-            box_width_pts = box_width_mm * mm
-            
-            # Pink background - FULL PAGE (297mm width, no white space)
-            canvas.setFillColor(colors.HexColor("#ffe6e6"))
-            canvas.rect(0, 0, page_width, page_height, fill=1, stroke=0)
-            
-            # Grid colors
-            light_grid_color = colors.HexColor("#ffd1d1")
-            major_grid_color = colors.HexColor("#ffb3b3")
-            
-            # Minor grid lines - 1mm spacing (scaled proportionally)
-            # In each box of 5.2105mm, we want 5 minor divisions (1mm each)
-            # So minor spacing = box_width / 5 = 5.2105 / 5 = 1.042mm
-            minor_spacing_mm = box_width_mm / 5.0  # 1.042mm per minor division
-            minor_spacing_pts = minor_spacing_mm * mm
-            
-            canvas.setStrokeColor(light_grid_color)
-            canvas.setLineWidth(0.6)  # Minor grid lines (1mm spacing) - keep original thickness
-            
-            # Vertical minor lines - full page width (297mm)
-            x = 0
-            while x <= page_width:
-                canvas.line(x, 0, x, page_height)
-                x += minor_spacing_pts
-                if x > page_width:
-                    break
-            
-            # Horizontal minor lines - full page height
-            minor_spacing_y = 1.0 * mm  # 1mm vertical spacing
-            y = 0
-            while y <= page_height:
-                canvas.line(0, y, page_width, y)
-                y += minor_spacing_y
-            
-            # Major grid lines - exactly 57 boxes across full 297mm width
-            canvas.setStrokeColor(major_grid_color)
-            canvas.setLineWidth(0.6)  # Thinner major grid lines (5mm spacing) - was 1.2
-            
-            # Vertical major lines - 57 boxes (297mm width, 5.2105mm per box)
-            x = 0
-            for i in range(num_boxes_width + 1):  # 58 lines for 57 boxes
-                canvas.line(x, 0, x, page_height)
-                x += box_width_pts
-            
-            # Horizontal major lines - 40 boxes (210mm height, 5.25mm per box)
+            box_width_pts = (297.0 / num_boxes_width) * mm
             num_boxes_height = 40
-            page_height_mm = 210.0
-            box_height_mm = page_height_mm / num_boxes_height  # 210/40 = 5.25mm per box
-            box_height_pts = box_height_mm * mm
-            y = 0
-            for i in range(num_boxes_height + 1):  # 41 lines for 40 boxes
-                canvas.line(0, y, page_width, y)
-                y += box_height_pts
-        
+            box_height_pts = (210.0 / num_boxes_height) * mm
+            draw_page_grid(canvas, page_width, page_height, box_width_pts / 5.0, 1.0 * mm,
+                           box_width_pts, box_height_pts, minor_width=0.6, major_width=0.6)
+
         # STEP 1.5: Draw Org. and Phone No. on Page 1 (REPOSITIONED - slightly higher, more left)
         if canvas.getPageNumber() == 1:
             canvas.saveState()
@@ -4152,18 +3913,12 @@ def generate_hrv_ecg_report(filename="hrv_ecg_report.pdf", lead_ii_data=None, da
                 ecg_normalized = center_y + (boxes_offset * box_height_points)
                 
                 # Draw ECG waveform (EXACT SAME AS MAIN REPORT line 2240-2263)
-                ecg_path = Path(fillColor=None, 
-                               strokeColor=colors.HexColor("#000000"), 
-                               strokeWidth=0.4,  # Same as main report
-                               strokeLineCap=1,
-                               strokeLineJoin=1)
-                
-                # Start path
-                ecg_path.moveTo(t[0], ecg_normalized[0])
-                
-                # Add ALL points
-                for i in range(1, len(t)):
-                    ecg_path.lineTo(t[i], ecg_normalized[i])
+                # One path per trace, min/max decimated to the printable resolution
+                ecg_path = trace_path(t, ecg_normalized,
+                                      strokeColor=colors.HexColor("#000000"),
+                                      strokeWidth=0.4,  # Same as main report
+                                      strokeLineCap=1,
+                                      strokeLineJoin=1)
                 
                 # Add path to master drawing
                 master_drawing.add(ecg_path)
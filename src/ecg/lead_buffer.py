@@ -0,0 +1,151 @@
+"""
+Circular Multi-Lead Sample Store
+
+Replaces the "np.roll the whole history, then write [-1]" pattern, which
+copied every lead's full HISTORY_LENGTH buffer once per sample.
+
+CircularLeadBuffer keeps a head pointer and writes every sample twice
+(at head and head + capacity), so the newest n samples of any lead are always
+one contiguous slice:
+- extend()/append() cost O(new samples), never O(history)
+- latest(n) returns a zero-copy, time-ordered view
+- snapshot() returns an ordered copy for reports and file export
+
+For compatibility with code written against the old list of per-lead arrays,
+buffer[i] returns lead i's time-ordered history (a read-only view),
+len(buffer) is the number of leads and iteration yields one view per lead.
+
+Views are only valid until the next write; take snapshot() (or np.array())
+when the data must outlive the current frame or cross threads.
+"""
+
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+class CircularLeadBuffer:
+    """Fixed-capacity (n_leads x capacity) history with O(1) per-sample writes."""
+
+    def __init__(self, n_leads: int = 12, capacity: int = 10000, dtype=np.float32):
+        self.n_leads = int(n_leads)
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        # Mirrored storage: column j and j + capacity always hold the same sample
+        self._buf = np.zeros((self.n_leads, 2 * self.capacity), dtype=self.dtype)
+        self.head = 0               # next write column in [0, capacity)
+        self.total_written = 0      # monotonically increasing sample counter
+        self._filled = 0            # valid samples, <= capacity
+        self.generation = 0         # bumped whenever stored samples change other than by appending
+
+    # ------------------------------------------------------------------ writes
+    def extend(self, block) -> None:
+        """
+        Append a (n_leads x k) block, oldest sample first along axis 1.
+        """
+        block = np.asarray(block, dtype=self.dtype)
+        if block.ndim == 1:
+            block = block.reshape(self.n_leads, -1)
+        k = block.shape[1]
+        if k == 0:
+            return
+        if block.shape[0] != self.n_leads:
+            raise ValueError(f"Expected {self.n_leads} leads, got {block.shape[0]}")
+
+        skipped = 0
+        if k > self.capacity:
+            skipped = k - self.capacity
+            block = block[:, skipped:]
+            k = self.capacity
+
+        cap = self.capacity
+        start = (self.head + skipped) % cap
+        first = min(k, cap - start)
+        for offset in (0, cap):
+            self._buf[:, offset + start:offset + start + first] = block[:, :first]
+            if first < k:
+                self._buf[:, offset:offset + k - first] = block[:, first:]
+
+        self.head = (start + k) % cap
+        self.total_written += k + skipped
+        self._filled = min(cap, self._filled + k + skipped)
+
+    def append(self, column) -> None:
+        """Append one sample for every lead."""
+        column = np.asarray(column, dtype=self.dtype).reshape(self.n_leads, 1)
+        self.extend(column)
+
+    def set_lead(self, lead: int, values) -> None:
+        """
+        Overwrite the newest len(values) samples of one lead (legacy
+        whole-lead assignment). Does not advance the write head.
+        """
+        values = np.asarray(values, dtype=self.dtype).ravel()[-self.capacity:]
+        n = values.size
+        if n == 0:
+            return
+        end = self.head + self.capacity
+        self._buf[lead, end - n:end] = values
+        # Keep the mirror consistent
+        lo = end - n
+        if lo < self.capacity:
+            self._buf[lead, lo + self.capacity:2 * self.capacity] = self._buf[lead, lo:self.capacity]
+        if end > self.capacity:
+            self._buf[lead, :end - self.capacity] = self._buf[lead, self.capacity:end]
+        self._filled = max(self._filled, n)
+        self.generation += 1
+
+    def reset(self) -> None:
+        """Drop all history."""
+        self._buf.fill(0)
+        self.head = 0
+        self.total_written = 0
+        self._filled = 0
+        self.generation += 1
+
+    # ------------------------------------------------------------------- reads
+    @property
+    def filled(self) -> int:
+        """Number of valid samples held per lead."""
+        return self._filled
+
+    def latest(self, n: Optional[int] = None, lead: Optional[int] = None) -> np.ndarray:
+        """
+        Zero-copy, time-ordered view of the newest n samples.
+
+        Args:
+            n: Samples wanted (clamped to the valid history; None = all)
+            lead: Lead index for a 1-D view, or None for (n_leads x n)
+        """
+        n = self._filled if n is None else max(0, min(int(n), self._filled))
+        end = self.head + self.capacity
+        rows = slice(None) if lead is None else lead
+        view = self._buf[rows, end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def snapshot(self, n: Optional[int] = None) -> np.ndarray:
+        """Ordered (n_leads x n) copy, safe to keep or hand to another thread."""
+        return np.array(self.latest(n))
+
+    def __len__(self) -> int:
+        return self.n_leads
+
+    def __bool__(self) -> bool:
+        return self.n_leads > 0
+
+    def __getitem__(self, lead: int) -> np.ndarray:
+        if isinstance(lead, slice):
+            return [self.latest(lead=i) for i in range(self.n_leads)][lead]
+        if lead < 0:
+            lead += self.n_leads
+        if not 0 <= lead < self.n_leads:
+            raise IndexError("lead index out of range")
+        return self.latest(lead=lead)
+
+    def __setitem__(self, lead: int, values) -> None:
+        self.set_lead(lead, values)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(self.n_leads):
+            yield self.latest(lead=i)
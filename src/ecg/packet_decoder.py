@@ -0,0 +1,252 @@
+"""
+ECG Serial Packet Decoding
+
+Packet layout (22 bytes):
+    [0]      START_BYTE (0xE8)
+    [1..4]   header / counters (ignored)
+    [5..20]  8 direct leads (I, II, V1..V6) as MSB/LSB pairs
+             value = ((MSB & 0x1F) << 7) | (LSB & 0x7F), MSB bit 0x20 = lead connected
+    [21]     END_BYTE (0x8E)
+
+Two decoders are provided:
+- parse_packet(): one packet -> dict of 12 lead values (original per-packet path)
+- decode_packet_stream(): whole receive buffer -> (n_packets x 12) array in one
+  vectorized pass (np.frombuffer + sliding-window view, derived limb leads as
+  array ops). This is what the acquisition loop uses.
+
+Benchmark (from the src directory):
+    python -m ecg.packet_decoder
+"""
+
+import contextlib
+import os
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.perf_stats import hot_path_verbose
+
+# Packet parsing constants
+PACKET_SIZE = 22
+START_BYTE = 0xE8
+END_BYTE = 0x8E
+LEAD_NAMES_DIRECT = ["I", "II", "V1", "V2", "V3", "V4", "V5", "V6"]
+# Output column order of decode_packet_stream (matches the 12-lead display order)
+DECODED_LEAD_ORDER = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
+_FIRST_MSB = 5
+
+
+def decode_lead(msb: int, lsb: int) -> Tuple[int, bool]:
+    """Decode lead value from MSB and LSB bytes"""
+    lower7 = lsb & 0x7F
+    upper5 = msb & 0x1F
+    value = (upper5 << 7) | lower7
+    connected = (msb & 0x20) != 0
+    return value, connected
+
+
+def parse_packet(raw: bytes) -> Dict[str, int]:
+    """Parse ECG packet and return dictionary of lead values"""
+    if len(raw) != PACKET_SIZE or raw[0] != START_BYTE or raw[-1] != END_BYTE:
+        return {}
+
+    lead_values: Dict[str, int] = {}
+    idx = _FIRST_MSB  # first MSB position
+    # Per-packet dumps only at DEBUG on the ecg.hotpath logger (console I/O dominated acquisition CPU)
+    verbose = hot_path_verbose()
+
+    if verbose:
+        print("---- New Packet ----")
+
+    for name in LEAD_NAMES_DIRECT:
+        msb = raw[idx]
+        lsb = raw[idx + 1]
+        idx += 2
+
+        value, connected = decode_lead(msb, lsb)
+
+        if verbose:
+            print(f"{name}: MSB={msb:02X}, LSB={lsb:02X}, value={value}, connected={connected}")
+
+        lead_values[name] = value
+
+    # Derived limb leads
+    lead_i = lead_values.get("I", 0)
+    lead_ii = lead_values.get("II", 0)
+
+    lead_values["III"] = lead_ii - lead_i
+    lead_values["aVR"] = -(lead_i + lead_ii) / 2
+    lead_values["aVL"] = (lead_i - lead_values["III"]) / 2
+    lead_values["aVF"] = (lead_ii + lead_values["III"]) / 2
+
+    if verbose:
+        print("Derived:", {
+            "III": lead_values["III"],
+            "aVR": lead_values["aVR"],
+            "aVL": lead_values["aVL"],
+            "aVF": lead_values["aVF"],
+        })
+        print("---------------------\n")
+
+    return lead_values
+
+
+def _select_non_overlapping(starts: np.ndarray) -> np.ndarray:
+    """Greedy pick of frame starts so that no two frames overlap."""
+    keep = []
+    next_free = -1
+    for s in starts.tolist():
+        if s >= next_free:
+            keep.append(s)
+            next_free = s + PACKET_SIZE
+    return np.asarray(keep, dtype=np.intp)
+
+
+def decode_packet_stream(buf, max_packets: Optional[int] = None,
+                         dtype=np.float32) -> Tuple[np.ndarray, int]:
+    """
+    Decode every START/END framed packet in a receive buffer at once.
+
+    A frame is any START_BYTE whose byte PACKET_SIZE-1 later is END_BYTE.
+    Unlike the per-packet loop, a corrupt candidate costs only its start byte,
+    so the stream re-synchronises on the very next valid frame.
+
+    Args:
+        buf: bytes/bytearray receive buffer (not modified)
+        max_packets: Optional cap on packets decoded; later frames stay queued
+        dtype: Output dtype. Defaults to float32 because aVR/aVL/aVF are
+               half-integers (same values parse_packet produces)
+
+    Returns:
+        (samples, consumed) - samples is (n_packets x 12) in DECODED_LEAD_ORDER,
+        consumed is how many leading bytes of `buf` can be discarded. A trailing
+        partial packet is never consumed.
+    """
+    # bytes() copy: a NumPy view would pin a bytearray and block `del buf[:n]`
+    arr = np.frombuffer(bytes(buf), dtype=np.uint8)
+    n = arr.size
+    empty = np.empty((0, len(DECODED_LEAD_ORDER)), dtype=dtype)
+    if n < PACKET_SIZE:
+        partial = np.flatnonzero(arr == START_BYTE)
+        return empty, (int(partial[0]) if partial.size else n)
+
+    starts = np.flatnonzero((arr[:n - PACKET_SIZE + 1] == START_BYTE) &
+                            (arr[PACKET_SIZE - 1:] == END_BYTE))
+    if starts.size > 1 and np.any(np.diff(starts) < PACKET_SIZE):
+        starts = _select_non_overlapping(starts)
+
+    limited = max_packets is not None and starts.size > max_packets
+    if limited:
+        starts = starts[:max_packets]
+
+    end = int(starts[-1]) + PACKET_SIZE if starts.size else 0
+    if limited:
+        consumed = end
+    else:
+        # Keep the earliest START_BYTE that may still begin a partial frame
+        tail_starts = np.flatnonzero(arr[max(end, n - PACKET_SIZE + 1):] == START_BYTE)
+        consumed = max(end, n - PACKET_SIZE + 1) + int(tail_starts[0]) if tail_starts.size else n
+
+    if not starts.size:
+        return empty, consumed
+
+    # (n_packets x PACKET_SIZE) gathered from a zero-copy stride view
+    frames = sliding_window_view(arr, PACKET_SIZE)[starts]
+    pairs = frames[:, _FIRST_MSB:_FIRST_MSB + 2 * len(LEAD_NAMES_DIRECT)]
+    msb = pairs[:, 0::2].astype(np.int32)
+    lsb = pairs[:, 1::2].astype(np.int32)
+    direct = ((msb & 0x1F) << 7) | (lsb & 0x7F)
+
+    lead_i = direct[:, 0]
+    lead_ii = direct[:, 1]
+    lead_iii = lead_ii - lead_i
+
+    out = np.empty((starts.size, len(DECODED_LEAD_ORDER)), dtype=dtype)
+    out[:, 0] = lead_i
+    out[:, 1] = lead_ii
+    out[:, 2] = lead_iii
+    out[:, 3] = -(lead_i + lead_ii) / 2
+    out[:, 4] = (lead_i - lead_iii) / 2
+    out[:, 5] = (lead_ii + lead_iii) / 2
+    out[:, 6:] = direct[:, 2:]
+    return out, consumed
+
+
+def encode_packets(direct_leads: np.ndarray, connected: bool = True) -> bytes:
+    """
+    Build a byte stream of packets from (n_packets x 8) direct lead values.
+    Used by the benchmark and the offline replay tools.
+    """
+    direct_leads = np.asarray(direct_leads, dtype=np.int64) & 0xFFF
+    n = direct_leads.shape[0]
+    frames = np.zeros((n, PACKET_SIZE), dtype=np.uint8)
+    frames[:, 0] = START_BYTE
+    frames[:, -1] = END_BYTE
+    msb = (direct_leads >> 7) & 0x1F
+    if connected:
+        msb |= 0x20
+    frames[:, _FIRST_MSB:_FIRST_MSB + 16:2] = msb
+    frames[:, _FIRST_MSB + 1:_FIRST_MSB + 16:2] = direct_leads & 0x7F
+    return frames.tobytes()
+
+
+def _decode_per_packet(stream: bytes) -> int:
+    """Original SerialStreamReader framing loop around parse_packet."""
+    buf = bytearray(stream)
+    decoded = 0
+    while True:
+        start_idx = buf.find(bytes([START_BYTE]))
+        if start_idx == -1 or len(buf) - start_idx < PACKET_SIZE:
+            break
+        candidate = bytes(buf[start_idx:start_idx + PACKET_SIZE])
+        del buf[:start_idx + PACKET_SIZE]
+        if candidate[-1] != END_BYTE:
+            continue
+        if parse_packet(candidate):
+            decoded += 1
+    return decoded
+
+
+def benchmark_decoders(n_packets: int = 5000, repeats: int = 5,
+                       chunk_sizes: Sequence[int] = (1024, 16384)) -> Dict[str, float]:
+    """
+    Microbenchmark: packets/sec of parse_packet framing vs decode_packet_stream.
+
+    The per-packet path is timed with stdout sent to os.devnull so the number
+    reflects Python overhead rather than terminal speed.
+    """
+    rng = np.random.default_rng(0)
+    stream = encode_packets(rng.integers(0, 4096, size=(n_packets, 8)))
+    results: Dict[str, float] = {}
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            _decode_per_packet(stream)
+            best = min(best, time.perf_counter() - t0)
+    results["per_packet"] = n_packets / best
+
+    for chunk in chunk_sizes:
+        best = float("inf")
+        for _ in range(repeats):
+            buf = bytearray()
+            t0 = time.perf_counter()
+            for pos in range(0, len(stream), chunk):
+                buf.extend(stream[pos:pos + chunk])
+                _, consumed = decode_packet_stream(buf)
+                del buf[:consumed]
+            best = min(best, time.perf_counter() - t0)
+        results[f"batch_{chunk}B"] = n_packets / best
+
+    print(f"Packet decode benchmark ({n_packets} packets, best of {repeats}):")
+    base = results["per_packet"]
+    for name, rate in results.items():
+        print(f"  {name:<14} {rate:>14,.0f} packets/s  ({rate / base:5.1f}x)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_decoders()
@@ -1,5 +1,6 @@
 import numpy as np
-from scipy.signal import butter, lfilter
+from collections import deque
+from scipy.signal import butter, lfilter, sosfilt, sosfilt_zi
 
 def pan_tompkins(ecg, fs=500):
     """
@@ -31,3 +32,236 @@ def pan_tompkins(ecg, fs=500):
     from scipy.signal import find_peaks
     peaks, _ = find_peaks(mwa, height=threshold, distance=min_distance)
     return peaks
+
+
+class StreamingPanTompkins:
+    """
+    Online Pan-Tompkins QRS detector.
+    
+    Same front end as pan_tompkins() (5-15 Hz bandpass, derivative, squaring,
+    150 ms moving-window integration), but run causally with the filter state
+    kept between calls, and the classic adaptive SPKI/NPKI thresholds with
+    refractory period, T-wave rejection and RR search-back instead of a
+    whole-record threshold. Feed it samples as they arrive; it returns the new
+    R-peak indices and keeps a running RR series.
+    
+    Indices are absolute sample numbers: the first sample passed to process()
+    is `start_index` (use the buffer's total_written to stay aligned with it).
+    
+    Usage:
+        detector = StreamingPanTompkins(fs=500)
+        new_peaks = detector.process(lead_ii_block)
+        hr = detector.heart_rate()
+    """
+    
+    def __init__(self, fs=500, start_index=0, refractory_ms=200, learning_s=2.0, max_peaks=512):
+        """
+        Args:
+            fs: Sampling frequency (Hz)
+            start_index: Absolute index of the first sample that will be processed
+            refractory_ms: Minimum R-R distance (200 ms = 300 BPM)
+            learning_s: Seconds of signal used to seed the thresholds
+            max_peaks: R peaks / RR intervals retained
+        """
+        self.fs = float(fs)
+        self.start_index = int(start_index)
+        self.refractory = max(1, int(refractory_ms / 1000.0 * self.fs))
+        self.learning_samples = max(1, int(learning_s * self.fs))
+        self.window = max(1, int(0.15 * self.fs))  # MWI window (150 ms)
+        self.t_wave_window = int(0.36 * self.fs)
+        self.search_back = int(0.25 * self.fs)      # R lies before the MWI peak
+        self.history_len = int(5.0 * self.fs)        # raw samples kept for R localisation
+        
+        nyq = 0.5 * self.fs
+        self._sos = butter(1, [5 / nyq, min(15 / nyq, 0.99)], btype='band', output='sos')
+        self.r_peaks = deque(maxlen=max_peaks)
+        self.rr_intervals = deque(maxlen=max_peaks)  # samples
+        self.reset()
+    
+    def reset(self):
+        """Forget all state (keeps the configuration and start index)."""
+        self.processed = self.start_index   # absolute index of the next sample
+        self._zi = None
+        self._last_bp = None
+        self._sq_tail = np.zeros(0)
+        self._mwa_tail = np.zeros(0)
+        self._raw = np.zeros(0)
+        self._learning = []                  # (index, value) MWI peaks seen while learning
+        self._learn_max = 0.0
+        self._learn_sum = 0.0
+        self._learn_count = 0
+        self.spki = None
+        self.npki = None
+        self._noise_peaks = []               # candidates since the last R (search-back)
+        self._last_peak_idx = None           # MWI index of the last accepted QRS
+        self._last_peak_val = 0.0
+        self.r_peaks.clear()
+        self.rr_intervals.clear()
+    
+    @property
+    def threshold(self):
+        if self.spki is None:
+            return None
+        return self.npki + 0.25 * (self.spki - self.npki)
+    
+    def process(self, samples):
+        """
+        Consume new samples of one lead.
+        
+        Args:
+            samples: 1D array of new samples (oldest first)
+        
+        Returns:
+            np.ndarray of absolute indices of R peaks confirmed by this call
+        """
+        x = np.asarray(samples, dtype=float).ravel()
+        k = x.size
+        if k == 0:
+            return np.zeros(0, dtype=np.int64)
+        base = self.processed
+        
+        # Raw history for locating the R peak itself (trimmed once the block is done)
+        self._raw = np.concatenate((self._raw, x))
+        
+        # 1. Bandpass (state carried between calls)
+        if self._zi is None:
+            self._zi = sosfilt_zi(self._sos) * x[0]
+        bp, self._zi = sosfilt(self._sos, x, zi=self._zi)
+        # 2. Differentiate, 3. square
+        prev = bp[0] if self._last_bp is None else self._last_bp
+        diff = np.diff(bp, prepend=prev)
+        self._last_bp = bp[-1]
+        sq = np.concatenate((self._sq_tail, diff * diff))
+        # 4. Causal moving-window integration via cumulative sums
+        csum = np.concatenate(([0.0], np.cumsum(sq)))
+        n_tail = self._sq_tail.size
+        ends = np.arange(n_tail + 1, n_tail + k + 1)
+        starts = np.maximum(0, ends - self.window)
+        mwa = (csum[ends] - csum[starts]) / self.window
+        self._sq_tail = sq[-(self.window - 1):] if self.window > 1 else np.zeros(0)
+        
+        # 5. Local maxima of the MWI (one sample of look-ahead, so carry a tail)
+        ext = np.concatenate((self._mwa_tail, mwa))
+        ext_base = base - self._mwa_tail.size
+        if ext.size >= 3:
+            mid = ext[1:-1]
+            peaks = np.flatnonzero((mid > ext[:-2]) & (mid >= ext[2:])) + 1
+        else:
+            peaks = np.zeros(0, dtype=np.int64)
+        self._mwa_tail = ext[-2:]
+        
+        # Learning statistics cover exactly the first learning_samples MWI samples
+        learn_end = self.start_index + self.learning_samples
+        if self.spki is None and base < learn_end:
+            part = mwa[:learn_end - base]
+            self._learn_max = max(self._learn_max, float(part.max()))
+            self._learn_sum += float(part.sum())
+            self._learn_count += part.size
+        
+        self.processed = base + k
+        new_r = []
+        for p in peaks:
+            idx = int(ext_base + p)
+            if self.spki is None:
+                if idx < learn_end:
+                    self._learning.append((idx, float(ext[p])))
+                    continue
+                self._finish_learning(new_r)
+            self._check_search_back(idx, new_r)
+            self._classify(idx, float(ext[p]), new_r)
+        self._raw = self._raw[-self.history_len:]
+        return np.asarray(new_r, dtype=np.int64)
+    
+    def _finish_learning(self, new_r):
+        self.spki = self._learn_max / 3.0
+        self.npki = (self._learn_sum / max(1, self._learn_count)) / 2.0
+        pending, self._learning = self._learning, []
+        for idx, val in pending:
+            self._classify(idx, val, new_r)
+    
+    def _classify(self, idx, val, new_r):
+        last = self._last_peak_idx
+        if last is not None and idx - last < self.refractory:
+            return
+        if val >= self.threshold:
+            # T-wave rejection: a weak peak shortly after a QRS
+            if last is not None and idx - last < self.t_wave_window and val < 0.5 * self._last_peak_val:
+                self.npki = 0.125 * val + 0.875 * self.npki
+                return
+            self.spki = 0.125 * val + 0.875 * self.spki
+            self._accept(idx, val, new_r)
+        else:
+            self.npki = 0.125 * val + 0.875 * self.npki
+            self._noise_peaks.append((idx, val))
+    
+    def _check_search_back(self, now, new_r):
+        """Promote the strongest missed candidate when no QRS for 1.66 x mean RR."""
+        if self._last_peak_idx is None or not self.rr_intervals or not self._noise_peaks:
+            return
+        recent = list(self.rr_intervals)[-8:]
+        if now - self._last_peak_idx <= 1.66 * (sum(recent) / len(recent)):
+            return
+        half = 0.5 * self.threshold
+        candidates = [(v, i) for i, v in self._noise_peaks
+                      if v >= half and i - self._last_peak_idx >= self.refractory]
+        if not candidates:
+            return
+        val, idx = max(candidates)
+        self.spki = 0.25 * val + 0.75 * self.spki
+        self._accept(idx, val, new_r)
+    
+    def _accept(self, idx, val, new_r):
+        self._last_peak_idx = idx
+        self._last_peak_val = val
+        self._noise_peaks = []
+        r = self._locate_r(idx)
+        if self.r_peaks:
+            if r - self.r_peaks[-1] < self.refractory:
+                return
+            self.rr_intervals.append(r - self.r_peaks[-1])
+        self.r_peaks.append(r)
+        new_r.append(r)
+    
+    def _locate_r(self, mwa_idx):
+        """R peak = largest deflection of the raw lead in the 250 ms before the MWI peak."""
+        raw_start = self.processed - self._raw.size
+        lo = max(mwa_idx - self.search_back, raw_start)
+        hi = min(mwa_idx + 1, self.processed)
+        if hi <= lo:
+            return max(self.start_index, mwa_idx - self.window // 2)
+        seg = self._raw[lo - raw_start:hi - raw_start]
+        return int(lo + np.argmax(np.abs(seg - np.median(seg))))
+    
+    def peaks_since(self, index):
+        """Retained R peaks with absolute index >= `index`."""
+        peaks = np.fromiter(self.r_peaks, dtype=np.int64, count=len(self.r_peaks))
+        return peaks[peaks >= index]
+    
+    def rr_intervals_ms(self):
+        """Running RR series in milliseconds."""
+        return np.asarray(self.rr_intervals, dtype=float) * (1000.0 / self.fs)
+    
+    def heart_rate(self, n_beats=8):
+        """BPM from the median of the last `n_beats` RR intervals (0 when unknown)."""
+        rr = self.rr_intervals_ms()[-n_beats:]
+        rr = rr[(rr >= 200) & (rr <= 6000)]
+        if rr.size == 0:
+            return 0
+        return int(round(60000.0 / np.median(rr)))
+
+
+def pan_tompkins_online(ecg, fs=500, chunk_size=None):
+    """
+    Run StreamingPanTompkins over a whole record (optionally in chunks).
+    Args:
+        ecg: 1D numpy array of ECG signal
+        fs: Sampling frequency (Hz)
+        chunk_size: Samples per process() call (None = one call)
+    Returns:
+        r_peaks: Indices of detected R peaks
+    """
+    detector = StreamingPanTompkins(fs=fs, max_peaks=max(512, len(ecg)))
+    ecg = np.asarray(ecg, dtype=float)
+    step = len(ecg) if not chunk_size else int(chunk_size)
+    peaks = [detector.process(ecg[i:i + step]) for i in range(0, len(ecg), max(1, step))]
+    return np.concatenate(peaks) if peaks else np.zeros(0, dtype=np.int64)
@@ -0,0 +1,486 @@
+"""
+Offline Replay and Benchmark Harness
+
+Drives recorded data through the real acquisition -> metrics -> report code
+without hardware or Qt, so hot-path regressions show up on a plain Linux box:
+
+- sources: raw packet byte streams (.bin/.raw), stored captures
+  (reports/ecg_data/*.json / *.ecgb), CSV exports with lead columns
+  (dummycsv.csv) and ADC text dumps (adc_data_raw.txt, 8 columns per row as
+  in parse_adc_data.py). Everything but raw bytes is re-encoded into device
+  packets (packet_decoder.encode_packets).
+- FakeSerialPort hands the bytes to SerialStreamReader chunk by chunk, just
+  like the driver does for the acquisition thread.
+- ReplayPipeline runs the same stages as ECGTestPage on each chunk: decode
+  (read_block), buffer (CircularLeadBuffer), filter (streaming AC chain +
+  2 s baseline), QRS (StreamingPanTompkins), rhythm (beat-by-beat engine);
+  live metrics (measure_all through the AnalysisCache) and window arrhythmia
+  detection (PQRSTAnalyzer + ArrhythmiaDetector on Lead II) run on the
+  stream-time cadence of their GUI timers.
+- At the end it optionally generates the PDF report from the replayed data.
+
+Per-stage latency percentiles, throughput (samples/sec) and peak RSS are
+printed (and optionally written as JSON).
+
+Usage (from the src directory):
+    python -m ecg.replay_harness ../dummycsv.csv --repeat 20
+    python -m ecg.replay_harness ../reports/ecg_data/ecg_data_20251212_174825.json --report /tmp/replay.pdf
+    python -m ecg.replay_harness ../adc_data_raw.txt --fs 500 --repeat 50 --chunk 512 --json replay.json
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .analysis_cache import AnalysisCache
+from .analysis_worker import LeadSnapshot, compute_live_metrics
+from .arrhythmia_detector import ArrhythmiaDetector
+from .ecg_capture import is_capture_file, load_capture_as_dict, write_capture
+from .ecg_filters import StreamingFilterChain, StreamingMovingAverage
+from .lead_buffer import CircularLeadBuffer
+from .packet_decoder import DECODED_LEAD_ORDER, LEAD_NAMES_DIRECT, encode_packets
+from .pan_tompkins import StreamingPanTompkins
+from .pqrst_analyzer import PQRSTAnalyzer
+from .rhythm_engine import StreamingRhythmEngine, measure_beat
+from .serial_acquisition import SerialStreamReader
+
+from utils.perf_stats import get_perf_stats
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+STAGES = ('decode', 'buffer', 'filter', 'qrs', 'rhythm', 'metrics', 'arrhythmia', 'report')
+HISTORY_LENGTH = 10000          # same history as ECGTestPage
+ADC_MAX = 4095
+ADC_MIDSCALE = 2048
+
+
+# ------------------------------------------------------------------ sources
+
+class FakeSerialPort:
+    """
+    Stands in for serial.Serial: serves a recorded byte stream in fixed chunks.
+
+    in_waiting reports at most one chunk so each read_block() call sees what
+    the driver would typically hold between two reads.
+    """
+
+    def __init__(self, stream: bytes, chunk_size: int = 512):
+        self._stream = bytes(stream)
+        self.chunk_size = max(1, int(chunk_size))
+        self._pos = 0
+        self.is_open = True
+
+    @property
+    def in_waiting(self) -> int:
+        return min(self.chunk_size, len(self._stream) - self._pos)
+
+    @property
+    def exhausted(self) -> bool:
+        return self._pos >= len(self._stream)
+
+    def read(self, size: int = 1) -> bytes:
+        n = min(int(size), self.chunk_size, len(self._stream) - self._pos)
+        chunk = self._stream[self._pos:self._pos + n]
+        self._pos += n
+        return chunk
+
+    def reset_input_buffer(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.is_open = False
+
+
+def _direct_leads_to_adc(direct: np.ndarray) -> np.ndarray:
+    """Fit (n x 8) direct-lead values into the 12-bit packet range (centred data is shifted to mid-scale)."""
+    direct = np.asarray(direct, dtype=float)
+    if direct.size and np.nanmin(direct) < 0:
+        direct = direct + ADC_MIDSCALE
+    return np.clip(np.nan_to_num(np.rint(direct)), 0, ADC_MAX).astype(np.int64)
+
+
+def _direct_from_named(leads: Dict[str, object]) -> np.ndarray:
+    """(n x 8) direct leads (I, II, V1..V6) from a {lead: samples} mapping; missing leads are mid-scale."""
+    series = [np.asarray(leads[name], dtype=float).ravel() for name in LEAD_NAMES_DIRECT if name in leads]
+    n = min(len(s) for s in series) if series else 0
+    direct = np.full((n, len(LEAD_NAMES_DIRECT)), float(ADC_MIDSCALE))
+    for col, name in enumerate(LEAD_NAMES_DIRECT):
+        if name in leads:
+            direct[:, col] = np.asarray(leads[name], dtype=float).ravel()[:n]
+    return direct
+
+
+def _read_csv_leads(path: str) -> Dict[str, np.ndarray]:
+    with open(path, 'r', newline='') as f:
+        text = f.read()
+    dialect = csv.Sniffer().sniff(text[:2048], delimiters=",\t;")
+    rows = list(csv.reader(io.StringIO(text), dialect))
+    header = [h.strip() for h in rows[0]]
+    columns = {name: i for i, name in enumerate(header) if name in DECODED_LEAD_ORDER}
+    if not columns:
+        raise ValueError(f"no lead columns ({', '.join(LEAD_NAMES_DIRECT)}) in CSV header")
+    values = np.array([[float(row[i]) for i in columns.values()] for row in rows[1:]
+                       if len(row) >= len(header)], dtype=float)
+    return {name: values[:, j] for j, name in enumerate(columns)}
+
+
+def _read_adc_text(path: str) -> np.ndarray:
+    """Rows of >= 8 integers (parse_adc_data.py format), taken as the 8 direct channels in packet order."""
+    rows = []
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('$') or line.startswith('----'):
+                continue
+            numbers = re.findall(r'-?\d+', line)
+            if len(numbers) >= len(LEAD_NAMES_DIRECT):
+                rows.append([int(n) for n in numbers[:len(LEAD_NAMES_DIRECT)]])
+    return np.asarray(rows, dtype=float).reshape(-1, len(LEAD_NAMES_DIRECT))
+
+
+def load_source(path: str, fs: Optional[float] = None, repeat: int = 1) -> Tuple[bytes, float]:
+    """
+    Packet byte stream and sampling rate for a recorded source.
+
+    Args:
+        path: .bin/.raw byte dump, capture (.json/.ecgb), .csv with lead columns, or ADC .txt dump
+        fs: Sampling rate for sources that do not carry one (default 500 Hz)
+        repeat: Concatenate the recording this many times (short files)
+
+    Returns:
+        (stream bytes, fs)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.bin', '.raw'):
+        with open(path, 'rb') as f:
+            return f.read() * max(1, repeat), float(fs or 500.0)
+    if is_capture_file(path) or ext == '.json':
+        if is_capture_file(path):
+            data = load_capture_as_dict(path)
+        else:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        direct = _direct_from_named(data.get('leads', {}))
+        fs = float(fs or data.get('sampling_rate') or 500.0)
+    elif ext == '.csv':
+        direct = _direct_from_named(_read_csv_leads(path))
+        fs = float(fs or 500.0)
+    else:
+        direct = _read_adc_text(path)
+        fs = float(fs or 500.0)
+    if len(direct) == 0:
+        raise ValueError(f"no samples in {path}")
+    direct = np.tile(_direct_leads_to_adc(direct), (max(1, repeat), 1))
+    return encode_packets(direct), fs
+
+
+# ------------------------------------------------------------------ pipeline
+
+class _StageTimer:
+    """Per-call durations (seconds) for each pipeline stage."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[name].append(time.perf_counter() - t0)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for name, values in self.samples.items():
+            if not values:
+                continue
+            ms = np.asarray(values) * 1000.0
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            result[name] = {
+                'calls': int(len(ms)),
+                'total_ms': float(ms.sum()),
+                'mean_ms': float(ms.mean()),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(ms.max()),
+            }
+        return result
+
+
+class _ReplaySampler:
+    """Fixed-rate stand-in for ECGTestPage.sampler (read by the report generator)."""
+
+    def __init__(self, sampling_rate: float):
+        self.sampling_rate = float(sampling_rate)
+
+
+class ReplayPipeline:
+    """
+    ECGTestPage's per-chunk processing without Qt.
+
+    Exposes the attributes the report generator reads from an ECG test page
+    (data, sampler, rhythm_timeline), so it can be passed as ecg_test_page.
+    """
+
+    def __init__(self, fs: float, ac_filter: str = "50", metrics_interval_s: float = 0.5,
+                 arrhythmia_interval_s: float = 2.0, arrhythmia_window_s: float = 10.0):
+        """
+        Args:
+            fs: Sampling rate of the replayed stream (Hz)
+            ac_filter: AC notch setting for the display filter chain ("off", "50", "60")
+            metrics_interval_s: Stream time between live-metrics runs (the 500 ms metrics timer)
+            arrhythmia_interval_s: Stream time between window arrhythmia runs (expanded view cadence)
+            arrhythmia_window_s: Lead II window handed to the arrhythmia detector
+        """
+        self.fs = float(fs)
+        self.sampler = _ReplaySampler(fs)
+        self.data = CircularLeadBuffer(n_leads=len(DECODED_LEAD_ORDER), capacity=HISTORY_LENGTH)
+        self.display_data = CircularLeadBuffer(n_leads=len(DECODED_LEAD_ORDER), capacity=HISTORY_LENGTH)
+        self.display_filter_chain = StreamingFilterChain(n_channels=len(DECODED_LEAD_ORDER))
+        self.display_filter_chain.configure(round(fs), ac_filter=ac_filter)
+        self.baseline = StreamingMovingAverage(max(10, int(2.0 * fs)), n_channels=len(DECODED_LEAD_ORDER))
+        self.qrs_detector = StreamingPanTompkins(fs=fs, start_index=0)
+        self.rhythm_engine = StreamingRhythmEngine(fs)
+        self.rhythm_timeline = self.rhythm_engine.timeline
+        self.analysis_cache = AnalysisCache(max_entries=64)
+        self.analyzer = PQRSTAnalyzer(sampling_rate=fs)
+        self.arrhythmia_detector = ArrhythmiaDetector(sampling_rate=fs)
+        self.metrics_every = max(1, int(round(metrics_interval_s * fs)))
+        self.arrhythmia_every = max(1, int(round(arrhythmia_interval_s * fs)))
+        self.arrhythmia_window = max(1, int(round(arrhythmia_window_s * fs)))
+        self._next_metrics = self.metrics_every
+        self._next_arrhythmia = self.arrhythmia_every
+        self.timer = _StageTimer()
+        self.latest_metrics = None
+        self.latest_arrhythmias: List[str] = []
+        self.metrics_runs = 0
+
+    def process_block(self, block: np.ndarray) -> None:
+        """Run every streaming stage on one decoded (12 x k) block."""
+        timer = self.timer
+        with timer.stage('buffer'):
+            self.data.extend(block)
+        with timer.stage('filter'):
+            self.display_data.extend(self.display_filter_chain.process(block))
+            self.baseline.update(block)
+        with timer.stage('qrs'):
+            self.qrs_detector.process(block[1])
+        with timer.stage('rhythm'):
+            self._feed_rhythm_engine()
+        total = self.data.total_written
+        if total >= self._next_metrics:
+            self._next_metrics = total + self.metrics_every
+            with timer.stage('metrics'):
+                self._run_metrics()
+        if total >= self._next_arrhythmia:
+            self._next_arrhythmia = total + self.arrhythmia_every
+            with timer.stage('arrhythmia'):
+                self._run_arrhythmia()
+
+    def _feed_rhythm_engine(self) -> None:
+        """Same hand-off as ECGTestPage._update_rhythm_engine."""
+        engine, fs = self.rhythm_engine, self.fs
+        total = self.data.total_written
+        start = 0 if engine.last_r is None else engine.last_r + 1
+        peaks = self.qrs_detector.peaks_since(start)
+        peaks = peaks[peaks < total - int(0.1 * fs)]
+        if len(peaks):
+            window_start = total - self.data.filled
+            lead_ii = self.data.latest(lead=1)
+            prev_r = engine.last_r
+            for r in peaks:
+                prev_rel = None if prev_r is None or prev_r < window_start else prev_r - window_start
+                qrs_ms, has_p, pr_ms, extra_p = measure_beat(lead_ii, int(r) - window_start, fs, prev_rel)
+                engine.add_beat(int(r), qrs_ms=qrs_ms, has_p=has_p, pr_ms=pr_ms, extra_p_waves=extra_p)
+                prev_r = int(r)
+        engine.tick(total)
+
+    def _live_r_peaks(self) -> np.ndarray:
+        window_start = self.data.total_written - self.data.filled
+        return self.qrs_detector.peaks_since(window_start) - window_start
+
+    def _run_metrics(self) -> None:
+        snapshot = LeadSnapshot.from_buffer(self.data)
+        with contextlib.redirect_stdout(io.StringIO()):
+            metrics = compute_live_metrics(snapshot, self.fs, self.analysis_cache,
+                                           live_r_peaks=self._live_r_peaks())
+        self.metrics_runs += 1
+        if metrics is not None:
+            self.latest_metrics = metrics
+
+    def _run_arrhythmia(self) -> None:
+        window = np.asarray(self.data.latest(self.arrhythmia_window, lead=1), dtype=float)
+        if len(window) < int(2.0 * self.fs):
+            return
+        with contextlib.redirect_stdout(io.StringIO()):
+            analysis = self.analyzer.analyze_signal(window)
+            self.latest_arrhythmias = self.arrhythmia_detector.detect_arrhythmias(
+                window, analysis, has_received_serial_data=True)
+
+    def report_metrics(self) -> Dict[str, object]:
+        """Metrics dict in the shape generate_ecg_report() expects."""
+        m = self.latest_metrics
+        if m is None:
+            return None
+        return {
+            "HR": m.heart_rate, "HR_bpm": m.heart_rate, "Heart_Rate": m.heart_rate,
+            "PR": m.pr_ms, "QRS": m.qrs_ms, "QT": m.qt_ms or 0, "QTc": m.qtc_ms,
+            "QTc_Fridericia": m.qtcf_ms, "ST": m.st_mv or 0, "QRS_axis": m.qrs_axis if m.qrs_axis is not None else "--",
+            "RV5": m.rv5_mv, "SV1": m.sv1_mv, "HR_avg": m.heart_rate, "HR_max": m.heart_rate, "HR_min": m.heart_rate,
+        }
+
+    def generate_report(self, filename: str) -> Optional[str]:
+        """
+        Write the ECG PDF report for the replayed data (report stage).
+
+        The buffer is saved as a capture in a temporary directory and handed to
+        generate_ecg_report() as ecg_data_file, so reports/ecg_data is untouched.
+
+        Returns:
+            filename, or None when the report generator cannot be loaded here
+        """
+        try:
+            from .ecg_report_generator import generate_ecg_report
+        except ImportError as e:
+            print(f"⚠️ Report stage skipped (report generator unavailable: {e})")
+            return None
+        with tempfile.TemporaryDirectory() as tmp:
+            capture = write_capture(os.path.join(tmp, 'replay.ecgb'), self.data.snapshot(), self.fs,
+                                    lead_names=list(DECODED_LEAD_ORDER))
+            with self.timer.stage('report'), contextlib.redirect_stdout(io.StringIO()):
+                generate_ecg_report(filename, data=self.report_metrics(), ecg_test_page=self,
+                                    ecg_data_file=capture)
+        return filename
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+# ------------------------------------------------------------------ driver
+
+def run_replay(path: str, fs: Optional[float] = None, repeat: int = 1, chunk_size: int = 512,
+               ac_filter: str = "50", report_path: Optional[str] = None) -> Dict[str, object]:
+    """
+    Replay one recording through SerialStreamReader and the analysis pipeline.
+
+    Args:
+        path: Recording (see load_source)
+        fs: Sampling rate override
+        repeat: Loop the recording this many times
+        chunk_size: Bytes handed out per serial read
+        ac_filter: AC notch setting for the filter stage
+        report_path: Also generate the PDF report here
+
+    Returns:
+        dict with sample counts, throughput, per-stage latency stats and peak RSS
+    """
+    stream, fs = load_source(path, fs=fs, repeat=repeat)
+    port = FakeSerialPort(stream, chunk_size=chunk_size)
+    with contextlib.redirect_stdout(io.StringIO()):
+        reader = SerialStreamReader(port=f"replay:{os.path.basename(path)}", baudrate=0, serial_port=port)
+        reader.start()
+    pipeline = ReplayPipeline(fs, ac_filter=ac_filter)
+    timer = pipeline.timer
+
+    t_start = time.perf_counter()
+    while not port.exhausted and reader.running:
+        with timer.stage('decode'):
+            block = reader.read_block()
+        if block.shape[1]:
+            pipeline.process_block(block)
+    pipeline_s = time.perf_counter() - t_start
+
+    report_file = pipeline.generate_report(report_path) if report_path else None
+    samples = pipeline.data.total_written
+    return {
+        'source': path,
+        'fs': fs,
+        'bytes': len(stream),
+        'samples': samples,
+        'stream_s': samples / fs if fs else 0.0,
+        'pipeline_s': pipeline_s,
+        'samples_per_s': samples / pipeline_s if pipeline_s > 0 else 0.0,
+        'realtime_factor': (samples / fs) / pipeline_s if pipeline_s > 0 and fs else 0.0,
+        'decode_errors': reader.error_count,
+        'beats': pipeline.rhythm_engine.beats,
+        'metrics_runs': pipeline.metrics_runs,
+        'heart_rate': pipeline.latest_metrics.heart_rate if pipeline.latest_metrics is not None else None,
+        'rhythm': pipeline.rhythm_engine.current_labels(),
+        'rhythm_events': pipeline.rhythm_timeline.summary(),
+        'arrhythmias': list(pipeline.latest_arrhythmias),
+        'report': report_file,
+        'stages': timer.summary(),
+        'perf_stats': get_perf_stats().summary(),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def print_report(result: Dict[str, object]) -> None:
+    print(f"📊 Replay: {os.path.basename(result['source'])} - {result['samples']} samples "
+          f"({result['stream_s']:.1f} s at {result['fs']:.1f} Hz, {result['bytes']} bytes)")
+    print(f"   throughput: {result['samples_per_s']:,.0f} samples/s "
+          f"({result['realtime_factor']:.0f}x real time), pipeline {result['pipeline_s'] * 1000:.1f} ms")
+    rss = result['peak_rss_mb']
+    print(f"   peak RSS: {rss:.1f} MB" if rss is not None else "   peak RSS: n/a")
+    print(f"   {'stage':<12}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'total ms':>11}")
+    for name, s in result['stages'].items():
+        print(f"   {name:<12}{s['calls']:>7}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}"
+              f"{s['p99_ms']:>10.3f}{s['max_ms']:>10.3f}{s['total_ms']:>11.1f}")
+    print(f"   beats: {result['beats']}, HR: {result['heart_rate']}, rhythm: {', '.join(result['rhythm']) or '--'}")
+    if result['arrhythmias']:
+        print(f"   window detector: {', '.join(result['arrhythmias'])}")
+    if result['decode_errors']:
+        print(f"⚠️ {result['decode_errors']} serial decode error(s)")
+    if result['report']:
+        print(f"📄 Report written to {result['report']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded ECG data through the acquisition/analysis pipeline")
+    parser.add_argument('sources', nargs='+', help="byte dumps, captures, CSV or ADC text files")
+    parser.add_argument('--fs', type=float, default=None, help="sampling rate for sources without one (default 500)")
+    parser.add_argument('--repeat', type=int, default=1, help="loop each recording N times")
+    parser.add_argument('--chunk', type=int, default=512, help="bytes per serial read")
+    parser.add_argument('--ac', default="50", help="AC notch setting: off / 50 / 60")
+    parser.add_argument('--report', default=None, help="generate the PDF report (single source only)")
+    parser.add_argument('--json', dest='json_path', default=None, help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for i, path in enumerate(args.sources):
+        try:
+            result = run_replay(path, fs=args.fs, repeat=args.repeat, chunk_size=args.chunk, ac_filter=args.ac,
+                                report_path=args.report if i == 0 else None)
+        except Exception as e:
+            print(f"❌ Replay of {path} failed: {e}")
+            continue
+        print_report(result)
+        results.append(result)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"💾 Results written to {args.json_path}")
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
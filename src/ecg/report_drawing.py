@@ -0,0 +1,279 @@
+"""
+ReportLab Drawing Helpers for ECG Report Panels
+
+The report generators used to add one Line shape per pair of consecutive
+samples and one per grid line - tens of thousands of shapes per PDF, each
+becoming its own stroke operator. These helpers build:
+
+- trace_polyline(): one PolyLine per lead trace
+- trace_path(): one Path per lead trace (for the master-page drawings that
+  already stroke a Path)
+- panel_grid_group(): the pink background plus minor/major grid as three
+  shapes (one Rect, one Path per line weight), cached per panel geometry and
+  shared by every lead panel and page
+- draw_page_grid(): the full-page grid behind the lead strips, built once per
+  geometry (paper speed / gain set the spacing) and placed in each PDF as a
+  Form XObject, so every page that needs it references one definition
+- add_axes_grid() / grid_tile_png(): the same grid for the Matplotlib lead
+  images, as two LineCollections instead of ~100 axvline/axhline artists,
+  and as a PNG tile rendered once per (size, DPI) into reports/cache so the
+  grid-only placeholder images are never redrawn
+
+Traces are min/max decimated to the printable resolution (REPORT_TRACE_DPI),
+so QRS peaks are kept while a 10 s lead is at most two points per printer dot
+column.
+
+Usage:
+    drawing = Drawing(460, 45)
+    drawing.add(panel_grid_group(460, 45, 1 * mm, 1 * mm, 5 * mm, 10 * mm))
+    drawing.add(trace_polyline(x_points, y_points, strokeColor=colors.black, strokeWidth=0.6))
+
+    # onPage callback
+    draw_page_grid(canvas, page_width, page_height, 1 * mm, 1 * mm, 5 * mm, 5 * mm)
+
+    # Matplotlib lead image
+    add_axes_grid(ax, 6, 2)
+    tile = grid_tile_png(6, 2, dpi=200)
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+
+import numpy as np
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Drawing, Group, Path, PolyLine, Rect
+from reportlab.lib import colors
+
+from .decimation import minmax_decimate
+
+REPORT_TRACE_DPI = 150        # Column = 0.48 pt, finer than the 0.4-0.6 pt trace stroke
+GRID_BACKGROUND_COLOR = "#ffe6e6"
+GRID_MINOR_COLOR = "#ffd1d1"
+GRID_MAJOR_COLOR = "#ffb3b3"
+
+
+def printable_columns(span_points, dpi=REPORT_TRACE_DPI):
+    """Number of printer dot columns covered by a span given in PDF points (1/72 in)."""
+    return max(1, int(np.ceil(abs(float(span_points)) / 72.0 * dpi)))
+
+
+def _decimate_for_print(x, y, dpi):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) < 2:
+        return x, y
+    return minmax_decimate(x, y, printable_columns(x[-1] - x[0], dpi))
+
+
+def trace_polyline(x, y, dpi=REPORT_TRACE_DPI, **kwargs):
+    """
+    One decimated PolyLine for a whole trace.
+
+    Args:
+        x: x coordinates in points (monotonic)
+        y: y coordinates in points
+        dpi: Printable resolution used for decimation
+        **kwargs: PolyLine properties (strokeColor, strokeWidth, ...)
+
+    Returns:
+        reportlab PolyLine
+    """
+    xd, yd = _decimate_for_print(x, y, dpi)
+    points = np.column_stack([xd, yd]).ravel().tolist()
+    return PolyLine(points, **kwargs)
+
+
+def trace_path(x, y, dpi=REPORT_TRACE_DPI, **kwargs):
+    """
+    One decimated Path (moveTo + lineTo...) for a whole trace.
+
+    Args:
+        x: x coordinates in points (monotonic)
+        y: y coordinates in points
+        dpi: Printable resolution used for decimation
+        **kwargs: Path properties (strokeColor, strokeWidth, strokeLineCap, ...)
+
+    Returns:
+        reportlab Path
+    """
+    xd, yd = _decimate_for_print(x, y, dpi)
+    points = np.column_stack([xd, yd]).ravel().tolist()
+    operators = [0] + [1] * (len(xd) - 1) if len(xd) else []  # 0 = moveTo, 1 = lineTo
+    kwargs.setdefault('fillColor', None)
+    return Path(points=points, operators=operators, **kwargs)
+
+
+def _grid_path(width, height, spacing_x, spacing_y, color, stroke_width, row_end=None):
+    """
+    All vertical and horizontal lines of one grid weight as a single Path.
+
+    Vertical lines cover x in [0, width]; horizontal lines run to row_end
+    (default: width).
+    """
+    path = Path(fillColor=None, strokeColor=colors.HexColor(color), strokeWidth=stroke_width)
+    for x_pos in np.arange(0.0, width + 1e-6, spacing_x):
+        path.moveTo(x_pos, 0)
+        path.lineTo(x_pos, height)
+    for y_pos in np.arange(0.0, height + 1e-6, spacing_y):
+        path.moveTo(0, y_pos)
+        path.lineTo(width if row_end is None else row_end, y_pos)
+    return path
+
+
+@lru_cache(maxsize=32)
+def panel_grid_group(width, height, minor_x, minor_y, major_x, major_y,
+                     minor_width=0.4, major_width=0.8):
+    """
+    Pink background + minor/major ECG grid for one lead panel (cached).
+
+    The same Group instance is returned for the same geometry, so every lead
+    panel on every page shares it. Treat it as read-only.
+
+    Args:
+        width, height: Panel size in points
+        minor_x, minor_y: Minor grid spacing in points
+        major_x, major_y: Major grid spacing in points
+        minor_width, major_width: Grid line widths
+
+    Returns:
+        reportlab Group
+    """
+    return Group(
+        Rect(0, 0, width, height, fillColor=colors.HexColor(GRID_BACKGROUND_COLOR), strokeColor=None),
+        _grid_path(width, height, minor_x, minor_y, GRID_MINOR_COLOR, minor_width),
+        _grid_path(width, height, major_x, major_y, GRID_MAJOR_COLOR, major_width),
+    )
+
+
+@lru_cache(maxsize=16)
+def grid_lines_group(width, height, minor_x, minor_y, major_x, major_y, minor_color=GRID_MINOR_COLOR,
+                     major_color=GRID_MAJOR_COLOR, minor_width=0.4, major_width=0.8):
+    """
+    Minor/major grid without a background (cached), drawn from the origin.
+
+    Place it with a translating Group, e.g. Group(grid, transform=(1, 0, 0, 1, x, y)).
+    """
+    return Group(
+        _grid_path(width, height, minor_x, minor_y, minor_color, minor_width),
+        _grid_path(width, height, major_x, major_y, major_color, major_width),
+    )
+
+
+@lru_cache(maxsize=16)
+def page_grid_drawing(page_width, page_height, minor_x, minor_y, major_x, major_y,
+                      minor_width=0.6, major_width=1.2, x_limit=None, major_row_end=None):
+    """
+    Full-page pink background + grid as one Drawing (cached per geometry).
+
+    Args:
+        page_width, page_height: Page size in points
+        minor_x, minor_y: Minor spacing in points
+        major_x, major_y: Major spacing in points
+        minor_width, major_width: Line widths
+        x_limit: Last x for vertical lines (default: page width)
+        major_row_end: Right end of the major horizontal lines (default: page width)
+
+    Returns:
+        reportlab Drawing
+    """
+    columns = page_width if x_limit is None else x_limit
+    drawing = Drawing(page_width, page_height)
+    drawing.add(Rect(0, 0, page_width, page_height, fillColor=colors.HexColor(GRID_BACKGROUND_COLOR), strokeColor=None))
+    drawing.add(_grid_path(columns, page_height, minor_x, minor_y, GRID_MINOR_COLOR, minor_width, row_end=page_width))
+    drawing.add(_grid_path(columns, page_height, major_x, major_y, GRID_MAJOR_COLOR, major_width,
+                           row_end=page_width if major_row_end is None else major_row_end))
+    return drawing
+
+
+def draw_page_grid(canvas, page_width, page_height, minor_x, minor_y, major_x, major_y, **kwargs):
+    """
+    Paint the full-page grid on a canvas through a Form XObject.
+
+    The form is defined the first time a document needs this geometry and
+    every later page only references it.
+
+    Args:
+        canvas: reportlab Canvas (e.g. inside an onPage callback)
+        page_width ... major_y, **kwargs: See page_grid_drawing()
+    """
+    key = (round(page_width, 3), round(page_height, 3), round(minor_x, 4), round(minor_y, 4),
+           round(major_x, 4), round(major_y, 4), tuple(sorted(kwargs.items())))
+    name = "ecgGrid" + hashlib.md5(repr(key).encode()).hexdigest()[:12]
+    if not canvas.hasForm(name):
+        canvas.beginForm(name, lowerx=0, lowery=0, upperx=page_width, uppery=page_height)
+        renderPDF.draw(page_grid_drawing(page_width, page_height, minor_x, minor_y, major_x, major_y, **kwargs),
+                       canvas, 0, 0)
+        canvas.endForm()
+    canvas.doForm(name)
+
+
+# ------------------------------------------------------------------ Matplotlib lead images
+
+@lru_cache(maxsize=16)
+def _axes_grid_segments(width, height, divisions_x, divisions_y):
+    xs = np.arange(divisions_x + 1) * (width / divisions_x)
+    ys = np.arange(divisions_y + 1) * (height / divisions_y)
+    vertical = [((x, 0.0), (x, height)) for x in xs]
+    horizontal = [((0.0, y), (width, y)) for y in ys]
+    return tuple(vertical + horizontal)
+
+
+def add_axes_grid(ax, width, height):
+    """
+    Pink minor (60 x 20) and major (12 x 4) grid on a Matplotlib axes spanning [0, width] x [0, height].
+
+    Two LineCollections with the styling the report images always used
+    (minor #ffd1d1 0.6 px, major #ffb3b3 1.0 px).
+    """
+    from matplotlib.collections import LineCollection
+    ax.add_collection(LineCollection(_axes_grid_segments(width, height, 60, 20),
+                                     colors=GRID_MINOR_COLOR, linewidths=0.6, alpha=0.8))
+    ax.add_collection(LineCollection(_axes_grid_segments(width, height, 12, 4),
+                                     colors=GRID_MAJOR_COLOR, linewidths=1.0, alpha=0.9))
+
+
+def default_tile_dir():
+    """<repo>/reports/cache/grid_tiles"""
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    return os.path.join(base_dir, 'reports', 'cache', 'grid_tiles')
+
+
+def grid_tile_png(width=6, height=2, dpi=200, cache_dir=None):
+    """
+    Grid-only lead image as a PNG tile on disk, rendered once per (size, DPI).
+
+    Args:
+        width, height: Figure size in inches
+        dpi: Output resolution
+        cache_dir: Tile directory (default: reports/cache/grid_tiles)
+
+    Returns:
+        Path of the PNG
+    """
+    cache_dir = cache_dir or default_tile_dir()
+    path = os.path.join(cache_dir, f"grid_{width:g}x{height:g}_{int(dpi)}dpi.png")
+    if os.path.exists(path):
+        return path
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fig, ax = plt.subplots(figsize=(width, height), facecolor=GRID_BACKGROUND_COLOR, frameon=True)
+    ax.set_facecolor(GRID_BACKGROUND_COLOR)
+    add_axes_grid(ax, width, height)
+    ax.set_xlim(0, width)
+    ax.set_ylim(0, height)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    # Unique temp name: report workers may render the same tile at the same time
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fig.savefig(tmp_path, dpi=dpi, bbox_inches='tight', pad_inches=0.05,
+                facecolor=GRID_BACKGROUND_COLOR, edgecolor='none', format='png')
+    plt.close(fig)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,669 @@
+"""
+Report Job Service (PDF rendering in a process pool)
+
+generate_ecg_report / generate_hrv_ecg_report / generate_hyperkalemia_ecg_report
+used to run on the GUI thread, Matplotlib Agg rendering of the lead panels and
+reportlab layout included, so the window froze for the whole report.
+
+This module moves that work into worker processes:
+
+- The GUI side archives the capture once (save_ecg_data_to_file, the same
+  reports/ecg_data/*.ecgb the generators already write) and serialises the
+  metrics, patient details and the few ECGTestPage values the generators
+  read (sampling rate, demo flag, median-beat axes, rhythm timeline summary)
+  into a small JSON job file per report.
+- ReportJobService runs the jobs in a ProcessPoolExecutor. Each worker
+  loads the job, memory-maps the capture and calls the generator with a
+  ReportContext standing in for ECGTestPage (like the _DummyECGPage the
+  hyperkalemia flow already uses).
+- For the 12-lead report the "last 10 seconds" lead panels are rendered as
+  12 separate pool tasks before the PDF job is queued.
+- Several reports for the same capture (ECG + HRV + hyperkalemia) run
+  concurrently; progress and completion are posted back to the GUI thread
+  through a Qt signal. Without Qt (headless use) callbacks run on the pool's
+  callback thread.
+
+Usage:
+    service = get_report_job_service()
+    jobs = create_report_jobs(ecg_test_page, {'ecg': 'report.pdf', 'hrv': 'report_HRV.pdf'},
+                              metrics=ecg_data, patient=patient)
+    service.submit(jobs, on_progress=lambda ev: print(ev['done'], ev['total']),
+                   on_done=lambda result: print(result['filename'], result['ok']))
+
+    python -m ecg.report_jobs ../reports/ecg_data/ecg_data_20241119_143022.ecgb --kinds ecg hrv hyperkalemia
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from utils.perf_stats import get_perf_stats
+
+from .ecg_capture import load_capture_as_dict
+
+try:
+    from PyQt5.QtCore import QObject, pyqtSignal
+except ImportError:  # headless use (CLI, replay harness)
+    QObject = None
+
+REPORT_KINDS = ('ecg', 'hrv', 'hyperkalemia')
+LEAD_NAMES = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
+PANEL_SECONDS = 10.0
+
+
+def default_job_dir() -> str:
+    """<repo>/reports/jobs"""
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    return os.path.join(base_dir, 'reports', 'jobs')
+
+
+def _panel_dir(job) -> str:
+    return os.path.join(os.path.dirname(job.job_path or default_job_dir()), f"{job.job_id}_panels")
+
+
+def _discard_job_files(job) -> None:
+    """Remove a finished job's panel PNGs and its job file (it holds patient details and metrics)."""
+    shutil.rmtree(_panel_dir(job), ignore_errors=True)
+    if job.job_path:
+        try:
+            os.remove(job.job_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ Could not remove report job file {job.job_path}: {e}")
+
+
+def _json_default(value):
+    """numpy scalars / arrays in metrics dicts -> plain JSON values."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+@dataclass
+class ReportJob:
+    """Everything a worker process needs to produce one PDF."""
+    kind: str
+    filename: str
+    capture_path: str
+    metrics: Dict[str, object] = field(default_factory=dict)
+    patient: Dict[str, object] = field(default_factory=dict)
+    context: Dict[str, object] = field(default_factory=dict)
+    lead_images: Optional[Dict[str, str]] = None
+    render_panels: bool = False
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    job_path: Optional[str] = None
+
+    def save(self, path: Optional[str] = None) -> str:
+        """Write the job file (default: <job_dir>/<job_id>_<kind>.json) and return its path."""
+        if path is None:
+            path = self.job_path or os.path.join(default_job_dir(), f"{self.job_id}_{self.kind}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.job_path = path
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(asdict(self), f, indent=2, default=_json_default)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "ReportJob":
+        with open(path, 'r') as f:
+            job = cls(**json.load(f))
+        job.job_path = path
+        return job
+
+
+# ------------------------------------------------------------------ worker side
+
+class _Sampler:
+    def __init__(self, fs):
+        self.sampling_rate = fs
+
+
+class _Flag:
+    """Read-only stand-in for a QCheckBox."""
+
+    def __init__(self, checked):
+        self._checked = bool(checked)
+
+    def isChecked(self):
+        return self._checked
+
+
+class _TimelineSummary:
+    """RhythmTimeline stand-in exposing the summary captured on the GUI side."""
+
+    def __init__(self, summary):
+        self._summary = summary or {}
+
+    def summary(self):
+        return dict(self._summary)
+
+
+class _DemoWindow:
+    """DemoManager stand-in carrying the wave-speed window the live page had."""
+
+    def __init__(self, window):
+        self.time_window = window.get('time_window')
+        self.samples_per_second = window.get('samples_per_second', 150)
+
+
+class _CachedRPeaks:
+    """
+    WindowAnalysis stand-in serving the Lead II R-peaks cached on the live page.
+
+    Peaks are stored as distances from the newest sample, so they line up
+    with the end of the capture whatever its length.
+    """
+
+    def __init__(self, from_end):
+        self._from_end = np.asarray(from_end or [], dtype=int)
+
+    def r_peaks_in_last(self, n_samples: int) -> np.ndarray:
+        n = int(n_samples)
+        return np.sort(n - self._from_end[self._from_end <= n])
+
+
+class ReportContext:
+    """
+    The parts of ECGTestPage the report generators read, rebuilt from a job.
+
+    data holds the capture's leads in the 12-lead order; the median-beat
+    axes, RV5/SV1, demo time window and cached R-peaks are the values the
+    live page had when the job was made. ecg_buffers / ptrs / window_size
+    are not needed: they are only read to write the capture, which the job
+    already points at.
+    """
+
+    def __init__(self, leads: Dict[str, np.ndarray], fs: float, context: Optional[Dict[str, object]] = None):
+        context = context or {}
+        self.data = [np.asarray(leads.get(name, np.zeros(0)), dtype=float) for name in LEAD_NAMES]
+        self.sampler = _Sampler(fs)
+        self.demo_toggle = _Flag(context.get('demo', False))
+        self.rhythm_timeline = _TimelineSummary(context.get('rhythm_events'))
+        self._axes = context.get('axes') or {}
+        self._rv5_sv1 = context.get('rv5_sv1') or (None, None)
+        demo_window = context.get('demo_window')
+        self.demo_manager = _DemoWindow(demo_window) if demo_window else None
+        self._r_peaks = context.get('r_peaks')
+
+    def window_analysis(self, fs=None):
+        """Cached R-peaks of the live window (only r_peaks_in_last is available)."""
+        if not self._r_peaks:
+            raise LookupError("no cached R-peaks in this report job")
+        return _CachedRPeaks(self._r_peaks.get('from_end'))
+
+    def calculate_p_axis_from_median(self):
+        return self._axes.get('p')
+
+    def calculate_qrs_axis_from_median(self):
+        return self._axes.get('qrs')
+
+    def calculate_t_axis_from_median(self):
+        return self._axes.get('t')
+
+    def calculate_rv5_sv1_from_median(self):
+        return tuple(self._rv5_sv1)
+
+
+def _init_worker():
+    # Worker processes never open a window
+    os.environ['MPLBACKEND'] = 'Agg'
+
+
+def render_lead_panel(capture_path: str, lead: str, out_path: str, seconds: float = PANEL_SECONDS):
+    """
+    Render one "last 10 seconds" lead panel PNG from a capture (pool task).
+
+    Returns:
+        (lead, out_path) or (lead, None) when the lead has no samples
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    capture = load_capture_as_dict(capture_path, last_seconds=seconds)
+    recent = capture.get('leads', {}).get(lead)
+    if recent is None or len(recent) == 0:
+        return lead, None
+
+    fig, ax = plt.subplots(figsize=(8, 2))
+    time_axis = np.linspace(0, seconds, len(recent))
+    ax.plot(time_axis, recent, color='black', linewidth=0.8)
+    ax.set_xlim(0, seconds)
+    ax.set_xticks([0, 2, 4, 6, 8, 10])
+    ax.set_xticklabels(['0s', '2s', '4s', '6s', '8s', '10s'])
+    ax.set_ylabel('Amplitude (mV)')
+    ax.set_title(f'Lead {lead} - Last 10 seconds', fontsize=10, fontweight='bold')
+    ax.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
+    ax.set_axisbelow(True)
+    ax.set_facecolor('white')
+    fig.patch.set_facecolor('white')
+    fig.savefig(out_path, bbox_inches='tight', pad_inches=0.1, dpi=150, facecolor='white', edgecolor='none')
+    plt.close(fig)
+    return lead, out_path
+
+
+def _lead_ii_records(leads: Dict[str, np.ndarray], fs: float) -> List[Dict[str, float]]:
+    """Lead II as the [{'time': s, 'value': adc}] list the HRV / hyperkalemia generators take."""
+    lead_ii = np.asarray(leads.get('II', np.zeros(0)), dtype=float)
+    times = np.arange(len(lead_ii)) / float(fs)
+    return [{'time': float(t), 'value': float(v)} for t, v in zip(times, lead_ii)]
+
+
+def run_report_job(job_path: str) -> Dict[str, object]:
+    """
+    Produce the PDF described by a job file (pool task).
+
+    Returns:
+        {'job_id', 'kind', 'filename', 'ok', 'error', 'panels', 'elapsed_ms'}
+    """
+    start = time.perf_counter()
+    job = ReportJob.load(job_path)
+    result = {'job_id': job.job_id, 'kind': job.kind, 'filename': job.filename, 'ok': False, 'error': None,
+              'panels': len(job.lead_images or {})}
+    try:
+        capture = load_capture_as_dict(job.capture_path)
+        leads = capture.get('leads', {})
+        fs = float(capture.get('sampling_rate') or job.context.get('sampling_rate') or 500.0)
+
+        if job.kind == 'ecg':
+            from .ecg_report_generator import generate_ecg_report
+            output = generate_ecg_report(
+                job.filename, dict(job.metrics), job.lead_images, None,
+                ReportContext(leads, fs, job.context), dict(job.patient),
+                ecg_data_file=job.capture_path,
+            )
+        elif job.kind == 'hrv':
+            from .hrv_ecg_report_generator import generate_hrv_ecg_report
+            output = generate_hrv_ecg_report(job.filename, _lead_ii_records(leads, fs),
+                                             dict(job.metrics), dict(job.patient))
+        elif job.kind == 'hyperkalemia':
+            from .hyperkalemia_ecg_report_generator import generate_hyperkalemia_ecg_report
+            output = generate_hyperkalemia_ecg_report(job.filename, _lead_ii_records(leads, fs),
+                                                      dict(job.metrics), dict(job.patient),
+                                                      ecg_data_file=job.capture_path)
+        else:
+            raise ValueError(f"Unknown report kind '{job.kind}'")
+
+        if isinstance(output, str) and output.startswith('Error'):
+            result['error'] = output
+        elif output is None and not os.path.exists(job.filename):
+            result['error'] = "Generator produced no file"
+        else:
+            result['ok'] = True
+    except Exception as e:
+        result['error'] = str(e)
+    result['elapsed_ms'] = (time.perf_counter() - start) * 1000.0
+    return result
+
+
+# ------------------------------------------------------------------ GUI side
+
+def snapshot_report_context(ecg_test_page) -> Dict[str, object]:
+    """
+    Values the generators read from ECGTestPage beyond the samples themselves.
+
+    Args:
+        ecg_test_page: Live ECGTestPage (or None)
+
+    Returns:
+        dict with sampling_rate, demo, demo_window, axes, rv5_sv1, r_peaks and
+        rhythm_events (JSON-safe)
+    """
+    context = {'sampling_rate': None, 'demo': False, 'demo_window': None, 'axes': {}, 'rv5_sv1': None,
+               'r_peaks': None, 'rhythm_events': None}
+    if ecg_test_page is None:
+        return context
+    try:
+        if hasattr(ecg_test_page, 'sampler') and getattr(ecg_test_page.sampler, 'sampling_rate', None):
+            context['sampling_rate'] = float(ecg_test_page.sampler.sampling_rate)
+    except Exception:
+        pass
+    try:
+        if hasattr(ecg_test_page, 'demo_toggle'):
+            context['demo'] = bool(ecg_test_page.demo_toggle.isChecked())
+    except Exception:
+        pass
+    try:
+        demo_manager = getattr(ecg_test_page, 'demo_manager', None)
+        if demo_manager:
+            time_window = getattr(demo_manager, 'time_window', None)
+            context['demo_window'] = {
+                'time_window': float(time_window) if time_window is not None else None,
+                'samples_per_second': getattr(demo_manager, 'samples_per_second', 150),
+            }
+    except Exception as e:
+        print(f"⚠️ Could not read demo time window for report job: {e}")
+    try:
+        if hasattr(ecg_test_page, 'window_analysis'):
+            # Same fs the generators use; stored as distances from the newest sample
+            analysis = ecg_test_page.window_analysis(context['sampling_rate'] or 250.0)
+            r_peaks = np.asarray(analysis.r_peaks_in_last(analysis.n_samples), dtype=int)
+            context['r_peaks'] = {'from_end': (int(analysis.n_samples) - r_peaks).tolist()}
+    except Exception as e:
+        print(f"⚠️ Could not read cached R-peaks for report job: {e}")
+    for key, method in (('p', 'calculate_p_axis_from_median'),
+                        ('qrs', 'calculate_qrs_axis_from_median'),
+                        ('t', 'calculate_t_axis_from_median')):
+        try:
+            if hasattr(ecg_test_page, method):
+                value = getattr(ecg_test_page, method)()
+                context['axes'][key] = float(value) if value is not None else None
+        except Exception as e:
+            print(f"⚠️ Could not read {key.upper()} axis for report job: {e}")
+    try:
+        if hasattr(ecg_test_page, 'calculate_rv5_sv1_from_median'):
+            rv5, sv1 = ecg_test_page.calculate_rv5_sv1_from_median()
+            context['rv5_sv1'] = [float(rv5) if rv5 is not None else None,
+                                  float(sv1) if sv1 is not None else None]
+    except Exception as e:
+        print(f"⚠️ Could not read RV5/SV1 for report job: {e}")
+    try:
+        timeline = getattr(ecg_test_page, 'rhythm_timeline', None)
+        if timeline is not None:
+            context['rhythm_events'] = timeline.summary()
+    except Exception as e:
+        print(f"⚠️ Could not read rhythm timeline for report job: {e}")
+    return context
+
+
+def run_report_jobs_inline(jobs: List[ReportJob]) -> List[Dict[str, object]]:
+    """Run jobs one after another in this process (fallback when no pool can be started)."""
+    results = []
+    for job in jobs:
+        if job.render_panels:
+            panel_dir = _panel_dir(job)
+            os.makedirs(panel_dir, exist_ok=True)
+            images = {}
+            for lead in LEAD_NAMES:
+                try:
+                    _, path = render_lead_panel(job.capture_path, lead,
+                                                os.path.join(panel_dir, f"lead_{lead}_10sec.png"))
+                    if path:
+                        images[lead] = path
+                except Exception as e:
+                    print(f" ❌ Error rendering Lead {lead}: {e}")
+            job.lead_images = images
+            job.save()
+        try:
+            results.append(run_report_job(job.job_path))
+        finally:
+            _discard_job_files(job)
+    return results
+
+
+def create_report_jobs(ecg_test_page, outputs: Dict[str, str], metrics: Optional[Dict[str, object]] = None,
+                       patient: Optional[Dict[str, object]] = None, capture_path: Optional[str] = None,
+                       render_panels: bool = True, job_dir: Optional[str] = None) -> List[ReportJob]:
+    """
+    Archive the capture once and write one job file per requested report.
+
+    Args:
+        ecg_test_page: Live ECGTestPage the data comes from
+        outputs: {kind: pdf filename}, kind in REPORT_KINDS
+        metrics: Metrics dict passed to the generators
+        patient: Patient details
+        capture_path: Existing capture to reuse instead of saving the live buffers
+        render_panels: Render the 10 s lead panels for the 12-lead report in the pool
+        job_dir: Where job files and panel images go (default: reports/jobs)
+
+    Returns:
+        Saved ReportJob list (empty if the capture could not be written)
+    """
+    if capture_path is None:
+        from .ecg_report_generator import save_ecg_data_to_file
+        capture_path = save_ecg_data_to_file(ecg_test_page, patient=patient)
+    if not capture_path:
+        print("❌ No capture available for report jobs")
+        return []
+
+    job_dir = job_dir or default_job_dir()
+    context = snapshot_report_context(ecg_test_page)
+    jobs = []
+    for kind, filename in outputs.items():
+        if kind not in REPORT_KINDS:
+            print(f"⚠️ Unknown report kind '{kind}' skipped")
+            continue
+        job = ReportJob(kind=kind, filename=os.path.abspath(filename), capture_path=capture_path,
+                        metrics=dict(metrics or {}), patient=dict(patient or {}), context=context,
+                        render_panels=render_panels and kind == 'ecg')
+        job.save(os.path.join(job_dir, f"{job.job_id}_{kind}.json"))
+        jobs.append(job)
+    return jobs
+
+
+if QObject is not None:
+    class _ProgressBridge(QObject):
+        """Carries progress / completion from the pool's callback thread to the GUI thread."""
+        posted = pyqtSignal(object, object)   # callback, payload
+else:
+    _ProgressBridge = None
+
+
+class _Batch:
+    """Step counter shared by the jobs of one submit() call."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.lock = threading.Lock()
+
+    def step(self) -> int:
+        with self.lock:
+            self.done += 1
+            return self.done
+
+
+class ReportJobService:
+    """ProcessPoolExecutor running report jobs and their lead-panel renders."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or max(2, min(4, (os.cpu_count() or 2) - 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._bridge = None
+        if _ProgressBridge is not None:
+            try:
+                # Created on the GUI thread, so the queued slot runs there
+                self._bridge = _ProgressBridge()
+                self._bridge.posted.connect(self._deliver)
+            except Exception as e:
+                print(f"⚠️ Report jobs running without Qt progress bridge: {e}")
+                self._bridge = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that holds Qt / serial threads
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'),
+                                                     initializer=_init_worker)
+            return self._executor
+
+    def _post(self, callback: Optional[Callable], payload) -> None:
+        if callback is None:
+            return
+        if self._bridge is not None:
+            self._bridge.posted.emit(callback, payload)
+        else:
+            self._deliver(callback, payload)
+
+    @staticmethod
+    def _deliver(callback, payload):
+        try:
+            callback(payload)
+        except Exception as e:
+            print(f"❌ Report job callback failed: {e}")
+
+    def submit(self, jobs: List[ReportJob], on_progress: Optional[Callable] = None,
+               on_done: Optional[Callable] = None) -> None:
+        """
+        Queue a set of report jobs; they run concurrently.
+
+        Args:
+            jobs: Saved ReportJob list (create_report_jobs)
+            on_progress: Called with {'job_id', 'kind', 'stage', 'done', 'total'} after every step
+                         (each lead panel and each finished report)
+            on_done: Called with run_report_job's result dict once per job
+        """
+        total = sum(1 + (len(LEAD_NAMES) if job.render_panels else 0) for job in jobs)
+        batch = _Batch(total)
+        self.submitted += len(jobs)
+        for job in jobs:
+            if job.render_panels:
+                self._submit_panels(job, batch, on_progress, on_done)
+            else:
+                self._submit_report(job, batch, on_progress, on_done)
+
+    def _progress(self, job: ReportJob, stage: str, batch: _Batch, on_progress) -> None:
+        done = batch.step()
+        self._post(on_progress, {'job_id': job.job_id, 'kind': job.kind, 'stage': stage,
+                                 'done': done, 'total': batch.total})
+
+    def _submit_panels(self, job: ReportJob, batch: _Batch, on_progress, on_done) -> None:
+        panel_dir = _panel_dir(job)
+        os.makedirs(panel_dir, exist_ok=True)
+        images: Dict[str, str] = {}
+        remaining = [len(LEAD_NAMES)]
+        lock = threading.Lock()
+
+        def _panel_done(future, lead):
+            try:
+                _, path = future.result()
+                if path:
+                    images[lead] = path
+            except Exception as e:
+                print(f" ❌ Error rendering Lead {lead}: {e}")
+            self._progress(job, f"panel:{lead}", batch, on_progress)
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                # All panels in: the PDF job reads them from the job file
+                job.lead_images = {name: images[name] for name in LEAD_NAMES if name in images}
+                job.save()
+                self._submit_report(job, batch, on_progress, on_done)
+
+        pool = self._pool()
+        for lead in LEAD_NAMES:
+            out_path = os.path.join(panel_dir, f"lead_{lead}_10sec.png")
+            future = pool.submit(render_lead_panel, job.capture_path, lead, out_path)
+            future.add_done_callback(lambda f, lead=lead: _panel_done(f, lead))
+
+    def _submit_report(self, job: ReportJob, batch: _Batch, on_progress, on_done) -> None:
+        def _report_done(future):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'job_id': job.job_id, 'kind': job.kind, 'filename': job.filename,
+                          'ok': False, 'error': str(e), 'elapsed_ms': None}
+            # The result is all the GUI needs; panel PNGs and the job file (PHI) go now
+            _discard_job_files(job)
+            if result.get('ok'):
+                self.completed += 1
+            else:
+                self.failed += 1
+                print(f"❌ {job.kind} report failed: {result.get('error')}")
+            if result.get('elapsed_ms') is not None:
+                get_perf_stats().record(f"report.{job.kind}_ms", result['elapsed_ms'])
+            self._progress(job, 'report', batch, on_progress)
+            self._post(on_done, result)
+
+        try:
+            future = self._pool().submit(run_report_job, job.job_path)
+        except Exception as e:
+            # Pool broken / shut down: report the failure through the same path
+            future = Future()
+            future.set_exception(e)
+        future.add_done_callback(_report_done)
+
+    def run(self, jobs: List[ReportJob], timeout: Optional[float] = None) -> List[Dict[str, object]]:
+        """submit() and wait; returns the result dicts (headless / CLI use)."""
+        results = []
+        finished = threading.Event()
+
+        def _on_done(result):
+            results.append(result)
+            if len(results) == len(jobs):
+                finished.set()
+
+        if not jobs:
+            return results
+        self.submit(jobs, on_done=_on_done)
+        finished.wait(timeout)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {'workers': self.max_workers, 'submitted': self.submitted,
+                'completed': self.completed, 'failed': self.failed}
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop the pool (running jobs finish when wait=True)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_service: Optional[ReportJobService] = None
+
+
+def get_report_job_service() -> ReportJobService:
+    """Process-wide ReportJobService (create it from the GUI thread)."""
+    global _service
+    if _service is None:
+        _service = ReportJobService()
+    return _service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Render ECG / HRV / hyperkalemia PDFs for a capture in a process pool")
+    parser.add_argument('capture', help="capture file (.ecgb)")
+    parser.add_argument('--kinds', nargs='+', default=['ecg'], choices=REPORT_KINDS)
+    parser.add_argument('--out', default=None, help="output directory (default: a temporary directory)")
+    parser.add_argument('--metrics', default=None, help="JSON file with the metrics dict")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    out_dir = args.out or tempfile.mkdtemp(prefix='ecg_reports_')
+    metrics = {}
+    if args.metrics:
+        with open(args.metrics, 'r') as f:
+            metrics = json.load(f)
+    stem = os.path.splitext(os.path.basename(args.capture))[0]
+    outputs = {kind: os.path.join(out_dir, f"{stem}_{kind}.pdf") for kind in args.kinds}
+    jobs = create_report_jobs(None, outputs, metrics=metrics, capture_path=os.path.abspath(args.capture),
+                              job_dir=os.path.join(out_dir, 'jobs'))
+
+    service = ReportJobService(max_workers=args.workers)
+    start = time.perf_counter()
+    results = service.run(jobs)
+    elapsed = time.perf_counter() - start
+    service.shutdown(wait=True)
+    for result in sorted(results, key=lambda r: r['kind']):
+        status = "✅" if result['ok'] else f"❌ {result['error']}"
+        print(f"{result['kind']:<13} {result['elapsed_ms'] or 0:8.0f} ms  {result['filename']}  {status}")
+    print(f"📊 {len(results)} report(s) in {elapsed:.2f} s with {service.max_workers} worker(s)")
+    return 0 if results and all(r['ok'] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,467 @@
+"""
+Beat-by-Beat Streaming Rhythm Engine and Event Timeline
+
+Window-based detection (ArrhythmiaDetector on the whole buffer every 500 ms,
+detect_arrhythmia() on pre-aggregated intervals) re-detects the same rhythm on
+every overlapping window and cannot say when an episode started or how long
+it lasted.
+
+StreamingRhythmEngine consumes one beat at a time - R index, QRS width,
+P-wave association, PR and extra (non-conducted) P waves - and keeps a little
+state per rhythm class:
+
+- base rhythm (sinus / brady / tachy / AF / VT) from a sliding RR window,
+  switched only after the new class persists for a few beats
+- bigeminy runs (alternating short/long RR)
+- premature ventricular beats (premature + wide or no P + compensatory pause)
+- first-degree AV block (sustained PR > 200 ms) and dropped beats
+  (second-degree, Wenckebach when PR lengthened before the drop)
+- pauses (RR > 2 s) and asystole (no beat for 4 s, via tick())
+
+Each state change becomes an onset/offset RhythmEvent in a RhythmTimeline,
+which the live page, expanded view and reports read. Cost is O(1) per beat.
+
+Usage:
+    engine = StreamingRhythmEngine(fs=500)
+    for r in new_r_peaks:
+        qrs_ms, has_p, pr_ms, extra_p = measure_beat(lead_ii, r - offset, fs, prev_r - offset)
+        engine.add_beat(r, qrs_ms=qrs_ms, has_p=has_p, pr_ms=pr_ms, extra_p_waves=extra_p)
+    engine.tick(total_samples)
+    print(engine.current_labels(), engine.timeline.summary())
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.signal import find_peaks
+
+# Labels match ArrhythmiaDetector's output so the UI treats both sources alike
+NSR = "Normal Sinus Rhythm"
+SINUS_BRADY = "Sinus Bradycardia"
+SINUS_TACHY = "Sinus Tachycardia"
+AFIB = "Atrial Fibrillation Detected"
+VTACH = "Possible Ventricular Tachycardia"
+BIGEMINY = "Bigeminy"
+PVC = "Ventricular Ectopics Detected"
+AV_BLOCK_1 = "First-Degree AV Block"
+AV_BLOCK_2_TYPE_I = "Second-Degree AV Block (Type I - Wenckebach)"
+AV_BLOCK_2_TYPE_II = "Second-Degree AV Block (Type II)"
+PAUSE = "Sinus Pause"
+ASYSTOLE = "Asystole (Cardiac Arrest)"
+
+BASE_RHYTHMS = (NSR, SINUS_BRADY, SINUS_TACHY, AFIB, VTACH)
+BENIGN_LABELS = (NSR,)
+
+
+@dataclass
+class RhythmEvent:
+    """One rhythm episode; offset_* stay None while it is ongoing."""
+    label: str
+    onset_sample: int
+    onset_time: float
+    offset_sample: Optional[int] = None
+    offset_time: Optional[float] = None
+    beats: int = 0
+    detail: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def active(self) -> bool:
+        return self.offset_sample is None
+
+    def duration_s(self, now_time: Optional[float] = None) -> float:
+        """Episode length; ongoing episodes are measured up to now_time (or their onset)."""
+        end = self.offset_time if self.offset_time is not None else (now_time if now_time is not None else self.onset_time)
+        return max(0.0, end - self.onset_time)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'label': self.label,
+            'onset_sample': self.onset_sample,
+            'onset_time': round(self.onset_time, 3),
+            'offset_sample': self.offset_sample,
+            'offset_time': None if self.offset_time is None else round(self.offset_time, 3),
+            'duration_s': round(self.duration_s(), 3),
+            'beats': self.beats,
+            'detail': dict(self.detail),
+        }
+
+
+class RhythmTimeline:
+    """Bounded, thread-safe list of rhythm events (written by the engine, read by UI/reports)."""
+
+    def __init__(self, max_events: int = 2000):
+        self._events: deque = deque(maxlen=max_events)
+        self._active: Dict[str, RhythmEvent] = {}
+        self._lock = threading.Lock()
+        self.latest_time = 0.0
+
+    def open(self, label: str, sample: int, fs: float, **detail) -> RhythmEvent:
+        """Start an episode (returns the ongoing one if the label is already active)."""
+        with self._lock:
+            event = self._active.get(label)
+            if event is None:
+                event = RhythmEvent(label, int(sample), sample / fs, detail=dict(detail))
+                self._active[label] = event
+                self._events.append(event)
+            return event
+
+    def close(self, label: str, sample: int, fs: float) -> Optional[RhythmEvent]:
+        """End the active episode with this label (no-op if none)."""
+        with self._lock:
+            event = self._active.pop(label, None)
+            if event is not None:
+                event.offset_sample = int(sample)
+                event.offset_time = sample / fs
+            return event
+
+    def instant(self, label: str, onset_sample: int, offset_sample: int, fs: float, **detail) -> RhythmEvent:
+        """Record a finished episode in one go (e.g. a pause)."""
+        event = RhythmEvent(label, int(onset_sample), onset_sample / fs, int(offset_sample),
+                            offset_sample / fs, beats=1, detail=dict(detail))
+        with self._lock:
+            self._events.append(event)
+        return event
+
+    def is_active(self, label: str) -> bool:
+        with self._lock:
+            return label in self._active
+
+    def active(self) -> List[RhythmEvent]:
+        with self._lock:
+            return list(self._active.values())
+
+    def events(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> List[RhythmEvent]:
+        """Events overlapping [start_time, end_time] (seconds), oldest first."""
+        with self._lock:
+            events = list(self._events)
+        if start_time is None and end_time is None:
+            return events
+        lo = float('-inf') if start_time is None else start_time
+        hi = float('inf') if end_time is None else end_time
+        return [e for e in events
+                if e.onset_time <= hi and (e.offset_time is None or e.offset_time >= lo)]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{label: {'count', 'total_s', 'longest_s'}} over all recorded episodes."""
+        result: Dict[str, Dict[str, float]] = {}
+        for event in self.events():
+            duration = event.duration_s(self.latest_time)
+            entry = result.setdefault(event.label, {'count': 0, 'total_s': 0.0, 'longest_s': 0.0})
+            entry['count'] += 1
+            entry['total_s'] += duration
+            entry['longest_s'] = max(entry['longest_s'], duration)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._active.clear()
+            self.latest_time = 0.0
+
+
+def measure_beat(signal: np.ndarray, r: int, fs: float, prev_r: Optional[int] = None
+                 ) -> Tuple[Optional[float], Optional[bool], Optional[float], int]:
+    """
+    Per-beat QRS width, P association and PR for one R peak.
+
+    Q/S are the minima within 80 ms either side of R and P the maximum 120-200 ms
+    before R, as in PQRSTAnalyzer; a P wave counts only if it rises at least 8% of
+    the R amplitude above the local baseline. Peaks between the previous beat's
+    T wave and this P window with 0.5-2x this P's amplitude are counted as
+    non-conducted P waves.
+
+    Args:
+        signal: Lead samples (raw)
+        r: R-peak index into signal
+        fs: Sampling rate (Hz)
+        prev_r: Previous R-peak index into signal, if known
+
+    Returns:
+        (qrs_ms, has_p, pr_ms, extra_p_waves); None where not measurable
+    """
+    n = len(signal)
+    if r < 0 or r >= n:
+        return None, None, None, 0
+    w80 = max(1, int(0.08 * fs))
+    q_lo, s_hi = max(0, r - w80), min(n, r + w80 + 1)
+    if r - q_lo < 1 or s_hi - r < 2:
+        return None, None, None, 0
+    q = q_lo + int(np.argmin(signal[q_lo:r]))
+    s = r + 1 + int(np.argmin(signal[r + 1:s_hi]))
+    qrs_ms = (s - q) / fs * 1000.0
+
+    base_lo = max(0, r - int(0.35 * fs))
+    baseline = float(np.median(signal[base_lo:q + 1])) if q >= base_lo else float(signal[q])
+    r_amp = abs(float(signal[r]) - baseline)
+    p_lo, p_hi = r - int(0.20 * fs), r - int(0.12 * fs)
+    has_p, pr_ms, p_amp = None, None, 0.0
+    if p_lo >= 0 and p_hi > p_lo + 2 and r_amp > 0:
+        seg = signal[p_lo:p_hi]
+        i = int(np.argmax(seg))
+        p_amp = float(seg[i]) - baseline
+        has_p = bool(0 < i < len(seg) - 1 and p_amp >= 0.08 * r_amp)
+        if has_p and q > p_lo + i:
+            pr_ms = (q - (p_lo + i)) / fs * 1000.0
+
+    # A blocked P wave should look like this beat's conducted one (T waves and noise mostly do not)
+    extra_p = 0
+    if prev_r is not None and has_p:
+        a_lo, a_hi = prev_r + int(0.45 * fs), p_lo
+        if a_lo >= 0 and a_hi - a_lo > int(0.1 * fs):
+            peaks, props = find_peaks(signal[a_lo:a_hi] - baseline, height=(0.5 * p_amp, 2.0 * p_amp),
+                                      prominence=0.5 * p_amp, distance=max(1, int(0.2 * fs)))
+            extra_p = int(len(peaks))
+    return qrs_ms, has_p, pr_ms, extra_p
+
+
+class StreamingRhythmEngine:
+    """Incremental per-beat rhythm classifier writing onset/offset events to a RhythmTimeline."""
+
+    def __init__(self, fs: float = 500.0, timeline: Optional[RhythmTimeline] = None, rr_window: int = 16,
+                 confirm_beats: int = 4, af_confirm_beats: int = 8, asystole_s: float = 4.0):
+        """
+        Args:
+            fs: Sampling rate (Hz) of the R-peak indices
+            timeline: Timeline to write to (default: a new one)
+            rr_window: RR intervals used for rate / irregularity
+            confirm_beats: Beats a new base rhythm must persist before it is reported
+            af_confirm_beats: Same for atrial fibrillation (needs a filled RR window)
+            asystole_s: Seconds without a beat before asystole is declared (tick())
+        """
+        self.fs = float(fs)
+        self.timeline = timeline or RhythmTimeline()
+        self.rr_window = int(rr_window)
+        self.confirm_beats = int(confirm_beats)
+        self.af_confirm_beats = int(af_confirm_beats)
+        self.asystole_s = float(asystole_s)
+        self.reset(clear_timeline=False)
+
+    def reset(self, clear_timeline: bool = True) -> None:
+        """Forget beat history (and, by default, the recorded events)."""
+        if clear_timeline:
+            self.timeline.clear()
+        self._rr: deque = deque(maxlen=self.rr_window)          # ms
+        self._wide: deque = deque(maxlen=4)
+        self._has_p: deque = deque(maxlen=self.rr_window)
+        self._pr: deque = deque(maxlen=4)
+        self.last_r: Optional[int] = None
+        self.beats = 0
+        self.base_rhythm: Optional[str] = None
+        self._candidate: Optional[str] = None
+        self._candidate_count = 0
+        self._alternations = 0
+        self._non_alternations = 0
+        self._last_rr_class = 0                                 # -1 short, +1 long, 0 neither
+        self._prev_rr_onset = 0
+        self._alternation_start = 0
+        self._pending_pvc: Optional[int] = None
+        self._pvc_last: Optional[int] = None
+        self._pvc_count = 0
+        self._long_pr = 0
+        self._short_pr = 0
+        self._drop_last: Optional[int] = None
+
+    def set_sampling_rate(self, fs: float) -> None:
+        if fs and fs > 0:
+            self.fs = float(fs)
+
+    @property
+    def ready(self) -> bool:
+        """True once a base rhythm has been established."""
+        return self.base_rhythm is not None
+
+    def current_labels(self) -> List[str]:
+        """Active rhythm labels, base rhythm first."""
+        active = [e.label for e in self.timeline.active()]
+        active.sort(key=lambda label: (label not in BASE_RHYTHMS, label))
+        return active
+
+    # ------------------------------------------------------------------ input
+
+    def add_beat(self, r_sample: int, qrs_ms: Optional[float] = None, has_p: Optional[bool] = None,
+                 pr_ms: Optional[float] = None, extra_p_waves: int = 0) -> None:
+        """
+        Consume one beat.
+
+        Args:
+            r_sample: Absolute R-peak sample index (increasing)
+            qrs_ms: QRS width of this beat, if measured
+            has_p: Whether a P wave precedes this beat (None = unknown)
+            pr_ms: PR of this beat, if measured
+            extra_p_waves: Non-conducted P waves since the previous beat
+        """
+        r_sample = int(r_sample)
+        if self.last_r is not None and r_sample <= self.last_r:
+            return
+        fs = self.fs
+        self.timeline.latest_time = r_sample / fs
+        if self.timeline.is_active(ASYSTOLE):
+            self.timeline.close(ASYSTOLE, r_sample, fs)
+        self.beats += 1
+        wide = qrs_ms is not None and qrs_ms > 120
+        self._wide.append(wide)
+        if has_p is not None:
+            self._has_p.append(bool(has_p))
+
+        if self.last_r is None:
+            self.last_r = r_sample
+            return
+        prev_r = self.last_r
+        self.last_r = r_sample
+        rr = (r_sample - prev_r) / fs * 1000.0
+        if rr > 2000.0:
+            # A pause is an event of its own, not a sample of the underlying rhythm
+            self.timeline.instant(PAUSE, prev_r, r_sample, fs, rr_ms=round(rr))
+            self._pending_pvc = None
+            self._last_rr_class = 0
+            self._update_base_rhythm(r_sample)
+            for event in self.timeline.active():
+                event.beats += 1
+            return
+
+        mean_before = float(np.mean(self._rr)) if self._rr else None
+        self._update_pvc(prev_r, r_sample, rr, mean_before, wide, has_p)
+        self._update_bigeminy(prev_r, r_sample, rr, mean_before)
+        self._update_av_conduction(prev_r, r_sample, pr_ms, extra_p_waves)
+        self._rr.append(rr)
+        self._update_base_rhythm(r_sample)
+
+        for event in self.timeline.active():
+            event.beats += 1
+
+    def tick(self, now_sample: int) -> None:
+        """Advance time without a beat (declares asystole after asystole_s of silence)."""
+        fs = self.fs
+        self.timeline.latest_time = max(self.timeline.latest_time, now_sample / fs)
+        if self.last_r is None or self.timeline.is_active(ASYSTOLE):
+            return
+        if (now_sample - self.last_r) / fs >= self.asystole_s:
+            for label in BASE_RHYTHMS:
+                self.timeline.close(label, now_sample, fs)
+            self.base_rhythm = None
+            self._candidate, self._candidate_count = None, 0
+            self.timeline.open(ASYSTOLE, self.last_r, fs)
+
+    # ------------------------------------------------------------------ state machines
+
+    def _classify_base(self) -> Optional[str]:
+        if len(self._rr) < 4:
+            return None
+        rr = np.asarray(self._rr)
+        mean = float(np.mean(rr))
+        if mean <= 0:
+            return None
+        cv = float(np.std(rr)) / mean
+        hr = 60000.0 / float(np.median(rr))
+        p_ratio = float(np.mean(self._has_p)) if self._has_p else 1.0
+        if len(rr) >= 8 and cv > 0.10 and p_ratio < 0.7 and float(np.mean(np.abs(np.diff(rr)))) > 0.10 * mean:
+            return AFIB
+        recent = rr[-4:]
+        if (len(self._wide) >= 3 and all(list(self._wide)[-3:]) and 60000.0 / float(np.median(recent)) > 120
+                and float(np.std(recent)) < 80):
+            return VTACH
+        if hr < 60:
+            return SINUS_BRADY
+        if hr >= 100:
+            return SINUS_TACHY
+        return NSR
+
+    def _update_base_rhythm(self, r_sample: int) -> None:
+        label = self._classify_base()
+        if label is None:
+            return
+        if label == self.base_rhythm:
+            self._candidate, self._candidate_count = None, 0
+            return
+        if label != self._candidate:
+            self._candidate, self._candidate_count = label, 0
+        self._candidate_count += 1
+        needed = self.af_confirm_beats if label == AFIB else self.confirm_beats
+        if self._candidate_count >= needed or self.base_rhythm is None:
+            if self.base_rhythm is not None:
+                self.timeline.close(self.base_rhythm, r_sample, self.fs)
+            self.base_rhythm = label
+            self.timeline.open(label, r_sample, self.fs)
+            self._candidate, self._candidate_count = None, 0
+
+    def _update_pvc(self, prev_r: int, r_sample: int, rr: float, mean_before: Optional[float],
+                    wide: bool, has_p: Optional[bool]) -> None:
+        fs = self.fs
+        # Confirm last beat's premature candidate with a compensatory pause
+        if self._pending_pvc is not None:
+            if mean_before is not None and rr > 1.15 * mean_before:
+                if not self.timeline.is_active(PVC):
+                    self._pvc_count = 0
+                    self.timeline.open(PVC, self._pending_pvc, fs)
+                self._pvc_count += 1
+                self.timeline.open(PVC, self._pending_pvc, fs).detail['pvc_count'] = self._pvc_count
+                self._pvc_last = self._pending_pvc
+            self._pending_pvc = None
+        # Without P waves in AF every short RR would look premature; only wide beats count there
+        no_p = has_p is False and self.base_rhythm != AFIB
+        # An isolated ectopic follows a narrow beat; consecutive wide beats belong to a run (VT)
+        isolated = len(self._wide) < 2 or not self._wide[-2]
+        if (mean_before is not None and len(self._rr) >= 3 and rr < 0.85 * mean_before
+                and isolated and (wide or no_p)):
+            self._pending_pvc = r_sample
+        # Ectopy episode ends after 10 s without a PVC
+        if self._pvc_last is not None and (r_sample - self._pvc_last) / fs > 10.0:
+            self.timeline.close(PVC, r_sample, fs)
+            self._pvc_last = None
+
+    def _update_bigeminy(self, prev_r: int, r_sample: int, rr: float, mean_before: Optional[float]) -> None:
+        if mean_before is None or len(self._rr) < 3:
+            return
+        rr_class = -1 if rr < 0.75 * mean_before else (1 if rr > 1.03 * mean_before else 0)
+        if rr_class != 0 and self._last_rr_class == -rr_class:
+            if self._alternations == 0:
+                self._alternation_start = self._prev_rr_onset
+            self._alternations += 1
+            self._non_alternations = 0
+        else:
+            self._non_alternations += 1
+            if self._non_alternations >= 2:
+                self._alternations = 0
+        self._last_rr_class = rr_class
+        self._prev_rr_onset = prev_r
+        if self._alternations >= 3:
+            # Onset is back-dated to the first beat of the alternating run
+            event = self.timeline.open(BIGEMINY, self._alternation_start, self.fs)
+            if event.beats == 0:
+                event.beats = self._alternations
+        elif self._non_alternations >= 2 and self.timeline.is_active(BIGEMINY):
+            self.timeline.close(BIGEMINY, r_sample, self.fs)
+
+    def _update_av_conduction(self, prev_r: int, r_sample: int, pr_ms: Optional[float], extra_p_waves: int) -> None:
+        fs = self.fs
+        if pr_ms is not None:
+            if pr_ms > 200:
+                self._long_pr += 1
+                self._short_pr = 0
+            else:
+                self._short_pr += 1
+                self._long_pr = 0
+            if self._long_pr >= 4:
+                self.timeline.open(AV_BLOCK_1, r_sample, fs)
+            elif self._short_pr >= 4:
+                self.timeline.close(AV_BLOCK_1, r_sample, fs)
+
+        if extra_p_waves > 0:
+            # Dropped beat: Wenckebach if PR lengthened over the beats before the drop
+            pr = [p for p in self._pr if p is not None]
+            label = AV_BLOCK_2_TYPE_I if len(pr) >= 2 and pr[-1] - pr[0] >= 20 else AV_BLOCK_2_TYPE_II
+            other = AV_BLOCK_2_TYPE_II if label == AV_BLOCK_2_TYPE_I else AV_BLOCK_2_TYPE_I
+            if self.timeline.is_active(other):
+                self.timeline.close(other, prev_r, fs)
+            event = self.timeline.open(label, prev_r, fs)
+            event.detail['dropped_beats'] = int(event.detail.get('dropped_beats', 0)) + int(extra_p_waves)
+            self._drop_last = r_sample
+            self._pr.clear()
+        elif self._drop_last is not None and (r_sample - self._drop_last) / fs > 10.0:
+            self.timeline.close(AV_BLOCK_2_TYPE_I, r_sample, fs)
+            self.timeline.close(AV_BLOCK_2_TYPE_II, r_sample, fs)
+            self._drop_last = None
+        self._pr.append(pr_ms)
@@ -0,0 +1,231 @@
+"""
+Rhythm Feature Vector for Arrhythmia Rules
+
+ArrhythmiaDetector used to hand the raw signal and peak lists to ~20 _is_*
+predicates, and each of them rebuilt np.array(signal), np.diff(r_peaks),
+RR mean/std/CV and the signal's ptp/std on its own. extract_rhythm_features()
+computes all of that once per analysis window:
+
+- RR statistics: intervals (ms), mean/std/CV, heart rate, successive differences
+- signal amplitude: peak-to-peak, std, mean/max |x|, near-zero ratio
+- P-wave association: P/R ratio, P-P regularity, P wave 120-200 ms before each R
+- QRS width distribution: per-beat Q->S widths, mean (the QRS duration), wide fraction
+- entropy: normalised Shannon entropy of the RR and amplitude distributions
+
+The detector's rules are then plain comparisons over one RhythmFeatures.
+legacy_truth records how the old `if not r_peaks` style guards evaluated each
+peak container, so rules those guards kept silent stay silent.
+
+Usage:
+    features = extract_rhythm_features(lead_ii, analysis, fs=500)
+    print(features.heart_rate, features.rr_cv, features.p_ratio, features.qrs_duration)
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+
+ZERO_THRESHOLD = 0.2            # |x| below this counts as "no activity" for asystole
+PR_WINDOW_MS = (120.0, 200.0)   # P wave expected this long before its R peak
+RR_ENTROPY_BINS = 16
+AMPLITUDE_ENTROPY_BINS = 32
+
+
+@dataclass
+class RhythmFeatures:
+    """Every rhythm feature the arrhythmia rules read, computed once per window."""
+    fs: float
+    # Signal amplitude
+    n_samples: int
+    duration_s: float
+    amplitude_ptp: float
+    amplitude_std: float
+    amplitude_mean_abs: float
+    amplitude_max_abs: float
+    near_zero_ratio: float
+    relative_variability: float
+    # Peak counts
+    n_r: int
+    n_p: int
+    n_q: int
+    n_s: int
+    p_ratio: float
+    # RR statistics (ms)
+    n_rr: int
+    rr_mean: Optional[float]
+    rr_std: float
+    rr_cv: float
+    heart_rate: Optional[float]
+    rr_diff_std: float
+    # P-P statistics (ms)
+    pp_mean: Optional[float]
+    pp_std: float
+    pp_cv: float
+    # Conduction / QRS width
+    pr_interval: Optional[float]
+    qrs_duration: Optional[float]
+    qrs_wide_fraction: float
+    p_association: float
+    # Entropy (0 = one bin, 1 = uniform)
+    rr_entropy: float
+    amplitude_entropy: float
+    # Arrays kept for the per-beat morphology rules
+    signal: np.ndarray = field(default=None, repr=False)
+    r_peaks: np.ndarray = field(default=None, repr=False)
+    p_peaks: np.ndarray = field(default=None, repr=False)
+    q_peaks: np.ndarray = field(default=None, repr=False)
+    s_peaks: np.ndarray = field(default=None, repr=False)
+    rr_ms: np.ndarray = field(default=None, repr=False)
+    rr_diff_abs: np.ndarray = field(default=None, repr=False)
+    qrs_widths: np.ndarray = field(default=None, repr=False)
+    r_has_p: np.ndarray = field(default=None, repr=False)
+    # bool(peaks) as the old rules evaluated it per peak type ('r', 'p', 'q', 's');
+    # None where that raised (ndarray with 2+ peaks, e.g. PQRSTAnalyzer's r_peaks)
+    legacy_truth: Dict[str, Optional[bool]] = field(default_factory=dict, repr=False)
+
+    def to_dict(self) -> Dict[str, object]:
+        """Scalar features only (for logging / benchmarks)."""
+        return {k: v for k, v in self.__dict__.items() if not isinstance(v, (np.ndarray, dict))}
+
+
+def _as_index_array(peaks) -> np.ndarray:
+    if peaks is None:
+        return np.zeros(0, dtype=np.int64)
+    return np.asarray(peaks, dtype=np.int64).ravel()
+
+
+def _legacy_truth(peaks) -> Optional[bool]:
+    """bool(peaks) as `not peaks` saw it; None where it raised (ambiguous ndarray truth value)."""
+    if peaks is None:
+        return False
+    if isinstance(peaks, np.ndarray):
+        if peaks.size > 1:
+            return None
+        return bool(peaks.size) and bool(peaks.ravel()[0])
+    return bool(peaks)
+
+
+def _paired_ms(first: np.ndarray, second: np.ndarray, fs: float) -> np.ndarray:
+    """(second - first) in ms for index-aligned pairs where second > first."""
+    m = min(len(first), len(second))
+    if m == 0:
+        return np.zeros(0, dtype=float)
+    d = (second[:m] - first[:m]).astype(float)
+    return d[d > 0] / fs * 1000.0
+
+
+def _normalised_entropy(values: np.ndarray, bins: int) -> float:
+    """Shannon entropy of a histogram of values, divided by log2(bins)."""
+    if len(values) < 2:
+        return 0.0
+    lo = float(np.min(values))
+    span = float(np.max(values)) - lo
+    if span <= 0:
+        return 0.0
+    # Equal-width bins over [min, max] via bincount (np.histogram is ~5x slower here)
+    idx = np.minimum(((values - lo) * (bins / span)).astype(np.int64), bins - 1)
+    counts = np.bincount(idx, minlength=bins)
+    p = counts[counts > 0] / len(values)
+    return float(-np.sum(p * np.log2(p)) / np.log2(bins))
+
+
+def _interval_stats(intervals: np.ndarray):
+    """(mean or None, std, CV) of an interval series."""
+    if len(intervals) == 0:
+        return None, 0.0, 0.0
+    mean = float(np.mean(intervals))
+    std = float(np.std(intervals))
+    return mean, std, (std / mean if mean > 0 else 0.0)
+
+
+def extract_rhythm_features(signal, analysis: Optional[Dict[str, object]], fs: float) -> RhythmFeatures:
+    """
+    Compute the rhythm feature vector for one analysis window.
+
+    Args:
+        signal: Raw samples of the analysed lead
+        analysis: PQRSTAnalyzer.analyze_signal() result (r/p/q/s peak indices)
+        fs: Sampling rate (Hz)
+
+    Returns:
+        RhythmFeatures
+    """
+    analysis = analysis or {}
+    fs = float(fs)
+    x = np.asarray(signal, dtype=float).ravel() if signal is not None else np.zeros(0)
+    n = len(x)
+
+    if n:
+        abs_x = np.abs(x)
+        ptp = float(np.ptp(x))
+        std = float(np.std(x))
+        mean_abs = float(np.mean(abs_x))
+        max_abs = float(np.max(abs_x))
+        near_zero_ratio = float(np.count_nonzero(abs_x < ZERO_THRESHOLD)) / n
+    else:
+        ptp = std = mean_abs = max_abs = near_zero_ratio = 0.0
+
+    r = _as_index_array(analysis.get('r_peaks'))
+    p = _as_index_array(analysis.get('p_peaks'))
+    q = _as_index_array(analysis.get('q_peaks'))
+    s = _as_index_array(analysis.get('s_peaks'))
+
+    rr = np.diff(r) / fs * 1000.0
+    rr_mean, rr_std, rr_cv = _interval_stats(rr)
+    rr_diff_abs = np.abs(np.diff(rr))
+    pp_mean, pp_std, pp_cv = _interval_stats(np.diff(p) / fs * 1000.0)
+
+    pr = _paired_ms(p, q, fs)
+    qrs = _paired_ms(q, s, fs)
+
+    # P wave 120-200 ms before each R peak
+    if len(r) and len(p):
+        p_sorted = np.sort(p)
+        lo = r - PR_WINDOW_MS[1] / 1000.0 * fs
+        hi = r - PR_WINDOW_MS[0] / 1000.0 * fs
+        r_has_p = np.searchsorted(p_sorted, hi, side='right') > np.searchsorted(p_sorted, lo, side='left')
+    else:
+        r_has_p = np.zeros(len(r), dtype=bool)
+
+    return RhythmFeatures(
+        fs=fs,
+        n_samples=n,
+        duration_s=n / fs if fs > 0 else 0.0,
+        amplitude_ptp=ptp,
+        amplitude_std=std,
+        amplitude_mean_abs=mean_abs,
+        amplitude_max_abs=max_abs,
+        near_zero_ratio=near_zero_ratio,
+        relative_variability=std / mean_abs if mean_abs > 0 else 0.0,
+        n_r=len(r),
+        n_p=len(p),
+        n_q=len(q),
+        n_s=len(s),
+        p_ratio=len(p) / len(r) if len(r) else 0.0,
+        n_rr=len(rr),
+        rr_mean=rr_mean,
+        rr_std=rr_std,
+        rr_cv=rr_cv,
+        heart_rate=60000.0 / rr_mean if rr_mean and rr_mean > 0 else None,
+        rr_diff_std=float(np.std(rr_diff_abs)) if len(rr_diff_abs) else 0.0,
+        pp_mean=pp_mean,
+        pp_std=pp_std,
+        pp_cv=pp_cv,
+        pr_interval=float(np.mean(pr)) if len(pr) else None,
+        qrs_duration=float(np.mean(qrs)) if len(qrs) else None,
+        qrs_wide_fraction=float(np.mean(qrs > 120.0)) if len(qrs) else 0.0,
+        p_association=float(np.mean(r_has_p)) if len(r) else 0.0,
+        rr_entropy=_normalised_entropy(rr, RR_ENTROPY_BINS),
+        amplitude_entropy=_normalised_entropy(x, AMPLITUDE_ENTROPY_BINS),
+        signal=x,
+        r_peaks=r,
+        p_peaks=p,
+        q_peaks=q,
+        s_peaks=s,
+        rr_ms=rr,
+        rr_diff_abs=rr_diff_abs,
+        qrs_widths=qrs,
+        r_has_p=r_has_p,
+        legacy_truth={name: _legacy_truth(analysis.get(f'{name}_peaks')) for name in ('r', 'p', 'q', 's')},
+    )
@@ -0,0 +1,376 @@
+"""
+Background Serial Acquisition for the 12-Lead ECG Page
+
+The packet reader used to be polled from the Qt GUI timer, so every redraw
+stall delayed the next ``ser.read`` and packets were dropped or bunched.
+This module moves serial I/O onto a dedicated thread:
+
+- SampleRingBuffer: preallocated (n_leads x capacity) NumPy ring written by a
+  single producer (the acquisition thread) and drained by a single consumer
+  (the GUI). No locks: the producer publishes by bumping a monotonically
+  increasing sample counter after the samples are in place.
+- SerialAcquisitionThread: owns the serial reader, frames/decodes packets
+  continuously (batch decoder from packet_decoder) and pushes 12-lead
+  columns into the ring.
+- SerialStreamReader: the packet reader itself. It has no Qt dependency, and
+  any object with read() / in_waiting can stand in for the pyserial port
+  (the offline replay harness feeds recorded byte streams this way).
+
+Usage:
+    ring = SampleRingBuffer(n_leads=12, capacity=5000)
+    thread = SerialAcquisitionThread(serial_reader, ring, LEAD_LABELS)
+    thread.start()
+
+    # GUI timer
+    block, cursor, dropped = ring.read_since(cursor)   # block: (12, k)
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.perf_stats import get_perf_stats, hot_path_verbose
+
+from .packet_decoder import (
+    DECODED_LEAD_ORDER, END_BYTE, PACKET_SIZE, START_BYTE, decode_packet_stream, parse_packet
+)
+
+try:
+    import serial
+    SERIAL_AVAILABLE = True
+except ImportError:
+    serial = None
+    SERIAL_AVAILABLE = False
+
+
+def _crash_logger():
+    """Shared crash logger, or None where it cannot be loaded (it pulls in Qt)."""
+    try:
+        from utils.crash_logger import get_crash_logger
+        return get_crash_logger()
+    except Exception:
+        return None
+
+
+class SampleRingBuffer:
+    """Single-producer / single-consumer ring of multi-lead samples."""
+
+    def __init__(self, n_leads: int = 12, capacity: int = 5000, dtype=np.float32):
+        self.n_leads = int(n_leads)
+        self.capacity = int(capacity)
+        self._data = np.zeros((self.n_leads, self.capacity), dtype=dtype)
+        # Total samples ever written. Only the producer assigns it; a plain int
+        # rebind is atomic under the GIL, which is all the consumer needs.
+        self.write_count = 0
+        # Samples the consumer could not read before they were overwritten
+        self.overrun_count = 0
+        # write_count once the in-flight write (if any) completes; announced
+        # before touching the array so the reader can spot torn columns
+        self._write_target = 0
+
+    def write(self, block: np.ndarray) -> None:
+        """
+        Append a (n_leads x k) block of samples (producer side).
+
+        Args:
+            block: Samples for every lead, oldest first along axis 1
+        """
+        block = np.asarray(block)
+        if block.ndim != 2 or block.shape[0] != self.n_leads or block.shape[1] == 0:
+            return
+
+        k = block.shape[1]
+        if k > self.capacity:
+            # Only the newest `capacity` samples can be held anyway
+            block = block[:, -self.capacity:]
+            self.write_count += k - self.capacity
+            k = self.capacity
+
+        self._write_target = self.write_count + k
+        start = self.write_count % self.capacity
+        first = min(k, self.capacity - start)
+        self._data[:, start:start + first] = block[:, :first]
+        if first < k:
+            self._data[:, :k - first] = block[:, first:]
+
+        # Publish only after the samples are in place
+        self.write_count += k
+
+    def read_since(self, cursor: int, max_samples: Optional[int] = None) -> Tuple[np.ndarray, int, int]:
+        """
+        Copy out every sample written after `cursor` (consumer side).
+
+        Args:
+            cursor: Value of write_count returned by the previous call (0 initially)
+            max_samples: Optional cap on samples returned; the remainder stays queued
+
+        Returns:
+            (block, new_cursor, dropped) where block is (n_leads x k) and dropped
+            counts samples overwritten before they could be read
+        """
+        available = self.write_count
+        dropped = 0
+        if available - cursor > self.capacity:
+            dropped = available - cursor - self.capacity
+            cursor = available - self.capacity
+
+        k = available - cursor
+        if max_samples is not None:
+            k = min(k, int(max_samples))
+        if k <= 0:
+            return np.empty((self.n_leads, 0), dtype=self._data.dtype), cursor, dropped
+
+        start = cursor % self.capacity
+        first = min(k, self.capacity - start)
+        if first == k:
+            block = self._data[:, start:start + k].copy()
+        else:
+            block = np.concatenate((self._data[:, start:], self._data[:, :k - first]), axis=1)
+
+        # The producer may have lapped us while we were copying (or be midway
+        # through a write); discard the columns it could have overwritten
+        # instead of returning torn data.
+        lapped = max(self.write_count, self._write_target) - cursor - self.capacity
+        if lapped > 0:
+            lapped = min(lapped, k)
+            block = block[:, lapped:]
+            dropped += lapped
+
+        if dropped:
+            self.overrun_count += dropped
+        return block, cursor + k, dropped
+
+    def pending(self, cursor: int) -> int:
+        """Number of samples queued for a consumer positioned at `cursor`."""
+        return max(0, min(self.write_count - cursor, self.capacity))
+
+    def reset(self) -> None:
+        """Forget all samples. Only call while the producer is stopped."""
+        self._data.fill(0)
+        self.write_count = 0
+        self.overrun_count = 0
+        self._write_target = 0
+
+
+class SerialAcquisitionThread(threading.Thread):
+    """Reads, frames and decodes serial packets off the GUI thread."""
+
+    def __init__(self, serial_reader, ring: SampleRingBuffer, lead_order: Sequence[str],
+                 max_packets: int = 256, idle_sleep: float = 0.002):
+        super().__init__(name="ECGSerialAcquisition", daemon=True)
+        self.serial_reader = serial_reader
+        self.ring = ring
+        self.lead_order: List[str] = list(lead_order)
+        self.max_packets = max_packets
+        self.idle_sleep = idle_sleep
+        self.packets_received = 0
+        self.last_error: Optional[Exception] = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        print("🧵 Serial acquisition thread started")
+        while not self._stop_event.is_set():
+            reader = self.serial_reader
+            if reader is None or not getattr(reader, "running", False):
+                break
+            try:
+                if hasattr(reader, "read_block"):
+                    # Vectorized decode of everything buffered (12 x k)
+                    block = reader.read_block(max_packets=self.max_packets)
+                else:
+                    block = self._packets_to_block(reader.read_packets(max_packets=self.max_packets))
+                if block.shape[1] == 0:
+                    # ser.read() already blocks up to its timeout; this only
+                    # guards against a port that returns immediately.
+                    time.sleep(self.idle_sleep)
+                    continue
+                self.ring.write(block)
+                self.packets_received += block.shape[1]
+                get_perf_stats().gauge("acquisition.ring_overruns", self.ring.overrun_count)
+            except Exception as e:
+                self.last_error = e
+                print(f"❌ Serial acquisition thread error: {e}")
+                if hasattr(reader, "_handle_serial_error"):
+                    reader._handle_serial_error(e)
+                time.sleep(0.05)
+        print(f"🧵 Serial acquisition thread stopped ({self.packets_received} packets)")
+
+    def _packets_to_block(self, packets) -> np.ndarray:
+        """Convert parsed packet dicts into a (n_leads x n_packets) array (legacy readers)."""
+        block = np.zeros((len(self.lead_order), len(packets)), dtype=np.float32)
+        for col, packet in enumerate(packets):
+            for row, name in enumerate(self.lead_order):
+                value = packet.get(name)
+                if value is not None:
+                    block[row, col] = value
+        return block
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Signal the loop to exit and wait for the current read to finish."""
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+
+class SerialStreamReader:
+    """Packet-based serial reader for ECG data - NEW IMPLEMENTATION"""
+    
+    def __init__(self, port: str, baudrate: int, timeout: float = 0.1, serial_port=None):
+        """
+        Args:
+            port: Serial device (e.g. COM3, /dev/ttyUSB0)
+            baudrate: Baud rate
+            timeout: Read timeout (s)
+            serial_port: Already-open port object (read / in_waiting /
+                reset_input_buffer / close) used instead of opening `port`,
+                e.g. the replay harness's FakeSerialPort
+        """
+        if serial_port is not None:
+            self.ser = serial_port
+        else:
+            if not SERIAL_AVAILABLE:
+                raise RuntimeError("pyserial is required for serial capture. pip install pyserial")
+            self.ser = serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
+        self.buf = bytearray()
+        self.running = False
+        self.data_count = 0
+        self.error_count = 0
+        self.consecutive_errors = 0
+        self.last_error_time = 0
+        self.crash_logger = _crash_logger()
+        self.user_details = {}  # For error reporting compatibility
+        print(f"🔌 SerialStreamReader initialized: Port={port}, Baud={baudrate}")
+
+    def close(self) -> None:
+        """Close serial connection"""
+        try:
+            self.running = False
+            self.ser.close()
+        except Exception:
+            pass
+
+    def start(self):
+        """Start data acquisition"""
+        print("🚀 Starting packet-based ECG data acquisition...")
+        self.ser.reset_input_buffer()
+        self.buf.clear()
+        self.running = True
+        print("✅ Packet-based ECG device started - waiting for data packets...")
+
+    def stop(self):
+        """Stop data acquisition"""
+        print("⏹️ Stopping packet-based ECG data acquisition...")
+        self.running = False
+        print(f"📊 Total data packets received: {self.data_count}")
+
+    def read_packets(self, max_packets: int = 50) -> List[Dict[str, int]]:
+        """Read and parse ECG packets from serial stream"""
+        if not self.running:
+            return []
+            
+        out: List[Dict[str, int]] = []
+        
+        try:
+            chunk = self.ser.read(1024)
+            if chunk:
+                self.buf.extend(chunk)
+
+            # Extract packets
+            while len(out) < max_packets:
+                start_idx = self.buf.find(bytes([START_BYTE]))
+                if start_idx == -1:
+                    self.buf.clear()
+                    break
+                if len(self.buf) - start_idx < PACKET_SIZE:
+                    if start_idx > 0:
+                        del self.buf[:start_idx]
+                    break
+                    
+                candidate = bytes(self.buf[start_idx : start_idx + PACKET_SIZE])
+                del self.buf[: start_idx + PACKET_SIZE]
+
+                if candidate[-1] != END_BYTE:
+                    continue
+
+                parsed = parse_packet(candidate)
+                if parsed:
+                    self.data_count += 1
+                    if hot_path_verbose():
+                        print(f"📡 [Packet #{self.data_count}] Received valid packet with {len(parsed)} leads")
+                        # Log each lead value as it is parsed
+                        for name, val in parsed.items():
+                            print(f"Serial data - Lead {name}: value={val}")
+                    out.append(parsed)
+                    
+        except Exception as e:
+            self._handle_read_error(e)
+            
+        return out
+
+    def read_block(self, max_packets: Optional[int] = None) -> np.ndarray:
+        """Read and decode all complete packets in one vectorized pass.
+
+        Returns a (12 x n_packets) float32 array in DECODED_LEAD_ORDER (the 12-lead display order).
+        """
+        if not self.running:
+            return np.empty((len(DECODED_LEAD_ORDER), 0), dtype=np.float32)
+
+        try:
+            # Drain whatever the driver already holds so a backlog clears in one call
+            waiting = getattr(self.ser, 'in_waiting', 0) or 0
+            chunk = self.ser.read(max(1024, waiting))
+            if chunk:
+                self.buf.extend(chunk)
+
+            perf = get_perf_stats()
+            with perf.timer("serial.decode_ms"):
+                samples, consumed = decode_packet_stream(self.buf, max_packets=max_packets)
+            if consumed:
+                del self.buf[:consumed]
+            self.data_count += samples.shape[0]
+            perf.incr("serial.packets_decoded", samples.shape[0])
+            return samples.T
+        except Exception as e:
+            self._handle_read_error(e)
+            return np.empty((len(DECODED_LEAD_ORDER), 0), dtype=np.float32)
+
+    def _handle_read_error(self, e):
+        """Count a read/parse failure and stop on fatal device errors"""
+        self.error_count += 1
+        get_perf_stats().incr("serial.read_errors")
+        self.consecutive_errors += 1
+        error_msg = f"Packet parsing error: {e}"
+        print(f"❌ {error_msg}")
+        if self.crash_logger is not None:
+            self.crash_logger.log_error(
+                message=error_msg,
+                exception=e,
+                category="SERIAL_ERROR"
+            )
+        
+        # If device is disconnected (Errno 6) or too many consecutive errors, stop
+        if "Device not configured" in str(e) or "[Errno 6]" in str(e) or self.consecutive_errors > 20:
+            print("⏹️ Critical serial error - stopping acquisition")
+            self.running = False
+
+    def _handle_serial_error(self, error):
+        """Handle serial communication errors"""
+        current_time = time.time()
+        self.error_count += 1
+        self.consecutive_errors += 1
+        
+        error_msg = f"Serial communication error: {error}"
+        print(f"❌ {error_msg}")
+        
+        if self.crash_logger is not None:
+            self.crash_logger.log_error(
+                message=error_msg,
+                exception=error,
+                category="SERIAL_ERROR"
+            )
+        
+        if self.consecutive_errors >= 5 and (current_time - self.last_error_time) > 10:
+            self.last_error_time = current_time
+            self.consecutive_errors = 0
@@ -38,7 +38,7 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QGroupBox, QFileDialog,
     QStackedLayout, QGridLayout, QSizePolicy, QMessageBox, QFormLayout, QLineEdit, QFrame, QApplication, QDialog
 )
-from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtGui import QFont, QColor, QKeySequence
 from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QDateTime 
 # --- CHANGED: Removed Matplotlib imports ---
 
@@ -50,8 +50,19 @@ from typing import Deque, Dict, List, Tuple, Optional
 from ecg.recording import ECGMenu
 from scipy.signal import find_peaks
 from utils.settings_manager import SettingsManager
+from utils.perf_stats import get_perf_stats, hot_path_verbose
 from utils.localization import translate_text
 from .demo_manager import DemoManager
+from .serial_acquisition import SampleRingBuffer, SerialAcquisitionThread, SerialStreamReader
+from .lead_buffer import CircularLeadBuffer
+from .decimation import StreamingEnvelope, minmax_decimate
+from .ecg_filters import StreamingFilterChain, StreamingMovingAverage
+from .pan_tompkins import StreamingPanTompkins
+from .analysis_cache import AnalysisCache, WindowAnalysis
+from .analysis_worker import AnalysisWorker, LeadSnapshot, compute_live_metrics
+from .full_disclosure import FullDisclosureRecorder
+from .rhythm_engine import StreamingRhythmEngine, measure_beat
+from numpy.lib.stride_tricks import sliding_window_view
 from PyQt5.QtWidgets import QGraphicsDropShadowEffect
 from functools import partial # For plot clicking
 from .clinical_measurements import (
@@ -89,6 +100,11 @@ class SamplingRateCalculator:
             self.last_update_time = current_time
         return self.sampling_rate
 
+    def add_samples(self, count):
+        """Account for a block of samples at once (threaded acquisition)"""
+        self.sample_count += max(0, int(count) - 1)
+        return self.add_sample()
+
 # ------------------------ ECG Display Gain Helper (Clinical Standard) ------------------------
 
 def get_display_gain(wave_gain_mm: float) -> float:
@@ -230,11 +246,12 @@ def generate_realistic_ecg_waveform(duration_seconds=10, sampling_rate=500, hear
 # NEW PACKET-BASED SERIAL PARSING LOGIC
 # ============================================================================
 
-# Packet parsing constants
-PACKET_SIZE = 22
-START_BYTE = 0xE8
-END_BYTE = 0x8E
-LEAD_NAMES_DIRECT = ["I", "II", "V1", "V2", "V3", "V4", "V5", "V6"]
+# Packet parsing constants and decoders live in packet_decoder (shared with the
+# acquisition thread and the offline tools)
+from .packet_decoder import (
+    PACKET_SIZE, START_BYTE, END_BYTE, LEAD_NAMES_DIRECT,
+    decode_lead, parse_packet, decode_packet_stream
+)
 PACKET_REGEX = re.compile(r"(?i)(E8(?:[0-9A-F\s]{2,})?8E)")
 
 def hex_string_to_bytes(hex_str: str) -> bytes:
@@ -244,172 +261,6 @@ def hex_string_to_bytes(hex_str: str) -> bytes:
         raise ValueError("Hex string must have even length")
     return bytes(int(cleaned[i : i + 2], 16) for i in range(0, len(cleaned), 2))
 
-def decode_lead(msb: int, lsb: int) -> Tuple[int, bool]:
-    """Decode lead value from MSB and LSB bytes"""
-    lower7 = lsb & 0x7F
-    upper5 = msb & 0x1F
-    value = (upper5 << 7) | lower7
-    connected = (msb & 0x20) != 0
-    return value, connected
-
-def parse_packet(raw: bytes) -> Dict[str, int]:
-    """Parse ECG packet and return dictionary of lead values"""
-    if len(raw) != PACKET_SIZE or raw[0] != START_BYTE or raw[-1] != END_BYTE:
-        return {}
-
-    lead_values: Dict[str, int] = {}
-    idx = 5  # first MSB position
-
-    print("---- New Packet ----")
-
-    for name in LEAD_NAMES_DIRECT:
-        msb = raw[idx]
-        lsb = raw[idx + 1]
-        idx += 2
-
-        value, connected = decode_lead(msb, lsb)
-
-        print(f"{name}: MSB={msb:02X}, LSB={lsb:02X}, value={value}, connected={connected}")
-
-        lead_values[name] = value
-
-    # Derived limb leads
-    lead_i = lead_values.get("I", 0)
-    lead_ii = lead_values.get("II", 0)
-
-    lead_values["III"] = lead_ii - lead_i
-    lead_values["aVR"] = -(lead_i + lead_ii) / 2
-    lead_values["aVL"] = (lead_i - lead_values["III"]) / 2
-    lead_values["aVF"] = (lead_ii + lead_values["III"]) / 2
-
-    print("Derived:", {
-        "III": lead_values["III"],
-        "aVR": lead_values["aVR"],
-        "aVL": lead_values["aVL"],
-        "aVF": lead_values["aVF"],
-    })
-
-    print("---------------------\n")
-
-    return lead_values
-
-class SerialStreamReader:
-    """Packet-based serial reader for ECG data - NEW IMPLEMENTATION"""
-    
-    def __init__(self, port: str, baudrate: int, timeout: float = 0.1):
-        if not SERIAL_AVAILABLE:
-            raise RuntimeError("pyserial is required for serial capture. pip install pyserial")
-        self.ser = serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
-        self.buf = bytearray()
-        self.running = False
-        self.data_count = 0
-        self.error_count = 0
-        self.consecutive_errors = 0
-        self.last_error_time = 0
-        self.crash_logger = get_crash_logger()
-        self.user_details = {}  # For error reporting compatibility
-        print(f"🔌 SerialStreamReader initialized: Port={port}, Baud={baudrate}")
-
-    def close(self) -> None:
-        """Close serial connection"""
-        try:
-            self.running = False
-            self.ser.close()
-        except Exception:
-            pass
-
-    def start(self):
-        """Start data acquisition"""
-        print("🚀 Starting packet-based ECG data acquisition...")
-        self.ser.reset_input_buffer()
-        self.buf.clear()
-        self.running = True
-        print("✅ Packet-based ECG device started - waiting for data packets...")
-
-    def stop(self):
-        """Stop data acquisition"""
-        print("⏹️ Stopping packet-based ECG data acquisition...")
-        self.running = False
-        print(f"📊 Total data packets received: {self.data_count}")
-
-    def read_packets(self, max_packets: int = 50) -> List[Dict[str, int]]:
-        """Read and parse ECG packets from serial stream"""
-        if not self.running:
-            return []
-            
-        out: List[Dict[str, int]] = []
-        
-        try:
-            chunk = self.ser.read(1024)
-            if chunk:
-                self.buf.extend(chunk)
-
-            # Extract packets
-            while len(out) < max_packets:
-                start_idx = self.buf.find(bytes([START_BYTE]))
-                if start_idx == -1:
-                    self.buf.clear()
-                    break
-                if len(self.buf) - start_idx < PACKET_SIZE:
-                    if start_idx > 0:
-                        del self.buf[:start_idx]
-                    break
-                    
-                candidate = bytes(self.buf[start_idx : start_idx + PACKET_SIZE])
-                del self.buf[: start_idx + PACKET_SIZE]
-
-                if candidate[-1] != END_BYTE:
-                    continue
-
-                parsed = parse_packet(candidate)
-                if parsed:
-                    self.data_count += 1
-                    print(f"📡 [Packet #{self.data_count}] Received valid packet with {len(parsed)} leads")
-                    # Log each lead value as it is parsed
-                    for name, val in parsed.items():
-                        try:
-                            print(f"Serial data - Lead {name}: value={val}")
-                        except Exception:
-                            pass
-                    out.append(parsed)
-                    
-        except Exception as e:
-            self.error_count += 1
-            self.consecutive_errors += 1
-            error_msg = f"Packet parsing error: {e}"
-            print(f"❌ {error_msg}")
-            self.crash_logger.log_error(
-                message=error_msg,
-                exception=e,
-                category="SERIAL_ERROR"
-            )
-            
-            # If device is disconnected (Errno 6) or too many consecutive errors, stop
-            if "Device not configured" in str(e) or "[Errno 6]" in str(e) or self.consecutive_errors > 20:
-                print("⏹️ Critical serial error - stopping acquisition")
-                self.running = False
-            
-        return out
-
-    def _handle_serial_error(self, error):
-        """Handle serial communication errors"""
-        current_time = time.time()
-        self.error_count += 1
-        self.consecutive_errors += 1
-        
-        error_msg = f"Serial communication error: {error}"
-        print(f"❌ {error_msg}")
-        
-        self.crash_logger.log_error(
-            message=error_msg,
-            exception=error,
-            category="SERIAL_ERROR"
-        )
-        
-        if self.consecutive_errors >= 5 and (current_time - self.last_error_time) > 10:
-            self.last_error_time = current_time
-            self.consecutive_errors = 0
-
 # ============================================================================
 # OLD SERIAL READER (COMMENTED OUT - KEPT FOR REFERENCE)
 # ============================================================================
@@ -451,12 +302,14 @@ class SerialECGReader:
             if line_data:
                 self.data_count += 1
                 # Print detailed data information
-                print(f"📡 [Packet #{self.data_count}] Raw data: '{line_data}' (Length: {len(line_data)})")
+                if hot_path_verbose():
+                    print(f"📡 [Packet #{self.data_count}] Raw data: '{line_data}' (Length: {len(line_data)})")
                 
                 # Parse and display ECG value
                 if line_data.isdigit():
                     ecg_value = int(line_data[-3:])
-                    print(f"💓 ECG Value: {ecg_value} mV")
+                    if hot_path_verbose():
+                        print(f"💓 ECG Value: {ecg_value} mV")
                     return ecg_value
                 else:
                     # Try to parse as multiple values (8-channel data)
@@ -467,10 +320,12 @@ class SerialECGReader:
                         values = [int(x) for x in cleaned_line.split() if x.strip() and x.replace('-', '').isdigit()]
                         
                         if len(values) >= 8:
-                            print(f"💓 8-Channel ECG Data: {values}")
+                            if hot_path_verbose():
+                                print(f"💓 8-Channel ECG Data: {values}")
                             return values  # Return the list of 8 values
                         elif len(values) == 1:
-                            print(f"💓 Single ECG Value: {values[0]} mV")
+                            if hot_path_verbose():
+                                print(f"💓 Single ECG Value: {values[0]} mV")
                             return values[0]
                         elif len(values) > 0:
                             print(f"⚠️ Unexpected number of values: {len(values)} (expected 8)")
@@ -480,7 +335,8 @@ class SerialECGReader:
                         print(f"❌ Error parsing ECG data: {e}")
                         return None
             else:
-                print("⏳ No data received (timeout)")
+                if hot_path_verbose():
+                    print("⏳ No data received (timeout)")
                 
         except Exception as e:
             self._handle_serial_error(e)
@@ -1151,9 +1007,27 @@ class ECGTestPage(QWidget):
         self.leads = self.LEADS_MAP[test_name]
         self.base_buffer_size = 2000  # Base buffer used for speed scaling
         self.buffer_size = self.base_buffer_size  # Increased buffer size for all leads
-        # Use GitHub version data structure: list of numpy arrays for all 12 leads
-        # Initialize data buffers with memory management
-        self.data = [np.zeros(HISTORY_LENGTH, dtype=np.float32) for _ in range(12)]
+        # Raw lead history: O(1) circular store (self.data[i] still yields lead i in time order)
+        self.data = CircularLeadBuffer(n_leads=12, capacity=HISTORY_LENGTH)
+        # Display-filtered history (AC notch) maintained incrementally from live samples,
+        # plus a streaming 2 s baseline per lead - see _update_display_filters()
+        self.display_data = CircularLeadBuffer(n_leads=12, capacity=HISTORY_LENGTH)
+        self.display_filter_chain = StreamingFilterChain(n_channels=12)
+        self._baseline_tracker = None
+        # Online R-peak detector on raw Lead II (indices in self.data.total_written coordinates)
+        self.qrs_detector = None
+        # Beat-by-beat rhythm classifier fed by qrs_detector; its timeline holds onset/offset events
+        self.rhythm_engine = StreamingRhythmEngine()
+        self.rhythm_timeline = self.rhythm_engine.timeline
+        # R-peaks / median beats / TP baselines shared by all measurements of one data epoch
+        self.analysis_cache = AnalysisCache(max_entries=64)
+        # Background thread for metrics / arrhythmia analysis (latest snapshot wins)
+        self.analysis_worker = AnalysisWorker()
+        # Stage timers / counters (ring histograms) and the optional on-screen overlay
+        self.perf_stats = get_perf_stats()
+        self._setup_perf_overlay()
+        # Pixel-width min/max envelopes per view ('grid', 'overlay', 'two_column', 'dashboard')
+        self.display_envelopes = {}
         
         # Track overlay state and current layout (12:1 vs 6:2)
         self._overlay_active = False
@@ -1173,6 +1047,11 @@ class ECGTestPage(QWidget):
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_plots)
         self.serial_reader = None
+        # Threaded acquisition: background thread owns the port, GUI drains the ring
+        self.acquisition_thread = None
+        self.acquisition_ring = None
+        self._ring_cursor = 0
+        self.samples_dropped = 0
         self.stacked_widget = stacked_widget
         self.sampler = SamplingRateCalculator()
         # self.demo_fs = 500  # Increased sampling rate for more realistic ECG
@@ -1694,7 +1573,14 @@ class ECGTestPage(QWidget):
         help_btn.clicked.connect(self.show_help)
 
         self.ports_btn.clicked.connect(self.show_ports_dialog)
-        self.generate_report_btn.clicked.connect(self.generate_pdf_report)
+        self.generate_report_btn.clicked.connect(lambda: self.generate_pdf_report())
+        try:
+            from PyQt5.QtWidgets import QShortcut
+            # Ctrl+Shift+R: ECG, HRV and hyperkalemia reports for the same capture, rendered concurrently
+            QShortcut(QKeySequence("Ctrl+Shift+R"), self,
+                      activated=lambda: self.generate_pdf_report(('ecg', 'hrv', 'hyperkalemia')))
+        except Exception as e:
+            print(f"⚠️ Report shortcut unavailable: {e}")
         # self.export_csv_btn.clicked.connect(self.export_csv)  # Commented out
         # self.sequential_btn.clicked.connect(self.show_sequential_view)  # Commented out
         self.twelve_leads_btn.clicked.connect(self.twelve_leads_overlay)
@@ -1901,12 +1787,9 @@ class ECGTestPage(QWidget):
             window_samples = min(window_samples, len(signal))
             
             if window_samples >= 10 and len(signal) >= window_samples:
-                # Extract actual low-frequency baseline signal using convolution
-                # This is a proper moving average, not just a statistic
-                kernel = np.ones(window_samples) / window_samples
-                baseline_signal = np.convolve(signal, kernel, mode="valid")
-                # Use the last value of the moving-average signal
-                baseline_estimate = baseline_signal[-1] if len(baseline_signal) > 0 else np.nanmean(signal)
+                # Last value of the 2 s moving-average signal is simply the mean of
+                # the newest window: O(window) instead of convolving the whole buffer
+                baseline_estimate = float(np.mean(signal[-window_samples:]))
             else:
                 # Fallback: use mean if window too small
                 baseline_estimate = np.nanmean(signal)
@@ -1932,8 +1815,8 @@ class ECGTestPage(QWidget):
             return
         
         # 🫀 CLINICAL: Use RAW Lead II data (index 1) for clinical analysis
-        # This is the raw buffer - NOT display-processed data
-        lead_ii_data = self.data[1]
+        # This is the raw buffer - NOT display-processed data (time-ordered view, no copy)
+        lead_ii_data = self.data.latest(lead=1)
         
         # Check if data is all zeros or has no real signal variation
         if len(lead_ii_data) < 100 or np.all(lead_ii_data == 0) or np.std(lead_ii_data) < 0.1:
@@ -1946,111 +1829,73 @@ class ECGTestPage(QWidget):
         elif hasattr(self, 'sampling_rate') and self.sampling_rate > 10:
             fs = float(self.sampling_rate)
         
-        # Detect R-peaks in raw Lead II (fallback to V2 if Lead II insufficient) - GE/Philips standard
-        from scipy.signal import butter, filtfilt, find_peaks
-        nyquist = fs / 2
-        low = 0.5 / nyquist
-        high = 40 / nyquist
-        b, a = butter(4, [low, high], btype='band')
-        filtered_ii = filtfilt(b, a, lead_ii_data)
-        
-        signal_mean = np.mean(filtered_ii)
-        signal_std = np.std(filtered_ii)
-        r_peaks, _ = find_peaks(
-            filtered_ii,
-            height=signal_mean + 0.5 * signal_std,
-            distance=int(0.3 * fs),
-            prominence=signal_std * 0.4
-        )
+        # One measure_all() pass over the shared per-epoch R-peaks and median beats
+        # (online Pan-Tompkins stream when live, else Lead II with V2 fallback):
+        # HR, PR, QRS, QT/QTc/QTcF, P/QRS/T axes, QRS-T angle, ST and RV5/SV1.
+        # Runs on the analysis worker against a snapshot; the GUI only applies the result.
+        worker = getattr(self, 'analysis_worker', None)
+        if worker is not None:
+            epoch = (self.data.generation, self.data.total_written, round(fs, 3))
+            if epoch == getattr(self, '_metrics_epoch_submitted', None):
+                return  # No new samples since the last job
+            self._metrics_epoch_submitted = epoch
+            prev_axes = {'p': self._prev_p_axis, 'qrs': self._prev_qrs_axis, 't': self._prev_t_axis}
+            worker.submit('live_metrics', compute_live_metrics,
+                          LeadSnapshot.from_buffer(self.data), fs, self.analysis_cache,
+                          prev_axes, self.live_r_peaks(self.data.filled),
+                          on_result=self.apply_ecg_metrics)
+            return
         
-        # Fallback to V2 if Lead II has insufficient beats (GE/Philips standard)
-        if len(r_peaks) < 8 and len(self.data) > 3:
-            lead_v2_data = self.data[3]  # V2 is typically index 3
-            if len(lead_v2_data) > 100 and np.std(lead_v2_data) > 0.1:
-                filtered_v2 = filtfilt(b, a, lead_v2_data)
-                signal_mean_v2 = np.mean(filtered_v2)
-                signal_std_v2 = np.std(filtered_v2)
-                r_peaks_v2, _ = find_peaks(
-                    filtered_v2,
-                    height=signal_mean_v2 + 0.5 * signal_std_v2,
-                    distance=int(0.3 * fs),
-                    prominence=signal_std_v2 * 0.4
-                )
-                if len(r_peaks_v2) >= 8:
-                    r_peaks = r_peaks_v2
-                    lead_ii_data = lead_v2_data  # Use V2 for beat alignment
+        self.apply_ecg_metrics(self.measure_window(fs))
+
+    def apply_ecg_metrics(self, metrics):
+        """
+        Store and display one ECGMeasurements result (GUI thread only).
         
+        Args:
+            metrics: ECGMeasurements from measure_window()/compute_live_metrics(), or None
+        """
         # Require ≥8 clean beats for median beat (GE/Philips standard)
-        if len(r_peaks) < 8:
-            return
-        
-        # Build median beat from raw Lead II (or V2 fallback) - requires ≥8 beats
-        time_axis, median_beat_ii = build_median_beat(lead_ii_data, r_peaks, fs, min_beats=8)
-        if median_beat_ii is None:
+        if metrics is None:
             return
+        self._remember_axes(metrics)
+        r_peaks = metrics.r_peaks
+        rr_ms = metrics.rr_ms
         
-        # Get TP baseline using proper TP segment detection (end of T to next P) - GE/Philips standard
-        r_idx = len(median_beat_ii) // 2  # R-peak at center
-        r_mid = r_peaks[len(r_peaks) // 2]
-        # Use previous R-peak for proper TP segment detection
-        prev_r_idx = r_peaks[len(r_peaks) // 2 - 1] if len(r_peaks) > 1 else None
-        tp_baseline_ii = get_tp_baseline(lead_ii_data, r_mid, fs, prev_r_peak_idx=prev_r_idx)
-        
-        # Calculate RR interval in ms (median RR from raw signal)
-        if len(r_peaks) >= 2:
-            rr_intervals_ms = np.diff(r_peaks) / fs * 1000.0
-            valid_rr = rr_intervals_ms[(rr_intervals_ms >= 200) & (rr_intervals_ms <= 6000)]
-            rr_ms = np.median(valid_rr) if len(valid_rr) > 0 else 600.0
-        else:
-            rr_ms = 600.0
-        
-        # Calculate Heart Rate: HR = 60000 / RR (GE/Philips standard)
-        heart_rate = int(round(60000.0 / rr_ms)) if rr_ms > 0 else 60
+        heart_rate = metrics.heart_rate
         self.last_heart_rate = heart_rate
         
-        # Calculate PR Interval from median beat (standardized function)
-        pr_interval = measure_pr_from_median_beat(median_beat_ii, time_axis, fs, tp_baseline_ii)
-        if pr_interval is None or pr_interval <= 0:
-            pr_interval = 0
+        pr_interval = metrics.pr_ms if metrics.pr_ms and metrics.pr_ms > 0 else 0
         self.pr_interval = pr_interval
         
-        # Calculate QRS Complex duration from median beat (standardized function)
-        qrs_duration = measure_qrs_duration_from_median_beat(median_beat_ii, time_axis, fs, tp_baseline_ii)
-        if qrs_duration is None or qrs_duration <= 0:
-            qrs_duration = 0
+        qrs_duration = metrics.qrs_ms if metrics.qrs_ms and metrics.qrs_ms > 0 else 0
         self.last_qrs_duration = qrs_duration
         
-        # Calculate QT Interval from median beat (GE/Philips standard)
-        qt_interval = measure_qt_from_median_beat(median_beat_ii, time_axis, fs, tp_baseline_ii)
-        if qt_interval is None:
-            qt_interval = 0
+        qt_interval = metrics.qt_ms if metrics.qt_ms is not None else 0
         self.last_qt_interval = qt_interval
         
-        # Calculate QTc (Bazett) and QTcF (Fridericia)
-        qtc_interval = self.calculate_qtc_interval(heart_rate, qt_interval)
-        qtcf_interval = self.calculate_qtcf_interval(qt_interval, rr_ms)
+        # QTc (Bazett) and QTcF (Fridericia)
+        qtc_interval = metrics.qtc_ms
+        qtcf_interval = metrics.qtcf_ms
         self.last_qtc_interval = qtc_interval
         self.last_qtcf_interval = qtcf_interval
         
-        # Calculate axes from median beats (P/QRS/T)
-        qrs_axis = self.calculate_qrs_axis_from_median()
-        p_axis = self.calculate_p_axis_from_median()
-        t_axis = self.calculate_t_axis_from_median()
+        # Axes from median beats (P/QRS/T), previous axis when indeterminate
+        qrs_axis = metrics.qrs_axis if metrics.qrs_axis is not None else (self._prev_qrs_axis or 0)
+        p_axis = metrics.p_axis if metrics.p_axis is not None else (self._prev_p_axis or 0)
+        t_axis = metrics.t_axis if metrics.t_axis is not None else (self._prev_t_axis or 0)
         self.last_qrs_axis = qrs_axis
         
-        # Calculate QRS-T angle (highly valuable clinical metric)
-        from .clinical_measurements import calculate_qrs_t_angle
-        qrs_t_angle = calculate_qrs_t_angle(qrs_axis, t_axis)
+        # QRS-T angle (highly valuable clinical metric)
+        qrs_t_angle = metrics.qrs_t_angle
         self.last_qrs_t_angle = qrs_t_angle
         
-        # Calculate ST deviation from median beat (returns mV)
-        st_segment = measure_st_deviation_from_median_beat(median_beat_ii, time_axis, fs, tp_baseline_ii, j_offset_ms=60)
-        if st_segment is None:
-            st_segment = 0.0
+        # ST deviation from median beat (mV, J+60 ms)
+        st_segment = metrics.st_mv if metrics.st_mv is not None else 0.0
         self.last_st_segment = st_segment
         
-        # Calculate RV5/SV1 from median beats
-        rv5_mv, sv1_mv = self.calculate_rv5_sv1_from_median()
+        # RV5/SV1 from the V5/V1 median beats
+        rv5_mv, sv1_mv = metrics.rv5_mv, metrics.sv1_mv
         
         # VALIDATION: Ensure clinical measurements are independent of display filters
         try:
@@ -2076,6 +1921,33 @@ class ECGTestPage(QWidget):
         # Update UI metrics (dashboard only shows: BPM, PR, QRS axis, ST, QT/QTc, timer)
         self.update_ecg_metrics_display(heart_rate, pr_interval, qrs_duration, qrs_axis, st_segment, qt_interval, qtc_interval, qtcf_interval)
 
+    def request_heart_rate(self, announce=False):
+        """
+        Heart rate from Lead II without blocking the GUI thread.
+        
+        Queues calculate_heart_rate() on the analysis worker with a copy of Lead II
+        and returns the most recent background result (0 until the first one lands).
+        Without a worker the rate is computed inline.
+        
+        Args:
+            announce: Print the 💓 HEARTBEAT line when the result arrives
+        """
+        worker = getattr(self, 'analysis_worker', None)
+        if worker is None:
+            heart_rate = self.calculate_heart_rate(self.data[1])
+            if announce and heart_rate > 0:
+                print(f"💓 HEARTBEAT: {heart_rate} BPM")
+            return heart_rate
+
+        def apply(heart_rate):
+            self._background_heart_rate = heart_rate
+            if announce and heart_rate > 0:
+                print(f"💓 HEARTBEAT: {heart_rate} BPM")
+
+        worker.submit('heart_rate', self.calculate_heart_rate,
+                      np.array(self.data.latest(lead=1), dtype=float), on_result=apply)
+        return getattr(self, '_background_heart_rate', 0)
+
     def calculate_heart_rate(self, lead_data):
         """Calculate heart rate from Lead II data using R-R intervals
         
@@ -2995,47 +2867,11 @@ class ECGTestPage(QWidget):
         try:
             if len(self.data) < 6:
                 return 0
-            fs = 186.5
-            if hasattr(self, 'sampler') and hasattr(self.sampler, 'sampling_rate') and self.sampler.sampling_rate > 10:
-                fs = float(self.sampler.sampling_rate)
-            lead_i_raw = self.data[0]
-            lead_avf_raw = self.data[5]
-            lead_ii = self.data[1]
-            from scipy.signal import butter, filtfilt
-            nyquist = fs / 2
-            low = 0.5 / nyquist
-            high = 40 / nyquist
-            b, a = butter(4, [low, high], btype='band')
-            filtered_ii = filtfilt(b, a, lead_ii)
-            signal_mean = np.mean(filtered_ii)
-            signal_std = np.std(filtered_ii)
-            r_peaks, _ = find_peaks(filtered_ii, height=signal_mean + 0.5 * signal_std, distance=int(0.3 * fs), prominence=signal_std * 0.4)
-            if len(r_peaks) < 8: # Enforce 8 beats
+            # Shared measure_all() result for this data epoch
+            metrics = self.measure_window()
+            if metrics is None or metrics.qrs_axis is None:
                 return getattr(self, '_prev_qrs_axis', 0) or 0
-            _, median_i = build_median_beat(lead_i_raw, r_peaks, fs, min_beats=8)
-            _, median_avf = build_median_beat(lead_avf_raw, r_peaks, fs, min_beats=8)
-            if median_i is None or median_avf is None:
-                return getattr(self, '_prev_qrs_axis', 0) or 0
-            r_peak_idx = len(median_i) // 2
-            # Get Lead II median beat for axis calculation
-            _, median_ii = build_median_beat(lead_ii, r_peaks, fs, min_beats=8)
-            if median_ii is None:
-                return getattr(self, '_prev_qrs_axis', 0) or 0
-            # Get TP baselines for Lead I and aVF (REQUIRED for correct axis calculation)
-            r_mid = r_peaks[len(r_peaks) // 2]
-            prev_r_idx = r_peaks[len(r_peaks) // 2 - 1] if len(r_peaks) > 1 else None
-            tp_baseline_i = get_tp_baseline(lead_i_raw, r_mid, fs, prev_r_peak_idx=prev_r_idx)
-            tp_baseline_avf = get_tp_baseline(lead_avf_raw, r_mid, fs, prev_r_peak_idx=prev_r_idx)
-            
-            # Build time axis for median beat
-            time_axis_i, _ = build_median_beat(lead_i_raw, r_peaks, fs, min_beats=8)
-            if time_axis_i is None:
-                return getattr(self, '_prev_qrs_axis', 0) or 0
-            
-            # Calculate QRS axis using strict wave windows and net area (integral)
-            axis_deg = calculate_axis_from_median_beat(lead_i_raw, lead_ii, lead_avf_raw, median_i, median_ii, median_avf, r_peak_idx, fs, tp_baseline_i=tp_baseline_i, tp_baseline_avf=tp_baseline_avf, time_axis=time_axis_i, wave_type='QRS', prev_axis=self._prev_qrs_axis)
-            self._prev_qrs_axis = axis_deg
-            return int(round(axis_deg))
+            return metrics.qrs_axis
         except Exception as e:
             print(f"❌ Error calculating QRS axis from median: {e}")
             return 0
@@ -3045,70 +2881,11 @@ class ECGTestPage(QWidget):
         try:
             if len(self.data) < 6:
                 return getattr(self, '_prev_p_axis', 0) or 0
-            
-            fs = 500.0
-            if hasattr(self, 'sampler') and hasattr(self.sampler, 'sampling_rate') and self.sampler.sampling_rate:
-                fs = float(self.sampler.sampling_rate)
-            
-            lead_i_raw = np.asarray(self.data[0], dtype=float)
-            lead_ii = np.asarray(self.data[1], dtype=float)
-            lead_avf_raw = np.asarray(self.data[5], dtype=float)
-            
-            # 1. R-peak detection on Lead II (Same as QRS for alignment consistency)
-            from scipy.signal import butter, filtfilt
-            nyquist = fs / 2
-            b, a = butter(4, [0.5/nyquist, 40/nyquist], btype='band')
-            filtered_ii = filtfilt(b, a, lead_ii)
-            
-            signal_mean = np.mean(filtered_ii)
-            signal_std = np.std(filtered_ii)
-            r_peaks, _ = find_peaks(
-                filtered_ii, 
-                height=signal_mean + 0.5 * signal_std, 
-                distance=int(0.25 * fs), 
-                prominence=signal_std * 0.4
-            )
-            
-            if len(r_peaks) < 8:
-                return getattr(self, '_prev_p_axis', 0) or 0
-            
-            # 2. Build Median Beats
-            _, median_i = build_median_beat(lead_i_raw, r_peaks, fs, min_beats=8)
-            _, median_ii = build_median_beat(lead_ii, r_peaks, fs, min_beats=8)
-            _, median_avf = build_median_beat(lead_avf_raw, r_peaks, fs, min_beats=8)
-            
-            if median_i is None or median_ii is None or median_avf is None:
-                return getattr(self, '_prev_p_axis', 0) or 0
-                
-            r_peak_idx = len(median_i) // 2
-            
-            # 3. TP Baselines and PR (for window shrinking)
-            r_mid = r_peaks[len(r_peaks) // 2]
-            prev_r_idx = r_peaks[len(r_peaks) // 2 - 1] if len(r_peaks) > 1 else None
-            tp_baseline_i = get_tp_baseline(lead_i_raw, r_mid, fs, prev_r_peak_idx=prev_r_idx)
-            tp_baseline_avf = get_tp_baseline(lead_avf_raw, r_mid, fs, prev_r_peak_idx=prev_r_idx)
-            
-            time_axis_i, _ = build_median_beat(lead_i_raw, r_peaks, fs, min_beats=8)
-            pr_ms = getattr(self, 'pr_interval', 160)
-            
-            # 4. Axis Calculation (Integral Area Method)
-            axis_deg = calculate_axis_from_median_beat(
-                lead_i_raw, lead_ii, lead_avf_raw, 
-                median_i, median_ii, median_avf, 
-                r_peak_idx, fs, 
-                tp_baseline_i=tp_baseline_i, 
-                tp_baseline_avf=tp_baseline_avf, 
-                time_axis=time_axis_i, 
-                wave_type='P', 
-                prev_axis=getattr(self, '_prev_p_axis', None),
-                pr_ms=pr_ms
-            )
-            
-            if axis_deg is None:
+            # Shared measure_all() result for this data epoch (P window from its PR)
+            metrics = self.measure_window()
+            if metrics is None or metrics.p_axis is None:
                 return getattr(self, '_prev_p_axis', 0) or 0
-                
-            self._prev_p_axis = axis_deg
-            return int(round(axis_deg))
+            return metrics.p_axis
         except Exception as e:
             print(f"❌ Error calculating P axis: {e}")
             return 0
@@ -3118,69 +2895,15 @@ class ECGTestPage(QWidget):
         try:
             if len(self.data) < 6:
                 return getattr(self, '_prev_t_axis', 0) or 0
-            
-            fs = 500.0
-            if hasattr(self, 'sampler') and hasattr(self.sampler, 'sampling_rate') and self.sampler.sampling_rate:
-                fs = float(self.sampler.sampling_rate)
-            
-            lead_i_raw = np.asarray(self.data[0], dtype=float)
-            lead_ii = np.asarray(self.data[1], dtype=float)
-            lead_avf_raw = np.asarray(self.data[5], dtype=float)
-            
-            # 1. R-peak detection on Lead II
-            from scipy.signal import butter, filtfilt
-            nyquist = fs / 2
-            b, a = butter(4, [0.5/nyquist, 40/nyquist], btype='band')
-            filtered_ii = filtfilt(b, a, lead_ii)
-            
-            signal_mean = np.mean(filtered_ii)
-            signal_std = np.std(filtered_ii)
-            r_peaks, _ = find_peaks(
-                filtered_ii, 
-                height=signal_mean + 0.5 * signal_std, 
-                distance=int(0.25 * fs), 
-                prominence=signal_std * 0.4
-            )
-            
-            if len(r_peaks) < 8:
-                return getattr(self, '_prev_t_axis', 0) or 0
-            
-            # 2. Build Median Beats
-            _, median_i = build_median_beat(lead_i_raw, r_peaks, fs, min_beats=8)
-            _, median_ii = build_median_beat(lead_ii, r_peaks, fs, min_beats=8)
-            _, median_avf = build_median_beat(lead_avf_raw, r_peaks, fs, min_beats=8)
-            
-            if median_i is None or median_ii is None or median_avf is None:
+            # Shared measure_all() result for this data epoch
+            metrics = self.measure_window()
+            if metrics is None or metrics.t_axis is None:
                 return getattr(self, '_prev_t_axis', 0) or 0
-                
-            r_peak_idx = len(median_i) // 2
-            
-            # 3. TP Baselines
-            r_mid = r_peaks[len(r_peaks) // 2]
-            prev_r_idx = r_peaks[len(r_peaks) // 2 - 1] if len(r_peaks) > 1 else None
-            tp_baseline_i = get_tp_baseline(lead_i_raw, r_mid, fs, prev_r_peak_idx=prev_r_idx)
-            tp_baseline_avf = get_tp_baseline(lead_avf_raw, r_mid, fs, prev_r_peak_idx=prev_r_idx)
-            
-            time_axis_i, _ = build_median_beat(lead_i_raw, r_peaks, fs, min_beats=8)
-            
-            # 4. Axis Calculation (Integral Area Method)
-            axis_deg = calculate_axis_from_median_beat(
-                lead_i_raw, lead_ii, lead_avf_raw, 
-                median_i, median_ii, median_avf, 
-                r_peak_idx, fs, 
-                tp_baseline_i=tp_baseline_i, 
-                tp_baseline_avf=tp_baseline_avf, 
-                time_axis=time_axis_i, 
-                wave_type='T', 
-                prev_axis=getattr(self, '_prev_t_axis', None)
-            )
-            
-            self._prev_t_axis = axis_deg
-            return int(round(axis_deg))
+            return metrics.t_axis
         except Exception as e:
             print(f"❌ Error calculating T axis: {e}")
             return 0
-    
+
     def calculate_rv5_sv1_from_median(self):
         """Calculate RV5 and SV1 from median beats (GE/Philips standard).
         
@@ -3191,50 +2914,12 @@ class ECGTestPage(QWidget):
         try:
             if len(self.data) < 8:
                 return None, None
-            
-            fs = 500.0
-            if hasattr(self, 'sampler') and hasattr(self.sampler, 'sampling_rate') and self.sampler.sampling_rate:
-                fs = float(self.sampler.sampling_rate)
-                
-            # CRITICAL: Correct lead indices for 12-lead ECG
-            # LEADS_MAP: ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
-            # Index 6 = V1, Index 10 = V5
-            lead_v5_raw = np.asarray(self.data[10], dtype=float) if len(self.data) > 10 else None
-            lead_v1_raw = np.asarray(self.data[6], dtype=float) if len(self.data) > 6 else None
-            lead_ii = np.asarray(self.data[1], dtype=float)
-            
-            if lead_v5_raw is None or lead_v1_raw is None:
-                return None, None
-            
-            # 1. Detect R-peaks on Lead II for alignment
-            from scipy.signal import butter, filtfilt
-            nyquist = fs / 2
-            b, a = butter(4, [0.5/nyquist, 40/nyquist], btype='band')
-            filtered_ii = filtfilt(b, a, lead_ii)
-            
-            signal_mean = np.mean(filtered_ii)
-            signal_std = np.std(filtered_ii)
-            r_peaks, _ = find_peaks(
-                filtered_ii, 
-                height=signal_mean + 0.5 * signal_std, 
-                distance=int(0.25 * fs), 
-                prominence=signal_std * 0.4
-            )
-            
-            if len(r_peaks) < 8:
+            # Shared measure_all() result: V5 (index 10) / V1 (index 6) median beats
+            # aligned on the same R-peaks as every other measurement
+            metrics = self.measure_window()
+            if metrics is None:
                 return None, None
-                
-            # 2. Call measurement function using RAW data and shared R-peaks
-            # ADC factors for V5/V1 (Marquette standards)
-            rv5_mv, sv1_mv = measure_rv5_sv1_from_median_beat(
-                lead_v5_raw, lead_v1_raw, 
-                r_peaks, r_peaks, # Use shared R-peaks for alignment
-                fs, 
-                v5_adc_per_mv=2048.0, 
-                v1_adc_per_mv=1441.0
-            )
-            
-            return rv5_mv, sv1_mv
+            return metrics.rv5_mv, metrics.sv1_mv
         except Exception as e:
             print(f"❌ Error calculating RV5/SV1 from median: {e}")
             return None, None
@@ -3301,7 +2986,7 @@ class ECGTestPage(QWidget):
             
             # Get current heart rate
             if has_real_signal:
-                heart_rate = self.calculate_heart_rate(self.data[1])
+                heart_rate = self.request_heart_rate()
                 metrics['heart_rate'] = f"{heart_rate}" if heart_rate > 0 else "0"
             else:
                 metrics['heart_rate'] = "0"
@@ -3340,8 +3025,18 @@ class ECGTestPage(QWidget):
 
     def get_latest_rhythm_interpretation(self):
         """Expose latest arrhythmia interpretation string for the dashboard."""
+        labels = self.current_rhythm_labels()
+        if labels:
+            return ", ".join(labels)
         return getattr(self, '_latest_rhythm_interpretation', "Analyzing Rhythm...")
 
+    def current_rhythm_labels(self):
+        """Active rhythm-timeline labels (base rhythm first), or [] until the engine has a rhythm."""
+        engine = getattr(self, 'rhythm_engine', None)
+        if engine is None or not engine.ready:
+            return []
+        return engine.current_labels()
+
     def update_plot_y_range(self, plot_index):
         """Update Y-axis range for a specific plot using robust stats to avoid cropping"""
         try:
@@ -4455,15 +4150,21 @@ class ECGTestPage(QWidget):
                         })
 
                     # --- Arrhythmia detection ---
-                    arrhythmia_result = detect_arrhythmia(
-                        heart_rate,
-                        qrs_duration,
-                        rr_intervals,
-                        pr_interval=pr_interval,
-                        p_peaks=p_peaks,
-                        r_peaks=r_peaks,
-                        ecg_signal=centered
-                    )
+                    # The streaming rhythm engine already classified these beats; the
+                    # window rules are only the fallback until it has a rhythm
+                    rhythm_labels = self.current_rhythm_labels()
+                    if rhythm_labels:
+                        arrhythmia_result = ", ".join(rhythm_labels)
+                    else:
+                        arrhythmia_result = detect_arrhythmia(
+                            heart_rate,
+                            qrs_duration,
+                            rr_intervals,
+                            pr_interval=pr_interval,
+                            p_peaks=p_peaks,
+                            r_peaks=r_peaks,
+                            ecg_signal=centered
+                        )
                     arrhythmia_label.setText(arrhythmia_result)
                     self._latest_rhythm_interpretation = arrhythmia_result
                 else:
@@ -4971,6 +4672,41 @@ class ECGTestPage(QWidget):
             print(f"Real-time smoothing error: {e}")
             return new_value
 
+    def apply_realtime_smoothing_block(self, block):
+        """Vectorized apply_realtime_smoothing for a (n_leads x k) block of new samples.
+
+        Same output as calling apply_realtime_smoothing sample by sample: raw for the
+        first 4 samples, mean of the last 5 for samples 5-6, then the 7-tap Gaussian.
+        """
+        block = np.asarray(block, dtype=float)
+        n_leads, k = block.shape
+        if k == 0:
+            return block
+        if getattr(self, '_smoothing_history', None) is None or self._smoothing_history.shape[0] != n_leads:
+            self._smoothing_history = np.empty((n_leads, 0))
+            self._smoothing_seen = 0
+            g = np.exp(-0.5 * ((np.arange(7) - 3) / 2) ** 2)
+            self._smoothing_weights = g / np.sum(g)
+
+        hist = self._smoothing_history
+        h = hist.shape[1]  # == min(6, samples seen so far)
+        ext = np.concatenate((hist, block), axis=1)
+        out = block.copy()
+
+        # Samples with >= 7 points of history get the Gaussian FIR
+        j0 = max(0, 6 - h)
+        if ext.shape[1] >= 7 and j0 < k:
+            windows = sliding_window_view(ext, 7, axis=1)
+            out[:, j0:] = windows[:, h + j0 - 6:] @ self._smoothing_weights
+        # Warm-up (only right after start): 5-6 points -> mean of last 5
+        for j in range(min(j0, k)):
+            if self._smoothing_seen + j + 1 >= 5:
+                out[:, j] = np.mean(ext[:, h + j - 4:h + j + 1], axis=1)
+
+        self._smoothing_history = ext[:, -6:]
+        self._smoothing_seen += k
+        return out
+
     # ---------------------- Serial Port Auto-Detection ----------------------
 
     def get_available_serial_ports(self):
@@ -5077,6 +4813,7 @@ class ECGTestPage(QWidget):
                 self.show_connection_warning(f"Invalid baud rate: {baud}. Please set a valid baud rate in System Setup.")
                 return
             
+            self._stop_acquisition_thread()
             if self.serial_reader:
                 self.serial_reader.close()
             
@@ -5135,6 +4872,14 @@ class ECGTestPage(QWidget):
                         raise e2
                 else:
                     raise e
+
+            # Fresh filter state and rhythm timeline for the new stream
+            self._reset_display_filters()
+            self.rhythm_engine.reset()
+            # Record every sample to disk so the expanded view can scroll the whole session
+            self._start_full_disclosure()
+            # Move serial I/O off the GUI thread unless polling mode is configured
+            self._start_acquisition_thread()
             
             # Use faster timer interval for EXE builds to prevent gaps
             # Timer interval is more important than timer type for smooth plotting
@@ -5194,6 +4939,8 @@ class ECGTestPage(QWidget):
             
         if self.serial_reader:
             self.serial_reader.stop()
+        self._stop_acquisition_thread()
+        self._stop_full_disclosure()
         self.timer.stop()
         if hasattr(self, '_12to1_timer'):
             self._12to1_timer.stop()
@@ -5319,11 +5066,327 @@ class ECGTestPage(QWidget):
         except Exception as e:
             print(f"❌ Error enabling demo mode: {e}")
 
+    def _start_acquisition_thread(self):
+        """Start the background serial reader feeding self.acquisition_ring"""
+        if not isinstance(self.serial_reader, SerialStreamReader):
+            return
+        try:
+            mode = self.settings_manager.get_setting("serial_acquisition_mode", "thread")
+        except Exception:
+            mode = "thread"
+        if mode != "thread":
+            print("ℹ️ Serial acquisition mode: GUI polling")
+            return
+        # ~10 s at 500 Hz: the GUI can stall for seconds before samples are lost
+        self.acquisition_ring = SampleRingBuffer(n_leads=len(LEAD_LABELS), capacity=5000)
+        self._ring_cursor = 0
+        self.acquisition_thread = SerialAcquisitionThread(self.serial_reader, self.acquisition_ring, LEAD_LABELS)
+        self.acquisition_thread.start()
+
+    def _stop_acquisition_thread(self):
+        """Stop the background serial reader (safe to call when not running)"""
+        thread = getattr(self, 'acquisition_thread', None)
+        if thread is None:
+            return
+        try:
+            thread.stop()
+        except Exception as e:
+            print(f"⚠️ Error stopping acquisition thread: {e}")
+        self.acquisition_thread = None
+
+    def _acquisition_thread_active(self):
+        thread = getattr(self, 'acquisition_thread', None)
+        return thread is not None and thread.is_alive()
+
+    def _append_live_samples(self, block):
+        """Append a (12 x k) block of decoded samples to the live lead buffers"""
+        n_samples = block.shape[1]
+        if n_samples > 0:
+            perf = self.perf_stats
+            with perf.timer("gui.ingest_ms"):
+                smoothed = self.apply_realtime_smoothing_block(block)
+                self.data.extend(smoothed)
+                self._update_display_filters(smoothed)
+                self._update_qrs_detector(smoothed)
+            perf.incr("gui.samples_appended", n_samples)
+            recorder = getattr(self, 'disclosure_recorder', None)
+            if recorder is not None and not recorder.closed:
+                try:
+                    recorder.append(smoothed)
+                except Exception as e:
+                    print(f"⚠️ Full-disclosure write failed, recording stopped: {e}")
+                    self._stop_full_disclosure()
+        try:
+            if hasattr(self, 'sampler') and n_samples > 0:
+                sampling_rate = self.sampler.add_samples(n_samples)
+                if sampling_rate > 0 and hasattr(self, 'metric_labels') and 'sampling_rate' in self.metric_labels:
+                    self.metric_labels['sampling_rate'].setText(f"{sampling_rate:.1f} Hz")
+        except Exception as e:
+            print(f"❌ Error updating sampling rate: {e}")
+        return n_samples
+
+    def _start_full_disclosure(self):
+        """Open a new full-disclosure session (setting "full_disclosure_recording")"""
+        self._stop_full_disclosure()
+        try:
+            enabled = self.settings_manager.get_setting("full_disclosure_recording", "on")
+        except Exception:
+            enabled = "on"
+        if enabled != "on":
+            return
+        try:
+            max_age_days = float(self.settings_manager.get_setting("full_disclosure_max_age_days", 30))
+            max_total_mb = float(self.settings_manager.get_setting("full_disclosure_max_total_mb", 2048))
+        except Exception:
+            max_age_days, max_total_mb = 30.0, 2048.0
+        try:
+            self.disclosure_recorder = FullDisclosureRecorder.create(
+                fs=self._live_sampling_rate(), n_leads=len(LEAD_LABELS), lead_names=list(LEAD_LABELS),
+                max_age_days=max_age_days, max_total_mb=max_total_mb)
+            print(f"💾 Full-disclosure recording to {self.disclosure_recorder.directory}")
+        except Exception as e:
+            print(f"⚠️ Could not start full-disclosure recording: {e}")
+            self.disclosure_recorder = None
+
+    def _stop_full_disclosure(self):
+        """Close the running session (review it later with open_full_disclosure)"""
+        recorder = getattr(self, 'disclosure_recorder', None)
+        self.disclosure_recorder = None
+        if recorder is None or recorder.closed:
+            return
+        try:
+            recorder.set_sampling_rate(self._live_sampling_rate())
+            recorder.close()
+        except Exception as e:
+            print(f"⚠️ Error closing full-disclosure session: {e}")
+
+    def _live_sampling_rate(self):
+        """Sampling rate of the live stream (measured rate when available)"""
+        if hasattr(self, 'sampler') and hasattr(self.sampler, 'sampling_rate') and self.sampler.sampling_rate > 10:
+            return float(self.sampler.sampling_rate)
+        if hasattr(self, 'sampling_rate') and self.sampling_rate > 10:
+            return float(self.sampling_rate)
+        return 186.5
+
+    def _reset_display_filters(self):
+        """Drop streaming filter / R-peak detector state and the filtered display history"""
+        self.display_data.reset()
+        self.display_filter_chain = StreamingFilterChain(n_channels=12)
+        self._baseline_tracker = None
+        self.qrs_detector = None
+
+    def _update_display_filters(self, block):
+        """
+        Advance the streaming display filters by a (12 x k) block of new samples.
+        
+        Only the new samples are filtered (state is carried per lead), so the
+        display no longer re-runs filtfilt and a 2 s convolution over every lead's
+        window on each frame. The chain is rebuilt - and the filtered history
+        re-primed from self.data - only when the rate or AC setting changes.
+        """
+        try:
+            # 1 Hz resolution: the measured rate jitters and a 50/60 Hz notch does not care
+            fs = round(self._live_sampling_rate())
+            ac_setting = self.settings_manager.get_setting("filter_ac", "off") if self.settings_manager else "off"
+            if self.display_filter_chain.configure(fs, ac_filter=ac_setting):
+                history = self.data.snapshot()
+                self.display_data.reset()
+                self.display_data.extend(self.display_filter_chain.process(history))
+            else:
+                self.display_data.extend(self.display_filter_chain.process(block))
+            
+            window = max(10, int(2.0 * fs))  # 2 s moving-average baseline
+            tracker = self._baseline_tracker
+            if tracker is None or tracker.window != window:
+                tracker = StreamingMovingAverage(window, n_channels=12)
+                tracker.update(self.data.latest(window))
+                self._baseline_tracker = tracker
+            else:
+                tracker.update(block)
+        except Exception as e:
+            print(f"⚠️ Streaming display filter error: {e}")
+            self._reset_display_filters()
+
+    def _update_qrs_detector(self, block):
+        """
+        Feed new raw Lead II samples to the online Pan-Tompkins detector.
+        
+        The detector is (re)built from the stored history when it does not exist
+        yet, has fallen out of step with self.data, or the measured rate moved by
+        more than 2%; otherwise only the new samples are processed.
+        """
+        try:
+            fs = self._live_sampling_rate()
+            detector = self.qrs_detector
+            in_step = detector is not None and detector.processed == self.data.total_written - block.shape[1]
+            if not in_step or abs(fs - detector.fs) > 0.02 * detector.fs:
+                self.qrs_detector = StreamingPanTompkins(
+                    fs=fs, start_index=self.data.total_written - self.data.filled)
+                self.qrs_detector.process(self.data.latest(lead=1))
+            else:
+                detector.process(block[1])
+        except Exception as e:
+            print(f"⚠️ Streaming R-peak detector error: {e}")
+            self.qrs_detector = None
+            return
+        self._update_rhythm_engine(fs)
+
+    def _update_rhythm_engine(self, fs):
+        """
+        Hand beats the detector found since the last call to the rhythm engine.
+        
+        A beat is passed on once 100 ms of signal follow its R peak (enough for
+        the S wave), with its QRS width / P wave / PR measured on raw Lead II.
+        A rebuilt detector re-reports old peaks; those at or before the engine's
+        last beat are skipped, so every beat is classified exactly once.
+        """
+        engine = self.rhythm_engine
+        detector = self.qrs_detector
+        if detector is None:
+            return
+        try:
+            total = self.data.total_written
+            if engine.last_r is not None and engine.last_r >= total:
+                # Buffer was reset underneath us: new stream, new timeline
+                engine.reset()
+            engine.set_sampling_rate(fs)
+            start = 0 if engine.last_r is None else engine.last_r + 1
+            ready_before = total - int(0.1 * fs)
+            peaks = detector.peaks_since(start)
+            peaks = peaks[peaks < ready_before]
+            if len(peaks):
+                window_start = total - self.data.filled
+                lead_ii = self.data.latest(lead=1)
+                prev_r = engine.last_r
+                for r in peaks:
+                    prev_rel = None if prev_r is None or prev_r < window_start else prev_r - window_start
+                    qrs_ms, has_p, pr_ms, extra_p = measure_beat(lead_ii, int(r) - window_start, fs, prev_rel)
+                    engine.add_beat(int(r), qrs_ms=qrs_ms, has_p=has_p, pr_ms=pr_ms, extra_p_waves=extra_p)
+                    prev_r = int(r)
+            engine.tick(total)
+        except Exception as e:
+            print(f"⚠️ Streaming rhythm engine error: {e}")
+
+    def live_r_peaks(self, n_samples):
+        """
+        R peaks from the online detector inside the newest n_samples of Lead II.
+        
+        Args:
+            n_samples: Length of the window (as returned by self.data.latest(n_samples))
+        
+        Returns:
+            np.ndarray of indices relative to that window, or None when the detector
+            is not following the live stream (demo mode, not started, rate change)
+        """
+        detector = getattr(self, 'qrs_detector', None)
+        if detector is None or detector.processed != self.data.total_written:
+            return None
+        window_start = self.data.total_written - min(int(n_samples), self.data.filled)
+        return detector.peaks_since(window_start) - window_start
+
+    def window_analysis(self, fs=None):
+        """
+        Cached analysis (R-peaks, median beats, TP baselines) of the current raw window.
+        
+        Every consumer that asks during the same data epoch (same write position
+        and fs) shares one set of results - see ecg.analysis_cache.
+        """
+        if fs is None:
+            fs = self._live_sampling_rate()
+        return WindowAnalysis(self.analysis_cache, self.data, fs, r_peak_source=self.live_r_peaks)
+
+    def measure_window(self, fs=None):
+        """
+        measure_all() result (ECGMeasurements) for the current raw window.
+        
+        Computed once per data epoch and shared by calculate_ecg_metrics, the
+        axis/RV5 helpers and the report generators. Returns None with fewer
+        than 8 beats.
+        """
+        prev_axes = {'p': self._prev_p_axis, 'qrs': self._prev_qrs_axis, 't': self._prev_t_axis}
+        metrics = self.window_analysis(fs).measurements(prev_axes)
+        self._remember_axes(metrics)
+        return metrics
+
+    def _remember_axes(self, metrics):
+        """Keep the last determinate P/QRS/T axes for beats whose axis is indeterminate."""
+        if metrics is None:
+            return
+        if metrics.p_axis is not None:
+            self._prev_p_axis = metrics.p_axis
+        if metrics.qrs_axis is not None:
+            self._prev_qrs_axis = metrics.qrs_axis
+        if metrics.t_axis is not None:
+            self._prev_t_axis = metrics.t_axis
+
+    def display_envelope(self, view, buffer, lead, n_samples, n_columns):
+        """
+        Pixel-width min/max envelope of one lead's newest samples.
+        
+        Each view keeps its own StreamingEnvelope, so the per-lead bins are
+        updated incrementally as samples arrive and a redraw costs O(width).
+        
+        Args:
+            view: Cache key of the calling view
+            buffer: Lead store (self.data or self.display_data)
+            lead: Lead index
+            n_samples: Window length in samples
+            n_columns: Plot width in pixels
+        
+        Returns:
+            (x, y): sample offsets from the window start and raw (unscaled) values
+        """
+        envelope = self.display_envelopes.get(view)
+        if envelope is None:
+            envelope = self.display_envelopes[view] = StreamingEnvelope()
+        return envelope.envelope(buffer, lead, n_samples, n_columns)
+
+    def _plot_columns(self, widgets, default=800):
+        """Widest pixel width among plot widgets (one bin size per view keeps the cache warm)"""
+        try:
+            width = max((w.width() for w in widgets if w is not None), default=0)
+        except Exception:
+            width = 0
+        return int(width) if width >= 100 else default
+
+    def _display_source(self):
+        """
+        Lead store for the live display paths.
+        
+        Returns:
+            (buffer, ac_filtered) - the streamed AC-filtered history while serial data
+            is flowing through _append_live_samples, else the raw history
+        """
+        if self.serial_reader is not None and self.display_filter_chain.active \
+                and self.display_data.filled == self.data.filled:
+            return self.display_data, True
+        return self.data, False
+
+    def _update_flatline_alert(self, lead_index, is_flat):
+        """Warn once when a lead goes flat; re-arm the warning when the signal returns"""
+        if is_flat and not self._flatline_alert_shown[lead_index]:
+            self._flatline_alert_shown[lead_index] = True
+            lead_name = self.leads[lead_index] if lead_index < len(self.leads) else f"Lead {lead_index+1}"
+            try:
+                QMessageBox.warning(
+                    self,
+                    "Flatline Detected",
+                    f"{lead_name} appears flat (no significant signal).\n"
+                    f"Please check the electrode/lead connection."
+                )
+            except Exception as warn_err:
+                print(f"⚠️ Flatline warning failed for {lead_name}: {warn_err}")
+        elif not is_flat:
+            # Reset flag when signal returns
+            self._flatline_alert_shown[lead_index] = False
+
     def update_plot(self):
-        print(f"[DEBUG] ECGTestPage - update_plot called, serial_reader exists: {self.serial_reader is not None}")
+        if hot_path_verbose():
+            print(f"[DEBUG] ECGTestPage - update_plot called, serial_reader exists: {self.serial_reader is not None}")
         
         if not self.serial_reader:
-            print("[DEBUG] ECGTestPage - No serial reader, returning")
+            if hot_path_verbose():
+                print("[DEBUG] ECGTestPage - No serial reader, returning")
             return
         
         # Read raw data directly from serial port
@@ -5332,16 +5395,19 @@ class ECGTestPage(QWidget):
             line_data = line.decode('utf-8', errors='replace').strip()
             
             if not line_data:
-                print("[DEBUG] ECGTestPage - No data received (empty line)")
+                if hot_path_verbose():
+                    print("[DEBUG] ECGTestPage - No data received (empty line)")
                 return
             
-            print(f"[DEBUG] ECGTestPage - Raw hardware data: '{line_data}' (length: {len(line_data)})")
+            if hot_path_verbose():
+                print(f"[DEBUG] ECGTestPage - Raw hardware data: '{line_data}' (length: {len(line_data)})")
             
             # Parse the 8-channel data (handle multiple spaces)
             try:
                 # Split by any whitespace and filter out empty strings
                 values = [int(x) for x in line_data.split() if x.strip()]
-                print(f"[DEBUG] ECGTestPage - Parsed {len(values)} values: {values}")
+                if hot_path_verbose():
+                    print(f"[DEBUG] ECGTestPage - Parsed {len(values)} values: {values}")
                 
                 if len(values) >= 8:
                     # Extract individual leads from 8-channel data
@@ -5366,12 +5432,14 @@ class ECGTestPage(QWidget):
                         "V1": v1, "V2": v2, "V3": v3, "V4": v4, "V5": v5, "V6": v6
                     }
                     
-                    print(f"[DEBUG] ECGTestPage - Successfully parsed 8-channel data: {lead_data}")
+                    if hot_path_verbose():
+                        print(f"[DEBUG] ECGTestPage - Successfully parsed 8-channel data: {lead_data}")
                     
                 elif len(values) == 1:
                     # Single value - generate realistic 12-lead ECG data
                     ecg_value = values[0]
-                    print(f"[DEBUG] ECGTestPage - Single value received: {ecg_value}, generating realistic ECG...")
+                    if hot_path_verbose():
+                        print(f"[DEBUG] ECGTestPage - Single value received: {ecg_value}, generating realistic ECG...")
                     
                     # Initialize realistic ECG generation if not already done
                     if not hasattr(self, 'ecg_generators'):
@@ -5403,11 +5471,13 @@ class ECGTestPage(QWidget):
                     self.ecg_time_index += 1
                     
                 else:
-                    print(f"[DEBUG] ECGTestPage - Unexpected number of values: {len(values)}")
+                    if hot_path_verbose():
+                        print(f"[DEBUG] ECGTestPage - Unexpected number of values: {len(values)}")
                     return
                     
             except ValueError as e:
-                print(f"[DEBUG] ECGTestPage - Error parsing values: {e}")
+                if hot_path_verbose():
+                    print(f"[DEBUG] ECGTestPage - Error parsing values: {e}")
                 # Try to extract numeric part using regex
                 import re
                 numbers = re.findall(r'-?\d+', line_data)
@@ -5415,7 +5485,8 @@ class ECGTestPage(QWidget):
                     try:
                         # Use first number as single value
                         ecg_value = int(numbers[0])
-                        print(f"[DEBUG] ECGTestPage - Extracted numeric value: {ecg_value}")
+                        if hot_path_verbose():
+                            print(f"[DEBUG] ECGTestPage - Extracted numeric value: {ecg_value}")
                         
                         # Use single value to generate realistic 12-lead ECG data
                         # Initialize realistic ECG generation if not already done
@@ -5447,10 +5518,12 @@ class ECGTestPage(QWidget):
                         # Move to next time sample
                         self.ecg_time_index += 1
                     except ValueError:
-                        print(f"[DEBUG] ECGTestPage - Could not parse numeric data from: '{line_data}'")
+                        if hot_path_verbose():
+                            print(f"[DEBUG] ECGTestPage - Could not parse numeric data from: '{line_data}'")
                         return
                 else:
-                    print(f"[DEBUG] ECGTestPage - No numeric data found in: '{line_data}'")
+                    if hot_path_verbose():
+                        print(f"[DEBUG] ECGTestPage - No numeric data found in: '{line_data}'")
                     return
             
             # Update data buffers for all leads
@@ -5460,7 +5533,8 @@ class ECGTestPage(QWidget):
                     if len(self.data[lead]) > self.buffer_size:
                         self.data[lead].pop(0)
             
-            print(f"[DEBUG] ECGTestPage - Updated data buffers, Lead II has {len(self.data['II'])} points")
+            if hot_path_verbose():
+                print(f"[DEBUG] ECGTestPage - Updated data buffers, Lead II has {len(self.data['II'])} points")
             
             # Write latest Lead II data to file for dashboard
             try:
@@ -5479,7 +5553,8 @@ class ECGTestPage(QWidget):
             # Update all plots
             for i, lead in enumerate(self.leads):
                 if len(self.data[lead]) > 0:
-                    print(f"[DEBUG] ECGTestPage - Updating plot for {lead}: {len(self.data[lead])} data points")
+                    if hot_path_verbose():
+                        print(f"[DEBUG] ECGTestPage - Updating plot for {lead}: {len(self.data[lead])} data points")
                     
                     # Prepare plot data
                     if len(self.data[lead]) < self.buffer_size:
@@ -5501,7 +5576,8 @@ class ECGTestPage(QWidget):
                     # Update the plot line
                     if i < len(self.lines):
                         self.lines[i].set_ydata(filtered_data)
-                        print(f"[DEBUG] ECGTestPage - Updated {lead} plot with {len(centered)} points, range: {np.min(centered):.2f} to {np.max(centered):.2f}")
+                        if hot_path_verbose():
+                            print(f"[DEBUG] ECGTestPage - Updated {lead} plot with {len(centered)} points, range: {np.min(centered):.2f} to {np.max(centered):.2f}")
                         
                         # Use dynamic y-limits based on current gain setting
                         ylim = self.ylim if hasattr(self, 'ylim') else 400
@@ -5528,95 +5604,27 @@ class ECGTestPage(QWidget):
                         if i < len(self.canvases):
                             self.canvases[i].draw_idle()
                     else:
-                        print(f"[DEBUG] ECGTestPage - Warning: No line object for lead {lead} at index {i}")
+                        if hot_path_verbose():
+                            print(f"[DEBUG] ECGTestPage - Warning: No line object for lead {lead} at index {i}")
                     
         except Exception as e:
-            print(f"[DEBUG] ECGTestPage - Error in update_plot: {e}")
+            if hot_path_verbose():
+                print(f"[DEBUG] ECGTestPage - Error in update_plot: {e}")
             import traceback
             traceback.print_exc()
 
-    def generate_pdf_report(self):
-        from PyQt5.QtWidgets import QFileDialog, QMessageBox
-        import datetime, os, json, shutil
-        from ecg.ecg_report_generator import generate_ecg_report
+    def generate_pdf_report(self, kinds=('ecg',)):
+        """
+        Build the 12-lead PDF report, plus the HRV / hyperkalemia reports when asked for.
 
-        # Capture last 10 seconds of live ECG data
-        lead_img_paths = {}
-        ordered_leads = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
-        
-        print(" Capturing last 10 seconds of live ECG data...")
-        
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.abspath(os.path.join(current_dir, '..'))
-        
-        # Calculate 10 seconds of data based on sampling rate
-        sampling_rate = 250  # Default sampling rate
-        if hasattr(self, 'sampler') and hasattr(self.sampler, 'sampling_rate'):
-            try:
-                sampling_rate = float(self.sampler.sampling_rate)
-            except:
-                sampling_rate = 250
-        
-        data_points_10_sec = int(sampling_rate * 10)  # 10 seconds of data
-        print(f" Capturing {data_points_10_sec} data points at {sampling_rate}Hz")
-        
-        for i, lead in enumerate(ordered_leads):
-            if i < len(self.data) and i < len(self.leads):
-                try:
-                    # Get the last 10 seconds of data for this lead
-                    lead_data = self.data[i]
-                    if len(lead_data) > data_points_10_sec:
-                        recent_data = lead_data[-data_points_10_sec:]
-                    else:
-                        recent_data = lead_data
-                    
-                    if len(recent_data) > 0:
-                        # Create a clean plot for the report
-                        import matplotlib.pyplot as plt
-                        import matplotlib
-                        matplotlib.use('Agg')  # Use non-interactive backend
-                        
-                        fig, ax = plt.subplots(figsize=(8, 2))
-                        
-                        # Plot the 10-second ECG trace
-                        time_axis = np.linspace(0, 10, len(recent_data))  # 10 seconds
-                        ax.plot(time_axis, recent_data, color='black', linewidth=0.8)
-                        
-                        # Clean medical-style formatting
-                        ax.set_xlim(0, 10)
-                        ax.set_xticks([0, 2, 4, 6, 8, 10])
-                        ax.set_xticklabels(['0s', '2s', '4s', '6s', '8s', '10s'])
-                        ax.set_ylabel('Amplitude (mV)')
-                        ax.set_title(f'Lead {lead} - Last 10 seconds', fontsize=10, fontweight='bold')
-                        
-                        # Add subtle grid
-                        ax.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
-                        ax.set_axisbelow(True)
-                        
-                        # Clean background
-                        ax.set_facecolor('white')
-                        fig.patch.set_facecolor('white')
-                        
-                        # Save the image
-                        img_path = os.path.join(project_root, f"lead_{lead}_10sec.png")
-                        fig.savefig(img_path, 
-                                  bbox_inches='tight', 
-                                  pad_inches=0.1, 
-                                  dpi=150, 
-                                  facecolor='white',
-                                  edgecolor='none')
-                        
-                        plt.close(fig)  # Close to free memory
-                        lead_img_paths[lead] = img_path
-                        
-                        print(f" ✅ Captured 10s Lead {lead}: {len(recent_data)} samples")
-                    else:
-                        print(f" ⚠️ No data available for Lead {lead}")
-                        
-                except Exception as e:
-                    print(f" ❌ Error capturing Lead {lead}: {e}")
-            else:
-                print(f" ⚠️ Lead {lead} not available (index {i})")
+        The capture is archived here; the lead panels and PDFs are rendered by
+        the report job service in worker processes (see ecg.report_jobs).
+
+        Args:
+            kinds: Report kinds to produce for the same capture ('ecg', 'hrv', 'hyperkalemia')
+        """
+        from PyQt5.QtWidgets import QFileDialog, QMessageBox
+        import datetime, os, json
 
         # Ask user for destination
         filename, _ = QFileDialog.getSaveFileName(
@@ -5718,18 +5726,120 @@ class ECGTestPage(QWidget):
                 patient = {}
             patient["date_time"] = now_str
 
-            # Generate report with patient details
-            generate_ecg_report(filename, ecg_data, lead_img_paths, None, self, patient)
+            # Render the report(s) off the GUI thread; _finish_pdf_report runs when each PDF is written
+            name, ext = os.path.splitext(filename)
+            suffixes = {'ecg': '', 'hrv': '_HRV', 'hyperkalemia': '_Hyperkalemia'}
+            outputs = {kind: f"{name}{suffixes[kind]}{ext or '.pdf'}" for kind in kinds if kind in suffixes}
+            if not self.submit_report_jobs(outputs, ecg_data, patient):
+                QMessageBox.critical(self, "Error", "Failed to generate PDF: no ECG data could be saved for the report")
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to generate PDF: {str(e)}")
+
+    REPORT_TITLES = {
+        'ecg': ("ECG Report", "12 Lead"),
+        'hrv': ("HRV ECG Report", "HRV"),
+        'hyperkalemia': ("Hyperkalemia ECG Report", "Hyperkalemia"),
+    }
+
+    def submit_report_jobs(self, outputs, ecg_data, patient, on_done=None):
+        """
+        Archive the current capture and render the requested PDFs in the report job pool.
 
+        Args:
+            outputs: {kind: pdf filename}
+            ecg_data: Metrics dict for the generators
+            patient: Patient details
+            on_done: Called on the GUI thread with each successful job result
+                     (default: _finish_pdf_report)
+
+        Returns:
+            True if the jobs were queued (or ran inline), False if no capture could be saved
+        """
+        from ecg.report_jobs import create_report_jobs, get_report_job_service, run_report_jobs_inline
+
+        jobs = create_report_jobs(self, outputs, metrics=ecg_data, patient=patient)
+        if not jobs:
+            return False
+
+        self._pending_report_jobs = getattr(self, '_pending_report_jobs', 0) + len(jobs)
+        self._show_report_progress()
+
+        def _done(result, patient=patient):
+            self._on_report_done(result, patient, on_done)
+
+        try:
+            get_report_job_service().submit(jobs, on_progress=self._on_report_progress, on_done=_done)
+        except Exception as e:
+            print(f"⚠️ Report job pool unavailable, generating on the GUI thread: {e}")
+            for result in run_report_jobs_inline(jobs):
+                _done(result)
+        return True
+
+    def _show_report_progress(self):
+        try:
+            from PyQt5.QtWidgets import QProgressDialog
+            dialog = getattr(self, '_report_progress', None)
+            if dialog is None:
+                dialog = QProgressDialog("Generating report...", None, 0, 0, self)
+                dialog.setWindowTitle("ECG Report")
+                dialog.setMinimumDuration(0)
+                dialog.setAutoClose(False)
+                dialog.setAutoReset(False)
+                self._report_progress = dialog
+            dialog.setRange(0, 0)
+            dialog.show()
+        except Exception as e:
+            print(f"⚠️ Could not show report progress: {e}")
+
+    def _on_report_progress(self, event):
+        """Report job progress (GUI thread): one step per lead panel and per finished PDF."""
+        dialog = getattr(self, '_report_progress', None)
+        if dialog is None:
+            return
+        try:
+            dialog.setRange(0, event['total'])
+            dialog.setValue(event['done'])
+            stage = event['stage']
+            if stage.startswith('panel:'):
+                dialog.setLabelText(f"Rendering lead {stage.split(':', 1)[1]}...")
+            else:
+                title = self.REPORT_TITLES.get(event['kind'], ("Report", ""))[0]
+                dialog.setLabelText(f"{title} finished")
+        except Exception as e:
+            print(f"⚠️ Report progress update failed: {e}")
+
+    def _on_report_done(self, result, patient, on_done=None):
+        """One report job finished (GUI thread)."""
+        from PyQt5.QtWidgets import QMessageBox
+        self._pending_report_jobs = max(0, getattr(self, '_pending_report_jobs', 1) - 1)
+        if self._pending_report_jobs == 0 and getattr(self, '_report_progress', None) is not None:
+            self._report_progress.hide()
+        if not result.get('ok'):
+            QMessageBox.critical(self, "Error", f"Failed to generate PDF: {result.get('error')}")
+            return
+        print(f"✅ {result['kind']} report ready in {result.get('elapsed_ms') or 0:.0f} ms: {result['filename']}")
+        if on_done is not None:
+            on_done(result)
+            return
+        title, report_type = self.REPORT_TITLES.get(result['kind'], self.REPORT_TITLES['ecg'])
+        self._finish_pdf_report(result['filename'], patient, title=title, report_type=report_type)
+
+    def _finish_pdf_report(self, filename, patient, title="ECG Report", report_type="12 Lead"):
+        """History entry, dual-save to reports/ and Downloads, recent-reports index."""
+        from PyQt5.QtWidgets import QMessageBox
+        import datetime, os, json, shutil
+
+        try:
             # Append history
             try:
                 from dashboard.history_window import append_history_entry
-                append_history_entry(patient, filename, report_type="12 Lead")
+                append_history_entry(patient, filename, report_type=report_type)
             except Exception:
                 import traceback
                 traceback.print_exc()
 
-            QMessageBox.information(self, "Success", f"ECG Report generated successfully!\nSaved as: {filename}")
+            QMessageBox.information(self, "Success", f"{title} generated successfully!\nSaved as: {filename}")
 
             # Dual-save to app reports/ and update index.json
             base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -5745,7 +5855,7 @@ class ECGTestPage(QWidget):
                     dst_path = os.path.join(reports_dir, dst_basename)
                     counter += 1
                 shutil.copyfile(filename, dst_path)
-            
+
             # Also save to Downloads folder
             try:
                 import pathlib
@@ -5784,7 +5894,7 @@ class ECGTestPage(QWidget):
 
             meta = {
                 'filename': os.path.basename(dst_path),
-                'title': 'ECG Report',
+                'title': title,
                 'patient': full_name,
                 'date': now.strftime('%Y-%m-%d'),
                 'time': now.strftime('%H:%M:%S')
@@ -5808,7 +5918,7 @@ class ECGTestPage(QWidget):
                 pass
 
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to generate PDF: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to save report copies: {str(e)}")
 
     def export_csv(self):
         """Export ECG data to CSV file in the same format as dummydata.csv"""
@@ -6177,6 +6287,40 @@ class ECGTestPage(QWidget):
         target = int(base_buffer * (mapped_speed / 50.0))
         return max(1, target)
 
+    def _overlay_lead_envelope(self, view, source, ac_filtered, lead_index, buffer_len, n_columns, label):
+        """
+        Baseline-removed min/max envelope of one lead's newest buffer_len samples (overlay views).
+        
+        Uses the view's StreamingEnvelope, so a redraw costs O(plot width); the
+        window is only materialised when it must be AC-filtered this frame. The
+        baseline is the median of the envelope points.
+        
+        Returns:
+            (x, y, n): sample offsets, un-gained values, window length; None when the lead is empty
+        """
+        if lead_index is None or lead_index >= len(source):
+            return None
+        n = min(int(buffer_len), source.filled)
+        if n <= 0:
+            return None
+        envelope = None
+        try:
+            ac_setting = self.settings_manager.get_setting("filter_ac", "off") if hasattr(self, "settings_manager") else "off"
+            if not ac_filtered and ac_setting and ac_setting != "off" and n >= 10:
+                from ecg.ecg_filters import apply_ac_filter
+                window = np.array(source.latest(n, lead=lead_index), dtype=float)
+                window = apply_ac_filter(window, self._live_sampling_rate(), ac_setting)
+                envelope = minmax_decimate(np.arange(n, dtype=float), window, n_columns)
+        except Exception as filter_error:
+            print(f"⚠️ {label} AC filter skipped for lead {lead_index}: {filter_error}")
+        if envelope is None:
+            envelope = self.display_envelope(view, source, lead_index, n, n_columns)
+        x, y = envelope
+        y = np.asarray(y, dtype=float)
+        finite = np.isfinite(y)
+        baseline = float(np.median(y[finite])) if np.any(finite) else 0.0
+        return x, np.nan_to_num(y - baseline, copy=False), n
+
     def _update_overlay_plots(self):
         
         if not hasattr(self, '_overlay_lines') or not self._overlay_lines:
@@ -6186,72 +6330,27 @@ class ECGTestPage(QWidget):
         is_demo_mode = hasattr(self, 'demo_toggle') and self.demo_toggle.isChecked()
         
         target_buffer_len = self._get_overlay_target_buffer_len(is_demo_mode)
+        # Streamed AC-filtered history when live serial data is flowing
+        source, ac_filtered = self._display_source()
+        plot_columns = self._plot_columns([getattr(self, '_overlay_canvas', None)])
         
         for idx, lead in enumerate(self.leads):
             if idx < len(self._overlay_lines):
-                if idx < len(self.data):
-                    data = self.data[idx]
-                else:
-                    data = np.array([])
+                lead_index = idx
                 line = self._overlay_lines[idx]
                 ax = self._overlay_axes[idx]
 
-                # Ensure overlay line length matches current buffer size
+                # x runs over 0..buffer_len-1 sample slots; the line gets (x, y) pairs
                 buffer_len = target_buffer_len
-                try:
-                    xdata = line.get_xdata()
-                    current_len = len(xdata) if xdata is not None else 0
-                    if current_len != buffer_len:
-                        new_x = np.arange(buffer_len)
-                        line.set_xdata(new_x)
-                        current_len = buffer_len
-                    if current_len:
-                        buffer_len = current_len
-                except Exception as e:
-                    print(f"⚠️ Overlay line sync error (12-lead): {e}")
-                    buffer_len = target_buffer_len
+                plot_x = np.arange(buffer_len, dtype=float)
                 
                 plot_data = np.full(buffer_len, np.nan)
                 
-                if data is not None and len(data) > 0:
-                    # Take exactly buffer_len samples from the end (same as main plots)
-                    # This ensures overlay matches main view for all wave speeds
-                    if len(data) >= buffer_len:
-                        data_segment = data[-buffer_len:]
-                    else:
-                        data_segment = data
-                    
-                    # Optional AC notch filtering (match main 12-lead grid view)
-                    filtered_segment = np.array(data_segment, dtype=float)
-                    try:
-                        # Prefer hardware sampling rate; fall back to 186.5 Hz
-                        sampling_rate = 186.5
-                        try:
-                            if hasattr(self, "sampler") and hasattr(self.sampler, "sampling_rate") and self.sampler.sampling_rate > 10:
-                                sampling_rate = float(self.sampler.sampling_rate)
-                            elif hasattr(self, "sampling_rate") and self.sampling_rate > 10:
-                                sampling_rate = float(self.sampling_rate)
-                        except Exception:
-                            pass
-                        
-                        ac_setting = self.settings_manager.get_setting("filter_ac", "off") if hasattr(self, "settings_manager") else "off"
-                        if ac_setting and ac_setting != "off" and len(filtered_segment) >= 10:
-                            from ecg.ecg_filters import apply_ac_filter
-                            filtered_segment = apply_ac_filter(filtered_segment, sampling_rate, ac_setting)
-                    except Exception as filter_error:
-                        print(f"⚠️ Overlay AC filter skipped for lead {lead}: {filter_error}")
-                    
-                    # Center data around baseline before applying gain
-                    centered_raw = np.array(filtered_segment, dtype=float)
-                    if centered_raw.size:
-                        finite_mask = np.isfinite(centered_raw)
-                        if np.any(finite_mask):
-                            baseline = np.nanmedian(centered_raw[finite_mask])
-                            if np.isfinite(baseline):
-                                centered_raw = centered_raw - baseline
-                        centered_raw = np.nan_to_num(centered_raw, copy=False)
-                    else:
-                        centered_raw = np.zeros(buffer_len, dtype=float)
+                # Newest buffer_len samples (same as main plots) as a baseline-removed envelope
+                envelope = self._overlay_lead_envelope('overlay', source, ac_filtered, lead_index, buffer_len,
+                                                       plot_columns, "Overlay")
+                if envelope is not None:
+                    env_x, centered_raw, n = envelope
 
                     # Apply current gain setting (match main 12-lead grid)
                     gain_factor = get_display_gain(self.settings_manager.get_wave_gain())
@@ -6264,30 +6363,17 @@ class ECGTestPage(QWidget):
                             reduction_factor = 0.75  # Reduce to 75% for real mode to prevent clipping
                         gain_factor = gain_factor * reduction_factor
                     
-                    centered = centered_raw * gain_factor
-                    centered = np.nan_to_num(centered, copy=False)
+                    plot_data = centered_raw * gain_factor
                     
                     # Debug logging for first lead in demo mode
                     if is_demo_mode and idx == 1:  # Lead II
-                        print(f"🎨 Overlay demo mode: Lead {lead}, gain={gain_factor:.2f}, raw_range={np.max(np.abs(centered_raw)):.1f}, gained_range={np.max(np.abs(centered)):.1f}")
+                        print(f"🎨 Overlay demo mode: Lead {lead}, gain={gain_factor:.2f}, raw_range={np.max(np.abs(centered_raw)):.1f}, gained_range={np.max(np.abs(plot_data)):.1f}")
                     
-                    # Match main plots: if we have enough data, take exactly buffer_len samples
-                    # If not enough data, stretch what we have to fill buffer_len
-                    n = len(centered)
-                    if n < buffer_len:
-                        # Stretch available data to fill buffer_len
-                        stretched = np.interp(
-                            np.linspace(0, n-1, buffer_len),
-                            np.arange(n),
-                            centered
-                        )
-                        plot_data[:] = stretched
-                    else:
-                        # Take exactly buffer_len samples from the end (same as main plots)
-                        plot_data[:] = centered[-buffer_len:]
+                    # Stretch available data to fill buffer_len when fewer samples are held
+                    plot_x = env_x * ((buffer_len - 1) / (n - 1)) if 1 < n < buffer_len else env_x
                     
-                    # Set Y-limits based on UN-GAINED data for both demo and real mode, so gain actually affects visual size
-                    # Use raw data for Y-axis calculation, so gain changes visual size
+                    # Set Y-limits based on UN-GAINED data for both demo and real mode, so gain actually affects visual size.
+                    # The envelope keeps every extreme of the window, so its points stand in for the samples.
                     valid_data = centered_raw[np.isfinite(centered_raw)]
                     
                     if len(valid_data) > 0:
@@ -6330,7 +6416,7 @@ class ECGTestPage(QWidget):
                 
                 # Set x-limits
                 ax.set_xlim(0, max(buffer_len - 1, 1))
-                line.set_ydata(plot_data)
+                line.set_data(plot_x, plot_data)
         
         if hasattr(self, '_overlay_canvas'):
             self._overlay_canvas.draw_idle()
@@ -6875,75 +6961,27 @@ class ECGTestPage(QWidget):
         left_leads = ["I", "II", "III", "aVR", "aVL", "aVF"]
         right_leads = ["V1", "V2", "V3", "V4", "V5", "V6"]
         all_leads = left_leads + right_leads
+        # Streamed AC-filtered history when live serial data is flowing
+        source, ac_filtered = self._display_source()
+        plot_columns = max(100, self._plot_columns([getattr(self, '_overlay_canvas', None)]) // 2)
         
         for idx, lead in enumerate(all_leads):
             if idx < len(self._overlay_lines):
-                if lead in self.leads:
-                    lead_index = self.leads.index(lead)
-                    if lead_index < len(self.data):
-                        data = self.data[lead_index]
-                    else:
-                        data = np.array([])
-                else:
-                    data = np.array([])
+                lead_index = self.leads.index(lead) if lead in self.leads else None
                 line = self._overlay_lines[idx]
                 ax = self._overlay_axes[idx]
                 
-                # Ensure overlay line length matches current buffer size
+                # x runs over 0..buffer_len-1 sample slots; the line gets (x, y) pairs
                 buffer_len = target_buffer_len
-                try:
-                    xdata = line.get_xdata()
-                    current_len = len(xdata) if xdata is not None else 0
-                    if current_len != buffer_len:
-                        new_x = np.arange(buffer_len)
-                        line.set_xdata(new_x)
-                        current_len = buffer_len
-                    if current_len:
-                        buffer_len = current_len
-                except Exception as e:
-                    print(f"⚠️ Overlay line sync error (6-lead): {e}")
-                    buffer_len = target_buffer_len
+                plot_x = np.arange(buffer_len, dtype=float)
 
                 plot_data = np.full(buffer_len, np.nan)
                 
-                if data is not None and len(data) > 0:
-                    # Take exactly buffer_len samples from the end (same as main plots)
-                    # This ensures overlay matches main view for all wave speeds
-                    if len(data) >= buffer_len:
-                        data_segment = data[-buffer_len:]
-                    else:
-                        data_segment = data
-                    
-                    # Optional AC notch filtering (match main 12-lead grid view)
-                    filtered_segment = np.array(data_segment, dtype=float)
-                    try:
-                        sampling_rate = 186.5
-                        try:
-                            if hasattr(self, "sampler") and hasattr(self.sampler, "sampling_rate") and self.sampler.sampling_rate > 10:
-                                sampling_rate = float(self.sampler.sampling_rate)
-                            elif hasattr(self, "sampling_rate") and self.sampling_rate > 10:
-                                sampling_rate = float(self.sampler.sampling_rate)
-                        except Exception:
-                            pass
-                        
-                        ac_setting = self.settings_manager.get_setting("filter_ac", "off") if hasattr(self, "settings_manager") else "off"
-                        if ac_setting and ac_setting != "off" and len(filtered_segment) >= 10:
-                            from ecg.ecg_filters import apply_ac_filter
-                            filtered_segment = apply_ac_filter(filtered_segment, sampling_rate, ac_setting)
-                    except Exception as filter_error:
-                        print(f"⚠️ 6:2 overlay AC filter skipped for lead {lead}: {filter_error}")
-                    
-                    # Center data around baseline before applying gain
-                    centered_raw = np.array(filtered_segment, dtype=float)
-                    if centered_raw.size:
-                        finite_mask = np.isfinite(centered_raw)
-                        if np.any(finite_mask):
-                            baseline = np.nanmedian(centered_raw[finite_mask])
-                            if np.isfinite(baseline):
-                                centered_raw = centered_raw - baseline
-                        centered_raw = np.nan_to_num(centered_raw, copy=False)
-                    else:
-                        centered_raw = np.zeros(buffer_len, dtype=float)
+                # Newest buffer_len samples (same as main plots) as a baseline-removed envelope
+                envelope = self._overlay_lead_envelope('two_column', source, ac_filtered, lead_index, buffer_len,
+                                                       plot_columns, "6:2 overlay")
+                if envelope is not None:
+                    env_x, centered_raw, n = envelope
 
                     # Apply current gain setting (match main 12-lead grid)
                     gain_factor = get_display_gain(self.settings_manager.get_wave_gain())
@@ -6956,30 +6994,17 @@ class ECGTestPage(QWidget):
                             reduction_factor = 0.75  # Reduce to 75% for real mode to prevent clipping
                         gain_factor = gain_factor * reduction_factor
                     
-                    centered = centered_raw * gain_factor
-                    centered = np.nan_to_num(centered, copy=False)
+                    plot_data = centered_raw * gain_factor
                     
                     # Debug logging for first lead in demo mode
                     if is_demo_mode and idx == 1:  # Lead II
-                        print(f"🎨 6:2 Overlay demo mode: Lead {lead}, gain={gain_factor:.2f}, raw_range={np.max(np.abs(centered_raw)):.1f}, gained_range={np.max(np.abs(centered)):.1f}")
+                        print(f"🎨 6:2 Overlay demo mode: Lead {lead}, gain={gain_factor:.2f}, raw_range={np.max(np.abs(centered_raw)):.1f}, gained_range={np.max(np.abs(plot_data)):.1f}")
                     
-                    # Match main plots: if we have enough data, take exactly buffer_len samples
-                    # If not enough data, stretch what we have to fill buffer_len
-                    n = len(centered)
-                    if n < buffer_len:
-                        # Stretch available data to fill buffer_len
-                        stretched = np.interp(
-                            np.linspace(0, n-1, buffer_len),
-                            np.arange(n),
-                            centered
-                        )
-                        plot_data[:] = stretched
-                    else:
-                        # Take exactly buffer_len samples from the end (same as main plots)
-                        plot_data[:] = centered[-buffer_len:]
+                    # Stretch available data to fill buffer_len when fewer samples are held
+                    plot_x = env_x * ((buffer_len - 1) / (n - 1)) if 1 < n < buffer_len else env_x
                     
-                    # Set Y-limits based on UN-GAINED data for both demo and real mode, so gain actually affects visual size
-                    # Use raw data for Y-axis calculation, so gain changes visual size
+                    # Set Y-limits based on UN-GAINED data for both demo and real mode, so gain actually affects visual size.
+                    # The envelope keeps every extreme of the window, so its points stand in for the samples.
                     valid_data = centered_raw[np.isfinite(centered_raw)]
                     
                     if len(valid_data) > 0:
@@ -7022,12 +7047,17 @@ class ECGTestPage(QWidget):
                 
                 # Set x-limits
                 ax.set_xlim(0, max(buffer_len - 1, 1))
-                line.set_ydata(plot_data)
+                line.set_data(plot_x, plot_data)
         
         if hasattr(self, '_overlay_canvas'):
             self._overlay_canvas.draw_idle()
 
     def update_plots(self):
+        """Frame callback: draw one frame and record its time (gui.frame_ms)"""
+        with self.perf_stats.timer("gui.frame_ms"):
+            self._update_plots_frame()
+
+    def _update_plots_frame(self):
         """Update all ECG plots with current data using PyQtGraph (GitHub version)"""
         try:
             # Memory management - check every N updates
@@ -7046,11 +7076,13 @@ class ECGTestPage(QWidget):
                 baseline_seconds = 3.0
                 seconds_scale = (25.0 / max(1e-6, wave_speed))
                 seconds_to_show = baseline_seconds * seconds_scale
+                plot_columns = self._plot_columns(self.plot_widgets)
 
                 for i in range(len(self.data_lines)):
                     try:
                         if i < len(self.data):
                             raw = np.asarray(self.data[i])
+                            display_offset = 0.0
                             gain = 1.0
                             try:
                                 gain = get_display_gain(self.settings_manager.get_wave_gain())
@@ -7082,6 +7114,7 @@ class ECGTestPage(QWidget):
                                     current_dc = np.nanmean(raw) if len(raw) > 0 else 0.0
                                     self._display_zero_refs[i] = (1 - zero_alpha) * self._display_zero_refs[i] + zero_alpha * current_dc
                                     raw = raw - self._display_zero_refs[i]
+                                    display_offset = self._baseline_anchors[i] + self._display_zero_refs[i]
                             except Exception as filter_error:
                                 # Fallback: use original signal (baseline anchor handles it, no mean subtraction)
                                 print(f"⚠️ Using fallback baseline correction: {filter_error}")
@@ -7122,13 +7155,12 @@ class ECGTestPage(QWidget):
                                     self._flatline_alert_shown[i] = False
 
                             if src.size < 2:
-                                resampled = np.zeros(display_len)
+                                self.data_lines[i].setData(np.zeros(display_len))
                             else:
-                                x_src = np.linspace(0.0, 1.0, src.size)
-                                x_dst = np.linspace(0.0, 1.0, display_len)
-                                resampled = np.interp(x_dst, x_src, src)
-
-                            self.data_lines[i].setData(resampled)
+                                # Min/max envelope stretched over display_len (keeps QRS spikes)
+                                x_env, y_env = self.display_envelope('grid', self.data, i, src.size, plot_columns)
+                                x_plot = x_env * ((display_len - 1) / (src.size - 1))
+                                self.data_lines[i].setData(x_plot, (y_env - display_offset) * gain)
                             self.update_plot_y_range(i)
                     except Exception as e:
                         print(f"❌ Error updating plot {i}: {e}")
@@ -7142,40 +7174,23 @@ class ECGTestPage(QWidget):
             # Check if we're using the new packet-based reader
             is_packet_reader = isinstance(self.serial_reader, SerialStreamReader)
             
-            if is_packet_reader:
-                # NEW: Use packet-based reading
+            if is_packet_reader and self._acquisition_thread_active():
+                # THREADED: the acquisition thread owns the port; only drain what it decoded
                 try:
-                    packets = self.serial_reader.read_packets(max_packets=max_packets)
-                    
-                    for packet in packets:
-                        # Packet contains all 12 leads: I, II, III, aVR, aVL, aVF, V1, V2, V3, V4, V5, V6
-                        # Map packet dict to our lead order
-                        lead_order = ["I", "II", "III", "aVR", "aVL", "aVF", "V1", "V2", "V3", "V4", "V5", "V6"]
-                        
-                        for i, lead_name in enumerate(lead_order):
-                            try:
-                                if i < len(self.data) and lead_name in packet:
-                                    value = packet[lead_name]
-                                    # Update circular buffer
-                                    self.data[i] = np.roll(self.data[i], -1)
-                                    # Apply smoothing
-                                    smoothed_value = self.apply_realtime_smoothing(value, i)
-                                    self.data[i][-1] = smoothed_value
-                            except Exception as e:
-                                print(f"❌ Error updating data buffer {i} ({lead_name}): {e}")
-                                continue
-                        
-                        # Update sampling rate counter
-                        try:
-                            if hasattr(self, 'sampler'):
-                                sampling_rate = self.sampler.add_sample()
-                                if sampling_rate > 0 and hasattr(self, 'metric_labels') and 'sampling_rate' in self.metric_labels:
-                                    self.metric_labels['sampling_rate'].setText(f"{sampling_rate:.1f} Hz")
-                        except Exception as e:
-                            print(f"❌ Error updating sampling rate: {e}")
-                        
-                        packets_processed += 1
-                        
+                    self.perf_stats.gauge("gui.queue_depth", self.acquisition_ring.pending(self._ring_cursor))
+                    block, self._ring_cursor, dropped = self.acquisition_ring.read_since(self._ring_cursor)
+                    if dropped:
+                        self.samples_dropped += dropped
+                        self.perf_stats.incr("gui.samples_dropped", dropped)
+                        print(f"⚠️ GUI fell behind acquisition: {dropped} samples dropped (total {self.samples_dropped})")
+                    packets_processed = self._append_live_samples(block)
+                except Exception as e:
+                    print(f"❌ Error draining acquisition ring: {e}")
+            elif is_packet_reader:
+                # POLLING: read and batch-decode on the GUI timer
+                try:
+                    block = self.serial_reader.read_block(max_packets=max_packets)
+                    packets_processed = self._append_live_samples(block)
                 except Exception as e:
                     print(f"❌ Error reading serial packets: {e}")
                     if hasattr(self, 'serial_reader') and hasattr(self.serial_reader, '_handle_serial_error'):
@@ -7189,22 +7204,10 @@ class ECGTestPage(QWidget):
                         all_8_leads = self.serial_reader.read_value()
                         if all_8_leads:
                             all_12_leads = self.calculate_12_leads_from_8_channels(all_8_leads)
-                            for i in range(len(self.leads)):
-                                try:
-                                    if i < len(self.data) and i < len(all_12_leads):
-                                        self.data[i] = np.roll(self.data[i], -1)
-                                        smoothed_value = self.apply_realtime_smoothing(all_12_leads[i], i)
-                                        self.data[i][-1] = smoothed_value
-                                except Exception as e:
-                                    print(f"❌ Error updating data buffer {i}: {e}")
-                                    continue
-                            try:
-                                if hasattr(self, 'sampler'):
-                                    sampling_rate = self.sampler.add_sample()
-                                    if sampling_rate > 0 and hasattr(self, 'metric_labels') and 'sampling_rate' in self.metric_labels:
-                                        self.metric_labels['sampling_rate'].setText(f"{sampling_rate:.1f} Hz")
-                            except Exception as e:
-                                print(f"❌ Error updating sampling rate: {e}")
+                            column = np.zeros((len(self.data), 1), dtype=np.float32)
+                            n = min(len(self.data), len(all_12_leads))
+                            column[:n, 0] = all_12_leads[:n]
+                            self._append_live_samples(column)
                             lines_processed += 1
                         else:
                             break
@@ -7240,6 +7243,7 @@ class ECGTestPage(QWidget):
                 baseline_seconds = 3.0
                 seconds_scale = (25.0 / max(1e-6, wave_speed))
                 seconds_to_show = baseline_seconds * seconds_scale
+                plot_columns = self._plot_columns(self.plot_widgets)
                 
                 for i in range(len(self.leads)):
                     try:
@@ -7247,10 +7251,6 @@ class ECGTestPage(QWidget):
                             continue
                         has_data = (i < len(self.data) and len(self.data[i]) > 0)
                         if has_data:
-                            # Calculate gain factor: higher mm/mV = higher gain (10mm/mV = 1.0x baseline)
-                            gain_factor = get_display_gain(self.settings_manager.get_wave_gain())
-                            scaled_data = self.apply_adaptive_gain(self.data[i], signal_source, gain_factor)
-
                             # Build time axis and apply wave-speed scaling
                             sampling_rate = 186.5
                             if hasattr(self, 'sampler') and hasattr(self.sampler, 'sampling_rate') and self.sampler.sampling_rate > 10:
@@ -7264,102 +7264,96 @@ class ECGTestPage(QWidget):
                             # 50 mm/s → 5s window (show less data, stretched)
                             samples_to_show = int(sampling_rate * seconds_to_show)
                             
-                            # Take only the most recent samples_to_show from the buffer (before gain application)
-                            raw_data = self.data[i]
-                            if len(raw_data) > samples_to_show:
-                                data_slice = raw_data[-samples_to_show:]
+                            # Newest samples_to_show of the lead store. While streaming, display_data
+                            # already carries the AC notch; the window itself is never copied here.
+                            source, ac_filtered = self._display_source()
+                            n = min(samples_to_show, source.filled)
+
+                            # Optional AC notch filtering based on "Set Filter" selection, only when the
+                            # streaming chain has not applied it (the window is then filtered this frame)
+                            try:
+                                ac_setting = self.settings_manager.get_setting("filter_ac", "off") if self.settings_manager else "off"
+                            except Exception:
+                                ac_setting = "off"
+                            frame_filtered = not ac_filtered and bool(ac_setting) and ac_setting != "off" and n >= 10
+
+                            # Pixel-width min/max envelope of the raw values: O(width) per frame, and
+                            # every extreme is kept, so the range / peak statistics below stay exact
+                            if frame_filtered:
+                                window = np.array(source.latest(n, lead=i), dtype=float)
+                                try:
+                                    from ecg.ecg_filters import apply_ac_filter
+                                    window = apply_ac_filter(window, sampling_rate, ac_setting)
+                                except Exception:
+                                    pass  # AC filter is optional
+                                x_env, y_env = minmax_decimate(np.arange(n, dtype=float), window, plot_columns)
                             else:
-                                data_slice = raw_data
-                            
+                                x_env, y_env = self.display_envelope('grid', source, i, n, plot_columns)
+
                             # 🫀 DISPLAY: Low-frequency baseline anchor (removes respiration from baseline)
                             # Extract very-low-frequency baseline (< 0.3 Hz) to prevent baseline from "breathing"
-                            filtered_slice = np.array(data_slice, dtype=float)
+                            display_offset = 0.0
                             try:
                                 # Initialize slow anchor if needed
                                 if not hasattr(self, '_baseline_anchors'):
                                     self._baseline_anchors = [0.0] * 12
                                     self._baseline_alpha_slow = 0.0005  # Monitor-grade: ~4 sec time constant at 500 Hz
-                                
-                                if len(filtered_slice) > 0:
+
+                                if n > 0:
                                     # Extract low-frequency baseline estimate (removes respiration 0.1-0.35 Hz)
-                                    baseline_estimate = self._extract_low_frequency_baseline(filtered_slice, sampling_rate)
-                                    
+                                    tracker = self._baseline_tracker
+                                    if ac_filtered and tracker is not None and tracker.count > 0:
+                                        # Streaming 2 s moving average, updated as samples arrive
+                                        baseline_estimate = float(tracker.value[i])
+                                    else:
+                                        # The estimate only reads the newest 2 s
+                                        recent = np.asarray(source.latest(min(n, int(2.0 * sampling_rate)), lead=i), dtype=float)
+                                        baseline_estimate = self._extract_low_frequency_baseline(recent, sampling_rate)
+
                                     # Update anchor with slow EMA (tracks only very-low-frequency drift)
                                     self._baseline_anchors[i] = (1 - self._baseline_alpha_slow) * self._baseline_anchors[i] + self._baseline_alpha_slow * baseline_estimate
-                                    
-                                    # Subtract anchor (NOT raw mean)
-                                    filtered_slice = filtered_slice - self._baseline_anchors[i]
-                                    
+
                                     # Final zero-centering clamp (visual only, display path)
                                     if not hasattr(self, '_display_zero_refs'):
                                         self._display_zero_refs = [0.0] * 12
-                                    
+
                                     zero_alpha = 0.01  # Fast convergence, visual only
-                                    current_dc = np.nanmean(filtered_slice) if len(filtered_slice) > 0 else 0.0
+                                    # Window DC read from the envelope (each column's min and max)
+                                    current_dc = float(np.nanmean(y_env)) - self._baseline_anchors[i] if y_env.size else 0.0
                                     self._display_zero_refs[i] = (1 - zero_alpha) * self._display_zero_refs[i] + zero_alpha * current_dc
-                                    filtered_slice = filtered_slice - self._display_zero_refs[i]
+                                    display_offset = self._baseline_anchors[i] + self._display_zero_refs[i]
                             except Exception as filter_error:
                                 # Fallback: use original signal (baseline anchor handles it, no mean subtraction)
                                 print(f"⚠️ Using fallback baseline correction for lead {self.leads[i] if hasattr(self, 'leads') else i}: {filter_error}")
-                            
-                            # Optional AC notch filtering based on "Set Filter" selection.
-                            # Keeps wave peaks intact while removing 50/60 Hz power noise for machine serial data.
-                            try:
-                                ac_setting = self.settings_manager.get_setting("filter_ac", "off") if self.settings_manager else "off"
-                                if ac_setting and ac_setting != "off" and len(filtered_slice) >= 10:
-                                    from ecg.ecg_filters import apply_ac_filter
-                                    filtered_slice = apply_ac_filter(filtered_slice, sampling_rate, ac_setting)
-                            except Exception as filter_error:
-                                pass  # AC filter is optional
-                            
-                            # Apply wave gain
+
+                            # Offset and gain are affine, so they apply to the envelope as-is
                             gain_factor = get_display_gain(self.settings_manager.get_wave_gain())
-                            
-                            # Signal is already baseline-corrected by median+mean filter
-                            centered_slice = filtered_slice
-                            
-                            # Apply gain after centering (same as demo mode)
-                            scaled_data = centered_slice * gain_factor
-                            scaled_data = np.nan_to_num(scaled_data, copy=False)
+                            plot_x = x_env / sampling_rate
+                            plot_y = np.nan_to_num((y_env - display_offset) * gain_factor, copy=False)
 
                             # --- Flatline detection (serial/display path) ---
-                            if scaled_data.size >= 50:
-                                amp_range = float(np.nanmax(scaled_data) - np.nanmin(scaled_data))
-                                std_val = float(np.nanstd(scaled_data))
+                            # Range is exact on the envelope; its spread stands in for the window std
+                            if n >= 50 and plot_y.size:
+                                amp_range = float(np.max(plot_y) - np.min(plot_y))
+                                std_val = float(np.std(plot_y))
                                 # Very small range and std → likely flatline / disconnected lead
-                                is_flat = amp_range < 5.0 and std_val < 1.0
-                                lead_name = self.leads[i] if i < len(self.leads) else f"Lead {i+1}"
-                                if is_flat and not self._flatline_alert_shown[i]:
-                                    self._flatline_alert_shown[i] = True
-                                    try:
-                                        QMessageBox.warning(
-                                            self,
-                                            "Flatline Detected",
-                                            f"{lead_name} appears flat (no significant signal).\n"
-                                            f"Please check the electrode/lead connection."
-                                        )
-                                    except Exception as warn_err:
-                                        print(f"⚠️ Flatline warning failed for {lead_name}: {warn_err}")
-                                elif not is_flat:
-                                    # Reset flag when signal returns
-                                    self._flatline_alert_shown[i] = False
-                            
-                            n = len(scaled_data)
-                            time_axis = np.arange(n, dtype=float) / sampling_rate
-                            
-                            # Avoid cropping: small padding and explicit x-range
+                                self._update_flatline_alert(i, amp_range < 5.0 and std_val < 1.0)
+
+                            # Avoid cropping: explicit x-range
+                            time_span = (n - 1) / sampling_rate if n > 1 else 0.0
                             try:
                                 vb = self.plot_widgets[i].getViewBox()
                                 if vb is not None:
-                                    vb.setRange(xRange=(time_axis[0], time_axis[-1]), padding=0)
+                                    vb.setRange(xRange=(0.0, time_span), padding=0)
                             except Exception:
                                 pass
 
-                            self.data_lines[i].setData(time_axis, scaled_data)
-                            self.update_plot_y_range_adaptive(i, signal_source, data_override=scaled_data)
+                            self.data_lines[i].setData(plot_x, plot_y)
+                            # Y-range from the plotted envelope (same extremes as the scaled window)
+                            self.update_plot_y_range_adaptive(i, signal_source, data_override=plot_y)
 
                             if i < 3 and hasattr(self, '_debug_counter') and self._debug_counter % 200 == 0:
-                                print(f"🎛️ Serial Lead {i}: speed={wave_speed:.1f}mm/s, scale={seconds_scale:.2f}, time_range={time_axis[-1]:.2f}s")
+                                print(f"🎛️ Serial Lead {i}: speed={wave_speed:.1f}mm/s, scale={seconds_scale:.2f}, time_range={time_span:.2f}s")
                         else:
                             self.data_lines[i].setData(self.data[i] if i < len(self.data) else [])
                             self.update_plot_y_range(i)
@@ -7379,9 +7373,12 @@ class ECGTestPage(QWidget):
                     else:
                         self.heartbeat_counter = 0
                     if self.heartbeat_counter % 10 == 0 and len(self.data) > 1:
-                        heart_rate = self.calculate_heart_rate(self.data[1])
-                        if heart_rate > 0:
-                            print(f"💓 HEARTBEAT: {heart_rate} BPM")
+                        if self.live_r_peaks(self.data.filled) is not None:
+                            heart_rate = self.qrs_detector.heart_rate()
+                            if heart_rate > 0:
+                                print(f"💓 HEARTBEAT: {heart_rate} BPM")
+                        else:
+                            self.request_heart_rate(announce=True)
                 except Exception as e:
                     print(f"❌ Error displaying heartbeat: {e}")
 
@@ -7389,11 +7386,71 @@ class ECGTestPage(QWidget):
             self.crash_logger.log_crash("Critical error in update_plots", e, "Real-time ECG plotting")
             try:
                 if hasattr(self, 'data') and self.data:
-                    for i in range(len(self.data)):
-                        self.data[i] = np.zeros(self.buffer_size if hasattr(self, 'buffer_size') else 1000)
+                    self.data.reset()
+                    self._reset_display_filters()
             except Exception as recovery_error:
                 self.crash_logger.log_error("Failed to recover from update_plots error", recovery_error, "Data reset")
     
+    def _setup_perf_overlay(self):
+        """Performance overlay (setting "perf_overlay"): Ctrl+Shift+P toggles it, Ctrl+Shift+J dumps the stats to JSON"""
+        try:
+            from PyQt5.QtWidgets import QShortcut
+            self.perf_overlay = QLabel(self)
+            self.perf_overlay.setStyleSheet(
+                "background: rgba(0, 0, 0, 180); color: #00ff99; font-family: monospace; "
+                "font-size: 10px; padding: 6px; border-radius: 4px;")
+            self.perf_overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+            self.perf_overlay.hide()
+            self._perf_overlay_timer = QTimer(self)
+            self._perf_overlay_timer.timeout.connect(self._refresh_perf_overlay)
+            QShortcut(QKeySequence("Ctrl+Shift+P"), self, activated=self.toggle_perf_overlay)
+            QShortcut(QKeySequence("Ctrl+Shift+J"), self, activated=self.dump_perf_stats)
+            if self.settings_manager.get_setting("perf_overlay", "off") == "on":
+                self.toggle_perf_overlay(True)
+        except Exception as e:
+            print(f"⚠️ Performance overlay unavailable: {e}")
+            self.perf_overlay = None
+
+    def toggle_perf_overlay(self, visible=None):
+        """Show/hide the performance overlay (toggles when visible is None)"""
+        overlay = getattr(self, 'perf_overlay', None)
+        if overlay is None:
+            return
+        if visible is None:
+            visible = not overlay.isVisible()
+        if visible:
+            self._refresh_perf_overlay()
+            overlay.show()
+            overlay.raise_()
+            self._perf_overlay_timer.start(1000)
+        else:
+            self._perf_overlay_timer.stop()
+            overlay.hide()
+
+    def _refresh_perf_overlay(self):
+        """Redraw the overlay text from the ring histograms (once a second while visible)"""
+        overlay = getattr(self, 'perf_overlay', None)
+        if overlay is None:
+            return
+        try:
+            stats = self.analysis_worker.stats()
+            self.perf_stats.gauge("analysis.superseded", stats.get('superseded', 0))
+            lines = ["Performance (ms)  Ctrl+Shift+J: dump JSON"] + self.perf_stats.format_lines()
+            overlay.setText("\n".join(lines))
+            overlay.adjustSize()
+            overlay.move(max(0, self.width() - overlay.width() - 12), 12)
+            overlay.raise_()
+        except Exception as e:
+            print(f"⚠️ Performance overlay refresh failed: {e}")
+
+    def dump_perf_stats(self, path=None):
+        """Write the current performance stats (plus analysis worker counters) to JSON"""
+        try:
+            self.perf_stats.gauge("analysis.superseded", self.analysis_worker.stats().get('superseded', 0))
+        except Exception:
+            pass
+        return self.perf_stats.dump_json(path)
+
     def _manage_memory(self):
         """Manage memory usage to prevent crashes from large data buffers"""
         try:
@@ -7404,6 +7461,7 @@ class ECGTestPage(QWidget):
             # Check current memory usage
             process = psutil.Process(os.getpid())
             memory_mb = process.memory_info().rss / 1024 / 1024
+            self.perf_stats.gauge("process.rss_mb", memory_mb)
             
             if memory_mb > 500:  # If using more than 500MB
                 print(f"⚠️ High memory usage: {memory_mb:.1f}MB - cleaning up...")
@@ -7411,12 +7469,7 @@ class ECGTestPage(QWidget):
                 # Force garbage collection
                 gc.collect()
                 
-                # Trim data buffers if they're too large
-                for i, data_buffer in enumerate(self.data):
-                    if len(data_buffer) > self.max_buffer_size:
-                        # Keep only the most recent data
-                        self.data[i] = data_buffer[-self.max_buffer_size:].copy()
-                        print(f"📉 Trimmed data buffer {i} to {len(self.data[i])} samples")
+                # Lead history is a preallocated CircularLeadBuffer - nothing to trim
                 
                 # Check memory after cleanup
                 memory_after = process.memory_info().rss / 1024 / 1024
@@ -7489,12 +7542,17 @@ class ECGTestPage(QWidget):
                 self.elapsed_timer.stop()
                 self.elapsed_timer.deleteLater()
             
-            # Close serial connection
+            # Close serial connection (stop the acquisition thread first)
             if hasattr(self, 'serial_reader') and self.serial_reader:
                 try:
+                    self.serial_reader.running = False
+                    self._stop_acquisition_thread()
                     self.serial_reader.close()
                 except Exception:
                     pass
+            self._stop_full_disclosure()
+            if getattr(self, 'analysis_worker', None) is not None:
+                self.analysis_worker.stop()
             
             # Log cleanup
             if hasattr(self, 'crash_logger'):
@@ -709,4 +709,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # Report workers use the spawn start method; in a frozen (PyInstaller) build
+    # the child process must run the job instead of relaunching the app
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
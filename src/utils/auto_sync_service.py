@@ -1,22 +1,34 @@
 """
 Automatic Background Cloud Sync Service
 Runs every 5 seconds to upload any new/modified files to cloud
+
+What has been synced is kept in reports/sync_state.db (utils.sync_state), so a
+restart does not rediscover every report. The reports directory is only
+rescanned when its mtime moves (a report was created, deleted or renamed) or
+every full_scan_seconds as a backstop; new files are then uploaded as one
+batch on a bounded thread pool sharing the single CloudUploader instance.
 """
 
 import os
 import json
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Set, Dict, List
+from typing import Set, Dict, List, Optional
+
+from utils.perf_stats import get_perf_stats
+from utils.sync_state import SyncStateIndex
 
 
 class AutoSyncService:
     """Background service that automatically syncs files to cloud every 5 seconds"""
     
-    def __init__(self, interval_seconds=5):
+    def __init__(self, interval_seconds=5, max_workers=4, full_scan_seconds=300):
         self.interval = interval_seconds
+        self.max_workers = max(1, int(max_workers))
+        self.full_scan_seconds = full_scan_seconds
         self.running = False
         self.thread = None
         self.cloud_uploader = None
@@ -28,8 +40,10 @@ class AutoSyncService:
         self.reports_dir = self.project_root / "reports"
         self.users_file = self.project_root / "users.json"
         
-        # Track last modified times
-        self.file_timestamps: Dict[str, float] = {}
+        # Persistent size/mtime/sha256/remote-key index of synced files
+        self.sync_state = SyncStateIndex(str(self.reports_dir / "sync_state.db"))
+        self._last_full_scan = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
         
         print(f"🔄 Auto-sync service initialized (interval: {interval_seconds}s)")
     
@@ -50,15 +64,28 @@ class AutoSyncService:
         modified_files = []
         
         try:
-            # Check reports directory for new/modified PDFs and JSONs
-            if self.reports_dir.exists():
-                for file_path in self.reports_dir.glob("ECG_Report_*.pdf"):
-                    if self._is_file_modified(file_path):
-                        modified_files.append(file_path)
-                        # Also check for JSON twin
+            # Rescan reports only when the directory changed (or the backstop interval passed)
+            now = time.time()
+            full_scan_due = now - self._last_full_scan >= self.full_scan_seconds
+            if self.reports_dir.exists() and (full_scan_due or self.sync_state.dir_changed(self.reports_dir)):
+                with get_perf_stats().timer("sync.scan_ms"):
+                    dir_mtime = os.stat(self.reports_dir).st_mtime_ns
+                    seen = set()
+                    # Earlier failures first, then new/modified PDFs and JSON twins
+                    candidates = [p for p in self.sync_state.pending_paths()
+                                  if p.parent == self.reports_dir and p.exists()]
+                    for file_path in self.reports_dir.glob("ECG_Report_*.pdf"):
+                        candidates.append(file_path)
                         json_twin = file_path.with_suffix('.json')
-                        if json_twin.exists() and self._is_file_modified(json_twin):
-                            modified_files.append(json_twin)
+                        if json_twin.exists():
+                            candidates.append(json_twin)
+                    for file_path in candidates:
+                        if file_path not in seen and self._is_file_modified(file_path):
+                            seen.add(file_path)
+                            modified_files.append(file_path)
+                    self.sync_state.mark_dir_scanned(self.reports_dir, dir_mtime)
+                    if full_scan_due:
+                        self._last_full_scan = now
             
             # Check for new user signups
             if self.users_file.exists() and self._is_file_modified(self.users_file):
@@ -70,25 +97,27 @@ class AutoSyncService:
         return modified_files
     
     def _is_file_modified(self, file_path: Path) -> bool:
-        """Check if file has been modified since last sync"""
+        """Check if file has contents that have not been synced yet"""
         try:
-            current_mtime = file_path.stat().st_mtime
-            file_str = str(file_path)
-            
-            # If we haven't seen this file before, it's new
-            if file_str not in self.file_timestamps:
-                self.file_timestamps[file_str] = current_mtime
-                return True
-            
-            # If modification time changed, file was modified
-            if current_mtime > self.file_timestamps[file_str]:
-                self.file_timestamps[file_str] = current_mtime
-                return True
-            
-            return False
+            return self.sync_state.needs_sync(file_path)
         except Exception:
             return False
     
+    @staticmethod
+    def _remote_key(result: Dict) -> Optional[str]:
+        """Object key / blob name / remote path from a backend upload result"""
+        for key in ('key', 'blob_name', 'remote_path', 'path', 'url'):
+            if result.get(key):
+                return str(result[key])
+        return None
+    
+    def _upload_one(self, file_path: Path) -> Dict:
+        """Upload one file and record the outcome in the sync-state index"""
+        result = self.cloud_uploader.upload_report(str(file_path))
+        status = result.get('status', 'error')
+        self.sync_state.mark(file_path, status, remote_key=self._remote_key(result))
+        return result
+    
     def _upload_report_files(self, file_path: Path) -> bool:
         """Upload report PDF and its JSON twin to cloud"""
         try:
@@ -96,16 +125,17 @@ class AutoSyncService:
                 return False
             
             # Upload PDF
-            result = self.cloud_uploader.upload_report(str(file_path))
+            result = self._upload_one(file_path)
             
-            if result.get('status') == 'success':
-                print(f"✅ Auto-sync: Uploaded {file_path.name}")
+            if result.get('status') in ('success', 'already_uploaded'):
+                if result.get('status') == 'success':
+                    print(f"✅ Auto-sync: Uploaded {file_path.name}")
                 
                 # Upload JSON twin if exists
                 if file_path.suffix == '.pdf':
                     json_twin = file_path.with_suffix('.json')
-                    if json_twin.exists():
-                        json_result = self.cloud_uploader.upload_report(str(json_twin))
+                    if json_twin.exists() and self._is_file_modified(json_twin):
+                        json_result = self._upload_one(json_twin)
                         if json_result.get('status') == 'success':
                             print(f"✅ Auto-sync: Uploaded {json_twin.name}")
                 
@@ -191,14 +221,19 @@ class AutoSyncService:
             
             print(f"\n🔄 Auto-sync: Found {len(modified_files)} file(s) to sync")
             
-            # Upload reports
-            for file_path in modified_files:
-                if file_path == self.users_file:
-                    # Handle user signups separately
-                    self._upload_user_signups()
-                else:
-                    # Upload report files
-                    self._upload_report_files(file_path)
+            # Upload reports as one batch on the worker pool (JSON twins go with their PDF)
+            report_files = [p for p in modified_files if p != self.users_file]
+            pdf_stems = {p.stem for p in report_files if p.suffix == '.pdf'}
+            report_files = [p for p in report_files if p.suffix == '.pdf' or p.stem not in pdf_stems]
+            if report_files:
+                with get_perf_stats().timer("sync.batch_ms"):
+                    uploaded = self._upload_batch(report_files)
+                get_perf_stats().incr("sync.uploaded", uploaded)
+            
+            if self.users_file in modified_files:
+                # Handle user signups separately
+                self._upload_user_signups()
+                self.sync_state.mark(self.users_file, 'success')
             
             self.last_sync_time = datetime.now()
             print(f"✅ Auto-sync: Cycle complete at {self.last_sync_time.strftime('%H:%M:%S')}\n")
@@ -206,6 +241,34 @@ class AutoSyncService:
         except Exception as e:
             print(f"❌ Auto-sync: Error in sync cycle: {e}")
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="auto-sync-upload")
+        return self._executor
+    
+    def _upload_batch(self, file_paths: List[Path]) -> int:
+        """
+        Upload report files concurrently (bounded by max_workers)
+        
+        Args:
+            file_paths: PDFs (with their JSON twins) and standalone JSON files
+            
+        Returns:
+            int: Number of files whose primary upload succeeded
+        """
+        if len(file_paths) == 1:
+            return int(self._upload_report_files(file_paths[0]))
+        executor = self._get_executor()
+        futures = [executor.submit(self._upload_report_files, p) for p in file_paths]
+        uploaded = 0
+        for future in as_completed(futures):
+            try:
+                uploaded += int(bool(future.result()))
+            except Exception as e:
+                print(f"❌ Auto-sync: Upload worker error: {e}")
+        return uploaded
+    
     def _sync_loop(self):
         """Background loop that runs sync every N seconds"""
         print(f"🚀 Auto-sync: Background service started (syncing every {self.interval}s)")
@@ -248,6 +311,9 @@ class AutoSyncService:
         self.running = False
         if self.thread:
             self.thread.join(timeout=2)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
         
         print("🛑 Auto-sync: Service stopped")
     
@@ -258,6 +324,7 @@ class AutoSyncService:
             "interval_seconds": self.interval,
             "last_sync": self.last_sync_time.strftime("%Y-%m-%d %H:%M:%S"),
             "synced_files_count": len(self.synced_files),
+            "indexed_files_count": self.sync_state.count(),
             "cloud_configured": self._init_cloud_uploader() if self.running else False
         }
 
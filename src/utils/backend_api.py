@@ -10,6 +10,7 @@ from typing import Dict, Any, Optional
 import os
 from dotenv import load_dotenv
 from .offline_queue import get_offline_queue
+from .cloud_clients import get_cloud_client_pool
 
 load_dotenv()
 
@@ -32,6 +33,8 @@ class BackendAPI:
         self.token = None
         self.session_id = None
         self.offline_queue = get_offline_queue()
+        # Shared keep-alive session (connection reuse across metrics/waveform/report calls)
+        self.session = get_cloud_client_pool().http_session()
         
         print(f"🔌 Backend API initialized:")
         print(f"   URL: {self.base_url}")
@@ -75,7 +78,8 @@ class BackendAPI:
             kwargs['headers'] = self._headers()
             kwargs.setdefault('timeout', 10)
             
-            response = requests.request(method, url, **kwargs)
+            response = self.session.request(method, url, **kwargs)
+            self.offline_queue.monitor.report_success()
             
             if response.status_code in [200, 201]:
                 return response.json() if response.content else {"status": "success"}
@@ -87,8 +91,10 @@ class BackendAPI:
                 }
                 
         except requests.exceptions.ConnectionError:
+            self.offline_queue.monitor.report_failure()
             return {"status": "queued", "message": "Connection error - data queued for sync"}
         except requests.exceptions.Timeout:
+            self.offline_queue.monitor.report_failure()
             return {"status": "queued", "message": "Request timeout - data queued for sync"}
         except Exception as e:
             return {"status": "error", "message": str(e)}
@@ -212,7 +218,7 @@ class BackendAPI:
                     elif self.api_key:
                         headers['X-API-Key'] = self.api_key
                     
-                    response = requests.post(
+                    response = self.session.post(
                         f'{self.base_url}/reports/upload',
                         files=files,
                         data=data,
@@ -0,0 +1,370 @@
+"""
+Pooled Cloud Clients for CloudUploader and BackendAPI
+
+Every upload used to build its own client: a new boto3 S3 client per file (and
+again in list_reports / generate_presigned_url / delete_file), a bare
+requests.post() per API call, a fresh FTP login per file. Each of those pays
+DNS + TCP + TLS setup, which dominates when a backlog of reports is flushed
+after an outage. CloudClientPool creates each client once and shares it:
+
+- HTTP (custom API, BackendAPI): one requests.Session with a pooled
+  HTTPAdapter (keep-alive, pool_maxsize connections, retries on 502/503/504
+  for idempotent requests)
+- S3: one boto3 client per credential set (botocore max_pool_connections,
+  TCP keep-alive) plus a TransferConfig so large PDFs go multipart with
+  several parts in flight; AWS_S3_ENDPOINT_URL points it at MinIO/moto
+- Azure / GCS / Dropbox: one container / bucket / Dropbox client per config
+- FTP / SFTP: one logged-in connection per worker thread (ftplib and paramiko
+  channels are not thread-safe), checked with NOOP / transport.is_active()
+  and reopened when the server dropped it; connections of threads that have
+  exited are closed the next time a thread opens one
+- upload workers: one long-lived thread pool per worker count
+  (upload_executor), so repeated backlog flushes reuse the same threads and
+  therefore the same FTP/SFTP sessions
+
+Tuning (environment):
+    CLOUD_POOL_MAXSIZE            connections per host / S3 pool (default 8)
+    CLOUD_MULTIPART_THRESHOLD_MB  S3 multipart above this size (default 8)
+    CLOUD_MULTIPART_CHUNK_MB      S3 part size (default 8)
+    CLOUD_MAX_CONCURRENCY         S3 parts in flight per file, and
+                                  CloudUploader.upload_many workers (default 4)
+
+Usage:
+    pool = get_cloud_client_pool()
+    session = pool.http_session()
+    session.post(url, files=files, timeout=30)
+    s3 = pool.s3_client(key_id, secret, region)
+    s3.upload_file(path, bucket, key, Config=pool.s3_transfer_config())
+
+    # Throughput check against a local HTTP stand-in (no cloud account needed):
+    python -m utils.cloud_clients reports/ECG_Report_*.pdf --workers 4
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class CloudClientPool:
+    """Lazily created, shared clients for every cloud backend."""
+
+    def __init__(self, pool_maxsize: Optional[int] = None, multipart_threshold_mb: Optional[int] = None,
+                 multipart_chunk_mb: Optional[int] = None, max_concurrency: Optional[int] = None):
+        self.pool_maxsize = pool_maxsize or _env_int('CLOUD_POOL_MAXSIZE', 8)
+        self.multipart_threshold = (multipart_threshold_mb or _env_int('CLOUD_MULTIPART_THRESHOLD_MB', 8)) * 1024 * 1024
+        self.multipart_chunksize = (multipart_chunk_mb or _env_int('CLOUD_MULTIPART_CHUNK_MB', 8)) * 1024 * 1024
+        self.max_concurrency = max_concurrency or _env_int('CLOUD_MAX_CONCURRENCY', 4)
+        self._lock = threading.Lock()
+        self._session = None
+        self._clients: Dict[tuple, object] = {}
+        self._transfer_config = None
+        self._local = threading.local()
+        self._thread_conn_maps: Dict[threading.Thread, dict] = {}
+
+    def _cached(self, key: tuple, factory):
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = factory()
+                    self._clients[key] = client
+        return client
+
+    # ------------------------------------------------------------------ HTTP
+
+    def http_session(self):
+        """Shared requests.Session with a keep-alive connection pool."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    from urllib3.util.retry import Retry
+
+                    session = requests.Session()
+                    # Status retries only for idempotent methods, so an upload POST is never sent twice.
+                    # When they run out the last response is returned (raise_on_status=False), so
+                    # callers still see the 502/503/504 code instead of a RetryError.
+                    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                                  raise_on_status=False)
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=retry)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    # -------------------------------------------------------------------- S3
+
+    def s3_client(self, access_key: Optional[str], secret_key: Optional[str], region: Optional[str],
+                  endpoint_url: Optional[str] = None):
+        """boto3 S3 client for these credentials (boto3 clients are thread-safe)."""
+        def factory():
+            import boto3
+            from botocore.config import Config
+
+            config = Config(
+                max_pool_connections=max(self.pool_maxsize, self.max_concurrency * 2),
+                retries={'max_attempts': 3, 'mode': 'standard'},
+                tcp_keepalive=True,
+            )
+            return boto3.client(
+                's3',
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name=region,
+                endpoint_url=endpoint_url or None,
+                config=config,
+            )
+        return self._cached(('s3', access_key, secret_key, region, endpoint_url), factory)
+
+    def s3_transfer_config(self):
+        """boto3 TransferConfig: multipart above the threshold, max_concurrency parts in flight."""
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+
+            self._transfer_config = TransferConfig(
+                multipart_threshold=self.multipart_threshold,
+                multipart_chunksize=self.multipart_chunksize,
+                max_concurrency=self.max_concurrency,
+                use_threads=True,
+            )
+        return self._transfer_config
+
+    # --------------------------------------------------- Azure / GCS / Dropbox
+
+    def azure_container(self, connection_string: str, container: str):
+        """Azure ContainerClient (container created once if missing)."""
+        def factory():
+            from azure.storage.blob import BlobServiceClient
+
+            service = BlobServiceClient.from_connection_string(
+                connection_string, max_single_put_size=self.multipart_threshold,
+                max_block_size=self.multipart_chunksize)
+            container_client = service.get_container_client(container)
+            try:
+                container_client.create_container()
+            except Exception:
+                pass  # Container already exists
+            return container_client
+        return self._cached(('azure', connection_string, container), factory)
+
+    def gcs_bucket(self, credentials_path: Optional[str], bucket: str):
+        """google.cloud.storage Bucket for these credentials."""
+        def factory():
+            from google.cloud import storage
+
+            client = storage.Client.from_service_account_json(credentials_path)
+            return client.bucket(bucket)
+        return self._cached(('gcs', credentials_path, bucket), factory)
+
+    def dropbox_client(self, token: str):
+        def factory():
+            import dropbox
+
+            return dropbox.Dropbox(token, session=dropbox.create_session(max_connections=self.pool_maxsize))
+        return self._cached(('dropbox', token), factory)
+
+    # -------------------------------------------------------------- FTP/SFTP
+
+    def ftp_connection(self, host: str, port: int, username: str, password: str):
+        """This thread's logged-in ftplib.FTP, reconnected if the server dropped it."""
+        key = ('ftp', host, port, username)
+        conns = self._thread_conns()
+        ftp = conns.get(key)
+        if ftp is not None:
+            try:
+                ftp.voidcmd('NOOP')
+                return ftp
+            except Exception:
+                conns.pop(key, None)
+        from ftplib import FTP
+
+        ftp = FTP()
+        ftp.connect(host, port)
+        ftp.login(username, password)
+        conns[key] = ftp
+        return ftp
+
+    def sftp_connection(self, host: str, port: int, username: str, password: str):
+        """This thread's paramiko SFTPClient, reconnected if the transport closed."""
+        key = ('sftp', host, port, username)
+        conns = self._thread_conns()
+        entry = conns.get(key)
+        if entry is not None:
+            transport, sftp = entry
+            if transport.is_active():
+                return sftp
+            conns.pop(key, None)
+        import paramiko
+
+        transport = paramiko.Transport((host, port))
+        transport.set_keepalive(30)
+        transport.connect(username=username, password=password)
+        sftp = paramiko.SFTPClient.from_transport(transport)
+        conns[key] = (transport, sftp)
+        return sftp
+
+    def drop_thread_connection(self, kind: str, host: str, port: int, username: str) -> None:
+        """Forget (and close) this thread's FTP/SFTP connection after an error."""
+        entry = self._thread_conns().pop((kind, host, port, username), None)
+        for conn in (entry if isinstance(entry, tuple) else (entry,)):
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _thread_conns(self) -> dict:
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+            with self._lock:
+                self._prune_dead_threads()
+                self._thread_conn_maps[threading.current_thread()] = conns
+        return conns
+
+    def close_thread_connections(self) -> None:
+        """Close every FTP/SFTP connection the calling thread opened."""
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            return
+        with self._lock:
+            self._thread_conn_maps.pop(threading.current_thread(), None)
+        self._local.conns = None
+        _close_conns(conns)
+
+    def _prune_dead_threads(self) -> None:
+        """Close connections left behind by threads that have exited (caller holds _lock)."""
+        for thread in [t for t in self._thread_conn_maps if not t.is_alive()]:
+            _close_conns(self._thread_conn_maps.pop(thread))
+
+    # ---------------------------------------------------------------- workers
+
+    def upload_executor(self, workers: int):
+        """Shared ThreadPoolExecutor with `workers` threads (kept until close())."""
+        def factory():
+            from concurrent.futures import ThreadPoolExecutor
+
+            return ThreadPoolExecutor(max_workers=int(workers), thread_name_prefix="cloud-upload")
+        return self._cached(('executor', int(workers)), factory)
+
+    # ----------------------------------------------------------------- close
+
+    def close(self) -> None:
+        """Close the HTTP session, upload workers and every FTP/SFTP connection; clients are rebuilt on next use."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            for conns in self._thread_conn_maps.values():
+                _close_conns(conns)
+            self._thread_conn_maps = {}
+            for key, client in list(self._clients.items()):
+                if key[0] == 'executor':
+                    client.shutdown(wait=False)
+            self._clients.clear()
+            self._transfer_config = None
+
+
+def _close_conns(conns: dict) -> None:
+    """Close and forget every FTP / (transport, SFTP) entry of one thread's map."""
+    for entry in conns.values():
+        for conn in (entry if isinstance(entry, tuple) else (entry,)):
+            try:
+                conn.close()
+            except Exception:
+                pass
+    conns.clear()
+
+
+_cloud_client_pool: Optional[CloudClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_cloud_client_pool() -> CloudClientPool:
+    """Process-wide CloudClientPool."""
+    global _cloud_client_pool
+    if _cloud_client_pool is None:
+        with _pool_lock:
+            if _cloud_client_pool is None:
+                _cloud_client_pool = CloudClientPool()
+    return _cloud_client_pool
+
+
+def _run_stub_benchmark(paths, workers: int) -> Dict[str, float]:
+    """
+    Flush files through CloudUploader.upload_many against a local HTTP stand-in.
+
+    A keep-alive HTTP/1.1 server on 127.0.0.1 accepts the multipart POSTs of
+    the 'api' backend; the upload ledger goes to a temporary directory so the
+    real one is untouched.
+    """
+    import tempfile
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    connections = set()
+
+    class _StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            self.rfile.read(length)
+            connections.add(self.client_address)
+            body = b'{"url": "stub://uploaded"}'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        from utils.cloud_uploader import CloudUploader
+
+        uploader = CloudUploader()
+        uploader.cloud_service = 'api'
+        uploader.upload_enabled = True
+        uploader.api_endpoint = f"http://127.0.0.1:{server.server_address[1]}/upload"
+        uploader.api_key = None
+        uploader.upload_ledger_path = os.path.join(tempfile.mkdtemp(prefix='ledger_'), 'upload_ledger.db')
+        uploader.upload_log_path = os.path.join(os.path.dirname(uploader.upload_ledger_path), 'none.json')
+
+        start = time.perf_counter()
+        results = uploader.upload_many(paths, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for r in results if r.get('status') == 'success')
+        total_bytes = sum(os.path.getsize(p) for p in paths)
+        return {
+            'files': len(paths),
+            'uploaded': ok,
+            'seconds': round(elapsed, 3),
+            'files_per_s': round(len(paths) / elapsed, 1) if elapsed > 0 else 0.0,
+            'mb_per_s': round(total_bytes / 1e6 / elapsed, 2) if elapsed > 0 else 0.0,
+            'tcp_connections': len(connections),
+        }
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Upload throughput against a local HTTP stand-in")
+    parser.add_argument('files', nargs='+', help="Report files (names must contain 'report' or 'metric')")
+    parser.add_argument('--workers', type=int, default=None, help="upload_many workers")
+    args = parser.parse_args()
+    print(json.dumps(_run_stub_benchmark(args.files, args.workers), indent=2))
@@ -10,6 +10,9 @@ from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
 
+from utils.cloud_clients import get_cloud_client_pool
+from utils.upload_ledger import file_sha256, get_upload_ledger
+
 # Load environment variables
 # 1) Load from current working directory (if running from project root)
 load_dotenv()
@@ -68,6 +71,7 @@ class CloudUploader:
         self.s3_region = os.getenv('AWS_S3_REGION', 'us-east-1')
         self.aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
         self.aws_secret_key = os.getenv('AWS_SECRET_ACCESS_KEY')
+        self.s3_endpoint_url = os.getenv('AWS_S3_ENDPOINT_URL')  # MinIO / local stand-in
         
         # Azure Blob Storage Configuration
         self.azure_connection_string = os.getenv('AZURE_STORAGE_CONNECTION_STRING')
@@ -91,8 +95,30 @@ class CloudUploader:
         # Dropbox Configuration
         self.dropbox_token = os.getenv('DROPBOX_ACCESS_TOKEN')
         
-        # Log file for upload tracking
+        # Upload tracking: indexed ledger; the old JSON log is migrated into it on first use
         self.upload_log_path = "reports/upload_log.json"
+        self.upload_ledger_path = "reports/upload_ledger.db"
+        self._ledger = None
+        
+        # Shared, keep-alive clients for every backend
+        self.clients = get_cloud_client_pool()
+
+    @property
+    def ledger(self):
+        """UploadLedger backing the dedupe checks and upload history (opened lazily)."""
+        if self._ledger is None:
+            self._ledger = get_upload_ledger(self.upload_ledger_path, legacy_json_path=self.upload_log_path)
+        return self._ledger
+
+    def _s3(self):
+        """Pooled boto3 S3 client for the configured credentials"""
+        return self.clients.s3_client(self.aws_access_key, self.aws_secret_key, self.s3_region,
+                                      endpoint_url=self.s3_endpoint_url)
+
+    def _s3_url(self, key):
+        if self.s3_endpoint_url:
+            return f"{self.s3_endpoint_url.rstrip('/')}/{self.s3_bucket}/{key}"
+        return f"https://{self.s3_bucket}.s3.{self.s3_region}.amazonaws.com/{key}"
 
     def reload_config(self):
         """Re-read .env from CWD and project root and refresh fields."""
@@ -122,6 +148,7 @@ class CloudUploader:
         self.s3_region = os.getenv('AWS_S3_REGION', 'us-east-1')
         self.aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
         self.aws_secret_key = os.getenv('AWS_SECRET_ACCESS_KEY')
+        self.s3_endpoint_url = os.getenv('AWS_S3_ENDPOINT_URL')
 
     def get_config_snapshot(self):
         return {
@@ -155,7 +182,7 @@ class CloudUploader:
     
     def _is_file_already_uploaded(self, file_path):
         """
-        Check if a file has already been uploaded based on filename
+        Check if a file has already been uploaded based on filename or content hash
         
         Args:
             file_path (str): Path to the file to check
@@ -165,26 +192,10 @@ class CloudUploader:
         """
         try:
             filename = os.path.basename(file_path)
-            
-            # Check upload log
-            if os.path.exists(self.upload_log_path):
-                with open(self.upload_log_path, 'r') as f:
-                    log_data = json.load(f)
-                
-                # Check if this filename has been uploaded before
-                for entry in log_data:
-                    # Get filename from the logged path
-                    logged_filename = os.path.basename(entry.get('local_path', ''))
-                    
-                    # Also check metadata filename as backup
-                    metadata_filename = entry.get('metadata', {}).get('filename', '')
-                    
-                    # If filename matches and upload was successful
-                    if (logged_filename == filename or metadata_filename == filename):
-                        if entry.get('result', {}).get('status') == 'success':
-                            return True
-            
-            return False
+            if self.ledger.is_uploaded(filename=filename):
+                return True
+            # Same contents uploaded under another name
+            return self.ledger.is_uploaded(content_hash=file_sha256(file_path))
             
         except Exception as e:
             print(f"⚠️ Error checking upload history: {e}")
@@ -281,6 +292,36 @@ class CloudUploader:
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
+    def upload_many(self, file_paths, metadata=None, max_workers=None):
+        """
+        Upload several report files concurrently over the pooled clients
+        
+        Args:
+            file_paths (list): Paths of report/metric files
+            metadata (dict): Optional metadata, either shared by all files or
+                             keyed by file path
+            max_workers (int): Parallel uploads (default: CLOUD_MAX_CONCURRENCY)
+            
+        Returns:
+            list: One upload_report() result per path, in input order
+        """
+        file_paths = list(file_paths)
+        if not file_paths:
+            return []
+        per_file = isinstance(metadata, dict) and any(p in metadata for p in file_paths)
+        
+        def _upload(path):
+            try:
+                return self.upload_report(path, metadata.get(path) if per_file else metadata)
+            except Exception as e:
+                return {"status": "error", "message": str(e)}
+        
+        workers = max(1, max_workers or self.clients.max_concurrency)
+        if workers == 1 or len(file_paths) == 1:
+            return [_upload(p) for p in file_paths]
+        # Long-lived workers: their per-thread FTP/SFTP sessions carry over to the next flush
+        return list(self.clients.upload_executor(workers).map(_upload, file_paths))
+    
     def upload_user_signup(self, user_data):
         """
         Upload user signup details to cloud storage
@@ -315,23 +356,13 @@ class CloudUploader:
         serial_number = user_data.get('serial_number', '')
         
         try:
-            if os.path.exists(self.upload_log_path):
-                with open(self.upload_log_path, 'r') as f:
-                    log_data = json.load(f)
-                
-                # Check if user with same username or serial has been uploaded
-                for entry in log_data:
-                    metadata = entry.get('metadata', {})
-                    if metadata.get('type') == 'user_signup':
-                        if (metadata.get('username') == username or 
-                            (serial_number and metadata.get('serial_number') == serial_number)):
-                            if entry.get('result', {}).get('status') == 'success':
-                                print(f"ℹ️ User signup for '{username}' already uploaded - skipping duplicate")
-                                return {
-                                    "status": "already_uploaded",
-                                    "message": f"User signup for '{username}' has already been uploaded",
-                                    "username": username
-                                }
+            if self.ledger.is_user_signup_uploaded(username, serial_number):
+                print(f"ℹ️ User signup for '{username}' already uploaded - skipping duplicate")
+                return {
+                    "status": "already_uploaded",
+                    "message": f"User signup for '{username}' has already been uploaded",
+                    "username": username
+                }
         except Exception as e:
             print(f"⚠️ Error checking user signup history: {e}")
         
@@ -413,15 +444,9 @@ class CloudUploader:
     def _upload_to_s3(self, file_path, metadata):
         """Upload to AWS S3"""
         try:
-            import boto3
             from botocore.exceptions import ClientError
             
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=self.aws_access_key,
-                aws_secret_access_key=self.aws_secret_key,
-                region_name=self.s3_region
-            )
+            s3_client = self._s3()
             
             # Generate S3 key
             filename = os.path.basename(file_path)
@@ -433,11 +458,12 @@ class CloudUploader:
                 file_path,
                 self.s3_bucket,
                 s3_key,
-                ExtraArgs={'Metadata': {k: str(v) for k, v in metadata.items()}}
+                ExtraArgs={'Metadata': {k: str(v) for k, v in metadata.items()}},
+                Config=self.clients.s3_transfer_config()
             )
             
             # Generate presigned URL (optional)
-            url = f"https://{self.s3_bucket}.s3.{self.s3_region}.amazonaws.com/{s3_key}"
+            url = self._s3_url(s3_key)
             
             return {
                 "status": "success",
@@ -457,13 +483,7 @@ class CloudUploader:
         if not (self.upload_enabled and self.cloud_service == 's3' and self.s3_bucket):
             return {"status": "error", "message": "S3 not configured"}
         try:
-            import boto3
-            s3 = boto3.client(
-                's3',
-                aws_access_key_id=self.aws_access_key,
-                aws_secret_access_key=self.aws_secret_key,
-                region_name=self.s3_region
-            )
+            s3 = self._s3()
             paginator = s3.get_paginator('list_objects_v2')
             pages = paginator.paginate(Bucket=self.s3_bucket, Prefix=prefix)
             items = []
@@ -476,7 +496,7 @@ class CloudUploader:
                         'key': key,
                         'size': obj.get('Size', 0),
                         'last_modified': obj.get('LastModified').isoformat() if obj.get('LastModified') else '',
-                        'url': f"https://{self.s3_bucket}.s3.{self.s3_region}.amazonaws.com/{key}"
+                        'url': self._s3_url(key)
                     })
             return {"status": "success", "items": items}
         except Exception as e:
@@ -485,13 +505,7 @@ class CloudUploader:
     def generate_presigned_url(self, key: str, expires_in: int = 3600):
         """Generate a presigned URL for a given S3 object key."""
         try:
-            import boto3
-            s3 = boto3.client(
-                's3',
-                aws_access_key_id=self.aws_access_key,
-                aws_secret_access_key=self.aws_secret_key,
-                region_name=self.s3_region
-            )
+            s3 = self._s3()
             url = s3.generate_presigned_url(
                 'get_object',
                 Params={'Bucket': self.s3_bucket, 'Key': key},
@@ -504,13 +518,7 @@ class CloudUploader:
     def delete_file(self, key: str):
         """Delete a file from S3 bucket"""
         try:
-            import boto3
-            s3 = boto3.client(
-                's3',
-                aws_access_key_id=self.aws_access_key,
-                aws_secret_access_key=self.aws_secret_key,
-                region_name=self.s3_region
-            )
+            s3 = self._s3()
             
             # Delete the object
             s3.delete_object(Bucket=self.s3_bucket, Key=key)
@@ -524,16 +532,8 @@ class CloudUploader:
     def _upload_to_azure(self, file_path, metadata):
         """Upload to Azure Blob Storage"""
         try:
-            from azure.storage.blob import BlobServiceClient
-            
-            blob_service_client = BlobServiceClient.from_connection_string(self.azure_connection_string)
-            container_client = blob_service_client.get_container_client(self.azure_container)
-            
-            # Ensure container exists
-            try:
-                container_client.create_container()
-            except Exception:
-                pass  # Container already exists
+            # Pooled container client (container is created once if missing)
+            container_client = self.clients.azure_container(self.azure_connection_string, self.azure_container)
             
             # Generate blob name
             filename = os.path.basename(file_path)
@@ -543,7 +543,8 @@ class CloudUploader:
             # Upload file
             blob_client = container_client.get_blob_client(blob_name)
             with open(file_path, "rb") as data:
-                blob_client.upload_blob(data, overwrite=True, metadata=metadata)
+                blob_client.upload_blob(data, overwrite=True, metadata=metadata,
+                                        max_concurrency=self.clients.max_concurrency)
             
             url = blob_client.url
             
@@ -563,10 +564,7 @@ class CloudUploader:
     def _upload_to_gcs(self, file_path, metadata):
         """Upload to Google Cloud Storage"""
         try:
-            from google.cloud import storage
-            
-            storage_client = storage.Client.from_service_account_json(self.gcs_credentials_path)
-            bucket = storage_client.bucket(self.gcs_bucket)
+            bucket = self.clients.gcs_bucket(self.gcs_credentials_path, self.gcs_bucket)
             
             # Generate blob name
             filename = os.path.basename(file_path)
@@ -574,7 +572,7 @@ class CloudUploader:
             blob_name = f"ecg-reports/{timestamp}/{filename}"
             
             # Upload file
-            blob = bucket.blob(blob_name)
+            blob = bucket.blob(blob_name, chunk_size=self.clients.multipart_chunksize)
             blob.metadata = metadata
             blob.upload_from_filename(file_path)
             
@@ -604,7 +602,7 @@ class CloudUploader:
                 
                 data = {'metadata': json.dumps(metadata)}
                 
-                response = requests.post(
+                response = self.clients.http_session().post(
                     self.api_endpoint,
                     files=files,
                     data=data,
@@ -632,32 +630,25 @@ class CloudUploader:
     def _upload_to_ftp(self, file_path, metadata, use_sftp=False):
         """Upload to FTP/SFTP server"""
         try:
-            if use_sftp:
-                import paramiko
-                
-                transport = paramiko.Transport((self.ftp_host, self.ftp_port))
-                transport.connect(username=self.ftp_username, password=self.ftp_password)
-                sftp = paramiko.SFTPClient.from_transport(transport)
-                
-                # Create remote directory if needed
-                remote_file = f"{self.ftp_remote_path}/{os.path.basename(file_path)}"
-                sftp.put(file_path, remote_file)
-                sftp.close()
-                transport.close()
-                
-            else:
-                from ftplib import FTP
-                
-                ftp = FTP()
-                ftp.connect(self.ftp_host, self.ftp_port)
-                ftp.login(self.ftp_username, self.ftp_password)
-                
-                # Upload file
-                with open(file_path, 'rb') as f:
-                    remote_file = f"{self.ftp_remote_path}/{os.path.basename(file_path)}"
-                    ftp.storbinary(f'STOR {remote_file}', f)
-                
-                ftp.quit()
+            # Pooled per-thread connection: one login for a whole batch of files
+            remote_file = f"{self.ftp_remote_path}/{os.path.basename(file_path)}"
+            kind = 'sftp' if use_sftp else 'ftp'
+            try:
+                if use_sftp:
+                    sftp = self.clients.sftp_connection(self.ftp_host, self.ftp_port,
+                                                        self.ftp_username, self.ftp_password)
+                    sftp.put(file_path, remote_file)
+                else:
+                    ftp = self.clients.ftp_connection(self.ftp_host, self.ftp_port,
+                                                      self.ftp_username, self.ftp_password)
+                    with open(file_path, 'rb') as f:
+                        ftp.storbinary(f'STOR {remote_file}', f)
+            except ImportError:
+                raise
+            except Exception:
+                # Connection may be half-open; next upload logs in again
+                self.clients.drop_thread_connection(kind, self.ftp_host, self.ftp_port, self.ftp_username)
+                raise
             
             return {
                 "status": "success",
@@ -675,7 +666,7 @@ class CloudUploader:
         try:
             import dropbox
             
-            dbx = dropbox.Dropbox(self.dropbox_token)
+            dbx = self.clients.dropbox_client(self.dropbox_token)
             
             # Generate Dropbox path
             filename = os.path.basename(file_path)
@@ -706,40 +697,25 @@ class CloudUploader:
             return {"status": "error", "message": f"Dropbox upload failed: {str(e)}"}
     
     def _log_upload(self, file_path, result, metadata):
-        """Log successful upload to tracking file"""
+        """Append a successful upload to the upload ledger"""
         try:
-            # Load existing log
-            log_data = []
-            if os.path.exists(self.upload_log_path):
-                with open(self.upload_log_path, 'r') as f:
-                    log_data = json.load(f)
-            
-            # Add new entry
-            log_entry = {
-                "local_path": file_path,
-                "uploaded_at": datetime.now().isoformat(),
-                "service": self.cloud_service,
-                "result": result,
-                "metadata": metadata
-            }
-            log_data.append(log_entry)
-            
-            # Save log
-            os.makedirs(os.path.dirname(self.upload_log_path), exist_ok=True)
-            with open(self.upload_log_path, 'w') as f:
-                json.dump(log_data, f, indent=2)
-                
+            self.ledger.record(file_path, result, metadata, service=self.cloud_service)
         except Exception as e:
             print(f"Warning: Could not log upload: {e}")
     
-    def get_upload_history(self, limit=50):
-        """Get recent upload history"""
+    def get_upload_history(self, limit=50, offset=0):
+        """
+        Get recent upload history
+        
+        Args:
+            limit (int): Maximum number of entries
+            offset (int): Entries to skip, counted from the most recent (for paging)
+            
+        Returns:
+            list: Upload log entries, oldest first within the page
+        """
         try:
-            if os.path.exists(self.upload_log_path):
-                with open(self.upload_log_path, 'r') as f:
-                    log_data = json.load(f)
-                return log_data[-limit:]
-            return []
+            return self.ledger.history(limit=limit, offset=offset, newest_first=False)
         except Exception:
             return []
     
@@ -751,21 +727,7 @@ class CloudUploader:
             list: List of successfully uploaded filenames
         """
         try:
-            if os.path.exists(self.upload_log_path):
-                with open(self.upload_log_path, 'r') as f:
-                    log_data = json.load(f)
-                
-                uploaded_files = []
-                for entry in log_data:
-                    if entry.get('result', {}).get('status') == 'success':
-                        filename = entry.get('metadata', {}).get('filename', '')
-                        if not filename:
-                            filename = os.path.basename(entry.get('local_path', ''))
-                        if filename:
-                            uploaded_files.append(filename)
-                
-                return uploaded_files
-            return []
+            return self.ledger.uploaded_filenames()
         except Exception as e:
             print(f"⚠️ Error getting uploaded files list: {e}")
             return []
@@ -779,28 +741,18 @@ class CloudUploader:
             dict: Result with status
         """
         try:
-            if os.path.exists(self.upload_log_path):
-                # Backup the log before clearing
-                backup_path = f"{self.upload_log_path}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                os.makedirs(os.path.dirname(backup_path), exist_ok=True)
-                
-                # Copy to backup
-                import shutil
-                shutil.copy2(self.upload_log_path, backup_path)
-                
-                # Clear the log
-                with open(self.upload_log_path, 'w') as f:
-                    json.dump([], f)
-                
-                return {
-                    "status": "success",
-                    "message": f"Upload log cleared. Backup saved to {backup_path}"
-                }
-            else:
+            if self.ledger.count() == 0:
                 return {
                     "status": "success",
-                    "message": "Upload log does not exist - nothing to clear"
+                    "message": "Upload log is empty - nothing to clear"
                 }
+            # Export the entries before clearing
+            backup_path = f"{self.upload_log_path}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            self.ledger.clear(backup_path=backup_path)
+            return {
+                "status": "success",
+                "message": f"Upload log cleared. Backup saved to {backup_path}"
+            }
         except Exception as e:
             return {
                 "status": "error",
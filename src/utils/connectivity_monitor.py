@@ -0,0 +1,300 @@
+"""
+Event-Driven Connectivity Monitor
+
+OfflineQueue.is_online() used to open a TCP connection to 8.8.8.8:53 with a
+3 s timeout on the caller's thread (BackendAPI checks it before every
+request), and the sync worker slept a fixed 30 s between checks, so queued
+data waited up to 30 s after the network came back. ConnectivityMonitor
+moves all of that onto one background thread:
+
+- probes: a non-blocking TCP connect (select() with probe_timeout) to the
+  configured backend host (CONNECTIVITY_PROBE_URL, else BACKEND_API_URL)
+- cadence: every online_interval seconds while online; while offline,
+  exponential backoff with jitter (backoff_base .. backoff_max, 2 s by
+  default, never exceeded by the jitter), so a backend that comes back behind
+  a link that never went down is seen within about 2 s
+- route watch: every route_interval (1 s) a UDP socket is "connected" to
+  the probe address, which only asks the OS for a route and sends nothing;
+  when a route appears or disappears the backoff is skipped and a probe runs
+  immediately, so a re-plugged cable or re-joined Wi-Fi is noticed within
+  about a second
+- state: is_online() returns the cached state and never blocks; state
+  changes notify a Condition (wait_for_change) and registered listeners
+- hints: report_failure() / report_success() from request paths trigger an
+  early probe or mark the link online without waiting for the next probe
+
+Usage:
+    monitor = get_connectivity_monitor()
+    monitor.add_listener(lambda online: wake_event.set() if online else None)
+    if monitor.is_online():
+        ...send...
+    monitor.wait_for_change(timeout=10)
+"""
+
+import errno
+import os
+import random
+import select
+import socket
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_PROBE_TARGET = ("8.8.8.8", 53)
+_IN_PROGRESS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, 10035}  # 10035 = WSAEWOULDBLOCK
+
+
+def probe_target_from_env() -> Tuple[str, int]:
+    """(host, port) to probe: CONNECTIVITY_PROBE_URL, else BACKEND_API_URL, else 8.8.8.8:53."""
+    url = os.getenv('CONNECTIVITY_PROBE_URL') or os.getenv('BACKEND_API_URL')
+    if url:
+        try:
+            parsed = urlparse(url if '://' in url else f"tcp://{url}")
+            if parsed.hostname:
+                port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+                return parsed.hostname, port
+        except ValueError:
+            pass
+    return DEFAULT_PROBE_TARGET
+
+
+class ConnectivityMonitor:
+    """Background reachability check with a cached, non-blocking state."""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, probe_timeout: float = 2.0,
+                 online_interval: float = 15.0, backoff_base: float = 0.5, backoff_max: float = 2.0,
+                 route_interval: float = 1.0):
+        """
+        Args:
+            host, port: Probe target (default: probe_target_from_env())
+            probe_timeout: Seconds to wait for a TCP connect
+            online_interval: Seconds between probes while online
+            backoff_base: First retry delay while offline (doubles per failed probe)
+            backoff_max: Upper bound of the offline retry delay (also the worst-case time to
+                         notice a backend that recovers while the local route stays up)
+            route_interval: Seconds between local route checks
+        """
+        if host is None:
+            host, default_port = probe_target_from_env()
+            port = port or default_port
+        self.host = host
+        self.port = int(port or 80)
+        self.probe_timeout = probe_timeout
+        self.online_interval = online_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.route_interval = route_interval
+
+        self._online: Optional[bool] = None     # None until the first probe finishes
+        self._changed = threading.Condition()
+        self._probe_requested = threading.Event()
+        self._listeners: List[Callable[[bool], None]] = []
+        self._running = False
+        self._thread = None
+        self._failures = 0
+        self._route_ok: Optional[bool] = None
+        self._resolved = None                    # (family, sockaddr) of the last successful resolve
+        self.last_probe_at = 0.0
+        self.last_change_at = 0.0
+        self.probe_count = 0
+
+    # ----------------------------------------------------------- public state
+
+    def is_online(self, strict: bool = False) -> bool:
+        """
+        Cached connectivity state (never blocks).
+
+        Args:
+            strict: If False (default) the state before the first probe counts as online, so
+                    requests are attempted (and queued on failure); if True it counts as offline
+
+        Returns:
+            bool
+        """
+        online = self._online
+        if online is None:
+            return not strict
+        return online
+
+    @property
+    def state(self) -> str:
+        """'online', 'offline' or 'unknown'"""
+        return {True: 'online', False: 'offline'}.get(self._online, 'unknown')
+
+    def wait_for_change(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the state changes.
+
+        Args:
+            timeout: Seconds to wait (None = forever)
+
+        Returns:
+            True if the state changed, False on timeout
+        """
+        with self._changed:
+            before = self._online
+            return self._changed.wait_for(lambda: self._online != before, timeout=timeout)
+
+    def add_listener(self, callback: Callable[[bool], None]) -> None:
+        """Call callback(online) from the monitor thread on every state change."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[bool], None]) -> None:
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def request_probe(self) -> None:
+        """Probe as soon as possible instead of waiting for the next scheduled probe."""
+        self._probe_requested.set()
+
+    def report_failure(self) -> None:
+        """Hint from a request path that a connection just failed."""
+        if self._online is not False:
+            self.request_probe()
+
+    def report_success(self) -> None:
+        """Hint from a request path that the backend just answered."""
+        if self._online is not True:
+            self._failures = 0
+            self._set_state(True)
+
+    def check_now(self) -> bool:
+        """Probe on the caller's thread (bounded by probe_timeout); for explicit user actions only."""
+        online = self._probe()
+        self._set_state(online)
+        return online
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "probe_target": f"{self.host}:{self.port}",
+            "probe_count": self.probe_count,
+            "consecutive_failures": self._failures,
+            "last_probe_at": self.last_probe_at,
+            "last_change_at": self.last_change_at,
+        }
+
+    # -------------------------------------------------------------- lifecycle
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="connectivity-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        self._probe_requested.set()
+        if self._thread:
+            self._thread.join(timeout=self.probe_timeout + 1)
+
+    # ---------------------------------------------------------------- probing
+
+    def _resolve(self):
+        try:
+            info = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)[0]
+            self._resolved = (info[0], info[4])
+        except (socket.gaierror, OSError, IndexError):
+            pass
+        return self._resolved
+
+    def _probe(self) -> bool:
+        """Non-blocking TCP connect to the probe target, waiting at most probe_timeout."""
+        self.probe_count += 1
+        self.last_probe_at = time.time()
+        resolved = self._resolve()
+        if resolved is None:
+            return False
+        family, addr = resolved
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            sock.setblocking(False)
+            err = sock.connect_ex(addr)
+            if err == 0:
+                return True
+            if err not in _IN_PROGRESS:
+                return False
+            _, writable, failed = select.select([], [sock], [sock], self.probe_timeout)
+            return bool(writable) and not failed and sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+        except OSError:
+            return False
+        finally:
+            sock.close()
+
+    def _route_available(self) -> bool:
+        """Whether the OS has a route to the probe address (UDP connect sends no packets)."""
+        family, addr = self._resolved or (socket.AF_INET, DEFAULT_PROBE_TARGET)
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            sock.connect(addr)
+            return True
+        except OSError:
+            return False
+        finally:
+            sock.close()
+
+    def _route_changed(self) -> bool:
+        route_ok = self._route_available()
+        changed = self._route_ok is not None and route_ok != self._route_ok
+        self._route_ok = route_ok
+        return changed
+
+    def _set_state(self, online: bool) -> None:
+        with self._changed:
+            if online == self._online:
+                return
+            previous = self._online
+            self._online = online
+            self.last_change_at = time.time()
+            self._changed.notify_all()
+        if previous is not None or not online:
+            print(f"🌐 Connectivity: {'online' if online else 'offline'} ({self.host}:{self.port})")
+        for callback in list(self._listeners):
+            try:
+                callback(online)
+            except Exception as e:
+                print(f"⚠️  Connectivity listener error: {e}")
+
+    def _next_delay(self, online: bool) -> float:
+        if online:
+            return self.online_interval
+        delay = self.backoff_base * (2 ** max(0, self._failures - 1))
+        return min(self.backoff_max, delay * random.uniform(0.8, 1.2))
+
+    def _run(self) -> None:
+        while self._running:
+            self._probe_requested.clear()
+            online = self._probe()
+            self._failures = 0 if online else self._failures + 1
+            self._set_state(online)
+
+            # Wait for the next probe; a requested probe or a route change cuts the wait short
+            deadline = time.monotonic() + self._next_delay(online)
+            self._route_changed()
+            while self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if self._probe_requested.wait(timeout=min(self.route_interval, remaining)):
+                    break
+                if self._route_changed():
+                    self._failures = 0
+                    break
+
+
+_connectivity_monitor: Optional[ConnectivityMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_connectivity_monitor() -> ConnectivityMonitor:
+    """Process-wide, started ConnectivityMonitor."""
+    global _connectivity_monitor
+    if _connectivity_monitor is None:
+        with _monitor_lock:
+            if _connectivity_monitor is None:
+                _connectivity_monitor = ConnectivityMonitor()
+                _connectivity_monitor.start()
+    return _connectivity_monitor
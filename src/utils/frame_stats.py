@@ -0,0 +1,94 @@
+"""
+Frame-Time Statistics for Live Plots
+
+Keeps the last N frame callback durations and frame-to-frame intervals in
+fixed ring buffers, so a live view can report its real refresh rate and
+per-frame cost (e.g. to confirm 30+ FPS on low-end clinic laptops) without
+allocating per frame.
+
+Usage:
+    stats = FrameTimeStats("Dashboard ECG")
+    t0 = stats.begin()
+    ...draw the frame...
+    stats.end(t0)
+    print(stats.summary())   # {'fps': 31.8, 'frame_ms_p50': 1.9, ...}
+    stats.maybe_report()     # prints a one-line summary every report_interval_s
+"""
+
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class FrameTimeStats:
+    """Ring-buffered frame durations / intervals with periodic console reporting."""
+
+    def __init__(self, name: str, window: int = 300, report_interval_s: float = 10.0):
+        self.name = name
+        self.window = int(window)
+        self.report_interval_s = report_interval_s
+        self._durations = np.zeros(self.window, dtype=float)   # seconds spent in the frame callback
+        self._intervals = np.zeros(self.window, dtype=float)   # seconds between frame starts
+        self._count = 0
+        self._last_start: Optional[float] = None
+        self._last_report = time.perf_counter()
+        self.frames_total = 0
+
+    def begin(self) -> float:
+        """Mark the start of a frame; returns the token to pass to end()."""
+        now = time.perf_counter()
+        if self._last_start is not None:
+            self._intervals[self._count % self.window] = now - self._last_start
+        self._last_start = now
+        return now
+
+    def end(self, start: float) -> None:
+        """Mark the end of the frame started at `start`."""
+        self._durations[self._count % self.window] = time.perf_counter() - start
+        self._count += 1
+        self.frames_total += 1
+
+    def reset(self) -> None:
+        self._durations.fill(0)
+        self._intervals.fill(0)
+        self._count = 0
+        self._last_start = None
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Statistics over the last `window` frames.
+
+        Returns:
+            dict with fps, frame_ms_mean/p50/p95/p99/max and interval_ms_p95 (empty when no frames)
+        """
+        n = min(self._count, self.window)
+        if n == 0:
+            return {}
+        durations = self._durations[:n] * 1000.0
+        result = {
+            "frames": float(n),
+            "frame_ms_mean": float(np.mean(durations)),
+            "frame_ms_p50": float(np.percentile(durations, 50)),
+            "frame_ms_p95": float(np.percentile(durations, 95)),
+            "frame_ms_p99": float(np.percentile(durations, 99)),
+            "frame_ms_max": float(np.max(durations)),
+        }
+        # The first frame after reset has no interval (its slot stays 0)
+        intervals = self._intervals[:n]
+        intervals = intervals[intervals > 0]
+        if intervals.size:
+            result["fps"] = float(1.0 / np.mean(intervals))
+            result["interval_ms_p95"] = float(np.percentile(intervals, 95) * 1000.0)
+        return result
+
+    def maybe_report(self) -> None:
+        """Print a one-line summary at most every report_interval_s."""
+        now = time.perf_counter()
+        if now - self._last_report < self.report_interval_s:
+            return
+        self._last_report = now
+        s = self.summary()
+        if s:
+            print(f"🎞️ {self.name}: {s.get('fps', 0.0):.1f} FPS, frame p50 {s['frame_ms_p50']:.1f} ms, "
+                  f"p95 {s['frame_ms_p95']:.1f} ms, max {s['frame_ms_max']:.1f} ms")
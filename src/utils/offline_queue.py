@@ -1,17 +1,30 @@
 """
 Offline Queue Manager for ECG Data
 Handles data queuing when internet is unavailable and syncs when connection is restored
+
+Items live in an SQLite queue (utils.queue_store, offline_queue/queue.db):
+drained by priority then FIFO in batches of OFFLINE_QUEUE_BATCH_SIZE, with
+exponential backoff + jitter per failed item. JSON files left in the old
+offline_queue/pending and failed folders are imported on startup.
+
+Connectivity comes from utils.connectivity_monitor: is_online() is a cached
+read, and the sync worker sleeps on an Event that is set when the link comes
+back, when data is queued while online, or when the next retry is due.
 """
 
 import os
 import json
 import time
 import threading
-import queue
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List
-import socket
+
+from .connectivity_monitor import ConnectivityMonitor, get_connectivity_monitor
+from .queue_store import QueueStore
+
+IDLE_WAIT_SECONDS = 60      # Longest sleep of the sync worker when nothing wakes it
+MIN_WAIT_SECONDS = 0.05     # Pause between drain cycles when more work is already due
 
 
 class OfflineQueue:
@@ -23,27 +36,34 @@ class OfflineQueue:
     - Auto-detects internet connectivity
     - Syncs queued data when connection restored
     - Prevents data loss
-    - Maintains data order
+    - Drains by priority, FIFO within a priority
     """
     
-    def __init__(self, queue_dir: str = "offline_queue"):
+    def __init__(self, queue_dir: str = "offline_queue", batch_size: Optional[int] = None,
+                 max_batches_per_cycle: Optional[int] = None, max_retries: int = 5,
+                 monitor: Optional[ConnectivityMonitor] = None):
         self.queue_dir = queue_dir
         self.pending_dir = os.path.join(queue_dir, "pending")
         self.failed_dir = os.path.join(queue_dir, "failed")
         self.synced_dir = os.path.join(queue_dir, "synced")
+        os.makedirs(queue_dir, exist_ok=True)
         
-        # Create directories
-        for dir_path in [self.pending_dir, self.failed_dir, self.synced_dir]:
-            os.makedirs(dir_path, exist_ok=True)
+        # Drain tuning: items per batch, batches per cycle (0 = until the queue is empty)
+        self.batch_size = batch_size or int(os.getenv('OFFLINE_QUEUE_BATCH_SIZE', '50'))
+        self.max_batches_per_cycle = (max_batches_per_cycle if max_batches_per_cycle is not None
+                                      else int(os.getenv('OFFLINE_QUEUE_MAX_BATCHES', '0')))
         
-        # Queue for in-memory items
-        self._memory_queue = queue.Queue()
+        # Persistent priority queue
+        self.store = QueueStore(os.path.join(queue_dir, "queue.db"), max_retries=max_retries)
+        
+        # Connectivity: cached state, change notifications wake the sync worker
+        self.monitor = monitor or get_connectivity_monitor()
+        self.monitor.add_listener(self._on_connectivity_change)
         
         # Sync thread
         self._sync_thread = None
         self._sync_running = False
-        self._last_connectivity_check = 0
-        self._is_online = False
+        self._wake = threading.Event()
         
         # Stats
         self.stats = {
@@ -53,6 +73,9 @@ class OfflineQueue:
             "pending_count": 0
         }
         
+        # Pick up items written by the file-based queue
+        self._import_legacy_files()
+        
         # Load pending items count
         self._update_stats()
         
@@ -61,25 +84,21 @@ class OfflineQueue:
     
     def is_online(self, force_check: bool = False) -> bool:
         """
-        Check if internet connection is available
-        Uses cached result for 30 seconds to avoid excessive checks
-        """
-        current_time = time.time()
-        
-        # Use cached result if recent (within 30 seconds)
-        if not force_check and (current_time - self._last_connectivity_check) < 30:
-            return self._is_online
+        Check if the backend is reachable (cached; never blocks)
         
-        # Perform connectivity check
-        try:
-            # Try to connect to Google DNS (8.8.8.8) on port 53
-            socket.create_connection(("8.8.8.8", 53), timeout=3)
-            self._is_online = True
-        except OSError:
-            self._is_online = False
-        
-        self._last_connectivity_check = current_time
-        return self._is_online
+        Args:
+            force_check: Also ask the monitor to probe again soon
+        """
+        if force_check:
+            self.monitor.request_probe()
+        return self.monitor.is_online()
+    
+    def _on_connectivity_change(self, online: bool) -> None:
+        """Monitor callback: drain as soon as the link is back"""
+        if online:
+            self._wake.set()
+        elif self.store.counts()["pending"]:
+            print("📴 Offline mode - data will be queued locally")
     
     def queue_data(self, data_type: str, data: Dict[str, Any], priority: int = 5) -> str:
         """
@@ -95,72 +114,51 @@ class OfflineQueue:
         """
         item_id = f"{data_type}_{int(time.time() * 1000)}_{os.urandom(4).hex()}"
         
-        queue_item = {
-            "id": item_id,
-            "type": data_type,
-            "data": data,
-            "priority": priority,
-            "queued_at": datetime.utcnow().isoformat() + 'Z',
-            "retry_count": 0,
-            "status": "pending"
-        }
-        
-        # Save to disk immediately
-        self._save_to_disk(queue_item, self.pending_dir)
-        
-        # Add to memory queue for faster processing
-        self._memory_queue.put(queue_item)
+        try:
+            self.store.put(item_id, data_type, data, priority=priority,
+                           queued_at=datetime.utcnow().isoformat() + 'Z')
+        except Exception as e:
+            print(f"⚠️  Failed to save queue item: {e}")
+            return item_id
         
         # Update stats
         self.stats["total_queued"] += 1
-        self.stats["pending_count"] += 1
+        self._update_stats()
+        
+        # Send right away if the link is up
+        if self.monitor.is_online(strict=True):
+            self._wake.set()
         
         print(f"📥 Queued {data_type}: {item_id}")
         return item_id
     
-    def _save_to_disk(self, item: Dict[str, Any], directory: str) -> None:
-        """Save queue item to disk"""
-        try:
-            file_path = os.path.join(directory, f"{item['id']}.json")
-            with open(file_path, 'w') as f:
-                json.dump(item, f, indent=2)
-        except Exception as e:
-            print(f"⚠️  Failed to save queue item to disk: {e}")
-    
-    def _load_from_disk(self, directory: str) -> List[Dict[str, Any]]:
-        """Load all queue items from disk directory"""
-        items = []
-        try:
+    def _import_legacy_files(self) -> int:
+        """Move items from the old pending/ and failed/ JSON folders into the queue store"""
+        imported = 0
+        for directory, status in ((self.pending_dir, 'pending'), (self.failed_dir, 'failed')):
+            if not os.path.isdir(directory):
+                continue
             for filename in sorted(os.listdir(directory)):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(directory, filename)
-                    try:
-                        with open(file_path, 'r') as f:
-                            items.append(json.load(f))
-                    except Exception as e:
-                        print(f"⚠️  Failed to load {filename}: {e}")
-        except Exception as e:
-            print(f"⚠️  Failed to read queue directory: {e}")
-        return items
-    
-    def _delete_from_disk(self, item_id: str, directory: str) -> None:
-        """Delete queue item from disk"""
-        try:
-            file_path = os.path.join(directory, f"{item_id}.json")
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception as e:
-            print(f"⚠️  Failed to delete queue item from disk: {e}")
-    
-    def _move_item(self, item_id: str, from_dir: str, to_dir: str) -> None:
-        """Move item from one directory to another"""
-        try:
-            from_path = os.path.join(from_dir, f"{item_id}.json")
-            to_path = os.path.join(to_dir, f"{item_id}.json")
-            if os.path.exists(from_path):
-                os.rename(from_path, to_path)
-        except Exception as e:
-            print(f"⚠️  Failed to move queue item: {e}")
+                if not filename.endswith('.json'):
+                    continue
+                file_path = os.path.join(directory, filename)
+                try:
+                    with open(file_path, 'r') as f:
+                        item = json.load(f)
+                    self.store.put(
+                        item['id'], item['type'], item.get('data', {}),
+                        priority=item.get('priority', 5),
+                        queued_at=item.get('queued_at'),
+                        retry_count=item.get('retry_count', 0) if status == 'pending' else 0,
+                        status=status,
+                    )
+                    os.remove(file_path)
+                    imported += 1
+                except Exception as e:
+                    print(f"⚠️  Failed to import {filename}: {e}")
+        if imported:
+            print(f"📦 Imported {imported} legacy queue item(s) into {self.store.db_path}")
+        return imported
     
     def start_sync_thread(self) -> None:
         """Start background sync thread"""
@@ -173,26 +171,19 @@ class OfflineQueue:
     def stop_sync_thread(self) -> None:
         """Stop background sync thread"""
         self._sync_running = False
+        self._wake.set()
         if self._sync_thread:
             self._sync_thread.join(timeout=5)
             print("⏹️  Offline queue sync thread stopped")
     
     def _sync_loop(self) -> None:
-        """Background sync loop"""
+        """Background sync loop (event driven)"""
         while self._sync_running:
+            self._wake.clear()
             try:
-                # Check connectivity every 30 seconds
-                if self.is_online(force_check=True):
-                    # Load pending items from disk if memory queue is empty
-                    if self._memory_queue.empty():
-                        pending_items = self._load_from_disk(self.pending_dir)
-                        for item in pending_items:
-                            self._memory_queue.put(item)
-                    
-                    # Process items from memory queue
+                if self.monitor.is_online(strict=True):
+                    # Drain everything that is due
                     self._process_queue()
-                else:
-                    print("📴 Offline mode - data will be queued locally")
                 
                 # Update stats
                 self._update_stats()
@@ -200,53 +191,71 @@ class OfflineQueue:
             except Exception as e:
                 print(f"⚠️  Error in sync loop: {e}")
             
-            # Sleep for 30 seconds before next check
-            time.sleep(30)
+            # Sleep until the link comes back, new data is queued, or the next retry is due
+            self._wake.wait(timeout=self._next_wait())
     
-    def _process_queue(self) -> None:
-        """Process queued items and attempt upload"""
-        processed = 0
-        max_batch = 10  # Process max 10 items per cycle
+    def _next_wait(self) -> float:
+        """Seconds the sync worker may sleep if nothing wakes it"""
+        if not self.monitor.is_online(strict=True):
+            return IDLE_WAIT_SECONDS
+        due_in = self.store.next_due_in()
+        if due_in is None:
+            return IDLE_WAIT_SECONDS
+        return min(IDLE_WAIT_SECONDS, max(MIN_WAIT_SECONDS, due_in))
+    
+    def _process_queue(self, max_batches: Optional[int] = None) -> int:
+        """
+        Drain due items in priority/FIFO batches
         
-        while not self._memory_queue.empty() and processed < max_batch:
-            try:
-                # Get item with timeout
-                item = self._memory_queue.get(timeout=1)
-                
-                # Attempt to sync
-                success = self._sync_item(item)
+        Stops when the queue has nothing due, after max_batches batches, or
+        when a whole batch failed (the backend is likely down; those items
+        are already rescheduled with backoff).
+        
+        Args:
+            max_batches: Batch limit for this call (default: max_batches_per_cycle, 0 = no limit)
+            
+        Returns:
+            Number of items synced
+        """
+        if max_batches is None:
+            max_batches = self.max_batches_per_cycle
+        synced_total = 0
+        batches = 0
+        
+        while not max_batches or batches < max_batches:
+            batch = self.store.next_batch(self.batch_size)
+            if not batch:
+                break
+            batches += 1
+            
+            synced_ids = []
+            for item in batch:
+                try:
+                    success = self._sync_item(item)
+                except Exception as e:
+                    print(f"⚠️  Error processing queue item: {e}")
+                    success = False
                 
                 if success:
-                    # Move to synced directory
-                    self._move_item(item['id'], self.pending_dir, self.synced_dir)
-                    self.stats["total_synced"] += 1
-                    self.stats["pending_count"] -= 1
+                    synced_ids.append(item['id'])
                     print(f"✅ Synced {item['type']}: {item['id']}")
-                    
-                    # Delete old synced items (keep last 100)
-                    self._cleanup_synced_items()
                 else:
-                    # Increment retry count
-                    item['retry_count'] += 1
-                    
-                    if item['retry_count'] < 5:
-                        # Re-queue for retry
-                        self._memory_queue.put(item)
-                        self._save_to_disk(item, self.pending_dir)
-                        print(f"🔄 Re-queued {item['type']}: {item['id']} (retry {item['retry_count']})")
-                    else:
-                        # Move to failed directory after 5 retries
-                        self._move_item(item['id'], self.pending_dir, self.failed_dir)
+                    status = self.store.mark_retry(item)
+                    if status == 'failed':
                         self.stats["total_failed"] += 1
-                        self.stats["pending_count"] -= 1
                         print(f"❌ Failed {item['type']}: {item['id']} (max retries exceeded)")
-                
-                processed += 1
-                
-            except queue.Empty:
+                    else:
+                        print(f"🔄 Re-queued {item['type']}: {item['id']} (retry {item['retry_count']})")
+            
+            self.store.mark_synced(synced_ids)
+            self.stats["total_synced"] += len(synced_ids)
+            synced_total += len(synced_ids)
+            
+            if not synced_ids:
                 break
-            except Exception as e:
-                print(f"⚠️  Error processing queue item: {e}")
+        
+        self._update_stats()
+        return synced_total
     
     def _sync_item(self, item: Dict[str, Any]) -> bool:
         """
@@ -295,59 +304,36 @@ class OfflineQueue:
     def _update_stats(self) -> None:
         """Update queue statistics"""
         try:
-            self.stats["pending_count"] = len([f for f in os.listdir(self.pending_dir) if f.endswith('.json')])
+            self.stats["pending_count"] = self.store.counts()["pending"]
         except Exception:
             pass
     
-    def _cleanup_synced_items(self, keep_last: int = 100) -> None:
-        """Clean up old synced items, keeping only the most recent ones"""
-        try:
-            synced_files = sorted([
-                f for f in os.listdir(self.synced_dir) if f.endswith('.json')
-            ])
-            
-            if len(synced_files) > keep_last:
-                files_to_delete = synced_files[:-keep_last]
-                for filename in files_to_delete:
-                    os.remove(os.path.join(self.synced_dir, filename))
-                print(f"🧹 Cleaned up {len(files_to_delete)} old synced items")
-        except Exception as e:
-            print(f"⚠️  Cleanup error: {e}")
-    
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics"""
         self._update_stats()
+        counts = self.store.counts()
         return {
             **self.stats,
+            "failed_count": counts["failed"],
             "is_online": self.is_online(),
+            "connectivity": self.monitor.stats(),
             "queue_dir": self.queue_dir
         }
     
     def get_pending_items(self) -> List[Dict[str, Any]]:
-        """Get all pending queue items"""
-        return self._load_from_disk(self.pending_dir)
+        """Get all pending queue items (in drain order)"""
+        return self.store.items('pending')
     
     def get_failed_items(self) -> List[Dict[str, Any]]:
         """Get all failed queue items"""
-        return self._load_from_disk(self.failed_dir)
+        return self.store.items('failed')
     
     def retry_failed_items(self) -> int:
         """Retry all failed items"""
-        failed_items = self.get_failed_items()
-        count = 0
-        
-        for item in failed_items:
-            # Reset retry count
-            item['retry_count'] = 0
-            item['status'] = 'pending'
-            
-            # Move back to pending
-            self._move_item(item['id'], self.failed_dir, self.pending_dir)
-            self._memory_queue.put(item)
-            
-            self.stats["total_failed"] -= 1
-            self.stats["pending_count"] += 1
-            count += 1
+        count = self.store.requeue_failed()
+        self.stats["total_failed"] -= count
+        self._update_stats()
+        self._wake.set()
         
         print(f"🔄 Retrying {count} failed items")
         return count
@@ -355,11 +341,9 @@ class OfflineQueue:
     def clear_synced_items(self) -> int:
         """Clear all synced items"""
         try:
-            synced_files = [f for f in os.listdir(self.synced_dir) if f.endswith('.json')]
-            for filename in synced_files:
-                os.remove(os.path.join(self.synced_dir, filename))
-            print(f"🧹 Cleared {len(synced_files)} synced items")
-            return len(synced_files)
+            count = self.store.delete_status('synced')
+            print(f"🧹 Cleared {count} synced items")
+            return count
         except Exception as e:
             print(f"⚠️  Clear error: {e}")
             return 0
@@ -367,7 +351,7 @@ class OfflineQueue:
     def force_sync_now(self) -> None:
         """Force immediate sync attempt"""
         print("🔄 Forcing immediate sync...")
-        if self.is_online(force_check=True):
+        if self.monitor.check_now():
             self._process_queue()
         else:
             print("📴 Cannot sync - no internet connection")
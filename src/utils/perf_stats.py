@@ -0,0 +1,223 @@
+"""
+Hot-Path Performance Counters and Ring Histograms
+
+Lightweight instrumentation for the acquisition / display / analysis loops:
+
+- RingHistogram: the last N values of one measurement (stage time in ms,
+  queue depth, ...) in a preallocated NumPy ring; percentiles are computed
+  only when a summary is asked for, so recording is a couple of attribute
+  writes.
+- PerfStats: named histograms, monotonically increasing counters (packets
+  decoded, samples dropped) and gauges (latest value: queue depth, RSS),
+  with a timer() context manager, a one-line-per-metric text summary for
+  the on-screen overlay in ECGTestPage and a JSON dump.
+- hot_path_verbose(): whether per-sample / per-packet debug output is
+  enabled. The "ecg.hotpath" logger defaults to WARNING, so those prints
+  are skipped; set ECG_HOTPATH_LOG=DEBUG (or call set_hot_path_log_level)
+  to get them back while debugging a device.
+
+Usage:
+    perf = get_perf_stats()
+    with perf.timer("serial.decode_ms"):
+        samples, consumed = decode_packet_stream(buf)
+    perf.incr("serial.packets", samples.shape[0])
+    perf.gauge("gui.queue_depth", ring.pending(cursor))
+    print(perf.summary())
+    perf.dump_json()          # logs/perf_stats_YYYYmmdd_HHMMSS.json
+
+    if hot_path_verbose():
+        print(f"📡 Packet #{n}: {parsed}")
+"""
+
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+HOT_PATH_LOGGER = logging.getLogger("ecg.hotpath")
+
+
+def hot_path_verbose() -> bool:
+    """True when per-sample debug output is enabled (ecg.hotpath logger at DEBUG)."""
+    return HOT_PATH_LOGGER.isEnabledFor(logging.DEBUG)
+
+
+def set_hot_path_log_level(level) -> None:
+    """Set the ecg.hotpath level, e.g. "DEBUG" to re-enable per-packet prints (unknown names -> WARNING)."""
+    try:
+        if isinstance(level, str):
+            level = int(level) if level.strip().isdigit() else level.strip().upper()
+        HOT_PATH_LOGGER.setLevel(level)
+    except (TypeError, ValueError):
+        print(f"⚠️ Unknown hot-path log level {level!r}, using WARNING")
+        HOT_PATH_LOGGER.setLevel(logging.WARNING)
+
+
+set_hot_path_log_level(os.environ.get("ECG_HOTPATH_LOG") or "WARNING")
+
+
+class RingHistogram:
+    """Fixed-size ring of the most recent values of one measurement."""
+
+    def __init__(self, window: int = 512):
+        self.window = int(window)
+        self._values = np.zeros(self.window, dtype=float)
+        self.count = 0          # values ever recorded
+        self.total = 0.0        # sum of values ever recorded
+        self.last = 0.0
+
+    def record(self, value: float) -> None:
+        self._values[self.count % self.window] = value
+        self.count += 1
+        self.total += value
+        self.last = value
+
+    def reset(self) -> None:
+        self._values.fill(0)
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Statistics over the retained window.
+
+        Returns:
+            dict with count (all time), mean/p50/p95/p99/max (window) and last; empty before the first value
+        """
+        n = min(self.count, self.window)
+        if n == 0:
+            return {}
+        values = self._values[:n]
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            'count': self.count,
+            'mean': float(np.mean(values)),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'max': float(np.max(values)),
+            'last': float(self.last),
+        }
+
+
+class PerfStats:
+    """Named ring histograms, counters and gauges for the live pipeline."""
+
+    def __init__(self, window: int = 512, enabled: bool = True):
+        self.window = int(window)
+        self.enabled = enabled
+        self._histograms: Dict[str, RingHistogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _histogram(self, name: str) -> RingHistogram:
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, RingHistogram(self.window))
+        return hist
+
+    def record(self, name: str, value: float) -> None:
+        """Add one value (e.g. a stage time in ms) to histogram `name`."""
+        if self.enabled:
+            self._histogram(name).record(value)
+
+    @contextlib.contextmanager
+    def timer(self, name: str):
+        """Record the block's wall time in ms into histogram `name`."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._histogram(name).record((time.perf_counter() - start) * 1000.0)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        if self.enabled and n:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + int(n)
+
+    def gauge(self, name: str, value: float) -> None:
+        if self.enabled:
+            self._gauges[name] = value
+
+    def counter(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+            self.started = time.time()
+
+    def summary(self) -> Dict[str, object]:
+        """{'uptime_s', 'histograms': {name: stats}, 'counters': {...}, 'gauges': {...}}"""
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'histograms': {name: hist.summary() for name, hist in sorted(histograms.items())},
+            'counters': dict(sorted(counters.items())),
+            'gauges': dict(sorted(self._gauges.items())),
+        }
+
+    def format_lines(self) -> List[str]:
+        """Compact text (one metric per line) for the on-screen overlay."""
+        s = self.summary()
+        uptime = max(1e-6, s['uptime_s'])
+        lines = []
+        for name, h in s['histograms'].items():
+            if h:
+                lines.append(f"{name:<24} p50 {h['p50']:7.2f}  p95 {h['p95']:7.2f}  max {h['max']:7.2f}")
+        for name, value in s['counters'].items():
+            lines.append(f"{name:<24} {value:>10}  ({value / uptime:,.0f}/s)")
+        for name, value in s['gauges'].items():
+            lines.append(f"{name:<24} {value:>10.1f}" if isinstance(value, float) else f"{name:<24} {value:>10}")
+        return lines
+
+    def dump_json(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Write summary() as JSON.
+
+        Args:
+            path: Output file (default: <repo>/logs/perf_stats_<timestamp>.json)
+
+        Returns:
+            Path written, or None on failure
+        """
+        if path is None:
+            base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+            path = os.path.join(base_dir, 'logs', f"perf_stats_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(self.summary(), f, indent=2)
+            print(f"💾 Performance stats written to {path}")
+            return path
+        except Exception as e:
+            print(f"❌ Could not write performance stats: {e}")
+            return None
+
+
+_perf_stats: Optional[PerfStats] = None
+
+
+def get_perf_stats() -> PerfStats:
+    """Process-wide PerfStats instance."""
+    global _perf_stats
+    if _perf_stats is None:
+        _perf_stats = PerfStats()
+    return _perf_stats
@@ -0,0 +1,294 @@
+"""
+SQLite Storage Engine for the Offline Queue
+
+OfflineQueue used to write every item as a pretty-printed JSON file under
+offline_queue/pending, list that directory to count items, and process at
+most 10 files per 30 s with priority ignored. QueueStore keeps the queue in
+one SQLite table (WAL journal) instead:
+
+- ordering: pending items drain by priority (1 = highest), then FIFO
+  (insertion sequence), skipping items whose retry backoff has not expired
+- payload blobs: waveform leads are packed as typed arrays (int32 / float32
+  only when that round-trips exactly, else float64) and zlib-compressed
+  instead of JSON number lists; other payloads are compact JSON
+- counters: pending / failed / synced counts are kept in memory and updated
+  in the same transaction as the rows, so stats never list a directory
+- retries: mark_retry() schedules the next attempt with exponential backoff
+  and jitter; after max_retries the item moves to 'failed'
+
+Usage:
+    store = QueueStore("offline_queue/queue.db")
+    store.put(item_id, "waveform", {"leads": leads, "sampling_rate": 500}, priority=5)
+    for item in store.next_batch(50):
+        ok = upload(item)
+        store.mark_synced([item["id"]]) if ok else store.mark_retry(item)
+    print(store.counts())   # {'pending': ..., 'failed': ..., 'synced': ...}
+"""
+
+import json
+import os
+import random
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+ENCODING_JSON = 'json'
+ENCODING_WAVEFORM = 'waveform-v1'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_items (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 5,
+    status TEXT NOT NULL DEFAULT 'pending',
+    retry_count INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    queued_at TEXT,
+    synced_at TEXT,
+    last_error TEXT,
+    encoding TEXT NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_drain ON queue_items(status, priority, seq);
+"""
+
+_STATUSES = ('pending', 'failed', 'synced')
+
+
+def _pack_array(values):
+    """Smallest exact typed array for a lead: int32 or float32 when the values round-trip, else float64."""
+    arr = np.asarray(values)
+    if arr.dtype.kind in 'iub' and (arr.size == 0 or (arr.min() >= -2**31 and arr.max() < 2**31)):
+        return arr.astype('<i4')
+    arr = arr.astype('<f8')
+    narrow = arr.astype('<f4')
+    if np.array_equal(arr, narrow, equal_nan=True):
+        return narrow
+    return arr
+
+
+def encode_payload(data_type: str, data: Dict[str, Any]):
+    """
+    Serialise a queue payload.
+
+    Waveform payloads ({'leads': {name: samples}, ...}) become a JSON header
+    plus raw little-endian arrays, zlib-compressed; everything else is
+    compact JSON.
+
+    Returns:
+        (encoding, bytes)
+    """
+    leads = data.get('leads') if data_type == 'waveform' and isinstance(data, dict) else None
+    if isinstance(leads, dict):
+        try:
+            arrays = [(str(name), _pack_array(values)) for name, values in leads.items()]
+            header = {
+                'meta': {k: v for k, v in data.items() if k != 'leads'},
+                'leads': [[name, arr.dtype.str, int(arr.size)] for name, arr in arrays],
+            }
+            header_bytes = json.dumps(header, separators=(',', ':'), default=str).encode('utf-8')
+            body = b''.join(arr.tobytes() for _, arr in arrays)
+            return ENCODING_WAVEFORM, zlib.compress(struct.pack('<I', len(header_bytes)) + header_bytes + body, 1)
+        except (TypeError, ValueError):
+            pass  # Ragged / non-numeric leads: fall back to JSON
+    return ENCODING_JSON, json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def decode_payload(encoding: str, blob: bytes) -> Dict[str, Any]:
+    """Inverse of encode_payload(); waveform leads come back as plain lists."""
+    if encoding == ENCODING_WAVEFORM:
+        raw = zlib.decompress(blob)
+        (header_len,) = struct.unpack_from('<I', raw, 0)
+        header = json.loads(raw[4:4 + header_len].decode('utf-8'))
+        offset = 4 + header_len
+        leads = {}
+        for name, dtype, size in header['leads']:
+            arr = np.frombuffer(raw, dtype=np.dtype(dtype), count=size, offset=offset)
+            offset += arr.nbytes
+            leads[name] = arr.tolist()
+        data = dict(header['meta'])
+        data['leads'] = leads
+        return data
+    return json.loads(bytes(blob).decode('utf-8'))
+
+
+class QueueStore:
+    """Priority + FIFO queue persisted in SQLite."""
+
+    _COLUMNS = "id, type, priority, status, retry_count, queued_at, encoding, payload"
+
+    def __init__(self, db_path: str, max_retries: int = 5, backoff_base: float = 2.0,
+                 backoff_max: float = 600.0, keep_synced: int = 100):
+        """
+        Args:
+            db_path: SQLite database file
+            max_retries: Attempts before an item moves to 'failed'
+            backoff_base: First retry delay in seconds (doubles per retry)
+            backoff_max: Upper bound of the retry delay in seconds
+            keep_synced: Synced rows retained for inspection
+        """
+        self.db_path = db_path
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.keep_synced = keep_synced
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._counts = {status: 0 for status in _STATUSES}
+        for status, n in self._conn.execute("SELECT status, COUNT(*) FROM queue_items GROUP BY status"):
+            self._counts[status] = n
+
+    def _bump(self, status: str, n: int) -> None:
+        self._counts[status] = self._counts.get(status, 0) + n
+
+    # ------------------------------------------------------------------ writes
+
+    def put(self, item_id: str, data_type: str, data: Dict[str, Any], priority: int = 5,
+            queued_at: Optional[str] = None, retry_count: int = 0, status: str = 'pending') -> None:
+        """Insert one item (ignored if item_id is already queued)."""
+        encoding, blob = encode_payload(data_type, data)
+        with self._lock:
+            with self._conn:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO queue_items (id, type, priority, status, retry_count, queued_at,"
+                    " encoding, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (item_id, data_type, int(priority), status, int(retry_count), queued_at, encoding,
+                     sqlite3.Binary(blob)),
+                )
+            if cur.rowcount:
+                self._bump(status, 1)
+
+    def mark_synced(self, item_ids: Iterable[str]) -> int:
+        """Mark items synced and trim synced rows beyond keep_synced."""
+        ids = list(item_ids)
+        if not ids:
+            return 0
+        now = time.strftime('%Y-%m-%dT%H:%M:%S')
+        with self._lock:
+            with self._conn:
+                cur = self._conn.executemany(
+                    "UPDATE queue_items SET status = 'synced', synced_at = ?, last_error = NULL"
+                    " WHERE id = ? AND status = 'pending'",
+                    [(now, item_id) for item_id in ids],
+                )
+                moved = cur.rowcount
+                trimmed = self._conn.execute(
+                    "DELETE FROM queue_items WHERE status = 'synced' AND seq NOT IN"
+                    " (SELECT seq FROM queue_items WHERE status = 'synced' ORDER BY seq DESC LIMIT ?)",
+                    (self.keep_synced,),
+                ).rowcount
+            self._bump('pending', -moved)
+            self._bump('synced', moved - trimmed)
+        return moved
+
+    def retry_delay(self, retry_count: int) -> float:
+        """Exponential backoff with +/-50% jitter for the given attempt number."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** max(0, retry_count - 1)))
+        return delay * random.uniform(0.5, 1.5)
+
+    def mark_retry(self, item: Dict[str, Any], error: Optional[str] = None) -> str:
+        """
+        Record a failed attempt.
+
+        Args:
+            item: Item dict from next_batch()
+            error: Optional error text
+
+        Returns:
+            'pending' (rescheduled with backoff) or 'failed' (max_retries reached)
+        """
+        retry_count = int(item.get('retry_count', 0)) + 1
+        item['retry_count'] = retry_count
+        status = 'failed' if retry_count >= self.max_retries else 'pending'
+        next_attempt = time.time() + self.retry_delay(retry_count) if status == 'pending' else 0
+        with self._lock:
+            with self._conn:
+                cur = self._conn.execute(
+                    "UPDATE queue_items SET retry_count = ?, status = ?, next_attempt = ?, last_error = ?"
+                    " WHERE id = ? AND status = 'pending'",
+                    (retry_count, status, next_attempt, error, item['id']),
+                )
+            if cur.rowcount and status == 'failed':
+                self._bump('pending', -1)
+                self._bump('failed', 1)
+        item['status'] = status
+        return status
+
+    def requeue_failed(self) -> int:
+        """Move every failed item back to pending with a fresh retry budget."""
+        with self._lock:
+            with self._conn:
+                n = self._conn.execute(
+                    "UPDATE queue_items SET status = 'pending', retry_count = 0, next_attempt = 0"
+                    " WHERE status = 'failed'"
+                ).rowcount
+            self._bump('failed', -n)
+            self._bump('pending', n)
+        return n
+
+    def delete_status(self, status: str) -> int:
+        with self._lock:
+            with self._conn:
+                n = self._conn.execute("DELETE FROM queue_items WHERE status = ?", (status,)).rowcount
+            self._bump(status, -n)
+        return n
+
+    # ------------------------------------------------------------------- reads
+
+    def _row_to_item(self, row) -> Dict[str, Any]:
+        item_id, data_type, priority, status, retry_count, queued_at, encoding, payload = row
+        return {
+            "id": item_id,
+            "type": data_type,
+            "data": decode_payload(encoding, payload),
+            "priority": priority,
+            "queued_at": queued_at,
+            "retry_count": retry_count,
+            "status": status,
+        }
+
+    def next_batch(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Up to `limit` pending items that are due, highest priority first, FIFO within a priority."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM queue_items WHERE status = 'pending' AND next_attempt <= ?"
+                " ORDER BY priority, seq LIMIT ?",
+                (time.time(), int(limit)),
+            ).fetchall()
+        return [self._row_to_item(row) for row in rows]
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the earliest pending item is due (0 if one is due now, None if none pending)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt) FROM queue_items WHERE status = 'pending'"
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def items(self, status: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM queue_items WHERE status = ? ORDER BY priority, seq", (status,)
+            ).fetchall()
+        return [self._row_to_item(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """{'pending', 'failed', 'synced'} row counts (in-memory, O(1))."""
+        return dict(self._counts)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -11,6 +11,10 @@ class SettingsManager:
             "lead_sequence": "Standard",
             "serial_port": "Select Port",
             "baud_rate": "115200",
+            "serial_acquisition_mode": "thread",  # "thread" or "poll" (legacy GUI-timer reads)
+            "full_disclosure_recording": "on",    # record every sample to reports/full_disclosure
+            "full_disclosure_max_age_days": "30", # delete older sessions when a new one starts (0 = keep)
+            "full_disclosure_max_total_mb": "2048",  # then trim oldest sessions to this total (0 = no limit)
 
             # Printer Setup settings
             "printer_average_wave": "on",
@@ -0,0 +1,180 @@
+"""
+Persistent Sync-State Index for AutoSyncService
+
+AutoSyncService kept file mtimes in a dict, so after every restart all
+reports looked new, and every 5 s cycle globbed and stat'ed the whole
+reports directory. SyncStateIndex keeps that state in SQLite across runs:
+
+- files: path -> size, mtime_ns, sha256, remote key, status, synced_at
+- dirs:  path -> mtime_ns of the last completed scan, so a directory whose
+  mtime has not moved (no file created, deleted or renamed) is not rescanned
+
+A file whose size and mtime match the index is unchanged without reading it;
+when only the mtime moved, the sha256 decides whether it really changed.
+
+Usage:
+    index = SyncStateIndex("reports/sync_state.db")
+    if index.dir_changed(reports_dir):
+        dir_mtime = os.stat(reports_dir).st_mtime_ns
+        for path in reports_dir.glob("ECG_Report_*.pdf"):
+            if index.needs_sync(path):
+                ...upload...
+                index.mark(path, status="success", remote_key=result.get("key"))
+        index.mark_dir_scanned(reports_dir, dir_mtime)
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.upload_ledger import file_sha256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    remote_key TEXT,
+    status TEXT,
+    synced_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_files_status ON files(status);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER
+);
+"""
+
+# Terminal statuses: the file's current contents need no further upload
+SYNCED_STATUSES = ('success', 'already_uploaded', 'skipped')
+
+
+class SyncStateIndex:
+    """On-disk record of what AutoSyncService has already synced."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def dir_changed(self, dir_path) -> bool:
+        """True if dir_path's mtime differs from the last mark_dir_scanned() (or it was never scanned)."""
+        try:
+            mtime_ns = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return False
+        with self._lock:
+            row = self._conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (str(dir_path),)).fetchone()
+        return row is None or row[0] != mtime_ns
+
+    def mark_dir_scanned(self, dir_path, mtime_ns: Optional[int] = None) -> None:
+        """
+        Remember dir_path's mtime as scanned.
+
+        Args:
+            dir_path: Directory that was scanned
+            mtime_ns: mtime read before the scan started (default: current mtime); passing
+                      it means a file created during the scan still changes the directory
+        """
+        if mtime_ns is None:
+            try:
+                mtime_ns = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                return
+        with self._lock:
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO dirs (path, mtime_ns) VALUES (?, ?)",
+                                   (str(dir_path), mtime_ns))
+
+    def get(self, file_path) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, sha256, remote_key, status, synced_at FROM files WHERE path = ?",
+                (str(file_path),),
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('size', 'mtime_ns', 'sha256', 'remote_key', 'status', 'synced_at'), row))
+
+    def needs_sync(self, file_path) -> bool:
+        """
+        Whether file_path has contents that were not synced yet.
+
+        Size + mtime equal to the index means unchanged (no read). If only
+        the mtime moved and the sha256 still matches, the new mtime is stored
+        and the file is treated as unchanged.
+
+        Args:
+            file_path: File to check
+
+        Returns:
+            bool
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return False
+        entry = self.get(file_path)
+        if entry is None or entry['status'] not in SYNCED_STATUSES:
+            return True
+        if entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return False
+        if entry['sha256'] and entry['size'] == st.st_size and file_sha256(str(file_path)) == entry['sha256']:
+            with self._lock:
+                with self._conn:
+                    self._conn.execute("UPDATE files SET mtime_ns = ? WHERE path = ?",
+                                       (st.st_mtime_ns, str(file_path)))
+            return False
+        return True
+
+    def mark(self, file_path, status: str, remote_key: Optional[str] = None,
+             sha256: Optional[str] = None) -> None:
+        """
+        Store the current size/mtime/sha256 of file_path with its sync status.
+
+        Args:
+            file_path: File that was processed
+            status: Upload status ('success', 'already_uploaded', 'skipped', 'error', ...)
+            remote_key: Object key / URL / remote path returned by the backend
+            sha256: Content hash if already computed
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return
+        if sha256 is None:
+            sha256 = file_sha256(str(file_path))
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, remote_key, status, synced_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (str(file_path), st.st_size, st.st_mtime_ns, sha256, remote_key, status,
+                     datetime.now().isoformat()),
+                )
+
+    def pending_paths(self) -> List[Path]:
+        """Files whose last attempt did not reach a synced status (retried on the next scan)."""
+        placeholders = ",".join("?" for _ in SYNCED_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT path FROM files WHERE status NOT IN ({placeholders})", SYNCED_STATUSES
+            ).fetchall()
+        return [Path(row[0]) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,318 @@
+"""
+Indexed Upload Ledger for CloudUploader
+
+reports/upload_log.json was a single JSON list that every dedupe check,
+history query and upload re-read in full (and rewrote with indent=2 after
+each upload), so AutoSyncService cycles got slower as the log grew.
+UploadLedger keeps the same entries in an SQLite database (stdlib sqlite3,
+WAL journal):
+
+- one row per logged upload, appended with a single INSERT
+- indexes on file name, content hash (sha256) and user-signup identity, so
+  "already uploaded?" is an index lookup instead of a scan
+- paginated history (newest first) without loading the whole ledger
+- a one-time migration of an existing upload_log.json; the JSON file is
+  renamed to upload_log.json.migrated afterwards
+
+The stored entry keeps the old log format (local_path, uploaded_at, service,
+result, metadata), so get_upload_history() callers see the same dicts.
+
+Usage:
+    ledger = get_upload_ledger("reports/upload_ledger.db",
+                               legacy_json_path="reports/upload_log.json")
+    if not ledger.is_uploaded(os.path.basename(path), file_sha256(path)):
+        ...upload...
+        ledger.record(path, result, metadata, service="s3")
+    recent = ledger.history(limit=50, offset=0)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL,
+    meta_filename TEXT,
+    content_hash TEXT,
+    status TEXT,
+    service TEXT,
+    kind TEXT,
+    username TEXT,
+    serial_number TEXT,
+    uploaded_at TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_filename ON uploads(filename, status);
+CREATE INDEX IF NOT EXISTS idx_uploads_meta_filename ON uploads(meta_filename, status);
+CREATE INDEX IF NOT EXISTS idx_uploads_hash ON uploads(content_hash, status);
+CREATE INDEX IF NOT EXISTS idx_uploads_user ON uploads(kind, username);
+CREATE INDEX IF NOT EXISTS idx_uploads_serial ON uploads(kind, serial_number);
+CREATE TABLE IF NOT EXISTS ledger_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def file_sha256(file_path: str) -> Optional[str]:
+    """
+    sha256 hex digest of a file, read in 1 MB chunks.
+
+    Args:
+        file_path: File to hash
+
+    Returns:
+        Hex digest, or None if the file cannot be read
+    """
+    try:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except (OSError, TypeError):
+        return None
+
+
+class UploadLedger:
+    """Append-only, indexed record of cloud uploads."""
+
+    def __init__(self, db_path: str = "reports/upload_ledger.db", legacy_json_path: Optional[str] = None):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        if legacy_json_path:
+            self.migrate_json_log(legacy_json_path)
+
+    # ------------------------------------------------------------------ writes
+
+    @staticmethod
+    def _row_for_entry(entry: Dict, content_hash: Optional[str] = None):
+        metadata = entry.get('metadata') or {}
+        result = entry.get('result') or {}
+        return (
+            os.path.basename(entry.get('local_path') or ''),
+            metadata.get('filename') or None,
+            content_hash or entry.get('content_hash'),
+            result.get('status'),
+            entry.get('service'),
+            metadata.get('type'),
+            metadata.get('username'),
+            metadata.get('serial_number') or None,
+            entry.get('uploaded_at'),
+            json.dumps(entry, default=str),
+        )
+
+    def _insert(self, rows) -> None:
+        self._conn.executemany(
+            "INSERT INTO uploads (filename, meta_filename, content_hash, status, service, kind,"
+            " username, serial_number, uploaded_at, entry) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def record(self, file_path: str, result: Dict, metadata: Optional[Dict] = None,
+               service: Optional[str] = None, content_hash: Optional[str] = None) -> Dict:
+        """
+        Append one upload entry.
+
+        Args:
+            file_path: Local file that was uploaded
+            result: Upload result dict from the cloud backend
+            metadata: Upload metadata (filename, type, username, ...)
+            service: Cloud service name
+            content_hash: sha256 of the file (computed here if not given)
+
+        Returns:
+            The stored entry (old upload_log.json format plus content_hash)
+        """
+        if content_hash is None:
+            content_hash = file_sha256(file_path)
+        entry = {
+            "local_path": file_path,
+            "uploaded_at": datetime.now().isoformat(),
+            "service": service,
+            "result": result,
+            "metadata": metadata or {},
+            "content_hash": content_hash,
+        }
+        with self._lock:
+            self._insert([self._row_for_entry(entry, content_hash)])
+            self._conn.commit()
+        return entry
+
+    def migrate_json_log(self, json_path: str) -> int:
+        """
+        Import an old upload_log.json once, then rename it to <json_path>.migrated.
+
+        Args:
+            json_path: Path of the legacy JSON log
+
+        Returns:
+            Number of entries imported (0 if already migrated or no log)
+        """
+        if not os.path.exists(json_path):
+            return 0
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM ledger_meta WHERE key = ?", ('migrated:' + os.path.abspath(json_path),)
+            ).fetchone()
+        if done:
+            return 0
+        try:
+            with open(json_path, 'r') as f:
+                log_data = json.load(f)
+            if not isinstance(log_data, list):
+                log_data = []
+        except Exception as e:
+            print(f"⚠️ Could not read legacy upload log {json_path}: {e}")
+            return 0
+
+        rows = [self._row_for_entry(entry) for entry in log_data if isinstance(entry, dict)]
+        with self._lock:
+            with self._conn:
+                self._insert(rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO ledger_meta (key, value) VALUES (?, ?)",
+                    ('migrated:' + os.path.abspath(json_path), datetime.now().isoformat()),
+                )
+        try:
+            os.replace(json_path, json_path + ".migrated")
+        except OSError as e:
+            print(f"⚠️ Could not rename migrated upload log: {e}")
+        print(f"✅ Migrated {len(rows)} upload log entries into {self.db_path}")
+        return len(rows)
+
+    def clear(self, backup_path: Optional[str] = None) -> Optional[str]:
+        """
+        Delete every entry, optionally exporting them first.
+
+        Args:
+            backup_path: JSON file to write the entries to before clearing
+
+        Returns:
+            backup_path if a backup was written, else None
+        """
+        written = None
+        with self._lock:
+            if backup_path:
+                entries = [json.loads(row[0]) for row in
+                           self._conn.execute("SELECT entry FROM uploads ORDER BY id")]
+                os.makedirs(os.path.dirname(os.path.abspath(backup_path)), exist_ok=True)
+                with open(backup_path, 'w') as f:
+                    json.dump(entries, f, indent=2)
+                written = backup_path
+            with self._conn:
+                self._conn.execute("DELETE FROM uploads")
+        return written
+
+    # ------------------------------------------------------------------- reads
+
+    def is_uploaded(self, filename: Optional[str] = None, content_hash: Optional[str] = None) -> bool:
+        """
+        Whether a successful upload exists for this file name or content hash.
+
+        Args:
+            filename: Base name of the file (matches the logged path or metadata filename)
+            content_hash: sha256 of the file contents
+
+        Returns:
+            bool
+        """
+        with self._lock:
+            if filename:
+                if self._conn.execute(
+                    "SELECT 1 FROM uploads WHERE filename = ? AND status = 'success' LIMIT 1", (filename,)
+                ).fetchone():
+                    return True
+                if self._conn.execute(
+                    "SELECT 1 FROM uploads WHERE meta_filename = ? AND status = 'success' LIMIT 1", (filename,)
+                ).fetchone():
+                    return True
+            if content_hash:
+                if self._conn.execute(
+                    "SELECT 1 FROM uploads WHERE content_hash = ? AND status = 'success' LIMIT 1", (content_hash,)
+                ).fetchone():
+                    return True
+        return False
+
+    def is_user_signup_uploaded(self, username: Optional[str], serial_number: Optional[str] = None) -> bool:
+        """Whether a successful user_signup upload exists for this username or serial number."""
+        with self._lock:
+            if username and self._conn.execute(
+                "SELECT 1 FROM uploads WHERE kind = 'user_signup' AND username = ? AND status = 'success' LIMIT 1",
+                (username,),
+            ).fetchone():
+                return True
+            if serial_number and self._conn.execute(
+                "SELECT 1 FROM uploads WHERE kind = 'user_signup' AND serial_number = ? AND status = 'success' LIMIT 1",
+                (serial_number,),
+            ).fetchone():
+                return True
+        return False
+
+    def history(self, limit: int = 50, offset: int = 0, newest_first: bool = True) -> List[Dict]:
+        """
+        One page of logged entries.
+
+        Args:
+            limit: Page size
+            offset: Entries to skip, counted from the newest
+            newest_first: Order of the returned page (False = chronological)
+
+        Returns:
+            list of entry dicts
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entry FROM uploads ORDER BY id DESC LIMIT ? OFFSET ?", (int(limit), int(offset))
+            ).fetchall()
+        entries = [json.loads(row[0]) for row in rows]
+        if not newest_first:
+            entries.reverse()
+        return entries
+
+    def uploaded_filenames(self) -> List[str]:
+        """File names of every successful upload, oldest first (metadata filename preferred)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT COALESCE(meta_filename, filename) FROM uploads WHERE status = 'success' ORDER BY id"
+            ).fetchall()
+        return [row[0] for row in rows if row[0]]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_ledgers: Dict[str, UploadLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_upload_ledger(db_path: str = "reports/upload_ledger.db",
+                      legacy_json_path: Optional[str] = "reports/upload_log.json") -> UploadLedger:
+    """Process-wide UploadLedger for db_path (migrates legacy_json_path on first open)."""
+    key = os.path.abspath(db_path)
+    with _ledgers_lock:
+        ledger = _ledgers.get(key)
+        if ledger is None:
+            ledger = UploadLedger(db_path, legacy_json_path=legacy_json_path)
+            _ledgers[key] = ledger
+        return ledger